@@ -686,8 +686,13 @@ def get_metrics():
             "stage0_candidates_last": 0,
             "stage1_candidates_last": 0,
             "rrf_fusion_used_total": 0,
+            "citation_forced_total": 0,
+            "citation_retry_avoided_total": 0,
             "retrieval_latency_ms_p50": 0,
             "retrieval_latency_ms_p95": 0,
+            "streamed_answers_total": 0,
+            "ttft_ms_p50": 0,
+            "ttft_ms_p95": 0,
         })
 
     # 10. Retriever 실시간 메트릭 (v2.0 추가)
@@ -703,6 +708,43 @@ def get_metrics():
     except Exception as e:
         print(f"Retriever 메트릭 조회 실패: {e}")
 
+    # 11. 답변 캐시 메트릭 (single-flight로 공유된 생성 수 포함)
+    try:
+        from app.rag.cache_manager import get_cache_stats
+        from app.rag.persistent_cache import get_persistent_cache
+
+        memory_stats = get_cache_stats()
+        persistent_stats = get_persistent_cache().stats
+        metrics["answer_cache"] = {
+            "memory_hit_rate": memory_stats["hit_rate"],
+            "inflight_count": memory_stats["inflight_count"],
+            "coalesced_in_process": memory_stats["coalesced"],
+            "coalesced_cross_process": persistent_stats["coalesced"],
+            "inflight_timeouts": memory_stats["inflight_timeouts"] + persistent_stats["lease_timeouts"],
+        }
+    except Exception as e:
+        print(f"답변 캐시 메트릭 조회 실패: {e}")
+
+    # 12. LLM 생성 스케줄러 (큐 깊이, 대기 시간, 만료/취소 수)
+    try:
+        from rag_system.generation_scheduler import get_scheduler_stats
+
+        scheduler_stats = get_scheduler_stats()
+        if scheduler_stats is not None:
+            metrics["llm_scheduler"] = scheduler_stats
+    except Exception as e:
+        print(f"생성 스케줄러 메트릭 조회 실패: {e}")
+
+    # 13. 프롬프트 접두부 KV 상태 캐시 (복원/보유 횟수, 재사용 토큰 수)
+    try:
+        from rag_system.prompt_prefix_cache import get_prefix_cache_stats
+
+        prefix_stats = get_prefix_cache_stats()
+        if prefix_stats is not None:
+            metrics["llm_prefix_cache"] = prefix_stats
+    except Exception as e:
+        print(f"접두부 캐시 메트릭 조회 실패: {e}")
+
     return metrics
 
 
@@ -22,6 +22,16 @@ from app.rag.smart_cache_key import generate_smart_cache_key
 logger = logging.getLogger(__name__)
 
 
+class _Flight:
+    """계산 중인 키 (완료 신호 + 팔로워와 공유할 결과)"""
+
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+
+
 class QueryCache:
     """Thread-safe in-memory cache for query results with TTL and LRU eviction"""
 
@@ -40,10 +50,12 @@ class QueryCache:
             "hits": 0,
             "misses": 0,
             "evictions": 0,
-            "expired": 0
+            "expired": 0,
+            "coalesced": 0,  # 리더의 계산 결과를 공유받은 요청 수
+            "inflight_timeouts": 0,
         }
         # 스탬피드 방지: 계산 중인 키 추적
-        self._inflight: Dict[str, threading.Event] = {}
+        self._inflight: Dict[str, _Flight] = {}
         # monotonic clock (wall-clock 대신)
         self._monotonic = time.monotonic
 
@@ -142,27 +154,28 @@ class QueryCache:
                 # 이미 다른 스레드가 계산 중
                 return False
             # 새로운 이벤트 생성
-            ev = threading.Event()
-            self._inflight[key] = ev
+            self._inflight[key] = _Flight()
             return True
 
     def end_inflight(self, query: str, mode: Optional[str] = None,
-                     namespace: Optional[str] = None) -> None:
+                     namespace: Optional[str] = None, result: Any = None) -> None:
         """계산 완료 신호
 
         Args:
             query: 검색 질의
             mode: 검색 모드
             namespace: 버전 네임스페이스
+            result: 대기 중인 팔로워에게 전달할 결과 (None이면 실패 → 팔로워가 직접 계산)
         """
         key = self._generate_key(query, mode, namespace)
         with self._lock:
-            ev = self._inflight.pop(key, None)
-            if ev:
-                ev.set()  # 대기 중인 스레드 깨우기
+            flight = self._inflight.pop(key, None)
+            if flight:
+                flight.result = result
+                flight.event.set()  # 대기 중인 스레드 깨우기
 
     def wait_inflight(self, query: str, mode: Optional[str] = None,
-                      namespace: Optional[str] = None, timeout: float = 10.0) -> None:
+                      namespace: Optional[str] = None, timeout: float = 10.0) -> Optional[Any]:
         """다른 스레드의 계산 완료 대기
 
         Args:
@@ -170,12 +183,23 @@ class QueryCache:
             mode: 검색 모드
             namespace: 버전 네임스페이스
             timeout: 최대 대기 시간 (초)
+
+        Returns:
+            리더가 공유한 결과 (계산 중인 키가 없거나, 실패/타임아웃이면 None)
         """
         key = self._generate_key(query, mode, namespace)
         with self._lock:
-            ev = self._inflight.get(key)
-        if ev:
-            ev.wait(timeout=timeout)
+            flight = self._inflight.get(key)
+        if not flight:
+            return None
+
+        finished = flight.event.wait(timeout=timeout)
+        with self._lock:
+            if not finished:
+                self.stats["inflight_timeouts"] += 1
+            elif flight.result is not None:
+                self.stats["coalesced"] += 1
+        return flight.result if finished else None
 
     def set(self, query: str, result: Any, mode: Optional[str] = None,
             namespace: Optional[str] = None):
@@ -207,6 +231,8 @@ class QueryCache:
         """Clear all cached entries (thread-safe)"""
         with self._lock:
             self.cache.clear()
+            for flight in self._inflight.values():
+                flight.event.set()  # 대기 중인 스레드는 직접 계산
             self._inflight.clear()
             logger.info("Cache cleared")
 
@@ -224,7 +250,9 @@ class QueryCache:
                 "evictions": self.stats["evictions"],
                 "expired": self.stats["expired"],
                 "hit_rate": f"{hit_rate:.2%}",
-                "inflight_count": len(self._inflight)
+                "inflight_count": len(self._inflight),
+                "coalesced": self.stats["coalesced"],
+                "inflight_timeouts": self.stats["inflight_timeouts"]
             }
 
 
@@ -125,6 +125,9 @@ def get_retriever_config_hash() -> str:
         "display_limit": _norm_env("DISPLAY_LIMIT", "20"),
         "snippet_max": _norm_env("SNIPPET_MAX_LENGTH", "3600"),
         "backend": _norm_env("RETRIEVER_BACKEND", "bm25"),
+        "bm25_scorer": _norm_env("BM25_SCORER", "python"),
+        "bm25_passage": _norm_env("BM25_PASSAGE_CHARS", "0"),
+        "bm25_passage_agg": _norm_env("BM25_PASSAGE_AGG", "max"),
         "parallel": _norm_env("ENABLE_PARALLEL_SEARCH", "true"),
         "exact": _norm_env("ENABLE_EXACT_MATCH", "true"),
         "bm25_path": os.getenv("BM25_INDEX_PATH", "var/index/bm25_index.pkl").strip(),
@@ -164,3 +167,39 @@ def get_namespace_for_mode(mode: Optional[str] = None) -> str:
     if mode:
         return f"{base}|mode:{mode}"
     return base
+
+
+def get_generation_config_hash() -> str:
+    """
+    답변 생성 관련 구성을 정규화하여 8자 해시로 반환.
+    - LLM 모델/생성 파라미터 + 운용 모드/문서근거 설정
+
+    Returns:
+        구성 해시 (8자)
+    """
+    cfg = {
+        "model": os.getenv("LLM_MODEL_PATH", "").strip(),
+        "chat_format": _norm_env("CHAT_FORMAT", "auto"),
+        "temperature": _norm_env("LLM_TEMPERATURE", "0.1"),
+        "max_tokens": _norm_env("LLM_MAX_TOKENS", "2048"),
+        "mode": _norm_env("MODE", "auto"),
+        "rag_min_score": _norm_env("RAG_MIN_SCORE", "0.35"),
+        "doc_topk": _norm_env("DOC_TOPK", "3"),
+        "require_citations": _norm_env("REQUIRE_CITATIONS", "true"),
+        "allow_ungrounded": _norm_env("ALLOW_UNGROUNDED_CHAT", "true"),
+        "compress": _norm_env("COMPRESS_ENABLED", "true") + ":" + _norm_env("COMPRESS_RATIO", "0.7"),
+        "rerank": _norm_env("RERANK_ENABLED", "true"),
+    }
+    config_str = "|".join(f"{k}={cfg[k]}" for k in sorted(cfg.keys()))
+    return _sha8(config_str)
+
+
+def current_answer_namespace() -> str:
+    """
+    답변 캐시 네임스페이스 (검색 네임스페이스 + 생성 구성 해시).
+    재색인/구성 변경 시에만 바뀌므로 그 외에는 기존 캐시를 그대로 사용한다.
+
+    Returns:
+        네임스페이스 문자열 (예: 'backend:bm25|index:...|conf:a1b2c3d4|gen:e5f6a7b8')
+    """
+    return f"{current_retriever_namespace()}|gen:{get_generation_config_hash()}"
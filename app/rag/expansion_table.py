@@ -0,0 +1,283 @@
+"""
+오프라인 쿼리 확장 테이블
+
+검색 시점에 LLM을 호출하지 않도록 확장어를 미리 계산해 JSON으로 저장합니다.
+- synonyms: config/query_expansion.yaml 동의어 그룹(양방향) + 형태 패턴
+            + 코퍼스에서 찾은 표기 변형 (예: lvm-180a ↔ lvm180a)
+- related: 코퍼스 문서 단위 공기(co-occurrence) 용어, NPMI 순
+
+구축: python scripts/build_expansion_table.py
+조회: ExpansionTable.lookup (사전 조회, 마이크로초 단위)
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+TABLE_VERSION = 1
+DEFAULT_TABLE_PATH = "var/index/query_expansion_table.json"
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "query_expansion.yaml"
+
+# 어절 끝 조사 (긴 것부터 제거 시도)
+JOSA_SUFFIXES = tuple(sorted(
+    ["은", "는", "이", "가", "을", "를", "와", "과", "의", "에", "에서", "으로", "로",
+     "께", "만", "도", "까지", "부터", "에게", "한테", "이나", "나"],
+    key=len, reverse=True,
+))
+
+_VARIANT_SEP_RE = re.compile(r"[-_/\s]+")
+_NUMERIC_RE = re.compile(r"^[\d\-_/.]+$")
+
+
+def normalize_term(term: str) -> str:
+    """용어 정규화 (NFKC, 소문자, 연속 공백 정리)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", str(term)).strip().lower())
+
+
+def strip_josa(term: str) -> str:
+    """한글 어절 끝 조사 제거 (남는 어간이 2자 미만이면 그대로)"""
+    if not term or not ("가" <= term[-1] <= "힣"):
+        return term
+    for suffix in JOSA_SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 2:
+            return term[: -len(suffix)]
+    return term
+
+
+def load_synonym_config(config_path: Optional[str] = None) -> Tuple[List[List[str]], Dict[str, List[str]]]:
+    """query_expansion.yaml에서 동의어 그룹과 형태 패턴 로드
+
+    Returns:
+        (동의어 그룹 목록, 패턴 → 확장어 매핑)
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.warning(f"⚠️ 쿼리 확장 설정 로드 실패: {e}")
+        return [], {}
+
+    groups = []
+    for key, values in (config.get("synonyms") or {}).items():
+        groups.append([key, *(values or [])])
+
+    patterns = {}
+    noun_verb = (config.get("morpheme_patterns") or {}).get("noun_verb") or {}
+    if noun_verb.get("enabled", True):
+        for example in noun_verb.get("examples") or []:
+            if example.get("pattern"):
+                patterns[example["pattern"]] = list(example.get("expansions") or [])
+    return groups, patterns
+
+
+class ExpansionTable:
+    """컴파일된 확장 테이블 (정규화 용어 → 동의어 / 관련어)"""
+
+    def __init__(self, synonyms: Dict[str, List[str]], related: Dict[str, List[str]],
+                 meta: Optional[Dict[str, Any]] = None):
+        self.synonyms = synonyms
+        self.related = related
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.synonyms.keys() | self.related.keys())
+
+    def lookup(self, term: str) -> Tuple[List[str], List[str]]:
+        """용어 조회 (없으면 조사 제거 후 재조회)
+
+        Args:
+            term: 정규화된 용어
+
+        Returns:
+            (동의어, 관련어)
+        """
+        for key in (term, strip_josa(term)):
+            synonyms = self.synonyms.get(key)
+            related = self.related.get(key)
+            if synonyms or related:
+                return list(synonyms or []), list(related or [])
+        return [], []
+
+    def save(self, path: str):
+        """JSON 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": TABLE_VERSION,
+            "meta": self.meta,
+            "synonyms": self.synonyms,
+            "related": self.related,
+        }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ExpansionTable":
+        """JSON 로드
+
+        Raises:
+            ValueError: 지원하지 않는 테이블 버전
+        """
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("version") != TABLE_VERSION:
+            raise ValueError(f"지원하지 않는 확장 테이블 버전: {payload.get('version')}")
+        return cls(payload.get("synonyms", {}), payload.get("related", {}), payload.get("meta", {}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "terms": len(self),
+            "synonym_terms": len(self.synonyms),
+            "related_terms": len(self.related),
+            **{k: v for k, v in self.meta.items() if k in ("built_at", "documents")},
+        }
+
+
+def _add_unique(target: List[str], values: Iterable[str], exclude: str):
+    for value in values:
+        if value and value != exclude and value not in target:
+            target.append(value)
+
+
+def _mine_related(doc_terms: List[List[str]], min_df: int, max_df_ratio: float, min_npmi: float,
+                  max_related: int, max_terms_per_doc: int) -> Tuple[Dict[str, List[str]], Counter]:
+    """문서 단위 공기 용어 추출 (NPMI = PMI / -log p(a,b))"""
+    n_docs = len(doc_terms)
+    doc_sets = [sorted(set(terms)) for terms in doc_terms]
+    df = Counter(term for terms in doc_sets for term in terms)
+    if n_docs == 0:
+        return {}, df
+
+    max_df = max(min_df, int(max_df_ratio * n_docs))
+    vocab = {
+        term for term, count in df.items()
+        if min_df <= count <= max_df and len(term) >= 2 and not _NUMERIC_RE.match(term)
+    }
+
+    pair_counts: Counter = Counter()
+    for terms in doc_sets:
+        kept = [t for t in terms if t in vocab]
+        if len(kept) > max_terms_per_doc:
+            # 희소한 용어 우선 (흔한 용어는 관련어 신호가 약함)
+            kept = sorted(sorted(kept, key=lambda t: (df[t], t))[:max_terms_per_doc])
+        for i, a in enumerate(kept):
+            for b in kept[i + 1:]:
+                pair_counts[(a, b)] += 1
+
+    candidates: Dict[str, List[Tuple[float, int, str]]] = defaultdict(list)
+    for (a, b), count in pair_counts.items():
+        if count < 2:
+            continue
+        p_ab = count / n_docs
+        if p_ab >= 1.0:
+            continue
+        pmi = math.log(p_ab / ((df[a] / n_docs) * (df[b] / n_docs)))
+        npmi = pmi / -math.log(p_ab)
+        if npmi < min_npmi:
+            continue
+        candidates[a].append((-npmi, -count, b))
+        candidates[b].append((-npmi, -count, a))
+
+    related = {term: [other for _, _, other in sorted(items)[:max_related]]
+               for term, items in candidates.items()}
+    return related, df
+
+
+def build_expansion_table(doc_terms: Iterable[Iterable[str]],
+                          synonym_groups: Optional[List[List[str]]] = None,
+                          patterns: Optional[Dict[str, List[str]]] = None,
+                          min_df: int = 3, max_df_ratio: float = 0.2, min_npmi: float = 0.3,
+                          max_related: int = 5, max_terms_per_doc: int = 256) -> ExpansionTable:
+    """확장 테이블 구축
+
+    Args:
+        doc_terms: 문서별 용어 목록 (불용어 제거 후)
+        synonym_groups: 서로 동의어인 용어 그룹 (설정 파일)
+        patterns: 활용형 → 확장어 (단방향)
+        min_df: 관련어 후보 최소 문서 빈도
+        max_df_ratio: 관련어 후보 최대 문서 비율 (너무 흔한 용어 제외)
+        min_npmi: 관련어 최소 NPMI (-1~1)
+        max_related: 용어당 관련어 수
+        max_terms_per_doc: 문서당 공기 계산에 쓰는 최대 용어 수
+
+    Returns:
+        ExpansionTable
+    """
+    start = time.perf_counter()
+    doc_terms = [[strip_josa(normalize_term(t)) for t in terms] for terms in doc_terms]
+    related, df = _mine_related(doc_terms, min_df, max_df_ratio, min_npmi, max_related, max_terms_per_doc)
+
+    synonyms: Dict[str, List[str]] = defaultdict(list)
+    for group in synonym_groups or []:
+        members = []
+        _add_unique(members, (normalize_term(m) for m in group), "")
+        for member in members:
+            _add_unique(synonyms[member], members, member)
+
+    for pattern, expansions in (patterns or {}).items():
+        key = normalize_term(pattern)
+        _add_unique(synonyms[key], (normalize_term(e) for e in expansions), key)
+
+    # 코퍼스 표기 변형 (구분자만 다른 용어: 모델명/부품명)
+    variant_groups: Dict[str, List[str]] = defaultdict(list)
+    for term in df:
+        key = _VARIANT_SEP_RE.sub("", term)
+        if key and key != term:
+            variant_groups[key].append(term)
+    for key, terms in variant_groups.items():
+        members = sorted(set(terms) | ({key} if key in df else set()))
+        if len(members) > 1:
+            for member in members:
+                _add_unique(synonyms[member], members, member)
+
+    meta = {
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "documents": len(doc_terms),
+        "vocabulary": len(df),
+        "params": {"min_df": min_df, "max_df_ratio": max_df_ratio, "min_npmi": min_npmi,
+                   "max_related": max_related},
+    }
+    table = ExpansionTable({k: v for k, v in synonyms.items() if v}, related, meta)
+    logger.info(f"확장 테이블 구축: 문서 {len(doc_terms)}개, 용어 {len(table)}개 "
+                f"({time.perf_counter() - start:.1f}s)")
+    return table
+
+
+_table_lock = threading.Lock()
+_table_cache: Dict[str, Tuple[float, ExpansionTable]] = {}
+
+
+def load_expansion_table(path: Optional[str] = None) -> Optional[ExpansionTable]:
+    """확장 테이블 로드 (파일 mtime이 바뀌면 다시 로드, 없으면 None)"""
+    path = path or os.getenv("QUERY_EXPANSION_TABLE", DEFAULT_TABLE_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _table_lock:
+        cached = _table_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            table = ExpansionTable.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 확장 테이블 로드 실패: {path} ({e})")
+            return cached[1] if cached else None
+        _table_cache[path] = (mtime, table)
+        logger.info(f"✅ 확장 테이블 로드: {path} ({len(table)}개 용어)")
+        return table
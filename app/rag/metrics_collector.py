@@ -57,6 +57,7 @@ class CodeSearchMetrics:
         self.exact_match_hits_total = 0
         self.rrf_fusion_used_total = 0
         self.citation_forced_total = 0
+        self.citation_retry_avoided_total = 0  # 인용 누락으로 이전 전체 재생성 경로가 실행됐을 답변 수
 
         # 마지막 검색 상태
         self.stage0_candidates_last = 0
@@ -65,6 +66,10 @@ class CodeSearchMetrics:
         # 지연시간 히스토그램 (최근 N개, 정확한 백분위 계산용)
         self.latency_samples = deque(maxlen=latency_window_size)
 
+        # 스트리밍 답변 첫 토큰 지연 (요청 시작 → 첫 토큰)
+        self.streamed_answers_total = 0
+        self.ttft_samples = deque(maxlen=latency_window_size)
+
         # EWMA 지표 (1분 반감기)
         self._last_tick = time.perf_counter()
         self._qps_ewma_1m = 0.0  # 초당 쿼리 수
@@ -120,6 +125,11 @@ class CodeSearchMetrics:
         with self._lock:
             self.citation_forced_total += 1
 
+    def record_citation_retry_avoided(self) -> None:
+        """인용 누락 재생성 생략 기록 (단일 패스 후 출처 부착)"""
+        with self._lock:
+            self.citation_retry_avoided_total += 1
+
     def record_latency(self, latency_ms: float) -> None:
         """검색 지연시간 기록
 
@@ -129,6 +139,16 @@ class CodeSearchMetrics:
         with self._lock:
             self.latency_samples.append(latency_ms)
 
+    def record_ttft(self, ttft_ms: float) -> None:
+        """스트리밍 답변 첫 토큰 지연(TTFT) 기록
+
+        Args:
+            ttft_ms: 요청 시작부터 첫 토큰까지 (밀리초)
+        """
+        with self._lock:
+            self.streamed_answers_total += 1
+            self.ttft_samples.append(ttft_ms)
+
     @contextmanager
     def measure_retrieval_latency(self) -> Iterator[None]:
         """검색 지연시간 측정 컨텍스트 매니저
@@ -151,8 +171,9 @@ class CodeSearchMetrics:
             dict: {
                 code_queries_total, exact_match_hits_total, exact_match_hit_rate,
                 stage0_candidates_last, stage1_candidates_last,
-                rrf_fusion_used_total, citation_forced_total,
+                rrf_fusion_used_total, citation_forced_total, citation_retry_avoided_total,
                 retrieval_latency_ms_p50, retrieval_latency_ms_p95,
+                streamed_answers_total, ttft_ms_p50, ttft_ms_p95,
                 qps_ewma_1m, hit_rate_ewma_1m
             }
         """
@@ -164,7 +185,10 @@ class CodeSearchMetrics:
             stage1 = self.stage1_candidates_last
             rrf = self.rrf_fusion_used_total
             cit = self.citation_forced_total
+            cit_avoided = self.citation_retry_avoided_total
             samples = list(self.latency_samples)
+            streamed = self.streamed_answers_total
+            ttft_samples = sorted(self.ttft_samples)
             qps_ewma = self._qps_ewma_1m
             hit_ewma = self._hit_rate_ewma_1m
 
@@ -186,8 +210,12 @@ class CodeSearchMetrics:
             "stage1_candidates_last": stage1,
             "rrf_fusion_used_total": rrf,
             "citation_forced_total": cit,
+            "citation_retry_avoided_total": cit_avoided,
             "retrieval_latency_ms_p50": p50,
             "retrieval_latency_ms_p95": p95,
+            "streamed_answers_total": streamed,
+            "ttft_ms_p50": int(_percentile(ttft_samples, 0.50)),
+            "ttft_ms_p95": int(_percentile(ttft_samples, 0.95)),
             "qps_ewma_1m": round(qps_ewma, 2),
             "hit_rate_ewma_1m": round(hit_ewma, 3),
         }
@@ -228,6 +256,10 @@ class CodeSearchMetrics:
             "# TYPE citation_forced_total counter",
             f'citation_forced_total {m["citation_forced_total"]}',
             "",
+            "# HELP citation_retry_avoided_total Answers that skipped citation regeneration",
+            "# TYPE citation_retry_avoided_total counter",
+            f'citation_retry_avoided_total {m["citation_retry_avoided_total"]}',
+            "",
             "# HELP retrieval_latency_ms_p50 Retrieval latency p50 (ms)",
             "# TYPE retrieval_latency_ms_p50 gauge",
             f'retrieval_latency_ms_p50 {m["retrieval_latency_ms_p50"]}',
@@ -236,6 +268,18 @@ class CodeSearchMetrics:
             "# TYPE retrieval_latency_ms_p95 gauge",
             f'retrieval_latency_ms_p95 {m["retrieval_latency_ms_p95"]}',
             "",
+            "# HELP streamed_answers_total Total streamed answers",
+            "# TYPE streamed_answers_total counter",
+            f'streamed_answers_total {m["streamed_answers_total"]}',
+            "",
+            "# HELP ttft_ms_p50 Streamed answer time to first token p50 (ms)",
+            "# TYPE ttft_ms_p50 gauge",
+            f'ttft_ms_p50 {m["ttft_ms_p50"]}',
+            "",
+            "# HELP ttft_ms_p95 Streamed answer time to first token p95 (ms)",
+            "# TYPE ttft_ms_p95 gauge",
+            f'ttft_ms_p95 {m["ttft_ms_p95"]}',
+            "",
             "# HELP qps_ewma_1m Queries per second (1m EWMA)",
             "# TYPE qps_ewma_1m gauge",
             f'qps_ewma_1m {m["qps_ewma_1m"]}',
@@ -253,9 +297,12 @@ class CodeSearchMetrics:
             self.exact_match_hits_total = 0
             self.rrf_fusion_used_total = 0
             self.citation_forced_total = 0
+            self.citation_retry_avoided_total = 0
             self.stage0_candidates_last = 0
             self.stage1_candidates_last = 0
             self.latency_samples.clear()
+            self.streamed_answers_total = 0
+            self.ttft_samples.clear()
             self._last_tick = time.perf_counter()
             self._qps_ewma_1m = 0.0
             self._hit_rate_ewma_1m = 0.0
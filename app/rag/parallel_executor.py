@@ -19,9 +19,6 @@ from concurrent.futures import (
     as_completed,
     wait,
 )
-from concurrent.futures import (
-    TimeoutError as FuturesTimeout,
-)
 from functools import wraps
 from typing import Any, Callable, Dict, Hashable, List, Optional
 
@@ -65,6 +62,27 @@ class ParallelSearchExecutor:
         """
         self.max_workers = max_workers
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # 타임아웃 후에도 끝까지 실행 중인 태스크 수 (해당 스레드는 풀에서 빠진 상태)
+        self._stuck = 0
+        self._stuck_lock = threading.Lock()
+
+    @staticmethod
+    def _run_timed(timing: Dict[str, float], func: Callable, *args, **kwargs) -> Any:
+        """실행 시작/종료 시각 기록 (대기열 대기와 실행 시간 분리)"""
+        timing["started"] = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timing["finished"] = time.perf_counter()
+
+    def _release_stuck(self, _fut) -> None:
+        with self._stuck_lock:
+            self._stuck -= 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """풀 크기와 타임아웃 후 계속 실행 중인 태스크 수"""
+        with self._stuck_lock:
+            return {"max_workers": self.max_workers, "stuck_tasks": self._stuck}
 
     def execute_searches(
         self,
@@ -81,11 +99,12 @@ class ParallelSearchExecutor:
                         "name": "bm25_search",
                         "func": callable,
                         "args": tuple,
-                        "kwargs": dict
+                        "kwargs": dict,
+                        "timeout": float  # 선택: 태스크별 타임아웃 (per_task_timeout보다 우선)
                     },
                     ...
                 ]
-            per_task_timeout: 개별 태스크 타임아웃 (초)
+            per_task_timeout: 개별 태스크 타임아웃 (초, 제출 시점 기준)
             total_timeout: 전체 배치 타임아웃 (초)
 
         Returns:
@@ -93,8 +112,15 @@ class ParallelSearchExecutor:
             {
                 "bm25_search": [...],
                 "vector_search": [...],
-                "_errors": {"task_name": "error_msg", ...}
+                "_errors": {"task_name": "error_msg", ...},
+                "_timings": {"task_name": {"queue_ms": float, "run_ms": float}, ...}
             }
+
+        타임아웃된 태스크는 결과가 []이고 _errors에 "Timeout"이 기록되며,
+        나머지 태스크는 계속 대기하므로 부분 결과를 사용할 수 있습니다.
+        (이미 실행 중인 스레드는 중단할 수 없어 백그라운드에서 끝까지 실행되며 get_stats()의
+        stuck_tasks로 집계됨). 타임아웃은 제출 시점 기준이므로 _timings에서 풀 대기 시간(queue_ms)과
+        실제 실행 시간(run_ms)을 따로 확인할 수 있습니다.
         """
         if not search_tasks:
             return {}
@@ -102,7 +128,10 @@ class ParallelSearchExecutor:
         results: Dict[str, Any] = {}
         errors: Dict[str, str] = {}
         futures = {}
-        t0 = time.perf_counter_ns()
+        deadlines: Dict[Any, Optional[float]] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        t0 = time.perf_counter()
+        total_deadline = t0 + total_timeout if total_timeout is not None else None
 
         # Submit all tasks
         for task in search_tasks:
@@ -110,55 +139,84 @@ class ParallelSearchExecutor:
             func = task["func"]
             args = task.get("args", ())
             kwargs = task.get("kwargs", {})
+            timeout = task.get("timeout", per_task_timeout)
 
-            future = self.executor.submit(func, *args, **kwargs)
+            timings[name] = {"submitted": time.perf_counter()}
+            future = self.executor.submit(self._run_timed, timings[name], func, *args, **kwargs)
             futures[future] = name
+            deadlines[future] = t0 + timeout if timeout is not None else None
             logger.debug(f"🚀 Submitted: {name}")
 
-        done = set()
-        try:
-            while len(done) < len(futures):
-                # 전체 타임박스 체크
-                if total_timeout is not None:
-                    elapsed_sec = (time.perf_counter_ns() - t0) / 1_000_000_000
-                    remaining = max(0.0, total_timeout - elapsed_sec)
-                    if remaining == 0.0:
-                        raise FuturesTimeout("total timeout exceeded")
-                else:
-                    remaining = None
-
-                # 완료 대기
-                pending_futures = [f for f in futures if f not in done]
-                for fut in as_completed(pending_futures, timeout=remaining):
-                    name = futures[fut]
-                    try:
-                        res = fut.result(timeout=per_task_timeout)
-                        results[name] = res
-                        logger.debug(f"✅ Done: {name}")
-                    except Exception as e:
-                        errors[name] = repr(e)
-                        logger.error(f"❌ Failed: {name} - {e}")
-                        results[name] = []
-                    finally:
-                        done.add(fut)
-
-        except FuturesTimeout:
-            # 남은 작업 취소 시도
-            for fut in futures:
-                if fut not in done:
-                    fut.cancel()
-                    name = futures[fut]
-                    errors[name] = "Timeout"
+        def expire(fut, reason: str):
+            name = futures[fut]
+            errors[name] = "Timeout"
+            results[name] = []
+            if fut.cancel():
+                logger.warning(f"⏳ {reason} while queued: {name}")
+                return
+            with self._stuck_lock:
+                self._stuck += 1
+                stuck = self._stuck
+            fut.add_done_callback(self._release_stuck)
+            logger.warning(f"⏳ {reason}: {name} (still running threads: {stuck}/{self.max_workers})")
+
+        pending = set(futures)
+        while pending:
+            now = time.perf_counter()
+
+            # 전체 타임박스 체크
+            if total_deadline is not None and now >= total_deadline:
+                for fut in pending:
+                    expire(fut, "Parallel batch timed out")
+                break
+
+            # 개별 타임아웃 체크
+            for fut in [f for f in pending if deadlines[f] is not None and now >= deadlines[f]]:
+                if not fut.done():
+                    expire(fut, "Task timed out")
+                    pending.discard(fut)
+            if not pending:
+                break
+
+            # 가장 가까운 마감까지 완료 대기
+            limits = [deadlines[f] for f in pending if deadlines[f] is not None]
+            if total_deadline is not None:
+                limits.append(total_deadline)
+            wait_timeout = max(0.0, min(limits) - now) if limits else None
+            finished, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for fut in finished:
+                name = futures[fut]
+                try:
+                    results[name] = fut.result()
+                    logger.debug(f"✅ Done: {name}")
+                except Exception as e:
+                    errors[name] = repr(e)
+                    logger.error(f"❌ Failed: {name} - {e}")
                     results[name] = []
-            logger.warning("⏳ Parallel batch timed out")
+                pending.discard(fut)
 
-        total_ms = (time.perf_counter_ns() - t0) / 1_000_000
+        end = time.perf_counter()
+        total_ms = (end - t0) * 1000
         logger.info(f"🏁 All tasks finished in {total_ms:.3f} ms")
 
-        # 에러 맵 추가
+        # 에러 맵 + 태스크별 대기/실행 시간 (타임아웃된 태스크는 반환 시점까지)
         results["_errors"] = errors
+        results["_timings"] = {name: self._split_timing(t, end) for name, t in timings.items()}
         return results
 
+    @staticmethod
+    def _split_timing(timing: Dict[str, float], end: float) -> Dict[str, float]:
+        """제출 후 경과 시간을 풀 대기(queue_ms)와 실행(run_ms)으로 분리"""
+        started = timing.get("started")
+        if started is None or started > end:
+            return {"queue_ms": (end - timing["submitted"]) * 1000, "run_ms": 0.0}
+        finished = min(timing.get("finished", end), end)
+        return {
+            "queue_ms": (started - timing["submitted"]) * 1000,
+            "run_ms": (finished - started) * 1000,
+        }
+
     def execute_filters(
         self,
         items: List[Any],
@@ -85,6 +85,8 @@ class PersistentCache:
         cleanup_prob: float = 0.01,  # set() 호출 시 확률적 정리
         compress: bool = True,
         key_func: Optional[Callable[[str, Optional[str]], str]] = None,
+        max_entries: Optional[int] = None,
+        namespace_grace: int = 900,
     ):
         """Initialize persistent cache
 
@@ -96,6 +98,8 @@ class PersistentCache:
             cleanup_prob: set() 호출 시 정리 확률 (0.0~1.0)
             compress: zlib 압축 여부
             key_func: 커스텀 키 생성 함수 (기본: generate_smart_cache_key)
+            max_entries: 최대 항목 수 (None: 파일 크기 상한만 적용)
+            namespace_grace: 현재가 아닌 네임스페이스를 축출하기까지의 미사용 시간 (초)
         """
         self.db_path = db_path
         self.ttl = ttl
@@ -103,6 +107,11 @@ class PersistentCache:
         self.max_db_mb = max_db_mb
         self.cleanup_prob = cleanup_prob
         self.compress = compress
+        self.max_entries = max_entries
+        self.namespace_grace = namespace_grace
+        self._current_namespace: Optional[str] = None
+        self._owner = f"{os.getpid()}:{id(self):x}"
+        self.stats = {"coalesced": 0, "lease_timeouts": 0}
         self._generate_key = key_func or (
             lambda q, m=None: generate_smart_cache_key(q, m)
         )
@@ -156,21 +165,48 @@ class PersistentCache:
             cur.execute(
                 "CREATE INDEX IF NOT EXISTS idx_access_count ON query_cache(access_count)"
             )
+            # 네임스페이스 컬럼 (인덱스 버전/구성 해시, 기존 DB는 마이그레이션)
+            columns = {row[1] for row in cur.execute("PRAGMA table_info(query_cache)")}
+            if "namespace" not in columns:
+                cur.execute(
+                    "ALTER TABLE query_cache ADD COLUMN namespace TEXT NOT NULL DEFAULT ''"
+                )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_namespace ON query_cache(namespace)"
+            )
+            # 프로세스 간 스탬피드 방지용 계산 임대 (키별 리더 1명)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS inflight_leases (
+                    cache_key  TEXT PRIMARY KEY,
+                    owner      TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
             logger.info(f"Persistent cache v2.0 initialized: {self.db_path}")
 
     # ---- 핵심 API --------------------------------------------------------------
 
-    def get(self, query: str, mode: str | None = None) -> Optional[Any]:
+    def _cache_key(self, query: str, mode: str | None, namespace: str | None) -> str:
+        """네임스페이스 포함 캐시 키 (QueryCache와 같은 형식)"""
+        base = self._generate_key(query, mode)
+        if namespace:
+            self._current_namespace = namespace
+            return f"{namespace}::{base}"
+        return base
+
+    def get(self, query: str, mode: str | None = None,
+            namespace: str | None = None) -> Optional[Any]:
         """캐시된 결과 조회
 
         Args:
             query: 검색 질의
             mode: 검색 모드
+            namespace: 버전 네임스페이스 (인덱스 버전|구성 해시)
 
         Returns:
             캐시된 결과 (없거나 만료 시 None)
         """
-        key = self._generate_key(query, mode)
+        key = self._cache_key(query, mode, namespace)
         now = time.time()
 
         with self._connect() as conn:
@@ -223,15 +259,17 @@ class PersistentCache:
         )
         return result
 
-    def set(self, query: str, result: Any, mode: str | None = None):
+    def set(self, query: str, result: Any, mode: str | None = None,
+            namespace: str | None = None):
         """결과 캐싱
 
         Args:
             query: 검색 질의
             result: 캐시할 결과
             mode: 검색 모드
+            namespace: 버전 네임스페이스 (인덱스 버전|구성 해시)
         """
-        key = self._generate_key(query, mode)
+        key = self._cache_key(query, mode, namespace)
         now = time.time()
         blob = _dumps(result, compress=self.compress)
 
@@ -240,8 +278,8 @@ class PersistentCache:
             # UPSERT: created_at 유지, 나머지 갱신
             cur.execute(
                 """
-                INSERT INTO query_cache (cache_key, query, result_data, created_at, accessed_at, access_count, compressed)
-                VALUES (?, ?, ?, ?, ?, 1, ?)
+                INSERT INTO query_cache (cache_key, query, result_data, created_at, accessed_at, access_count, compressed, namespace)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?)
                 ON CONFLICT(cache_key) DO UPDATE SET
                     query=excluded.query,
                     result_data=excluded.result_data,
@@ -253,7 +291,7 @@ class PersistentCache:
                         ELSE query_cache.created_at
                     END
             """,
-                (key, query, blob, now, now, 1 if self.compress else 0),
+                (key, query, blob, now, now, 1 if self.compress else 0, namespace or ""),
             )
 
         # 확률적 정리
@@ -263,6 +301,72 @@ class PersistentCache:
 
         logger.info(f"💾 Persistent cache set: {query[:50]}...")
 
+    # ---- 프로세스 간 스탬피드 방지 ----------------------------------------------
+
+    def acquire_lease(self, query: str, mode: str | None = None,
+                      namespace: str | None = None, ttl: float = 120.0) -> bool:
+        """계산 임대 획득 (다른 프로세스가 같은 키를 계산 중이면 False)
+
+        Args:
+            query: 검색 질의
+            mode: 검색 모드
+            namespace: 버전 네임스페이스
+            ttl: 임대 만료 시간 (초, 리더 프로세스가 죽어도 이후 요청이 막히지 않도록)
+
+        Returns:
+            True면 리더 (계산 후 release_lease 호출 필요)
+        """
+        key = self._cache_key(query, mode, namespace)
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM inflight_leases WHERE expires_at < ?", (now,))
+            cur.execute(
+                "INSERT OR IGNORE INTO inflight_leases (cache_key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self._owner, now + ttl),
+            )
+            return cur.rowcount == 1
+
+    def release_lease(self, query: str, mode: str | None = None,
+                      namespace: str | None = None):
+        """계산 임대 반환"""
+        key = self._cache_key(query, mode, namespace)
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM inflight_leases WHERE cache_key=? AND owner=?", (key, self._owner)
+            )
+
+    def wait_for_result(self, query: str, mode: str | None = None,
+                        namespace: str | None = None, timeout: float = 120.0,
+                        poll_interval: float = 0.25) -> Optional[Any]:
+        """다른 프로세스의 계산 결과 대기 (캐시에 기록되거나 임대가 풀릴 때까지)
+
+        Returns:
+            캐시된 결과 (리더가 실패했거나 타임아웃이면 None)
+        """
+        key = self._cache_key(query, mode, namespace)
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self.get(query, mode, namespace)
+            if result is not None:
+                self.stats["coalesced"] += 1
+                return result
+            with self._connect() as conn:
+                leased = conn.execute(
+                    "SELECT 1 FROM inflight_leases WHERE cache_key=? AND expires_at >= ?",
+                    (key, time.time()),
+                ).fetchone()
+            if not leased:
+                # 리더 종료: 마지막으로 한 번 더 확인 (결과를 캐시하지 않는 응답/오류면 None)
+                result = self.get(query, mode, namespace)
+                if result is not None:
+                    self.stats["coalesced"] += 1
+                return result
+            if time.monotonic() >= deadline:
+                self.stats["lease_timeouts"] += 1
+                return None
+            time.sleep(poll_interval)
+
     # ---- 유지보수 --------------------------------------------------------------
 
     def clear(self):
@@ -286,6 +390,33 @@ class PersistentCache:
         if deleted > 0:
             logger.info(f"Cleaned up {deleted} expired cache entries")
 
+        if self._current_namespace:
+            self._evict_stale_namespaces()
+
+    def _evict_stale_namespaces(self):
+        """현재 네임스페이스가 아니고 namespace_grace 동안 사용되지 않은 네임스페이스 제거
+
+        재색인/구성 변경 후 이전 버전 항목은 더 이상 조회되지 않으므로 정리 시점에
+        지연 축출한다. 다른 구성으로 실행 중인 프로세스의 네임스페이스는 계속 접근되는 동안 유지된다.
+        """
+        cutoff = time.time() - self.namespace_grace
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                DELETE FROM query_cache WHERE namespace IN (
+                    SELECT namespace FROM query_cache
+                    WHERE namespace != '' AND namespace != ?
+                    GROUP BY namespace HAVING MAX(accessed_at) < ?
+                )
+            """,
+                (self._current_namespace, cutoff),
+            )
+            deleted = cur.rowcount or 0
+
+        if deleted > 0:
+            logger.info(f"Evicted {deleted} entries from stale namespaces")
+
     def _db_file_size_mb(self) -> float:
         """DB 파일 크기 (MB)
 
@@ -298,6 +429,9 @@ class PersistentCache:
 
     def _enforce_size_limit(self):
         """크기 제한 강제 (LRU 축출)"""
+        if self.max_entries:
+            self._enforce_entry_limit()
+
         size = self._db_file_size_mb()
         if size <= self.max_db_mb:
             return
@@ -322,6 +456,24 @@ class PersistentCache:
                     f"Size limit exceeded ({size:.1f}MB). Evicted {len(keys)} entries"
                 )
 
+    def _enforce_entry_limit(self):
+        """항목 수 제한 강제 (오래된 접근부터 축출)"""
+        with self._connect() as conn:
+            cur = conn.cursor()
+            (count,) = cur.execute("SELECT COUNT(*) FROM query_cache").fetchone()
+            excess = count - self.max_entries
+            if excess <= 0:
+                return
+            cur.execute(
+                """
+                DELETE FROM query_cache WHERE cache_key IN (
+                    SELECT cache_key FROM query_cache ORDER BY accessed_at ASC LIMIT ?
+                )
+            """,
+                (excess,),
+            )
+        logger.info(f"Entry limit exceeded ({count}/{self.max_entries}). Evicted {excess} entries")
+
     # ---- 통계 & 유틸리티 -------------------------------------------------------
 
     def invalidate(self, prefix: str):
@@ -368,6 +520,7 @@ class PersistentCache:
             "db_size_mb": self._db_file_size_mb(),
             "ttl_mode": self.ttl_mode,
             "ttl_seconds": self.ttl,
+            **self.stats,
         }
 
 
@@ -395,30 +548,34 @@ def get_persistent_cache() -> PersistentCache:
     return _persistent_cache_instance
 
 
-def cache_query_result_persistent(query: str, result: Any, mode: str | None = None):
+def cache_query_result_persistent(query: str, result: Any, mode: str | None = None,
+                                  namespace: str | None = None):
     """Helper function to cache a query result persistently
 
     Args:
         query: 검색 질의
         result: 캐시할 결과
         mode: 검색 모드
+        namespace: 버전 네임스페이스
     """
     cache = get_persistent_cache()
-    cache.set(query, result, mode)
+    cache.set(query, result, mode, namespace)
 
 
-def get_cached_result_persistent(query: str, mode: str | None = None) -> Optional[Any]:
+def get_cached_result_persistent(query: str, mode: str | None = None,
+                                 namespace: str | None = None) -> Optional[Any]:
     """Helper function to get persistently cached result
 
     Args:
         query: 검색 질의
         mode: 검색 모드
+        namespace: 버전 네임스페이스
 
     Returns:
         캐시된 결과 (없으면 None)
     """
     cache = get_persistent_cache()
-    return cache.get(query, mode)
+    return cache.get(query, mode, namespace)
 
 
 def get_persistent_cache_stats() -> Dict[str, Any]:
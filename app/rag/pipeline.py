@@ -15,15 +15,21 @@ import base64
 import sqlite3
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Protocol, List, Optional, Dict, Any
+from typing import Protocol, List, Optional, Dict, Any, Iterator
 
 from app.core.logging import get_logger
 from app.core.errors import ModelError, SearchError, ErrorCode, ERROR_MESSAGES
 from app.utils.sqlite_helpers import connect_metadata
 from app.rag.query_router import QueryRouter, QueryMode
-from app.rag.cache_manager import get_cached_result, cache_query_result, get_cache_stats
-from app.rag.persistent_cache import get_cached_result_persistent, cache_query_result_persistent
+from app.rag.cache_manager import get_cache, get_cached_result, cache_query_result, get_cache_stats
+from app.rag.cache_namespace import current_answer_namespace
+from app.rag.persistent_cache import (
+    get_persistent_cache,
+    get_cached_result_persistent,
+    cache_query_result_persistent,
+)
 from app.utils.text_normalizer import normalize_query, is_detailed_mode, detect_section
+from rag_system.generation_scheduler import Priority, generation_priority
 from app.prompts.document_prompts import (
     build_detailed_prompt,
     build_section_prompt,
@@ -337,6 +343,10 @@ def _encode_file_ref(filename: str) -> Optional[str]:
 DIAG_RAG = os.getenv("DIAG_RAG", "false").lower() == "true"
 DIAG_LOG_LEVEL = os.getenv("DIAG_LOG_LEVEL", "INFO").upper()
 
+# 스탬피드 방지: 동일 질의 동시 요청은 첫 요청의 계산 결과를 공유
+ANSWER_SINGLE_FLIGHT = os.getenv("ANSWER_SINGLE_FLIGHT", "true").lower() == "true"
+ANSWER_SINGLE_FLIGHT_TIMEOUT = float(os.getenv("ANSWER_SINGLE_FLIGHT_TIMEOUT", "120"))
+
 
 # ============================================================================
 # Request / Response 데이터 클래스
@@ -563,242 +573,20 @@ class RAGPipeline:
         diagnostics = {}  # 진단 정보 수집
 
         try:
-            # 0. 검색 전 pre-routing: 장비 질의 감지 (DOC_ANCHORED 필터링용)
-            # QueryRouter의 device term 감지 로직 활용 (공개 API 우선, fallback to 비공개)
-            preliminary_mode = "chat"
-            if hasattr(self, 'query_router'):
-                has_device = (
-                    getattr(self.query_router, "has_device_terms", None) or
-                    getattr(self.query_router, "_has_device_terms", None)
-                )
-                if callable(has_device) and has_device(query):
-                    preliminary_mode = "doc_anchored"
-                    logger.info("🎯 검색 전 DOC_ANCHORED 모드 감지 (장비 용어)")
-
-            # 1. 검색: 정규화된 청크(dict) 리스트 기대
-            search_start = time.perf_counter()
-            results = self.retriever.search(query, top_k, mode=preliminary_mode, selected_filename=selected_filename)
-            metrics["search_time"] = time.perf_counter() - search_start
-
-            # [검색 결과 Top-N 진단 로그]
-            logger.info(f"RETRIEVE_TOPN mode={preliminary_mode}")
-            for i, doc in enumerate(results[:10], 1):
-                score = doc.get('score', 0.0)
-                doc_id = doc.get('doc_id', 'unknown')
-                snippet_preview = doc.get('snippet', '')[:60].replace('\n', ' ')
-                logger.info(f"  #{i} score={score:.4f} doc={doc_id} preview={snippet_preview}...")
-
-            # [DIAG] 검색 결과 진단
-            if DIAG_RAG:
-                diagnostics["retrieved_k"] = len(results)
-                if DIAG_LOG_LEVEL in ["DEBUG", "INFO"]:
-                    logger.info(f"[DIAG] 검색 완료: {len(results)}개 문서 검색됨")
-
-            if not results:
-                logger.warning(f"No results found for query: {query[:50]}")
-                if DIAG_RAG:
-                    diagnostics["mode"] = "no_results"
-                    diagnostics["generate_path"] = "fallback_no_context"
-
-                # 검색 결과 없음 → CHAT 모드로 폴백
-                metrics["mode"] = "chat"
-                metrics["top_score"] = 0.0
-
-                return RAGResponse(
-                    answer="관련 문서가 검색되지 않았다.",
-                    success=True,
-                    latency=time.perf_counter() - start_time,
-                    metrics=metrics,
-                    diagnostics=diagnostics,
-                )
-
-            # 2. 압축: 청크 단위 유지(페이지/스니펫/메타 보존)
-            compress_start = time.perf_counter()
-            compressed = self.compressor.compress(results, compression_ratio)
-            metrics["compress_time"] = time.perf_counter() - compress_start
-
-            # [DIAG] 압축 후 진단
-            if DIAG_RAG:
-                diagnostics["after_compress_k"] = len(compressed)
-                diagnostics["compression_ratio"] = compression_ratio
-                if DIAG_LOG_LEVEL in ["DEBUG", "INFO"]:
-                    logger.info(
-                        f"[DIAG] 압축 완료: {len(results)} → {len(compressed)}개 문서"
-                    )
-
-            # 3. 생성: 모드 결정 → 컨텍스트 최적화 → 생성
-            gen_start = time.perf_counter()
-
-            # CRITICAL: Inject compressed chunks into generator for proper LLM context
-            if hasattr(self.generator, "compressed_chunks"):
-                self.generator.compressed_chunks = compressed
-                logger.debug(
-                    f"Injected {len(compressed)} compressed chunks into generator"
-                )
-
-            # [DIAG] 생성 전 컨텍스트 스냅샷
-            if DIAG_RAG and DIAG_LOG_LEVEL == "DEBUG":
-                for i, c in enumerate(compressed[:3], 1):  # 상위 3개만 로그
-                    logger.debug(
-                        f"[DIAG] Context[{i}]: doc_id={c.get('doc_id')}, "
-                        f"filename={c.get('filename', 'N/A')}, "
-                        f"page={c.get('page', 0)}, "
-                        f"snippet={c.get('snippet', '')[:120]}..."
-                    )
-
-            # 🎯 STEP 1: QueryRouter 모드 분류 (DOC_ANCHORED 최우선 체크)
-            # CRITICAL: 검색 결과를 고려한 지능형 라우팅
-            route_decision = self.query_router.classify_mode_with_retrieval(query, results)
-            router_reason = route_decision.reason
-            query_mode = route_decision.mode  # Extract QueryMode enum
-            logger.info(f"🔀 QueryRouter 분류: mode={query_mode.value}, reason={router_reason}")
-
-            # 🎯 STEP 2: 모드 결정 로직
-            # CRITICAL: Determine mode BEFORE context hydration to apply mode-aware context limits
-            mode_env = os.getenv('MODE', 'AUTO').upper()
-            top_score = results[0].get('score', 0.0) if results else 0.0
-            metrics["top_score"] = top_score
-
-            if mode_env == 'AUTO':
-                # ━━━ 1. 강제 CHAT 모드 체크 (스몰토크/산술/짧은 질의) ━━━
-                should_force, force_reason = force_chat_mode(query)
-                if should_force:
-                    metrics["mode"] = "chat"
-                    metrics["force_chat_reason"] = force_reason
-                    logger.info(f"🎯 AUTO 모드: CHAT 강제 적용 (이유: {force_reason})")
-                else:
-                    # ━━━ 2. 도메인 키워드 + 절대값 임계값 기반 판단 ━━━
-                    has_keyword = has_domain_keyword(query)
-                    token_count = get_query_token_count(query)
-
-                    # 환경변수에서 절대값 임계값 읽기
-                    use_absolute = os.getenv('RAG_MIN_SCORE_POLICY', 'normalized') == 'absolute'
-                    bm25_min = float(os.getenv('BM25_MIN_ABS', '5.0'))
-                    vec_min = float(os.getenv('VEC_MIN_ABS', '0.25'))
-
-                    # 절대값 정책 사용 시 (권장)
-                    if use_absolute:
-                        # 실제 BM25/벡터 스코어를 results에서 추출 시도
-                        # (현재는 fused score만 있으므로 간소화)
-                        # 일단 top_score를 벡터 스코어로 간주
-                        pass_abs_threshold = top_score >= vec_min
-                        pass_domain = has_keyword
-                        pass_length = token_count >= 4
-
-                        # 🔒 Coverage Gate: 검색 결과에서 실제로 키워드가 발견되는지 확인
-                        keyword_coverage = get_keyword_coverage(query, results)
-                        min_coverage = int(os.getenv('MIN_KEYWORD_COVERAGE', '2'))
-                        pass_coverage = keyword_coverage >= min_coverage
-
-                        should_use_rag = pass_abs_threshold and pass_domain and pass_length and pass_coverage
-                        metrics["mode"] = "rag" if should_use_rag else "chat"
-                        metrics["keyword_coverage"] = keyword_coverage
-
-                        logger.info(
-                            f"🎯 AUTO 모드 (절대값): top_score={top_score:.3f}, "
-                            f"has_keyword={has_keyword}, token_count={token_count}, "
-                            f"coverage={keyword_coverage}/{min_coverage}, "
-                            f"threshold={vec_min}, selected_mode={metrics['mode']}"
-                        )
-                    else:
-                        # 기존 정규화 정책 (fallback)
-                        rag_min_score = float(os.getenv('RAG_MIN_SCORE', '0.35'))
-                        metrics["mode"] = "rag" if top_score >= rag_min_score else "chat"
-                        logger.info(
-                            f"🎯 AUTO 모드 (정규화): top_score={top_score:.3f}, "
-                            f"threshold={rag_min_score}, selected_mode={metrics['mode']}"
-                        )
-
-            elif mode_env == 'CHAT':
-                metrics["mode"] = "chat"
-                metrics["top_score"] = 0.0
-            else:  # RAG, SUMMARIZE
-                metrics["mode"] = "rag"
-                metrics["top_score"] = results[0].get('score', 0.0) if results else 0.0
-
-            # 🎯 STEP 2: 모드 기반 컨텍스트 최적화
-            determined_mode = metrics.get("mode", "rag")
-            logger.info(f"🎯 모드={determined_mode} → 컨텍스트 최적화 시작")
-
-            # Context Hydrator with mode-aware optimization (폴백 보장)
-            try:
-                from app.rag.utils.context_hydrator import hydrate_context
-            except Exception as e:
-                logger.warning(f"⚠️ hydrate_context import 실패, 폴백 사용: {e}")
-                def hydrate_context(chunks, max_len=10000, mode="rag"):
-                    """안전 폴백: 청크 스니펫 결합"""
-                    parts = []
-                    for c in chunks:
-                        t = (c.get("snippet") or c.get("content") or c.get("text") or "")
-                        if t:
-                            parts.append(t[:800])
-                    ctx = "\n\n".join(parts)[:max_len]
-                    return ctx, {"fallback": True, "joined": len(parts)}
-
-            hydrate_start = time.perf_counter()
-            context, hydrator_metrics = hydrate_context(compressed, max_len=10000, mode=determined_mode)
-            metrics["hydrate_time"] = time.perf_counter() - hydrate_start
-            # Merge hydrator metrics into main metrics
-            metrics.update({f"ctx_{k}": v for k, v in hydrator_metrics.items()})
+            plan = self._prepare_generation(
+                query, top_k, compression_ratio, selected_filename, metrics, diagnostics, start_time
+            )
+            if isinstance(plan, RAGResponse):
+                return plan  # 검색 결과 없음
 
             # 🎯 STEP 3: 생성 (모드별 토큰 예산 적용)
+            determined_mode = plan["mode"]
             logger.info(f"🎯 모드={determined_mode} → 생성 시작")
             llm_gen_start = time.perf_counter()
-            answer = self.generator.generate(query, context, temperature, mode=determined_mode)
+            answer = self.generator.generate(query, plan["context"], temperature, mode=determined_mode)
             metrics["generate_time"] = time.perf_counter() - llm_gen_start
 
-            # [DIAG] 생성 완료 진단
-            if DIAG_RAG:
-                diagnostics["mode"] = "normal"
-                diagnostics["generate_path"] = "from_context"
-                diagnostics["used_k"] = len(compressed)
-                if DIAG_LOG_LEVEL in ["DEBUG", "INFO"]:
-                    logger.info(
-                        f"[DIAG] 생성 완료: from_context 경로, {len(compressed)}개 문서 사용"
-                    )
-
-            total_latency = time.perf_counter() - start_time
-            metrics["total_time"] = total_latency
-
-            # 🚨 성능 가드: 슬로 쿼리 임계값 체크
-            if total_latency > 10.0:
-                logger.warning(
-                    f"⚠️  SLOW_QUERY (>10s): {total_latency:.2f}s | "
-                    f"query='{query[:50]}...' | "
-                    f"search={metrics['search_time']:.2f}s, "
-                    f"hydrate={metrics.get('hydrate_time', 0):.3f}s, "
-                    f"generate={metrics['generate_time']:.2f}s"
-                )
-            elif total_latency > 3.0:
-                logger.warning(
-                    f"⚠️  SLOW_QUERY (>3s): {total_latency:.2f}s | "
-                    f"query='{query[:50]}...'"
-                )
-
-            logger.info(
-                f"RAG query completed in {total_latency:.2f}s "
-                f"(search={metrics['search_time']:.2f}s, "
-                f"compress={metrics['compress_time']:.2f}s, "
-                f"hydrate={metrics.get('hydrate_time', 0):.3f}s, "
-                f"generate={metrics['generate_time']:.2f}s)"
-            )
-
-            # CHAT 모드일 경우 출처 제거 (일반 대화는 문서 인용 불필요)
-            # "전부" 또는 "개수" 질의 감지 시 출처도 더 많이 표시
-            max_sources = 200 if any(kw in query.lower() for kw in ["전부", "모두", "모든", "전체", "all", "몇", "개수", "총"]) else 3
-            final_source_docs = [] if determined_mode == "chat" else [c.get("doc_id") for c in results[:max_sources]]
-            final_evidence_chunks = [] if determined_mode == "chat" else compressed
-
-            return RAGResponse(
-                answer=answer,
-                source_docs=final_source_docs,
-                evidence_chunks=final_evidence_chunks,  # UI용 근거
-                raw_results=results,  # Evidence 최소 보장용
-                latency=total_latency,
-                success=True,
-                metrics=metrics,
-                diagnostics=diagnostics,
-            )
+            return self._finish_query(query, answer, plan, metrics, diagnostics, start_time)
 
         except SearchError as e:
             logger.error(f"Search failed: {e}", exc_info=True)
@@ -827,6 +615,262 @@ class RAGPipeline:
                 latency=time.perf_counter() - start_time,
             )
 
+    def _prepare_generation(
+        self,
+        query: str,
+        top_k: int,
+        compression_ratio: float,
+        selected_filename: Optional[str],
+        metrics: dict,
+        diagnostics: dict,
+        start_time: float,
+    ):
+        """생성 직전까지의 단계 (검색 → 압축 → 모드 결정 → 컨텍스트 구성)
+
+        query()와 answer_stream()이 공유한다. 검색 결과가 없으면 RAGResponse를 바로 반환하고,
+        그 외에는 생성에 필요한 plan dict(results/compressed/context/mode)를 반환한다.
+        """
+        # 0. 검색 전 pre-routing: 장비 질의 감지 (DOC_ANCHORED 필터링용)
+        # QueryRouter의 device term 감지 로직 활용 (공개 API 우선, fallback to 비공개)
+        preliminary_mode = "chat"
+        if hasattr(self, 'query_router'):
+            has_device = (
+                getattr(self.query_router, "has_device_terms", None) or
+                getattr(self.query_router, "_has_device_terms", None)
+            )
+            if callable(has_device) and has_device(query):
+                preliminary_mode = "doc_anchored"
+                logger.info("🎯 검색 전 DOC_ANCHORED 모드 감지 (장비 용어)")
+
+        # 1. 검색: 정규화된 청크(dict) 리스트 기대
+        search_start = time.perf_counter()
+        results = self.retriever.search(query, top_k, mode=preliminary_mode, selected_filename=selected_filename)
+        metrics["search_time"] = time.perf_counter() - search_start
+
+        # [검색 결과 Top-N 진단 로그]
+        logger.info(f"RETRIEVE_TOPN mode={preliminary_mode}")
+        for i, doc in enumerate(results[:10], 1):
+            score = doc.get('score', 0.0)
+            doc_id = doc.get('doc_id', 'unknown')
+            snippet_preview = doc.get('snippet', '')[:60].replace('\n', ' ')
+            logger.info(f"  #{i} score={score:.4f} doc={doc_id} preview={snippet_preview}...")
+
+        # [DIAG] 검색 결과 진단
+        if DIAG_RAG:
+            diagnostics["retrieved_k"] = len(results)
+            if DIAG_LOG_LEVEL in ["DEBUG", "INFO"]:
+                logger.info(f"[DIAG] 검색 완료: {len(results)}개 문서 검색됨")
+
+        if not results:
+            logger.warning(f"No results found for query: {query[:50]}")
+            if DIAG_RAG:
+                diagnostics["mode"] = "no_results"
+                diagnostics["generate_path"] = "fallback_no_context"
+
+            # 검색 결과 없음 → CHAT 모드로 폴백
+            metrics["mode"] = "chat"
+            metrics["top_score"] = 0.0
+
+            return RAGResponse(
+                answer="관련 문서가 검색되지 않았다.",
+                success=True,
+                latency=time.perf_counter() - start_time,
+                metrics=metrics,
+                diagnostics=diagnostics,
+            )
+
+        # 2. 압축: 청크 단위 유지(페이지/스니펫/메타 보존)
+        compress_start = time.perf_counter()
+        compressed = self.compressor.compress(results, compression_ratio)
+        metrics["compress_time"] = time.perf_counter() - compress_start
+
+        # [DIAG] 압축 후 진단
+        if DIAG_RAG:
+            diagnostics["after_compress_k"] = len(compressed)
+            diagnostics["compression_ratio"] = compression_ratio
+            if DIAG_LOG_LEVEL in ["DEBUG", "INFO"]:
+                logger.info(
+                    f"[DIAG] 압축 완료: {len(results)} → {len(compressed)}개 문서"
+                )
+
+        # 3. 생성: 모드 결정 → 컨텍스트 최적화 → 생성
+        gen_start = time.perf_counter()
+
+        # CRITICAL: Inject compressed chunks into generator for proper LLM context
+        if hasattr(self.generator, "compressed_chunks"):
+            self.generator.compressed_chunks = compressed
+            logger.debug(
+                f"Injected {len(compressed)} compressed chunks into generator"
+            )
+
+        # [DIAG] 생성 전 컨텍스트 스냅샷
+        if DIAG_RAG and DIAG_LOG_LEVEL == "DEBUG":
+            for i, c in enumerate(compressed[:3], 1):  # 상위 3개만 로그
+                logger.debug(
+                    f"[DIAG] Context[{i}]: doc_id={c.get('doc_id')}, "
+                    f"filename={c.get('filename', 'N/A')}, "
+                    f"page={c.get('page', 0)}, "
+                    f"snippet={c.get('snippet', '')[:120]}..."
+                )
+
+        # 🎯 STEP 1: QueryRouter 모드 분류 (DOC_ANCHORED 최우선 체크)
+        # CRITICAL: 검색 결과를 고려한 지능형 라우팅
+        route_decision = self.query_router.classify_mode_with_retrieval(query, results)
+        router_reason = route_decision.reason
+        query_mode = route_decision.mode  # Extract QueryMode enum
+        logger.info(f"🔀 QueryRouter 분류: mode={query_mode.value}, reason={router_reason}")
+
+        # 🎯 STEP 2: 모드 결정 로직
+        # CRITICAL: Determine mode BEFORE context hydration to apply mode-aware context limits
+        mode_env = os.getenv('MODE', 'AUTO').upper()
+        top_score = results[0].get('score', 0.0) if results else 0.0
+        metrics["top_score"] = top_score
+
+        if mode_env == 'AUTO':
+            # ━━━ 1. 강제 CHAT 모드 체크 (스몰토크/산술/짧은 질의) ━━━
+            should_force, force_reason = force_chat_mode(query)
+            if should_force:
+                metrics["mode"] = "chat"
+                metrics["force_chat_reason"] = force_reason
+                logger.info(f"🎯 AUTO 모드: CHAT 강제 적용 (이유: {force_reason})")
+            else:
+                # ━━━ 2. 도메인 키워드 + 절대값 임계값 기반 판단 ━━━
+                has_keyword = has_domain_keyword(query)
+                token_count = get_query_token_count(query)
+
+                # 환경변수에서 절대값 임계값 읽기
+                use_absolute = os.getenv('RAG_MIN_SCORE_POLICY', 'normalized') == 'absolute'
+                bm25_min = float(os.getenv('BM25_MIN_ABS', '5.0'))
+                vec_min = float(os.getenv('VEC_MIN_ABS', '0.25'))
+
+                # 절대값 정책 사용 시 (권장)
+                if use_absolute:
+                    # 실제 BM25/벡터 스코어를 results에서 추출 시도
+                    # (현재는 fused score만 있으므로 간소화)
+                    # 일단 top_score를 벡터 스코어로 간주
+                    pass_abs_threshold = top_score >= vec_min
+                    pass_domain = has_keyword
+                    pass_length = token_count >= 4
+
+                    # 🔒 Coverage Gate: 검색 결과에서 실제로 키워드가 발견되는지 확인
+                    keyword_coverage = get_keyword_coverage(query, results)
+                    min_coverage = int(os.getenv('MIN_KEYWORD_COVERAGE', '2'))
+                    pass_coverage = keyword_coverage >= min_coverage
+
+                    should_use_rag = pass_abs_threshold and pass_domain and pass_length and pass_coverage
+                    metrics["mode"] = "rag" if should_use_rag else "chat"
+                    metrics["keyword_coverage"] = keyword_coverage
+
+                    logger.info(
+                        f"🎯 AUTO 모드 (절대값): top_score={top_score:.3f}, "
+                        f"has_keyword={has_keyword}, token_count={token_count}, "
+                        f"coverage={keyword_coverage}/{min_coverage}, "
+                        f"threshold={vec_min}, selected_mode={metrics['mode']}"
+                    )
+                else:
+                    # 기존 정규화 정책 (fallback)
+                    rag_min_score = float(os.getenv('RAG_MIN_SCORE', '0.35'))
+                    metrics["mode"] = "rag" if top_score >= rag_min_score else "chat"
+                    logger.info(
+                        f"🎯 AUTO 모드 (정규화): top_score={top_score:.3f}, "
+                        f"threshold={rag_min_score}, selected_mode={metrics['mode']}"
+                    )
+
+        elif mode_env == 'CHAT':
+            metrics["mode"] = "chat"
+            metrics["top_score"] = 0.0
+        else:  # RAG, SUMMARIZE
+            metrics["mode"] = "rag"
+            metrics["top_score"] = results[0].get('score', 0.0) if results else 0.0
+
+        # 🎯 STEP 2: 모드 기반 컨텍스트 최적화
+        determined_mode = metrics.get("mode", "rag")
+        logger.info(f"🎯 모드={determined_mode} → 컨텍스트 최적화 시작")
+
+        # Context Hydrator with mode-aware optimization (폴백 보장)
+        try:
+            from app.rag.utils.context_hydrator import hydrate_context
+        except Exception as e:
+            logger.warning(f"⚠️ hydrate_context import 실패, 폴백 사용: {e}")
+            def hydrate_context(chunks, max_len=10000, mode="rag"):
+                """안전 폴백: 청크 스니펫 결합"""
+                parts = []
+                for c in chunks:
+                    t = (c.get("snippet") or c.get("content") or c.get("text") or "")
+                    if t:
+                        parts.append(t[:800])
+                ctx = "\n\n".join(parts)[:max_len]
+                return ctx, {"fallback": True, "joined": len(parts)}
+
+        hydrate_start = time.perf_counter()
+        context, hydrator_metrics = hydrate_context(compressed, max_len=10000, mode=determined_mode)
+        metrics["hydrate_time"] = time.perf_counter() - hydrate_start
+        # Merge hydrator metrics into main metrics
+        metrics.update({f"ctx_{k}": v for k, v in hydrator_metrics.items()})
+
+        return {"results": results, "compressed": compressed, "context": context, "mode": determined_mode}
+
+    def _finish_query(
+        self, query: str, answer: str, plan: dict, metrics: dict, diagnostics: dict, start_time: float
+    ) -> RAGResponse:
+        """생성 후 단계 (지연 로깅, 모드별 출처/근거 정리 → RAGResponse)"""
+        results = plan["results"]
+        compressed = plan["compressed"]
+        determined_mode = plan["mode"]
+
+        # [DIAG] 생성 완료 진단
+        if DIAG_RAG:
+            diagnostics["mode"] = "normal"
+            diagnostics["generate_path"] = "from_context"
+            diagnostics["used_k"] = len(compressed)
+            if DIAG_LOG_LEVEL in ["DEBUG", "INFO"]:
+                logger.info(
+                    f"[DIAG] 생성 완료: from_context 경로, {len(compressed)}개 문서 사용"
+                )
+
+        total_latency = time.perf_counter() - start_time
+        metrics["total_time"] = total_latency
+
+        # 🚨 성능 가드: 슬로 쿼리 임계값 체크
+        if total_latency > 10.0:
+            logger.warning(
+                f"⚠️  SLOW_QUERY (>10s): {total_latency:.2f}s | "
+                f"query='{query[:50]}...' | "
+                f"search={metrics['search_time']:.2f}s, "
+                f"hydrate={metrics.get('hydrate_time', 0):.3f}s, "
+                f"generate={metrics['generate_time']:.2f}s"
+            )
+        elif total_latency > 3.0:
+            logger.warning(
+                f"⚠️  SLOW_QUERY (>3s): {total_latency:.2f}s | "
+                f"query='{query[:50]}...'"
+            )
+
+        logger.info(
+            f"RAG query completed in {total_latency:.2f}s "
+            f"(search={metrics['search_time']:.2f}s, "
+            f"compress={metrics['compress_time']:.2f}s, "
+            f"hydrate={metrics.get('hydrate_time', 0):.3f}s, "
+            f"generate={metrics['generate_time']:.2f}s)"
+        )
+
+        # CHAT 모드일 경우 출처 제거 (일반 대화는 문서 인용 불필요)
+        # "전부" 또는 "개수" 질의 감지 시 출처도 더 많이 표시
+        max_sources = 200 if any(kw in query.lower() for kw in ["전부", "모두", "모든", "전체", "all", "몇", "개수", "총"]) else 3
+        final_source_docs = [] if determined_mode == "chat" else [c.get("doc_id") for c in results[:max_sources]]
+        final_evidence_chunks = [] if determined_mode == "chat" else compressed
+
+        return RAGResponse(
+            answer=answer,
+            source_docs=final_source_docs,
+            evidence_chunks=final_evidence_chunks,  # UI용 근거
+            raw_results=results,  # Evidence 최소 보장용
+            latency=total_latency,
+            success=True,
+            metrics=metrics,
+            diagnostics=diagnostics,
+        )
+
     def _make_response(
         self, text: str, selected: List[Dict[str, Any]], retrieved: List[Dict[str, Any]]
     ) -> dict:
@@ -890,10 +934,23 @@ class RAGPipeline:
             }
         """
         # ✨ 2-tier Cache check - 메모리 캐시 → 영구 캐시
-        cache_key = f"{query}:{selected_filename}" if selected_filename else query
+        # 네임스페이스(인덱스 버전 + 검색/생성 구성 해시)가 바뀌면 이전 답변은 조회되지 않음
+        cache_ns = current_answer_namespace()
+        cache_mode = f"doc:{selected_filename}" if selected_filename else None
+
+        cached_result = self._lookup_cached(query, cache_mode, cache_ns)
+        if cached_result:
+            return cached_result
+
+        if not ANSWER_SINGLE_FLIGHT:
+            return self._compute_answer(query, top_k, selected_filename, cache_mode, cache_ns)
+        return self._answer_single_flight(query, top_k, selected_filename, cache_mode, cache_ns)
 
+    @staticmethod
+    def _lookup_cached(query: str, cache_mode: Optional[str], cache_ns: str) -> Optional[dict]:
+        """2-tier 캐시 조회 (메모리 → 영구, status.from_cache 표시)"""
         # Tier 1: 메모리 캐시 확인 (가장 빠름)
-        cached_result = get_cached_result(cache_key)
+        cached_result = get_cached_result(query, cache_mode, cache_ns)
         if cached_result:
             logger.info(f"🎯 Memory Cache HIT! Returning cached result for query: {query[:50]}...")
             if "status" in cached_result:
@@ -901,15 +958,272 @@ class RAGPipeline:
             return cached_result
 
         # Tier 2: 영구 캐시 확인 (서버 재시작 후에도 유지)
-        cached_result = get_cached_result_persistent(cache_key)
+        cached_result = get_cached_result_persistent(query, cache_mode, cache_ns)
         if cached_result:
             logger.info(f"💾 Persistent Cache HIT! Returning cached result for query: {query[:50]}...")
             # 영구 캐시에서 가져온 결과를 메모리 캐시에도 저장 (다음 접근을 위해)
-            cache_query_result(cache_key, cached_result)
+            cache_query_result(query, cached_result, cache_mode, cache_ns)
             if "status" in cached_result:
                 cached_result["status"]["from_cache"] = "persistent"
             return cached_result
+        return None
+
+    def answer_stream(self, query: str, top_k: Optional[int] = None,
+                      selected_filename: Optional[str] = None) -> Iterator[dict]:
+        """토큰 스트리밍 답변 (answer()와 같은 결과를 이벤트로 나눠 전달)
+
+        Yields:
+            {"type": "meta", "citations", "evidence", "status"}: 검색·압축 완료 직후 (생성 전)
+            {"type": "token", "text": str}: 생성 조각 (도착 즉시)
+            {"type": "done", "result": dict, "metrics": {"ttft_ms", "total_ms"}}: answer()와 같은 최종 응답
+
+        캐시 히트, 선택 문서, COST/DOCUMENT/SEARCH 라우팅, 스트리밍 미지원 생성기는
+        answer() 경로의 완성 결과를 한 조각으로 전달한다. 생성 결과는 answer()처럼 두 캐시 계층에 기록되고,
+        동일 질의 동시 요청은 answer()와 같이 단일화된다 (팔로워는 리더의 완성 결과를 한 조각으로 재생).
+        """
+        start_time = time.perf_counter()
+        cache_ns = current_answer_namespace()
+        cache_mode = f"doc:{selected_filename}" if selected_filename else None
+
+        result = self._lookup_cached(query, cache_mode, cache_ns)
+        if result is None and (selected_filename or not hasattr(self.generator, "generate_stream")):
+            if not ANSWER_SINGLE_FLIGHT:
+                result = self._compute_answer(query, top_k, selected_filename, cache_mode, cache_ns)
+            else:
+                result = self._answer_single_flight(query, top_k, selected_filename, cache_mode, cache_ns)
+
+        if result is not None:
+            yield from self._replay_result(result, start_time)
+            return
+
+        if not ANSWER_SINGLE_FLIGHT:
+            yield from self._stream_answer(query, top_k, cache_mode, cache_ns, start_time)
+            return
+        yield from self._stream_single_flight(query, top_k, cache_mode, cache_ns, start_time)
+
+    def _stream_single_flight(self, query: str, top_k: Optional[int], cache_mode: Optional[str],
+                              cache_ns: str, start_time: float) -> Iterator[dict]:
+        """스트리밍 답변 single-flight (_answer_single_flight와 같은 in-flight/임대 규칙)
+
+        리더만 토큰을 스트리밍하고, 팔로워는 리더의 완성 결과를 _replay_result로 전달받는다.
+        리더의 생성이 실패하거나 스트림이 중간에 버려지면 결과 없이 종료되어 팔로워가 직접 계산한다.
+        """
+        memory = get_cache()
+        if not memory.begin_inflight(query, cache_mode, cache_ns):
+            logger.info(f"⏳ 동일 질의 계산 대기 (single-flight, stream): {query[:50]}...")
+            shared = memory.wait_inflight(query, cache_mode, cache_ns, timeout=ANSWER_SINGLE_FLIGHT_TIMEOUT)
+            if shared is not None:
+                yield from self._replay_result(self._shared_result(shared, "coalesced"), start_time)
+                return
+            yield from self._stream_answer(query, top_k, cache_mode, cache_ns, start_time)
+            return
+
+        result = None
+        persistent = get_persistent_cache()
+        leased = False
+        try:
+            try:
+                leased = persistent.acquire_lease(query, cache_mode, cache_ns, ttl=ANSWER_SINGLE_FLIGHT_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"계산 임대 획득 실패 (무시): {e}")
+                leased = True  # 임대 없이 계산
+
+            if not leased:
+                logger.info(f"⏳ 다른 프로세스의 동일 질의 계산 대기: {query[:50]}...")
+                shared = persistent.wait_for_result(
+                    query, cache_mode, cache_ns, timeout=ANSWER_SINGLE_FLIGHT_TIMEOUT
+                )
+                if shared is not None:
+                    cache_query_result(query, shared, cache_mode, cache_ns)
+                    result = self._shared_result(shared, "coalesced")
+                    yield from self._replay_result(result, start_time)
+                    return
+
+            result = yield from self._stream_answer(query, top_k, cache_mode, cache_ns, start_time)
+        finally:
+            memory.end_inflight(query, cache_mode, cache_ns, result=result)
+            if leased:
+                try:
+                    persistent.release_lease(query, cache_mode, cache_ns)
+                except Exception as e:
+                    logger.warning(f"계산 임대 반환 실패 (무시): {e}")
+
+    def _stream_answer(self, query: str, top_k: Optional[int], cache_mode: Optional[str],
+                       cache_ns: str, start_time: float) -> Iterator[dict]:
+        """검색 → 메타 → 토큰 → 최종 응답 이벤트 생성 (반환값: 성공 결과, 실패/부분 답변이면 None)"""
+        if hasattr(self.generator, "rag"):
+            routed = self._answer_routed(query, None)
+            if routed is not None:
+                yield from self._replay_result(routed, start_time)
+                return routed
+
+        metrics: Dict[str, Any] = {}
+        diagnostics: Dict[str, Any] = {}
+        try:
+            plan = self._prepare_generation(query, top_k or 5, 0.7, None, metrics, diagnostics, start_time)
+        except Exception as e:
+            logger.error(f"Stream retrieval failed: {e}", exc_info=True)
+            plan = RAGResponse(answer="", success=False, error=f"[E_RETRIEVE] 검색 실패: {e}",
+                               latency=time.perf_counter() - start_time)
+        if isinstance(plan, RAGResponse):
+            result = self._result_from_response(query, plan, cache_mode, cache_ns)
+            yield from self._replay_result(result, start_time)
+            return result if plan.success else None
+
+        # 1) 검색 메타데이터 먼저 (UI는 생성 중에도 근거 문서를 표시할 수 있음)
+        evidence_chunks = [] if plan["mode"] == "chat" else plan["compressed"]
+        evidence, _ = self._build_evidence(evidence_chunks, plan["results"])
+        yield {
+            "type": "meta",
+            "citations": evidence,
+            "evidence": evidence,
+            "status": {
+                "retrieved_count": len(plan["results"]),
+                "selected_count": len(evidence),
+                "found": len(evidence) > 0,
+            },
+        }
+
+        # 2) 토큰 (생성 조각 도착 즉시)
+        logger.info(f"🎯 모드={plan['mode']} → 스트리밍 생성 시작")
+        llm_gen_start = time.perf_counter()
+        parts = []
+        errors: List[str] = []
+        for piece in self._generate_stream(query, plan["context"], 0.1, plan["mode"], errors):
+            if not parts:
+                metrics["ttft"] = time.perf_counter() - start_time
+            parts.append(piece)
+            yield {"type": "token", "text": piece}
+        metrics["generate_time"] = time.perf_counter() - llm_gen_start
+
+        # 3) 최종 응답 (answer()와 동일 구조, 성공한 완성 답변만 캐시 기록)
+        if errors:
+            response = RAGResponse(
+                answer="".join(parts),
+                success=False,
+                error=f"[E_GENERATE] {errors[0]}",
+                latency=time.perf_counter() - start_time,
+                metrics=metrics,
+                diagnostics=diagnostics,
+            )
+            result = self._result_from_response(query, response, cache_mode, cache_ns)
+            if parts:
+                # 부분 답변: 이미 표시된 조각은 유지하고 중단 안내만 덧붙임 (캐시하지 않음)
+                result["text"] = "".join(parts) + "\n\n" + result["text"]
+                result["citations"] = result["evidence"] = evidence
+                result["status"]["partial"] = True
+        else:
+            response = self._finish_query(query, "".join(parts), plan, metrics, diagnostics, start_time)
+            result = self._result_from_response(query, response, cache_mode, cache_ns)
+
+        ttft_ms = int(metrics.get("ttft", response.latency) * 1000)
+        self._record_ttft(ttft_ms)
+        yield {
+            "type": "done",
+            "result": result,
+            "metrics": {
+                "ttft_ms": ttft_ms,
+                "total_ms": int(response.latency * 1000),
+                "context_tokens": metrics.get("ctx_packed_tokens"),
+            },
+        }
+        # 반환값은 _stream_single_flight가 yield from으로 받아 팔로워와 공유
+        return None if errors else result  # noqa: B901
+
+    def _generate_stream(self, query: str, context: str, temperature: float, mode: str,
+                         errors: List[str]) -> Iterator[str]:
+        """생성기 스트리밍 (실패는 errors에 기록하고 중단, 호출자가 실패 응답으로 마무리)"""
+        try:
+            for piece in self.generator.generate_stream(query, context, temperature, mode=mode):
+                if piece:
+                    yield piece
+        except Exception as e:
+            logger.error(f"Stream generation 실패: {e}", exc_info=True)
+            errors.append(str(e))
+
+    def _replay_result(self, result: dict, start_time: float) -> Iterator[dict]:
+        """완성된 answer() 결과를 스트림 이벤트로 전달 (텍스트는 한 조각)"""
+        yield {
+            "type": "meta",
+            "citations": result.get("citations", []),
+            "evidence": result.get("evidence", []),
+            "status": result.get("status", {}),
+        }
+        if result.get("text"):
+            yield {"type": "token", "text": result["text"]}
+        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+        yield {"type": "done", "result": result, "metrics": {"ttft_ms": elapsed_ms, "total_ms": elapsed_ms}}
+
+    @staticmethod
+    def _record_ttft(ttft_ms: int) -> None:
+        """첫 토큰 지연 메트릭 기록 (/metrics: ttft_ms_p50/p95)"""
+        try:
+            from app.rag.metrics_collector import get_metrics_collector
+            get_metrics_collector().record_ttft(ttft_ms)
+        except Exception as e:
+            logger.debug(f"TTFT 메트릭 기록 실패 (무시): {e}")
+
+    @staticmethod
+    def _shared_result(result: dict, source: str) -> dict:
+        """공유받은 결과 (리더의 결과 객체는 건드리지 않도록 status만 복사)"""
+        shared = dict(result)
+        if isinstance(result.get("status"), dict):
+            shared["status"] = {**result["status"], "from_cache": source}
+        return shared
+
+    def _answer_single_flight(self, query: str, top_k: Optional[int], selected_filename: Optional[str],
+                              cache_mode: Optional[str], cache_ns: str) -> dict:
+        """동일 질의 동시 요청 단일화 (스레드: 메모리 캐시 in-flight, 프로세스: SQLite 임대)
+
+        팔로워는 리더의 계산 결과를 공유받고, 리더가 실패하거나 타임아웃되면 직접 계산한다.
+        """
+        memory = get_cache()
+        if not memory.begin_inflight(query, cache_mode, cache_ns):
+            logger.info(f"⏳ 동일 질의 계산 대기 (single-flight): {query[:50]}...")
+            shared = memory.wait_inflight(query, cache_mode, cache_ns, timeout=ANSWER_SINGLE_FLIGHT_TIMEOUT)
+            if shared is not None:
+                return self._shared_result(shared, "coalesced")
+            return self._compute_answer(query, top_k, selected_filename, cache_mode, cache_ns)
+
+        result = None
+        persistent = get_persistent_cache()
+        leased = False
+        try:
+            try:
+                leased = persistent.acquire_lease(query, cache_mode, cache_ns, ttl=ANSWER_SINGLE_FLIGHT_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"계산 임대 획득 실패 (무시): {e}")
+                leased = True  # 임대 없이 계산
+
+            if not leased:
+                logger.info(f"⏳ 다른 프로세스의 동일 질의 계산 대기: {query[:50]}...")
+                shared = persistent.wait_for_result(
+                    query, cache_mode, cache_ns, timeout=ANSWER_SINGLE_FLIGHT_TIMEOUT
+                )
+                if shared is not None:
+                    cache_query_result(query, shared, cache_mode, cache_ns)
+                    result = self._shared_result(shared, "coalesced")
+                    return result
+
+            errors: List[str] = []
+            computed = self._compute_answer(query, top_k, selected_filename, cache_mode, cache_ns, errors)
+            # 실패 응답은 공유하지 않음 (팔로워가 직접 계산)
+            result = None if errors else computed
+            return computed
+        finally:
+            memory.end_inflight(query, cache_mode, cache_ns, result=result)
+            if leased:
+                try:
+                    persistent.release_lease(query, cache_mode, cache_ns)
+                except Exception as e:
+                    logger.warning(f"계산 임대 반환 실패 (무시): {e}")
 
+    def _compute_answer(self, query: str, top_k: Optional[int], selected_filename: Optional[str],
+                        cache_mode: Optional[str], cache_ns: str, errors: Optional[List[str]] = None) -> dict:
+        """캐시 미스 시 답변 계산 (answer()의 본체, 성공 결과는 두 캐시 계층에 기록)
+
+        생성 실패로 오류 응답을 반환하면 errors(주어진 경우)에 오류를 기록한다.
+        """
         # 🚀 조기 단락: 선택된 문서가 있으면 즉시 DOCUMENT 모드로 처리
         # 검색·라우팅·압축 단계 완전 생략 → 성능 향상 (20~60% 지연시간 감소)
         if selected_filename:
@@ -931,141 +1245,158 @@ class RAGPipeline:
             result = self._answer_document(actual_query, selected_filename=normalized_filename)
 
             # 결과 캐싱
-            cache_query_result(cache_key, result)
-            cache_query_result_persistent(cache_key, result)
+            cache_query_result(query, result, cache_mode, cache_ns)
+            cache_query_result_persistent(query, result, cache_mode, cache_ns)
 
             return result
 
         # 🔥 CRITICAL: 기안자/날짜 검색은 QuickFixRAG에 위임 (전문 로직 보유)
         if hasattr(self.generator, "rag"):
-            import sqlite3
+            routed = self._answer_routed(query, selected_filename)
+            if routed is not None:
+                return routed
 
-            # ✅ 확장된 쿼리에서 실제 질문 추출 (chat_interface.py 대응)
-            actual_query = query
-            if "현재 질문:" in query:
-                parts = query.split("현재 질문:")
-                if len(parts) > 1:
-                    actual_query = parts[-1].strip()
-                    logger.info(f"📝 확장 쿼리에서 추출: '{actual_query[:50]}'")
-
-            # 🧹 UI 메타데이터 제거 (🏷 pdf · 📅 2024-10-24 · ✍ 등)
-            actual_query = clean_ui_metadata(actual_query)
-
-            # 🔍 쿼리에서 문서명 추출 (사용자가 직접 타이핑한 경우)
-            # 패턴: "문서제목 이 문서/해당 문서 ..."
-            if not selected_filename:
-                doc_ref_pattern = r'^(.+?)\s+(이\s?문서|해당\s?문서|이문서)'
-                match = re.match(doc_ref_pattern, actual_query, re.IGNORECASE)
-                if match:
-                    candidate_title = match.group(1).strip()
-                    # 날짜 패턴 제거 (예: "2025-01-09_광화문_스튜디오..." → "광화문_스튜디오...")
-                    candidate_title = re.sub(r'^\d{4}[-_]\d{2}[-_]\d{2}[-_]', '', candidate_title)
-
-                    # metadata_db에서 제목으로 문서 검색
-                    from modules.metadata_db import MetadataDB
-                    db = MetadataDB()
-                    try:
-                        # 제목 정규화 (특수문자, 공백 처리)
-                        normalized_title = candidate_title.replace('_', ' ').replace('&', '').strip()
-
-                        # DB에서 제목 유사도 검색 (LIKE 패턴)
-                        conn = db.conn
-                        cursor = conn.cursor()
-                        query_sql = """
-                            SELECT filename, title FROM documents
-                            WHERE title LIKE ? OR filename LIKE ?
-                            ORDER BY
-                                CASE
-                                    WHEN title = ? THEN 1
-                                    WHEN title LIKE ? THEN 2
-                                    ELSE 3
-                                END
-                            LIMIT 1
-                        """
-                        like_pattern = f"%{normalized_title}%"
-                        cursor.execute(query_sql, (like_pattern, like_pattern, candidate_title, f"{candidate_title}%"))
-                        result = cursor.fetchone()
-
-                        if result:
-                            selected_filename = result[0]
-                            logger.info(f"📌 쿼리에서 문서명 추출: '{candidate_title}' → '{selected_filename}'")
-                    except Exception as e:
-                        logger.warning(f"문서명 추출 중 오류 (무시): {e}")
+        # 일반 쿼리는 기존 로직 사용
+        response = self.query(query, top_k=top_k or 5, selected_filename=selected_filename)
+        if not response.success and errors is not None:
+            errors.append(response.error or "generation failed")
+        return self._result_from_response(query, response, cache_mode, cache_ns)
+
+    def _answer_routed(self, query: str, selected_filename: Optional[str]) -> Optional[dict]:
+        """QuickFixRAG 경로 라우팅 (COST/DOCUMENT/SEARCH는 전용 처리, 일반 질의면 None)"""
+        # ✅ 확장된 쿼리에서 실제 질문 추출 (chat_interface.py 대응)
+        actual_query = query
+        if "현재 질문:" in query:
+            parts = query.split("현재 질문:")
+            if len(parts) > 1:
+                actual_query = parts[-1].strip()
+                logger.info(f"📝 확장 쿼리에서 추출: '{actual_query[:50]}'")
+
+        # 🧹 UI 메타데이터 제거 (🏷 pdf · 📅 2024-10-24 · ✍ 등)
+        actual_query = clean_ui_metadata(actual_query)
+
+        # 🔍 쿼리에서 문서명 추출 (사용자가 직접 타이핑한 경우)
+        # 패턴: "문서제목 이 문서/해당 문서 ..."
+        if not selected_filename:
+            doc_ref_pattern = r'^(.+?)\s+(이\s?문서|해당\s?문서|이문서)'
+            match = re.match(doc_ref_pattern, actual_query, re.IGNORECASE)
+            if match:
+                candidate_title = match.group(1).strip()
+                # 날짜 패턴 제거 (예: "2025-01-09_광화문_스튜디오..." → "광화문_스튜디오...")
+                candidate_title = re.sub(r'^\d{4}[-_]\d{2}[-_]\d{2}[-_]', '', candidate_title)
+
+                # metadata_db에서 제목으로 문서 검색
+                from modules.metadata_db import MetadataDB
+                db = MetadataDB()
+                try:
+                    # 제목 정규화 (특수문자, 공백 처리)
+                    normalized_title = candidate_title.replace('_', ' ').replace('&', '').strip()
+
+                    # DB에서 제목 유사도 검색 (LIKE 패턴)
+                    conn = db.conn
+                    cursor = conn.cursor()
+                    query_sql = """
+                        SELECT filename, title FROM documents
+                        WHERE title LIKE ? OR filename LIKE ?
+                        ORDER BY
+                            CASE
+                                WHEN title = ? THEN 1
+                                WHEN title LIKE ? THEN 2
+                                ELSE 3
+                            END
+                        LIMIT 1
+                    """
+                    like_pattern = f"%{normalized_title}%"
+                    cursor.execute(query_sql, (like_pattern, like_pattern, candidate_title, f"{candidate_title}%"))
+                    result = cursor.fetchone()
 
-            # 🎯 모드 라우팅: Q&A 의도 키워드가 있으면 파일명이 있어도 Q&A 모드 우선
-            route_decision = self.query_router.classify_mode(actual_query)
+                    if result:
+                        selected_filename = result[0]
+                        logger.info(f"📌 쿼리에서 문서명 추출: '{candidate_title}' → '{selected_filename}'")
+                except Exception as e:
+                    logger.warning(f"문서명 추출 중 오류 (무시): {e}")
 
-            # 🔧 selected_filename이 있으면 무조건 DOCUMENT 모드로 전환 (우선순위 최상위)
-            # 문서가 선택된 상태에서는 모든 질문에 대해 LLM이 해당 문서 기반으로 답변
-            if selected_filename:
-                logger.info(f"🎯 선택된 문서({selected_filename}) 감지 → DOCUMENT 모드로 강제")
-                route_decision.mode = QueryMode.DOCUMENT
-                route_decision.reason = "selected_doc"
+        # 🎯 모드 라우팅: Q&A 의도 키워드가 있으면 파일명이 있어도 Q&A 모드 우선
+        route_decision = self.query_router.classify_mode(actual_query)
 
-            # 🔧 요약 의도 + 쿼리에 날짜/문서명 패턴이 있으면 DOCUMENT 모드로 강제
-            has_summary_intent = self.query_router.SUMMARY_INTENT_PATTERN.search(actual_query) or "내용" in actual_query.lower()
-            has_date_pattern = re.search(r'\d{4}[-_]\d{2}[-_]\d{2}', actual_query)  # 2025-06-10 형식
+        # 🔧 selected_filename이 있으면 무조건 DOCUMENT 모드로 전환 (우선순위 최상위)
+        # 문서가 선택된 상태에서는 모든 질문에 대해 LLM이 해당 문서 기반으로 답변
+        if selected_filename:
+            logger.info(f"🎯 선택된 문서({selected_filename}) 감지 → DOCUMENT 모드로 강제")
+            route_decision.mode = QueryMode.DOCUMENT
+            route_decision.reason = "selected_doc"
 
-            if has_summary_intent and has_date_pattern and not selected_filename:
-                logger.info(f"🎯 요약 의도 + 날짜 패턴 감지 → DOCUMENT 모드로 강제")
-                route_decision.mode = QueryMode.DOCUMENT
-                route_decision.reason = "summary_with_date_pattern"
+        # 🔧 요약 의도 + 쿼리에 날짜/문서명 패턴이 있으면 DOCUMENT 모드로 강제
+        has_summary_intent = self.query_router.SUMMARY_INTENT_PATTERN.search(actual_query) or "내용" in actual_query.lower()
+        has_date_pattern = re.search(r'\d{4}[-_]\d{2}[-_]\d{2}', actual_query)  # 2025-06-10 형식
 
-            logger.info(
-                f"🔀 라우팅 결과: mode={route_decision.mode.value}, reason={route_decision.reason}"
-            )
+        if has_summary_intent and has_date_pattern and not selected_filename:
+            logger.info(f"🎯 요약 의도 + 날짜 패턴 감지 → DOCUMENT 모드로 강제")
+            route_decision.mode = QueryMode.DOCUMENT
+            route_decision.reason = "summary_with_date_pattern"
 
-            # 💰 COST 모드: 비용 합계 직접 조회
-            if route_decision.mode == QueryMode.COST:
-                return self._answer_cost_sum(actual_query)
+        logger.info(
+            f"🔀 라우팅 결과: mode={route_decision.mode.value}, reason={route_decision.reason}"
+        )
 
-            # 📄 DOCUMENT 모드: 문서 내용/요약 (통합: PREVIEW + SUMMARY)
-            if route_decision.mode == QueryMode.DOCUMENT:
-                return self._answer_document(actual_query, selected_filename=selected_filename)
+        # 💰 COST 모드: 비용 합계 직접 조회
+        if route_decision.mode == QueryMode.COST:
+            return self._answer_cost_sum(actual_query)
 
-            # 🔍 SEARCH 모드: 문서 검색 (통합: LIST + SEARCH + LIST_FIRST)
-            if route_decision.mode == QueryMode.SEARCH:
-                return self._answer_search(actual_query)
+        # 📄 DOCUMENT 모드: 문서 내용/요약 (통합: PREVIEW + SUMMARY)
+        if route_decision.mode == QueryMode.DOCUMENT:
+            return self._answer_document(actual_query, selected_filename=selected_filename)
 
-            # 🔍 디버깅: 실제 pattern matching 대상 로깅
-            logger.info(f"🔍 Pattern matching 대상 쿼리: '{actual_query[:100]}'")
+        # 🔍 SEARCH 모드: 문서 검색 (통합: LIST + SEARCH + LIST_FIRST)
+        if route_decision.mode == QueryMode.SEARCH:
+            return self._answer_search(actual_query)
 
-            # ✅ P0: 파일명 직접 언급 패턴 감지 (레거시 호환, PREVIEW 모드 외)
-        # 일반 쿼리는 기존 로직 사용
-        response = self.query(query, top_k=top_k or 5, selected_filename=selected_filename)
+        # 🔍 디버깅: 실제 pattern matching 대상 로깅
+        logger.info(f"🔍 Pattern matching 대상 쿼리: '{actual_query[:100]}'")
+        return None
 
-        if response.success:
-            # 검색/압축에서 넘어온 정규화 청크 사용 (실제 page/snippet/meta 노출)
+    @staticmethod
+    def _build_evidence(evidence_chunks: List[Dict[str, Any]], raw_results: List[Dict[str, Any]]):
+        """UI용 Evidence 구성 → (evidence, 검색 결과 강제 주입 여부)"""
+        # 검색/압축에서 넘어온 정규화 청크 사용 (실제 page/snippet/meta 노출)
+        evidence = [
+            {
+                "doc_id": c.get("doc_id"),
+                "page": c.get("page", 1),
+                "snippet": c.get("snippet", ""),
+                "meta": c.get(
+                    "meta", {"doc_id": c.get("doc_id"), "page": c.get("page", 1)}
+                ),
+            }
+            for c in (evidence_chunks or [])
+        ]
+
+        # CRITICAL: Evidence 최소 보장 (sources_cited가 비어도 검색 결과는 표시)
+        evidence_injected = False
+        if not evidence and raw_results:
+            logger.info("Evidence empty, using raw_results[:3] as fallback")
             evidence = [
                 {
-                    "doc_id": c.get("doc_id"),
-                    "page": c.get("page", 1),
-                    "snippet": c.get("snippet", ""),
-                    "meta": c.get(
-                        "meta", {"doc_id": c.get("doc_id"), "page": c.get("page", 1)}
-                    ),
+                    "doc_id": r.get("doc_id") or r.get("chunk_id", "unknown"),
+                    "page": 0,  # 검색 결과는 페이지 정보 없음
+                    "snippet": r.get("snippet") or r.get("text_preview", "")[:400],  # 500 → 400 (스니펫 일관성)
+                    "meta": {
+                        "doc_id": r.get("doc_id") or r.get("chunk_id", "unknown"),
+                        "filename": r.get("filename", ""),
+                        "page": 0,
+                    },
                 }
-                for c in (response.evidence_chunks or [])
+                for r in raw_results[:3]
             ]
+            evidence_injected = True
 
-            # CRITICAL: Evidence 최소 보장 (sources_cited가 비어도 검색 결과는 표시)
-            evidence_injected = False
-            if not evidence and response.raw_results:
-                logger.info("Evidence empty, using raw_results[:3] as fallback")
-                evidence = [
-                    {
-                        "doc_id": r.get("doc_id") or r.get("chunk_id", "unknown"),
-                        "page": 0,  # 검색 결과는 페이지 정보 없음
-                        "snippet": r.get("snippet") or r.get("text_preview", "")[:400],  # 500 → 400 (스니펫 일관성)
-                        "meta": {
-                            "doc_id": r.get("doc_id") or r.get("chunk_id", "unknown"),
-                            "filename": r.get("filename", ""),
-                            "page": 0,
-                        },
-                    }
-                    for r in response.raw_results[:3]
-                ]
-                evidence_injected = True
+        return evidence, evidence_injected
+
+    def _result_from_response(self, query: str, response: RAGResponse,
+                              cache_mode: Optional[str], cache_ns: str) -> dict:
+        """query() 결과 → answer() 응답 dict (Evidence 정리, 성공 시 두 캐시 계층에 기록)"""
+        if response.success:
+            evidence, evidence_injected = self._build_evidence(response.evidence_chunks, response.raw_results)
 
             # [DIAG] Evidence 진단 정보 추가
             if DIAG_RAG and response.diagnostics:
@@ -1087,6 +1418,8 @@ class RAGPipeline:
             search_ms = int(response.metrics.get("search_time", 0) * 1000)
             generate_ms = int(response.metrics.get("generate_time", 0) * 1000)
             total_ms = int(response.latency * 1000)
+            ttft = response.metrics.get("ttft")
+            ctx_tokens = response.metrics.get("ctx_packed_tokens")
 
             logger.info(
                 f'[RAG] query="{query[:50]}..." | '
@@ -1097,7 +1430,9 @@ class RAGPipeline:
                 f"backfill={evidence_injected} | "
                 f"search_ms={search_ms} | "
                 f"generate_ms={generate_ms} | "
-                f"total_ms={total_ms}"
+                + (f"ttft_ms={int(ttft * 1000)} | " if ttft is not None else "")
+                + (f"ctx_tokens={ctx_tokens} | " if ctx_tokens is not None else "")
+                + f"total_ms={total_ms}"
             )
 
             result = {
@@ -1109,9 +1444,8 @@ class RAGPipeline:
             }
 
             # ✨ Cache the successful result to both tiers
-            cache_key = f"{query}:{selected_filename}" if selected_filename else query
-            cache_query_result(cache_key, result)  # Memory cache
-            cache_query_result_persistent(cache_key, result)  # Persistent cache
+            cache_query_result(query, result, cache_mode, cache_ns)  # Memory cache
+            cache_query_result_persistent(query, result, cache_mode, cache_ns)  # Persistent cache
             logger.info(f"📝 Cached result to memory + persistent storage for query: {query[:50]}...")
 
             return result
@@ -1892,8 +2226,8 @@ class RAGPipeline:
                             )
 
                         # 3. LLM 호출 (max_tokens는 route_query에서 결정)
-                        from llama_cpp import Llama
-                        if isinstance(llm.llm, Llama):
+                        # llm.llm은 Llama 또는 생성 스케줄러 프록시(ScheduledLlama)
+                        if hasattr(llm.llm, "create_chat_completion"):
                             # System 메시지는 모드별로 설정
                             if detailed_mode:
                                 system_msg = "당신은 문서 분석 전문가입니다. 사용자가 요청한 모든 세부사항을 빠짐없이 포함하여 상세하게 답변하세요."
@@ -1904,14 +2238,16 @@ class RAGPipeline:
                             else:
                                 system_msg = "당신은 문서 분석 전문가입니다. 문서 내용을 기반으로 정확하게 답변하세요."
 
-                            output = llm.llm.create_chat_completion(
-                                messages=[
-                                    {"role": "system", "content": system_msg},
-                                    {"role": "user", "content": llm_prompt}
-                                ],
-                                max_tokens=max_tokens,
-                                temperature=0.3
-                            )
+                            # 요약은 대화형 답변보다 낮은 우선순위로 스케줄링
+                            with generation_priority(Priority.SUMMARY if needs_summary else Priority.INTERACTIVE):
+                                output = llm.llm.create_chat_completion(
+                                    messages=[
+                                        {"role": "system", "content": system_msg},
+                                        {"role": "user", "content": llm_prompt}
+                                    ],
+                                    max_tokens=max_tokens,
+                                    temperature=0.3
+                                )
                             llm_raw = output['choices'][0]['message']['content']
 
                             if needs_summary:
@@ -2275,8 +2611,9 @@ class RAGPipeline:
         """
         logger.info("Warming up RAG pipeline...")
         try:
-            # 더미 쿼리 실행
-            response = self.query("test warmup query", top_k=1)
+            # 더미 쿼리 실행 (예열 우선순위: 대기 중인 사용자 요청이 먼저 실행됨)
+            with generation_priority(Priority.WARMUP):
+                response = self.query("test warmup query", top_k=1)
             if response.success:
                 logger.info(f"Warmup completed in {response.latency:.2f}s")
             else:
@@ -2447,6 +2784,13 @@ class _LLMAdapter:
             logger.error(f"LLM 답변 생성 실패: {e}", exc_info=True)
             return f"[E_GENERATE] {str(e)}"
 
+    def generate_stream_from_context(self, query: str, context: str, temperature: float = 0.1,
+                                     mode: str = "rag") -> Iterator[str]:
+        """컨텍스트 기반 답변 토큰 스트리밍 (QwenLLM.generate_stream)"""
+        chunks = [{"snippet": context, "content": context}]
+        logger.info(f"🎯 generate_stream_from_context: mode={mode}")
+        yield from self.llm.generate_stream(query, chunks, mode=mode)
+
 
 class _QuickFixGenerator:
     """QuickFixRAG 래퍼 (기존 구현 활용)"""
@@ -2508,6 +2852,24 @@ class _QuickFixGenerator:
             logger.error(f"Generation 실패: {e}", exc_info=True)
             return f"[E_GENERATE] {str(e)}"
 
+    def generate_stream(self, query: str, context: str, temperature: float, mode: str = "rag") -> Iterator[str]:
+        """토큰 스트리밍 생성 (generate()와 같은 우선순위, 스트리밍 미지원 시 완성 답변 한 조각)"""
+        if hasattr(self.rag, "generate_stream_from_context"):
+            yield from self.rag.generate_stream_from_context(query, context, temperature=temperature, mode=mode)
+            return
+
+        if hasattr(self.rag, "_ensure_llm_loaded"):
+            self.rag._ensure_llm_loaded()
+
+        if hasattr(self.rag, "llm") and hasattr(self.rag.llm, "generate_stream"):
+            chunks = self.compressed_chunks or [
+                {"snippet": s, "content": s} for s in context.split("\n\n") if s.strip()
+            ]
+            yield from self.rag.llm.generate_stream(query, chunks, mode=mode)
+            return
+
+        yield self.generate(query, context, temperature, mode=mode)
+
 
 class _V2RetrieverAdapter:
     """V2 Retriever Adapter
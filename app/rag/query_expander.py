@@ -1,6 +1,9 @@
 """
-Query Expansion using LLM
+Query Expansion
 사용자 질문에서 키워드와 동의어/관련어를 추출하여 검색 범위 확장
+
+기본은 오프라인 확장 테이블 조회(app/rag/expansion_table.py)이며,
+QUERY_EXPANSION_MODE=llm일 때만 LLM으로 키워드를 추출합니다.
 """
 
 import json
@@ -9,10 +12,22 @@ import re
 import os
 import time
 import threading
+import hashlib
 import unicodedata
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Set, Optional, TypedDict
+from typing import List, Dict, Any, Iterable, Set, Optional, TypedDict
 from app.core.logging import get_logger
+from app.rag.expansion_table import (
+    DEFAULT_TABLE_PATH,
+    ExpansionTable,
+    build_expansion_table,
+    load_expansion_table,
+    load_synonym_config,
+    strip_josa,
+)
+from app.rag.persistent_cache import PersistentCache
+from rag_system.generation_scheduler import Priority, generation_priority
 from rag_system.llm_singleton import LLMSingleton
 
 logger = get_logger(__name__)
@@ -166,26 +181,32 @@ def _llm_keyword_prompt(user_query: str) -> str:
     )
 
 
+def _normalize_query(query: str) -> str:
+    """캐시 키용 질의 정규화 (대소문자, 공백, 길이 제한)"""
+    normalized = unicodedata.normalize("NFKC", query).strip().lower()
+    normalized = re.sub(r"\s+", " ", normalized)
+    return normalized[:200]
+
+
 class _MemCache:
-    """TTL 및 스레드 안전성이 보장된 메모리 캐시"""
+    """TTL 및 스레드 안전성이 보장된 메모리 캐시 (항목 수 상한, LRU 축출)"""
 
-    def __init__(self, ttl_sec: int = 900):
+    def __init__(self, ttl_sec: int = 900, max_entries: int = 1024):
         """
         Args:
             ttl_sec: Time To Live (초), 기본 15분
+            max_entries: 최대 항목 수
         """
         self.ttl = ttl_sec
-        self._storage: Dict[str, tuple] = {}
+        self.max_entries = max_entries
+        self._storage: "OrderedDict[str, tuple]" = OrderedDict()
         self._lock = threading.RLock()
 
     def _now(self) -> float:
         return time.time()
 
     def _norm_key(self, query: str) -> str:
-        """캐시 키 정규화 (대소문자, 공백, 길이 제한)"""
-        normalized = unicodedata.normalize("NFKC", query).strip().lower()
-        normalized = re.sub(r"\s+", " ", normalized)
-        return normalized[:200]
+        return _normalize_query(query)
 
     def get(self, query: str) -> Optional[Dict[str, Any]]:
         """캐시에서 조회 (만료된 항목은 자동 제거)"""
@@ -201,6 +222,7 @@ class _MemCache:
                 del self._storage[key]
                 return None
 
+            self._storage.move_to_end(key)
             return data
 
     def set(self, query: str, data: Dict[str, Any]):
@@ -208,22 +230,89 @@ class _MemCache:
         key = self._norm_key(query)
         with self._lock:
             self._storage[key] = (data, self._now())
+            self._storage.move_to_end(key)
+            while len(self._storage) > self.max_entries:
+                self._storage.popitem(last=False)
+
+
+def _quote(kw: str) -> str:
+    """FTS 리터럴 따옴표 (내부 따옴표 이스케이프)"""
+    return '"' + kw.replace('"', '\\"') + '"'
 
 
 class QueryExpander:
-    """LLM 기반 쿼리 확장"""
+    """쿼리 확장 (기본: 오프라인 확장 테이블 조회, 선택: LLM)
+
+    모드 (QUERY_EXPANSION_MODE):
+    - dict: scripts/build_expansion_table.py로 만든 테이블 조회 (LLM 호출 없음)
+            테이블이 없으면 config/query_expansion.yaml 동의어만 사용
+    - llm: LLM으로 키워드/동의어 추출 (질의마다 생성 비용 발생)
+    """
+
+    MAX_TERMS = 24  # FTS 쿼리 용어 수 제한
+
+    def __init__(self, mode: Optional[str] = None):
+        """초기화
 
-    def __init__(self):
-        """초기화"""
-        self.llm = LLMSingleton.get_instance()
-        self.cache = _MemCache(ttl_sec=900)  # TTL 15분, 스레드 안전 캐시
+        Args:
+            mode: dict | llm (None: QUERY_EXPANSION_MODE, 기본 dict)
+        """
+        self.mode = (mode or os.getenv("QUERY_EXPANSION_MODE", "dict")).strip().lower()
+        if self.mode not in ("dict", "llm"):
+            logger.warning(f"⚠️ 알 수 없는 QUERY_EXPANSION_MODE={self.mode}, dict 사용")
+            self.mode = "dict"
+        self.max_related = int(os.getenv("QUERY_EXPANSION_MAX_RELATED", "2"))
+        self.table_path = os.getenv("QUERY_EXPANSION_TABLE", DEFAULT_TABLE_PATH)
+        self._config_table: Optional[ExpansionTable] = None
+
+        # LLM은 llm 모드에서만 로드
+        self.llm = LLMSingleton.get_instance() if self.mode == "llm" else None
+        self.cache = _MemCache(
+            ttl_sec=900,  # TTL 15분, 스레드 안전 캐시
+            max_entries=int(os.getenv("QUERY_EXPANSION_MEM_CACHE_SIZE", "1024")),
+        )
         self.search_stopwords = self._load_search_stopwords()
         self.domain_terms = self._load_domain_terms()
+        self.config_hash = self._config_hash()
+        # 프로세스 간 공유 캐시 (LLM 결과만, 테이블 조회는 메모리 캐시로 충분)
+        self.shared_cache = self._init_shared_cache() if self.mode == "llm" else None
         logger.info(
-            f"✅ QueryExpander 초기화: {len(self.search_stopwords)}개 불용어, "
+            f"✅ QueryExpander 초기화 (mode={self.mode}): {len(self.search_stopwords)}개 불용어, "
             f"{len(self.domain_terms)}개 도메인 용어"
         )
 
+    def _config_hash(self) -> str:
+        """확장 결과에 영향을 주는 설정 해시 (프롬프트, 불용어, 도메인 용어, 모델)"""
+        config = {
+            "mode": self.mode,
+            "prompt": _llm_keyword_prompt(""),
+            "stopwords": sorted(self.search_stopwords),
+            "domain_terms": sorted(self.domain_terms),
+            "max_terms": self.MAX_TERMS,
+            "model": os.getenv("LLM_MODEL_PATH", ""),
+        }
+        payload = json.dumps(config, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        return hashlib.sha1(payload).hexdigest()[:16]
+
+    def _init_shared_cache(self) -> Optional[PersistentCache]:
+        """SQLite 확장 캐시 (QUERY_EXPANSION_CACHE_DB, 빈 값이면 사용 안 함)"""
+        db_path = os.getenv("QUERY_EXPANSION_CACHE_DB", "var/cache/query_expansion.db")
+        if not db_path:
+            return None
+        try:
+            return PersistentCache(
+                db_path=db_path,
+                ttl=int(os.getenv("QUERY_EXPANSION_CACHE_TTL", "604800")),  # 7일
+                ttl_mode="sliding",
+                max_db_mb=64,
+                cleanup_prob=0.05,
+                key_func=lambda query, namespace=None: f"qexp:{namespace}:{_normalize_query(query)}",
+                max_entries=int(os.getenv("QUERY_EXPANSION_CACHE_MAX_ENTRIES", "20000")),
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 쿼리 확장 캐시 DB 초기화 실패, 메모리 캐시만 사용: {e}")
+            return None
+
     def _load_search_stopwords(self) -> Set[str]:
         """검색 불용어 로드"""
         try:
@@ -259,6 +348,22 @@ class QueryExpander:
             logger.warning(f"⚠️ 도메인 용어 로드 실패: {e}")
             return set()
 
+    def _matched_domain_terms(self, query: str) -> Set[str]:
+        """질의에 포함된 도메인 용어"""
+        query_normalized = _normalize_token(query)
+        return {term for term in self.domain_terms if term in query_normalized}
+
+    def _expansion_table(self) -> ExpansionTable:
+        """확장 테이블 (오프라인 테이블 우선, 없으면 설정 파일 동의어로 구성)"""
+        table = load_expansion_table(self.table_path)
+        if table is not None:
+            return table
+        if self._config_table is None:
+            groups, patterns = load_synonym_config()
+            self._config_table = build_expansion_table([], groups, patterns)
+            logger.info(f"📋 확장 테이블 없음 ({self.table_path}), 설정 동의어 {len(self._config_table)}개 사용")
+        return self._config_table
+
     def expand_query(self, query: str) -> Dict[str, Any]:
         """사용자 질문에서 키워드 추출 및 확장
 
@@ -273,23 +378,129 @@ class QueryExpander:
             }
         """
         # 캐시 확인 (동일 질문 반복 방지)
-        cached = self.cache.get(query)
+        cached = self._cached(query)
         if cached:
             logger.info(f"💾 Cache hit: {query[:80]}...")
             return cached
 
+        if self.mode == "dict":
+            try:
+                result = self._expand_with_table(query)
+            except Exception as e:
+                logger.warning(f"⚠️ Query expansion 실패, fallback 사용: {e}")
+                return self._fallback_expansion(query)
+            self.cache.set(query, result)
+            return result
+
+        return self._expand_with_llm(query)
+
+    def _cached(self, query: str) -> Optional[Dict[str, Any]]:
+        """메모리 캐시 → 공유 SQLite 캐시 순으로 조회"""
+        cached = self.cache.get(query)
+        if cached or self.shared_cache is None:
+            return cached
+        try:
+            cached = self.shared_cache.get(query, self.config_hash)
+        except Exception as e:
+            logger.warning(f"⚠️ 쿼리 확장 캐시 조회 실패: {e}")
+            return None
+        if cached:
+            self.cache.set(query, cached)
+        return cached
+
+    def _store(self, query: str, result: Dict[str, Any]):
+        """메모리 캐시 + 공유 SQLite 캐시에 저장"""
+        self.cache.set(query, result)
+        if self.shared_cache is None:
+            return
+        try:
+            self.shared_cache.set(query, result, self.config_hash)
+        except Exception as e:
+            logger.warning(f"⚠️ 쿼리 확장 캐시 저장 실패: {e}")
+
+    def prewarm(self, queries: Iterable[str]) -> Dict[str, int]:
+        """질의 목록으로 캐시 예열 (이미 캐시된 질의는 건너뜀)
+
+        Returns:
+            {"queries", "cached", "expanded", "failed"} 건수
+        """
+        stats = {"queries": 0, "cached": 0, "expanded": 0, "failed": 0}
+        for query in queries:
+            stats["queries"] += 1
+            if self._cached(query):
+                stats["cached"] += 1
+                continue
+            with generation_priority(Priority.WARMUP):
+                result = self.expand_query(query)
+            stats["failed" if result.get("fallback") else "expanded"] += 1
+        logger.info(f"✅ 쿼리 확장 캐시 예열: {stats}")
+        return stats
+
+    def _expand_with_table(self, query: str) -> Dict[str, Any]:
+        """확장 테이블 조회 기반 확장 (LLM 호출 없음)"""
+        tokens = _quick_tokens(query)
+        keywords = _filter_tokens(tokens, self.search_stopwords) or [_normalize_token(t) for t in tokens]
+
+        # 원형 키워드 유지 (조사 제거는 "회로도"→"회로"처럼 어미를 자를 수 있음)
+        primary: List[str] = []
+        for keyword in keywords:
+            if keyword not in primary:
+                primary.append(keyword)
+
+        table = self._expansion_table()
+        synonyms_dict: Dict[str, List[str]] = {}
+        related_dict: Dict[str, List[str]] = {}
+        for keyword in primary:
+            synonyms, related = table.lookup(keyword)
+            if synonyms:
+                synonyms_dict[keyword] = synonyms
+            if related and self.max_related > 0:
+                related_dict[keyword] = related[:self.max_related]
+
+        # 우선순위: 원본 → 조사 제거 어간 → 변형 → 동의어 → 도메인 용어 → 관련어
+        ordered: List[str] = []
+
+        def _extend(values):
+            for value in values:
+                if value not in ordered:
+                    ordered.append(value)
+
+        for keyword in primary:
+            _extend([keyword, strip_josa(keyword)])
+        for keyword in primary:
+            _extend(_variants(keyword))
+        for synonyms in synonyms_dict.values():
+            _extend(synonyms)
+        _extend(sorted(self._matched_domain_terms(query)))
+        for related in related_dict.values():
+            _extend(related)
+
+        terms = ordered[:self.MAX_TERMS]
+        logger.info(f"✅ Query expansion (dict): {query[:80]}... → {len(terms)}개 키워드")
+        return {
+            "original_keywords": primary,
+            "expanded_keywords": terms,
+            "search_query": " OR ".join(_quote(t) for t in terms),
+            "synonyms": synonyms_dict,
+            "related": related_dict,
+        }
+
+    def _expand_with_llm(self, query: str) -> Dict[str, Any]:
+        """LLM 기반 확장 (QUERY_EXPANSION_MODE=llm)"""
         # LLM 프롬프트 생성 (인젝션 방어 포함)
         prompt = _llm_keyword_prompt(query)
+        response = None
 
         try:
-            # LLM 호출 (타임아웃 포함)
-            response = self.llm.generate_response(
-                question=prompt,
-                context_chunks=[],
-                max_retries=1,  # 빠른 실패
-                enable_complex_processing=False,
-                mode="tool"  # 도구 모드 (키워드 추출 전용)
-            )
+            # LLM 호출 (생성 스케줄러: 대화형 답변·요약보다 낮은 우선순위, 마감 초과 시 폴백)
+            with generation_priority(Priority.EXPANSION):
+                response = self.llm.generate_response(
+                    question=prompt,
+                    context_chunks=[],
+                    max_retries=1,  # 빠른 실패
+                    enable_complex_processing=False,
+                    mode="tool"  # 도구 모드 (키워드 추출 전용)
+                )
 
             # JSON 추출 및 파싱
             if hasattr(response, "answer"):
@@ -331,8 +542,7 @@ class QueryExpander:
                     all_keywords.update(_variants(syn))
 
             # 도메인 용어 매칭 (질의에 포함된 도메인 용어 자동 추가)
-            query_normalized = _normalize_token(query)
-            matched_terms = {term for term in self.domain_terms if term in query_normalized}
+            matched_terms = self._matched_domain_terms(query)
 
             if matched_terms:
                 all_keywords.update(matched_terms)
@@ -343,15 +553,8 @@ class QueryExpander:
                 all_keywords = set(keywords)
                 logger.warning("⚠️ 모든 키워드가 필터링됨 - 원본 유지")
 
-            # FTS 쿼리 생성 (우선순위: 원본 키워드 → 동의어/변형)
-            MAX_TERMS = 24  # 쿼리 길이 제한
-
-            # 따옴표 이스케이프 헬퍼
-            def _quote(kw: str) -> str:
-                return '"' + kw.replace('"', '\\"') + '"'
-
             # 우선순위 정렬: 원본 키워드를 앞에, 나머지는 뒤에
-            terms_list = list(all_keywords)[:MAX_TERMS]
+            terms_list = list(all_keywords)[:self.MAX_TERMS]
             primary = [_quote(t) for t in filtered_keywords if t in terms_list]
             secondary = [_quote(t) for t in terms_list if t not in filtered_keywords]
 
@@ -367,8 +570,8 @@ class QueryExpander:
                 "synonyms": synonyms_dict
             }
 
-            # 캐시에 저장
-            self.cache.set(query, result)
+            # 캐시에 저장 (메모리 + 공유 캐시)
+            self._store(query, result)
 
             return result
 
@@ -376,59 +579,34 @@ class QueryExpander:
             logger.warning(f"⚠️ JSON 파싱 실패, fallback 사용: {e}")
             if hasattr(response, "answer"):
                 logger.debug(f"LLM response: {response.answer[:500]}")
-            # Fallback: 정규식 토큰화 + 필터링 + Variants
-            tokens = _quick_tokens(query)
-            filtered = _filter_tokens(tokens, self.search_stopwords)
-
-            if not filtered:
-                filtered = tokens  # 모두 제거되면 원본 유지
-
-            # Variants 확장
-            expanded = set(filtered)
-            for t in filtered:
-                expanded.update(_variants(t))
-
-            # 따옴표 이스케이프
-            def _quote_safe(kw: str) -> str:
-                return '"' + kw.replace('"', '\\"') + '"'
-
-            quoted = [_quote_safe(w) for w in list(expanded)[:24]]
-
-            return {
-                "original_keywords": tokens,
-                "expanded_keywords": list(expanded),
-                "search_query": " OR ".join(quoted),
-                "synonyms": {},
-                "fallback": True  # Fallback 사용 표시
-            }
+            return self._fallback_expansion(query)
 
         except Exception as e:
             logger.warning(f"⚠️ Query expansion 실패, fallback 사용: {e}")
-            # Fallback: 정규식 토큰화 + 필터링 + Variants
-            tokens = _quick_tokens(query)
-            filtered = _filter_tokens(tokens, self.search_stopwords)
-
-            if not filtered:
-                filtered = tokens
-
-            # Variants 확장
-            expanded = set(filtered)
-            for t in filtered:
-                expanded.update(_variants(t))
-
-            # 따옴표 이스케이프
-            def _quote_safe(kw: str) -> str:
-                return '"' + kw.replace('"', '\\"') + '"'
-
-            quoted = [_quote_safe(w) for w in list(expanded)[:24]]
-
-            return {
-                "original_keywords": tokens,
-                "expanded_keywords": list(expanded),
-                "search_query": " OR ".join(quoted),
-                "synonyms": {},
-                "fallback": True
-            }
+            return self._fallback_expansion(query)
+
+    def _fallback_expansion(self, query: str) -> Dict[str, Any]:
+        """Fallback: 정규식 토큰화 + 필터링 + Variants"""
+        tokens = _quick_tokens(query)
+        filtered = _filter_tokens(tokens, self.search_stopwords)
+
+        if not filtered:
+            filtered = tokens  # 모두 제거되면 원본 유지
+
+        # Variants 확장
+        expanded = set(filtered)
+        for t in filtered:
+            expanded.update(_variants(t))
+
+        quoted = [_quote(w) for w in list(expanded)[:self.MAX_TERMS]]
+
+        return {
+            "original_keywords": tokens,
+            "expanded_keywords": list(expanded),
+            "search_query": " OR ".join(quoted),
+            "synonyms": {},
+            "fallback": True  # Fallback 사용 표시
+        }
 
 
 # 싱글톤 인스턴스
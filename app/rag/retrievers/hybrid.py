@@ -203,7 +203,7 @@ class HybridRetriever:
                     # Expander를 False로 설정 (다음 호출 시 재시도 방지)
                     self.query_expander = False
 
-            # LLM 기반 Query Expansion (초기화 성공한 경우만)
+            # Query Expansion (기본: 오프라인 확장 테이블 조회, 초기화 성공한 경우만)
             if self.query_expander and self.query_expander is not False:
                 try:
                     expansion_result = self.query_expander.expand_query(query)
@@ -468,6 +468,7 @@ class HybridRetriever:
                                 "date": result.get("date"),
                                 "drafter": result.get("drafter"),
                                 "category": result.get("category"),
+                                "passage_idx": result.get("passage_idx"),  # 패시지 단위 색인 시 매칭 패시지
                             }
                         })
                         seen_filenames.add(filename)
@@ -722,6 +723,8 @@ class HybridRetriever:
             metrics["bm25"] = {
                 "total_documents": len(self.bm25.documents),
                 "index_path": str(self.bm25.index_path),
+                "scorer": self.bm25.scorer,
+                "passage_chars": self.bm25.passage_chars,
             }
 
         return metrics
@@ -7,9 +7,9 @@
 
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass, asdict
 from collections import Counter
 
@@ -169,6 +169,35 @@ class RoutingMonitor:
             logger.error(f"패턴 제안 실패: {e}")
             return []
 
+    def frequent_queries(self, days: int = 7, limit: int = 200) -> List[Tuple[str, int]]:
+        """최근 로그에서 자주 나온 질의 (캐시 예열용)
+
+        Args:
+            days: 조회할 일수 (오늘 포함)
+            limit: 최대 질의 수
+
+        Returns:
+            [(질의, 횟수)] 빈도 내림차순
+        """
+        counts: Counter = Counter()
+        for i in range(days):
+            date = datetime.now().date() - timedelta(days=i)
+            log_file = self.log_dir / f"routing_{date}.jsonl"
+            if not log_file.exists():
+                continue
+            try:
+                with open(log_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            query = json.loads(line).get("query", "").strip()
+                        except ValueError:
+                            continue  # 기록 중 잘린 줄
+                        if query:
+                            counts[query] += 1
+            except OSError as e:
+                logger.warning(f"라우팅 로그 읽기 실패: {log_file} ({e})")
+        return counts.most_common(limit)
+
 
 # 전역 인스턴스
 _monitor = None
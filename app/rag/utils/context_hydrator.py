@@ -10,6 +10,8 @@ import time
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+from rag_system.context_packer import TokenCounter, context_budget, get_token_counter, mode_max_tokens
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,10 +34,14 @@ END_BONUS = int(os.getenv("END_BONUS", "1"))
 
 def hydrate_context(chunks: List[Dict[str, Any]], max_len: int = 10000, mode: str = "rag") -> Tuple[str, Dict[str, Any]]:
     """
-    청크에서 텍스트를 추출하고 부족하면 PDF 보강
+    청크에서 텍스트를 추출하고 부족하면 PDF 보강, 토큰 예산에 맞춰 패킹
+
+    토큰 수는 모델 토크나이저로 계산하며 (청크 해시별 캐시), 예산은
+    min(CONTEXT_MAX_TOKENS, n_ctx - 모드별 max_tokens - CONTEXT_PROMPT_OVERHEAD)이다.
+    청크는 관련도 순(입력 순서)으로 채우고, 넘치는 청크는 모드별로 줄여서 남은 예산을 채운다.
 
     Args:
-        chunks: 검색 결과 청크 리스트
+        chunks: 검색 결과 청크 리스트 (관련도 순)
         max_len: 최대 컨텍스트 길이 (문자 수)
         mode: 생성 모드 (chat/rag/summarize)
 
@@ -44,14 +50,14 @@ def hydrate_context(chunks: List[Dict[str, Any]], max_len: int = 10000, mode: st
     """
     start_time = time.perf_counter()
 
-    # 🎯 환경 변수에서 컨텍스트 토큰 상한 읽기
-    context_max_tokens = int(os.getenv("CONTEXT_MAX_TOKENS", "1200"))
-
-    # 🎯 토큰↔문자 변환 계수 (모델별 편차 고려)
-    # 기본값 0.33: 1 char ≈ 0.33 token (즉, 1 token ≈ 3 chars)
-    tokens_per_char = float(os.getenv("TOKENS_PER_CHAR", "0.33"))
-    context_max_chars = int(context_max_tokens / max(tokens_per_char, 1e-6))
-    effective_max_len = min(max_len, context_max_chars)
+    # 🎯 토큰 예산: 컨텍스트 상한과 n_ctx 잔여분 중 작은 값
+    counter = get_token_counter()
+    max_tokens = mode_max_tokens(mode, int(os.getenv("LLM_MAX_TOKENS", "2048")))
+    prompt_overhead = int(os.getenv("CONTEXT_PROMPT_OVERHEAD", "600"))
+    context_max_tokens = min(
+        int(os.getenv("CONTEXT_MAX_TOKENS", "1200")),
+        context_budget(counter.n_ctx, max_tokens, prompt_overhead),
+    )
 
     # 🎯 RAG 스타일 압축 모드 확인
     rag_style_compact = os.getenv("RAG_STYLE_COMPACT", "true").lower() == "true"
@@ -59,16 +65,18 @@ def hydrate_context(chunks: List[Dict[str, Any]], max_len: int = 10000, mode: st
     metrics = {
         "chunks_received": len(chunks),
         "chunks_used": 0,
+        "chunks_packed": 0,
         "pdf_tail_pages": 0,
         "pdf_tail_status": "skipped",  # skipped | success | fail
         "total_length": 0,
         "fallback_chain": [],
         "context_max_tokens": context_max_tokens,
-        "context_max_chars": context_max_chars,
         "extraction_time": 0.0,
         "compression_applied": False,
-        "token_estimate": 0,
-        "truncate_reason": "none"
+        "token_count_method": counter.method,  # tokenizer | estimate
+        "packed_tokens": 0,
+        "token_estimate": 0,  # 하위 호환 (packed_tokens와 동일)
+        "truncate_reason": "none"  # none | compact | hardcut | dropped
     }
 
     parts = []
@@ -81,40 +89,46 @@ def hydrate_context(chunks: List[Dict[str, Any]], max_len: int = 10000, mode: st
             metrics["chunks_used"] += 1
 
     # 2. 길이 체크
-    current_text = "\n\n".join(parts)
-    current_len = len(current_text)
+    current_len = len("\n\n".join(parts))
 
     if current_len < 500 and chunks:
         # PDF 보강 시도
-        pdf_text = _extract_pdf_tail(chunks[0], metrics, needed=effective_max_len - current_len)
+        pdf_text = _extract_pdf_tail(chunks[0], metrics, needed=max_len - current_len)
         if pdf_text:
             parts.insert(0, pdf_text)
-            current_text = "\n\n".join(parts)
-            current_len = len(current_text)
-
-    # 3. 🎯 모드별 컨텍스트 압축 정책
-    if mode == "rag" and rag_style_compact and current_len > effective_max_len:
-        # RAG 모드: 핵심 문장 추출 (정보 밀도 기반 압축)
-        current_text = _extract_core_sentences(current_text, effective_max_len)
-        current_len = len(current_text)
-        metrics["compression_applied"] = True
-    elif mode == "summarize":
-        # Summarize 모드: 압축 비적용, 하드 컷만 수행
-        pass
+
+    # 3. 🎯 토큰 예산 패킹 (넘치는 청크: RAG 모드는 핵심 문장 추출, 그 외는 문단 단위 하드 컷)
+    shrunk = []
+
+    def _shrink(text: str, remaining_tokens: int) -> str:
+        target_chars = _chars_for_tokens(counter, text, remaining_tokens)
+        shrunk.append(text)
+        if mode == "rag" and rag_style_compact:
+            return _extract_core_sentences(text, target_chars)
+        return _hard_cut_paragraphwise(text, target_chars)
+
+    packed, packed_tokens = counter.pack(parts, context_max_tokens, shrink=_shrink)
+    current_text = "\n\n".join(packed)
 
     # 4. 최대 길이 제한 (하드 컷 - 문단 단위)
-    if current_len > effective_max_len:
-        current_text = _hard_cut_paragraphwise(current_text, effective_max_len)
-        current_len = len(current_text)
+    if len(current_text) > max_len:
+        current_text = _hard_cut_paragraphwise(current_text, max_len)
+        packed_tokens = counter.count(current_text)
+    current_len = len(current_text)
 
+    metrics["chunks_packed"] = len(packed)
     metrics["total_length"] = current_len
-    metrics["token_estimate"] = int(current_len * tokens_per_char)
+    metrics["packed_tokens"] = packed_tokens
+    metrics["token_estimate"] = packed_tokens
 
     # 트렁케이션 사유 결정
-    if metrics["compression_applied"]:
+    if shrunk and mode == "rag" and rag_style_compact:
+        metrics["compression_applied"] = True
         metrics["truncate_reason"] = "compact"
-    elif current_len >= effective_max_len:
+    elif shrunk or len(current_text) < len("\n\n".join(packed)):
         metrics["truncate_reason"] = "hardcut"
+    elif len(packed) < len(parts):
+        metrics["truncate_reason"] = "dropped"
     else:
         metrics["truncate_reason"] = "none"
 
@@ -123,17 +137,17 @@ def hydrate_context(chunks: List[Dict[str, Any]], max_len: int = 10000, mode: st
     # 5. 로깅 (단일 라인 요약 - 운영 모니터링)
     parts_info = []
     if metrics["chunks_used"] > 0:
-        parts_info.append(f"chunks:{metrics['chunks_used']}")
+        parts_info.append(f"chunks:{metrics['chunks_packed']}/{metrics['chunks_used']}")
     if metrics["pdf_tail_pages"] > 0:
         parts_info.append(f"pdf_tail:{metrics['pdf_tail_pages']}")
 
     logger.info(
-        f"CTX len={current_len}/{effective_max_len} "
-        f"tokens~={metrics['token_estimate']} "
+        f"CTX len={current_len} "
+        f"tokens={packed_tokens}/{context_max_tokens} "
         f"src=[{','.join(parts_info)}] "
         f"truncate={metrics['truncate_reason']} "
         f"mode={mode} "
-        f"coef={tokens_per_char:.2f} "
+        f"count={counter.method} "
         f"time={metrics['extraction_time']:.3f}s"
     )
 
@@ -148,6 +162,12 @@ def hydrate_context(chunks: List[Dict[str, Any]], max_len: int = 10000, mode: st
     return current_text, metrics
 
 
+def _chars_for_tokens(counter: TokenCounter, text: str, max_tokens: int) -> int:
+    """텍스트 자체의 실측 문자/토큰 비율로 max_tokens에 해당하는 문자 수 계산"""
+    n = counter.count(text)
+    return len(text) if n <= max_tokens else int(len(text) * max_tokens / n)
+
+
 def _hard_cut_paragraphwise(text: str, max_len: int) -> str:
     """
     문단 단위로 하드 컷 (의미 단위 보존)
@@ -22,7 +22,6 @@ from functools import lru_cache
 from pathlib import Path
 
 from app.core.logging import get_logger
-from utils.streaming import stream_text_smart
 
 
 # ===== 로깅 설정 =====
@@ -649,19 +648,83 @@ def _generate_ai_response(
         return response
 
     except Exception as e:
-        error_info = _handle_error(e)
+        return _render_error(e, message_placeholder)
 
-        # 사용자 친화적 에러 메시지 표시
-        message_placeholder.error(error_info["message"])
 
-        # 상세 정보는 expander로 제공
-        with message_placeholder.container():
-            with st.expander("🔍 오류 상세 정보", expanded=False):
-                st.caption(f"**오류 유형**: {error_info['error_type']}")
-                st.caption(f"**상세 설명**: {error_info['details']}")
-                st.info("💡 **해결 방법**: 위 설명을 참고하여 문제를 해결해주세요. 문제가 지속되면 관리자에게 문의하세요.")
+def _stream_ai_response(
+    query: str,
+    rag_instance: Any,
+    message_placeholder: Any,
+    selected_filename: Optional[str] = None
+) -> Optional[dict]:
+    """AI 응답 토큰 스트리밍 (answer_stream 지원 인스턴스)
+
+    생성 조각이 도착하는 즉시 placeholder에 누적 표시하고,
+    완료 이벤트의 최종 응답(answer()와 동일 구조)을 정규화하여 반환합니다.
+
+    Args:
+        query: 향상된 쿼리 문자열
+        rag_instance: answer_stream()을 제공하는 RAG 인스턴스
+        message_placeholder: Streamlit placeholder 객체
+        selected_filename: 선택된 문서 파일명 (우선 검색용, 선택사항)
+
+    Returns:
+        Optional[dict]: {"text": str, "evidence": [], "status": {}, "diagnostics": {}} 또는 None
+    """
+    try:
+        streamed_text = ""
+        result = None
+
+        for event in rag_instance.answer_stream(query, selected_filename=selected_filename):
+            if event.get("type") == "token":
+                streamed_text += event["text"]
+                message_placeholder.markdown(streamed_text + "▌")  # 커서 효과
+            elif event.get("type") == "done":
+                result = event.get("result")
+                stream_metrics = event.get("metrics", {})
+                logger.info(
+                    f"Stream done: ttft_ms={stream_metrics.get('ttft_ms')}, "
+                    f"total_ms={stream_metrics.get('total_ms')}"
+                )
+
+        response = _normalize_rag_response(result if result is not None else streamed_text)
+        if isinstance(result, dict):
+            response["status"] = result.get("status", {})
+            response["diagnostics"] = result.get("diagnostics", {})
+
+        if not response["text"].strip():
+            logger.warning("Empty response text received after streaming")
+            return None
 
-        return {"text": error_info["message"], "evidence": []}  # 에러 메시지 반환
+        return response
+
+    except Exception as e:
+        return _render_error(e, message_placeholder)
+
+
+def _render_error(error: Exception, message_placeholder: Any) -> dict:
+    """응답 생성 오류 표시 (사용자 메시지 + 상세 정보 expander)
+
+    Args:
+        error: 발생한 예외
+        message_placeholder: Streamlit placeholder 객체
+
+    Returns:
+        dict: {"text": 에러 메시지, "evidence": []}
+    """
+    error_info = _handle_error(error)
+
+    # 사용자 친화적 에러 메시지 표시
+    message_placeholder.error(error_info["message"])
+
+    # 상세 정보는 expander로 제공
+    with message_placeholder.container():
+        with st.expander("🔍 오류 상세 정보", expanded=False):
+            st.caption(f"**오류 유형**: {error_info['error_type']}")
+            st.caption(f"**상세 설명**: {error_info['details']}")
+            st.info("💡 **해결 방법**: 위 설명을 참고하여 문제를 해결해주세요. 문제가 지속되면 관리자에게 문의하세요.")
+
+    return {"text": error_info["message"], "evidence": []}  # 에러 메시지 반환
 
 
 def _add_message(role: str, content: str, evidence: Optional[List] = None) -> None:
@@ -768,7 +831,9 @@ def render_chat_interface(unified_rag_instance: RAGProtocol) -> None:
 
             # AI 응답 생성
             with st.spinner(ChatConfig.SPINNER_TEXT):
-                response = _generate_ai_response(
+                # 스트리밍 지원 인스턴스: 생성 토큰을 도착 즉시 표시 (ChatGPT 스타일)
+                generate = _stream_ai_response if hasattr(unified_rag_instance, "answer_stream") else _generate_ai_response
+                response = generate(
                     enhanced_query,
                     unified_rag_instance,
                     message_placeholder,
@@ -777,24 +842,14 @@ def render_chat_interface(unified_rag_instance: RAGProtocol) -> None:
 
                 # 응답이 있으면 표시 및 저장
                 if response:
-                    # 답변 텍스트를 점진적으로 표시 (ChatGPT 스타일)
-                    # 캐시에서 가져온 경우 빠르게, 새로 생성한 경우 천천히
                     from_cache = response.get("status", {}).get("from_cache")
 
                     # 캐시 피드백 배지 표시
                     if from_cache:
                         st.caption("⚡ **Cached** - 이전 응답을 빠르게 불러왔습니다")
 
-                    if from_cache:
-                        # 캐시된 응답은 즉시 표시 (스트리밍 효과 없음)
-                        message_placeholder.markdown(response["text"])
-                    else:
-                        # 새로 생성된 응답은 점진적으로 표시
-                        streaming_speed = os.getenv("STREAMING_SPEED", "medium")  # slow, medium, fast
-                        for partial_text in stream_text_smart(response["text"], speed=streaming_speed):
-                            message_placeholder.markdown(partial_text + "▌")  # 커서 효과
-                        # 최종 텍스트 (커서 제거)
-                        message_placeholder.markdown(response["text"])
+                    # 최종 텍스트 (커서 제거, 출처 등 후처리 반영)
+                    message_placeholder.markdown(response["text"])
 
                     # Evidence 표시 (session_state 관리로 미리보기 클릭 시에도 유지됨)
                     if response.get("evidence"):
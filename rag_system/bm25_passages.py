@@ -0,0 +1,56 @@
+"""
+BM25 패시지 분할 (청크 단위 색인)
+
+문서를 겹치는 문자 윈도로 나누어 패시지마다 BM25 항목을 만듭니다.
+페이지 구분자(\\f)가 있으면 페이지 경계를 넘지 않도록 먼저 페이지로 나눈 뒤
+각 페이지를 윈도로 분할합니다. 윈도 끝은 가능하면 공백 위치로 당겨 단어가 잘리지 않게 합니다.
+"""
+
+from typing import List, Tuple
+
+PAGE_BREAK = "\f"
+AGGREGATIONS = ("max", "sum")  # 패시지 스코어 → 문서 스코어 집계 방식
+
+
+def _windows(text: str, base: int, size: int, overlap: int) -> List[Tuple[int, str]]:
+    """(시작 오프셋, 패시지) 목록"""
+    passages = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            # 윈도 뒤쪽 20% 안의 마지막 공백에서 자르기
+            cut = text.rfind(" ", start + size * 4 // 5, end)
+            if cut > start:
+                end = cut
+        passage = text[start:end]
+        if passage.strip():
+            passages.append((base + start, passage))
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return passages
+
+
+def split_passages(text: str, size: int, overlap: int = 0) -> List[Tuple[int, str]]:
+    """문서를 겹치는 패시지로 분할
+
+    Args:
+        text: 문서 원문
+        size: 패시지 최대 글자 수 (0 이하면 분할하지 않음)
+        overlap: 인접 패시지 겹침 글자 수
+
+    Returns:
+        (원문 내 시작 오프셋, 패시지) 목록 (빈 문서도 최소 1개)
+    """
+    if size <= 0 or len(text) <= size:
+        return [(0, text)]
+
+    overlap = max(0, min(overlap, size // 2))
+    passages = []
+    offset = 0
+    for page in text.split(PAGE_BREAK):
+        passages.extend(_windows(page, offset, size, overlap))
+        offset += len(page) + len(PAGE_BREAK)
+    return passages or [(0, text)]
@@ -0,0 +1,295 @@
+"""
+BM25 컬럼형 세그먼트 포맷 (pickle 미사용, mmap 기반)
+
+파일 하나(.seg)에 아래 섹션을 8바이트 정렬로 저장합니다.
+- vocab_blob / vocab_offsets: UTF-8 바이트 순 정렬 어휘 + 오프셋 (이진 탐색)
+- doc_freqs / idf: 용어별 DF, 사전 계산된 IDF
+- posting_offsets / posting_docs / posting_tfs: 용어별 포스팅 (문서 idx 오름차순)
+- doc_lens / len_norms: 문서 길이, 사전 계산된 길이 정규화 항
+- text_offsets / text_blob: 문서 원문 (UTF-8)
+- meta_offsets / meta_blob: 문서 메타데이터 (JSON)
+
+mmap으로 열기 때문에 여러 uvicorn/streamlit 프로세스가 OS 페이지 캐시를 공유하고,
+로드 시점에는 헤더만 읽으며 원문은 스니펫으로 반환되는 문서만 접근합니다.
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+MAGIC = b"BM25SEG\x01"
+FORMAT_VERSION = 1
+SEGMENT_SUFFIX = ".seg"
+_ALIGN = 8
+
+# (섹션명, array typecode)
+_SECTIONS = (
+    ("vocab_offsets", "q"),
+    ("vocab_blob", "B"),
+    ("doc_freqs", "i"),
+    ("idf", "d"),
+    ("posting_offsets", "q"),
+    ("posting_docs", "i"),
+    ("posting_tfs", "i"),
+    ("doc_lens", "i"),
+    ("len_norms", "d"),
+    ("text_offsets", "q"),
+    ("text_blob", "B"),
+    ("meta_offsets", "q"),
+    ("meta_blob", "B"),
+)
+
+
+def is_segment_path(path: Path) -> bool:
+    """세그먼트 포맷 경로 여부 (확장자 기준)"""
+    return Path(path).suffix == SEGMENT_SUFFIX
+
+
+def _pad(f, pos: int) -> int:
+    """8바이트 정렬 패딩"""
+    remainder = pos % _ALIGN
+    if remainder:
+        f.write(b"\0" * (_ALIGN - remainder))
+        pos += _ALIGN - remainder
+    return pos
+
+
+def write_segment(store, path: Path) -> None:
+    """BM25Store 내용을 세그먼트 파일로 저장 (임시 파일 작성 후 원자적 교체)
+
+    기존 파일을 mmap 중인 프로세스는 교체 전 inode를 계속 사용하므로 안전합니다.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f".tmp{os.getpid()}")
+
+    # UTF-8 바이트 순 정렬 (조회 시 바이트 비교 이진 탐색)
+    terms = sorted(store.postings.keys(), key=lambda t: t.encode("utf-8"))
+
+    vocab_offsets = array("q", [0])
+    vocab_blob = bytearray()
+    doc_freqs = array("i")
+    idf = array("d")
+    posting_offsets = array("q", [0])
+    posting_docs = array("i")
+    posting_tfs = array("i")
+    for term in terms:
+        vocab_blob += term.encode("utf-8")
+        vocab_offsets.append(len(vocab_blob))
+        doc_ids, tfs = store.postings[term]
+        doc_freqs.append(store.doc_freqs.get(term, len(doc_ids)))
+        idf.append(store.idf.get(term, 0.0))
+        posting_docs.extend(doc_ids)
+        posting_tfs.extend(tfs)
+        posting_offsets.append(len(posting_docs))
+
+    text_offsets = array("q", [0])
+    text_blob = bytearray()
+    for text in store.documents:
+        text_blob += (text or "").encode("utf-8")
+        text_offsets.append(len(text_blob))
+
+    meta_offsets = array("q", [0])
+    meta_blob = bytearray()
+    for meta in store.metadata:
+        meta_blob += json.dumps(meta or {}, ensure_ascii=False, default=str).encode("utf-8")
+        meta_offsets.append(len(meta_blob))
+
+    payloads = {
+        "vocab_offsets": vocab_offsets,
+        "vocab_blob": vocab_blob,
+        "doc_freqs": doc_freqs,
+        "idf": idf,
+        "posting_offsets": posting_offsets,
+        "posting_docs": posting_docs,
+        "posting_tfs": posting_tfs,
+        "doc_lens": array("i", store.doc_lens),
+        "len_norms": array("d", store.len_norms),
+        "text_offsets": text_offsets,
+        "text_blob": text_blob,
+        "meta_offsets": meta_offsets,
+        "meta_blob": meta_blob,
+    }
+
+    # 섹션 오프셋 (헤더 뒤 데이터 영역 시작 기준 상대 오프셋)
+    sections = {}
+    rel = 0
+    for name, typecode in _SECTIONS:
+        nbytes = len(payloads[name]) * array(typecode).itemsize
+        sections[name] = [rel, nbytes, typecode]
+        rel += nbytes + (-nbytes % _ALIGN)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "k1": store.k1,
+        "b": store.b,
+        "avg_doc_len": store.avg_doc_len,
+        "n_docs": len(store.documents),
+        "n_terms": len(terms),
+        "passage_chars": getattr(store, "passage_chars", 0),
+        "passage_overlap": getattr(store, "passage_overlap", 0),
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header_bytes).to_bytes(8, "little"))
+            f.write(header_bytes)
+            data_start = _pad(f, len(MAGIC) + 8 + len(header_bytes))
+            for name, _ in _SECTIONS:
+                data = payloads[name]
+                f.write(data.tobytes() if isinstance(data, array) else bytes(data))
+                _pad(f, data_start + sections[name][0] + sections[name][1])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class _TermMapping(Mapping):
+    """용어 → 값 읽기 전용 매핑 (mmap 배열 기반)"""
+
+    def __init__(self, segment: "BM25Segment", getter):
+        self._segment = segment
+        self._getter = getter
+
+    def __getitem__(self, token: str):
+        term_id = self._segment.term_id(token)
+        if term_id is None:
+            raise KeyError(token)
+        return self._getter(term_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._segment.iter_terms()
+
+    def __len__(self) -> int:
+        return self._segment.n_terms
+
+
+class _DocSequence(Sequence):
+    """문서 idx → 값 읽기 전용 시퀀스 (접근 시 디코딩)"""
+
+    def __init__(self, segment: "BM25Segment", getter):
+        self._segment = segment
+        self._getter = getter
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._getter(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return self._getter(idx)
+
+    def __len__(self) -> int:
+        return self._segment.n_docs
+
+
+class BM25Segment:
+    """mmap으로 연 BM25 세그먼트 (읽기 전용)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buf = memoryview(self._mmap)
+        if bytes(buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"BM25 세그먼트 포맷이 아닙니다: {self.path}")
+        header_len = int.from_bytes(buf[len(MAGIC):len(MAGIC) + 8], "little")
+        header_start = len(MAGIC) + 8
+        self.header: Dict[str, Any] = json.loads(bytes(buf[header_start:header_start + header_len]))
+        data_start = header_start + header_len
+        data_start += -data_start % _ALIGN
+
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 세그먼트 버전: {self.header.get('version')}")
+        if self.header.get("byteorder") != sys.byteorder:
+            raise ValueError("세그먼트 바이트 순서가 현재 플랫폼과 다릅니다 (재색인 필요)")
+
+        self.k1: float = self.header["k1"]
+        self.b: float = self.header["b"]
+        self.avg_doc_len: float = self.header["avg_doc_len"]
+        self.n_docs: int = self.header["n_docs"]
+        self.n_terms: int = self.header["n_terms"]
+
+        for name, (offset, nbytes, typecode) in self.header["sections"].items():
+            view = buf[data_start + offset:data_start + offset + nbytes]
+            setattr(self, name, view if typecode == "B" else view.cast(typecode))
+
+    # ---- 어휘 ----------------------------------------------------------------
+
+    def _term_bytes(self, term_id: int) -> bytes:
+        return bytes(self.vocab_blob[self.vocab_offsets[term_id]:self.vocab_offsets[term_id + 1]])
+
+    def term_id(self, token: str) -> Optional[int]:
+        """용어 id 이진 탐색 (없으면 None)"""
+        target = token.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and self._term_bytes(lo) == target:
+            return lo
+        return None
+
+    def iter_terms(self) -> Iterator[str]:
+        for term_id in range(self.n_terms):
+            yield self._term_bytes(term_id).decode("utf-8")
+
+    def posting(self, term_id: int) -> Tuple[memoryview, memoryview]:
+        start = self.posting_offsets[term_id]
+        end = self.posting_offsets[term_id + 1]
+        return self.posting_docs[start:end], self.posting_tfs[start:end]
+
+    # ---- 문서 ----------------------------------------------------------------
+
+    def get_text(self, doc_idx: int, max_chars: int = 0) -> str:
+        """문서 원문 (max_chars > 0이면 앞부분만 디코딩)"""
+        start = self.text_offsets[doc_idx]
+        end = self.text_offsets[doc_idx + 1]
+        if max_chars > 0:
+            # UTF-8 한 글자는 최대 4바이트
+            end = min(end, start + max_chars * 4)
+            return bytes(self.text_blob[start:end]).decode("utf-8", errors="ignore")[:max_chars]
+        return bytes(self.text_blob[start:end]).decode("utf-8")
+
+    def get_metadata(self, doc_idx: int) -> Dict[str, Any]:
+        start = self.meta_offsets[doc_idx]
+        end = self.meta_offsets[doc_idx + 1]
+        return json.loads(bytes(self.meta_blob[start:end]))
+
+    # ---- BM25Store 호환 뷰 ---------------------------------------------------
+
+    def postings_view(self) -> Mapping:
+        return _TermMapping(self, self.posting)
+
+    def doc_freqs_view(self) -> Mapping:
+        return _TermMapping(self, lambda term_id: self.doc_freqs[term_id])
+
+    def idf_view(self) -> Mapping:
+        return _TermMapping(self, lambda term_id: self.idf[term_id])
+
+    def documents_view(self) -> Sequence:
+        return _DocSequence(self, self.get_text)
+
+    def metadata_view(self) -> Sequence:
+        return _DocSequence(self, self.get_metadata)
+
+    def memory_footprint(self) -> int:
+        """매핑 크기 (바이트, 실제 상주 페이지는 접근한 부분만)"""
+        return len(self._mmap)
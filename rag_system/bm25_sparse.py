@@ -0,0 +1,157 @@
+"""
+BM25 희소 행렬(Sparse) 스코어러
+NumPy/SciPy 기반 벡터화 BM25 (BM25_SCORER=sparse)
+
+문서 × 용어 CSC 행렬에 k1/b가 반영된 BM25 가중치를 미리 계산해 두고,
+질의 스코어링은 질의 용어 열(column)만 선택해 행 합산한 뒤 argpartition으로 top-k를 고릅니다.
+순수 파이썬 스코어러(역색인)와 부동소수 오차 범위 내에서 동일한 스코어를 반환합니다.
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+    SPARSE_AVAILABLE = True
+except ImportError:
+    np = None
+    sparse = None
+    SPARSE_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from rag_system.bm25_store import BM25Store
+
+
+class SparseBM25Scorer:
+    """CSC 가중치 행렬 기반 BM25 스코어러"""
+
+    def __init__(self, store: "BM25Store"):
+        if not SPARSE_AVAILABLE:
+            raise ImportError("numpy/scipy가 설치되지 않아 sparse BM25 스코어러를 사용할 수 없습니다")
+
+        self.k1 = store.k1
+        self.b = store.b
+        self.term_ids: Dict[str, int] = {}
+        self.matrix = self._build_matrix(store)
+        # 삭제(tombstone) 문서는 행렬에 남아 있으므로 스코어에서 제외
+        self.deleted = np.fromiter(sorted(store.deleted), dtype=np.int64, count=len(store.deleted))
+
+    def _build_matrix(self, store: "BM25Store"):
+        """포스팅 리스트로부터 (문서 수 × 용어 수) CSC 가중치 행렬 구축
+
+        CSC의 열 = 용어, 열 내부 행 인덱스 = 포스팅의 문서 idx (오름차순) 이므로
+        포스팅 배열을 그대로 이어 붙여 indices/data를 만듭니다.
+        """
+        n_docs = len(store.documents)
+        len_norms = np.asarray(store.len_norms, dtype=np.float64)
+
+        indptr = [0]
+        indices_parts = []
+        data_parts = []
+        for token, (doc_ids, tfs) in store.postings.items():
+            idf = store.idf.get(token)
+            if idf is None or not doc_ids:
+                continue
+            self.term_ids[token] = len(self.term_ids)
+
+            doc_arr = np.frombuffer(doc_ids, dtype=np.int32)
+            tf_arr = np.frombuffer(tfs, dtype=np.int32).astype(np.float64)
+            weights = idf * ((tf_arr * (self.k1 + 1)) / (tf_arr + len_norms[doc_arr]))
+
+            indices_parts.append(doc_arr)
+            data_parts.append(weights)
+            indptr.append(indptr[-1] + len(doc_arr))
+
+        if indices_parts:
+            indices = np.concatenate(indices_parts)
+            data = np.concatenate(data_parts)
+        else:
+            indices = np.zeros(0, dtype=np.int32)
+            data = np.zeros(0, dtype=np.float64)
+
+        return sparse.csc_matrix(
+            (data, indices, np.asarray(indptr, dtype=np.int64)),
+            shape=(n_docs, len(self.term_ids)),
+        )
+
+    def score(self, query_tokens: List[str]):
+        """질의 토큰 열을 선택해 행 합산 (중복 토큰은 중복 가산)
+
+        Returns:
+            문서별 스코어 벡터 (np.ndarray) 또는 매칭 용어가 없으면 None
+        """
+        cols = [self.term_ids[token] for token in query_tokens if token in self.term_ids]
+        if not cols:
+            return None
+        scores = np.asarray(self.matrix[:, cols].sum(axis=1)).ravel()
+        if self.deleted.size:
+            scores[self.deleted] = 0.0
+        return scores
+
+    def score_batch(self, token_lists: List[List[str]]):
+        """여러 질의를 (용어 × 질의) 횟수 행렬과의 곱 한 번으로 스코어링
+
+        Returns:
+            (문서 수 × 질의 수) 스코어 행렬 (np.ndarray, 매칭 용어가 없는 질의는 0 열)
+        """
+        rows, cols = [], []
+        for q, tokens in enumerate(token_lists):
+            for token in tokens:
+                term_id = self.term_ids.get(token)
+                if term_id is not None:
+                    rows.append(term_id)
+                    cols.append(q)
+        # 중복 (용어, 질의) 항목은 합산되어 중복 토큰 가산과 동일
+        query_matrix = sparse.csc_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.term_ids), len(token_lists)),
+        )
+        scores = np.asarray((self.matrix @ query_matrix).toarray())
+        if self.deleted.size:
+            scores[self.deleted] = 0.0
+        return scores
+
+    @staticmethod
+    def nonzero(scores) -> Dict[int, float]:
+        """스코어 벡터의 0이 아닌 문서 {문서 idx: 스코어}"""
+        if scores is None:
+            return {}
+        doc_idxs = np.flatnonzero(scores)
+        return dict(zip(doc_idxs.tolist(), scores[doc_idxs].tolist()))
+
+    def matched(self, query_tokens: List[str]) -> Dict[int, float]:
+        """질의 용어를 포함한 문서의 스코어 (패시지 집계용)"""
+        return self.nonzero(self.score(query_tokens))
+
+    def top_k(self, query_tokens: List[str], top_k: int) -> List[Tuple[float, int]]:
+        """양수 스코어 상위 K개 (스코어 내림차순, 동점은 문서 idx 오름차순)"""
+        return self.rank(self.score(query_tokens), top_k)
+
+    @staticmethod
+    def rank(scores, top_k: int) -> List[Tuple[float, int]]:
+        """스코어 벡터에서 양수 스코어 상위 K개"""
+        if scores is None or top_k <= 0:
+            return []
+
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.size == 0:
+            return []
+
+        if candidates.size > top_k:
+            cand_scores = scores[candidates]
+            # top_k 경계 동점을 놓치지 않도록 경계값 이상인 후보를 모두 남긴 뒤 정렬
+            part = np.argpartition(-cand_scores, top_k - 1)
+            kth = cand_scores[part[top_k - 1]]
+            candidates = candidates[cand_scores >= kth]
+
+        order = np.lexsort((candidates, -scores[candidates]))[:top_k]
+        return [(float(scores[candidates[i]]), int(candidates[i])) for i in order]
+
+    def get_stats(self) -> Dict[str, int]:
+        """행렬 통계"""
+        return {
+            "n_docs": int(self.matrix.shape[0]),
+            "n_terms": int(self.matrix.shape[1]),
+            "nnz": int(self.matrix.nnz),
+            "memory_bytes": int(self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes),
+        }
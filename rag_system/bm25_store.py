@@ -9,25 +9,116 @@ import json
 import pickle
 import re
 import time
-from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import heapq
+import multiprocessing
+import threading
+from array import array
+from typing import Iterable, List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
-from collections import defaultdict
-from functools import lru_cache
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import math
 
+from rag_system.bm25_passages import AGGREGATIONS, split_passages
+from rag_system.bm25_segment import BM25Segment, is_segment_path, write_segment
+from rag_system.bm25_sparse import SPARSE_AVAILABLE, SparseBM25Scorer
+
 # kiwipiepy 토크나이저 (한국어 특화)
 # AVX-VNNI 문제로 인해 비활성화
 KIWIPIEPY_AVAILABLE = False
 print("⚠️  kiwipiepy disabled due to AVX-VNNI issue, using basic tokenization")
 
+class QueryTokenCache:
+    """질의 토큰 캐시 (LRU, 항목 수·바이트 상한, thread-safe)
+
+    짧은 질의 문자열만 캐시합니다. max_text_chars보다 긴 텍스트는 캐시하지 않고
+    bypass로 집계하여 문서 본문이 자주 쓰이는 질의를 밀어내지 않도록 합니다.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, max_text_chars: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_text_chars = max_text_chars
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[Tuple[str, ...], int]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypass": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def _entry_bytes(text: str, tokens: Tuple[str, ...]) -> int:
+        """항목 크기 추정 (UTF-8 바이트 기준)"""
+        return len(text.encode("utf-8")) + sum(len(t.encode("utf-8")) for t in tokens)
+
+    def cacheable(self, text: str) -> bool:
+        return len(text) <= self.max_text_chars
+
+    def get(self, text: str) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            entry = self._cache.get(text)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._cache.move_to_end(text)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def put(self, text: str, tokens: Tuple[str, ...]) -> None:
+        size = self._entry_bytes(text, tokens)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._cache.pop(text, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._cache[text] = (tokens, size)
+            self._bytes += size
+            while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.stats["bypass"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.stats["hits"] / lookups * 100 if lookups else 0.0,
+            }
+
+
 class KoreanTokenizer:
-    """한국어 토크나이저"""
+    """한국어 토크나이저
+
+    - tokenize_query: 검색 질의용 (QueryTokenCache 사용)
+    - tokenize / tokenize_many: 색인용 (캐시 미사용)
+    """
     
     # 토크나이저 상수
     MIN_TOKEN_LENGTH = 1
     VALID_POS_TAGS = ['N', 'V', 'A', 'M']  # 명사, 동사, 형용사, 수식언
     TOKEN_PATTERN = r'[^\w\s가-힣]'  # 한글, 영문, 숫자 외 제거
-    CACHE_SIZE = 2048  # 토큰 캐시 크기
+    CACHE_SIZE = 2048  # 질의 토큰 캐시 최대 항목 수
+    CACHE_MAX_BYTES = 4 * 1024 * 1024  # 질의 토큰 캐시 최대 크기 (UTF-8 추정)
+    CACHE_MAX_TEXT_CHARS = 512  # 이보다 긴 텍스트는 질의로 보지 않고 캐시 생략
 
     def __init__(self):
         self.logger = get_logger(__name__)
@@ -35,9 +126,11 @@ class KoreanTokenizer:
         # 패턴 컴파일
         self._compiled_token_pattern = re.compile(self.TOKEN_PATTERN)
 
+        # 질의 토큰 캐시 (인스턴스별)
+        self.query_cache = QueryTokenCache(self.CACHE_SIZE, self.CACHE_MAX_BYTES, self.CACHE_MAX_TEXT_CHARS)
+
         # 성능 통계
         self.tokenize_count = 0
-        self.cache_hits = 0
 
         if KIWIPIEPY_AVAILABLE:
             try:
@@ -50,13 +143,26 @@ class KoreanTokenizer:
                 self.use_kiwi = False
         else:
             self.use_kiwi = False
-    
-    @lru_cache(maxsize=CACHE_SIZE)
+
+    def tokenize_query(self, text: str) -> List[str]:
+        """검색 질의 토큰화 (캐시됨)"""
+        if not text or not self.query_cache.cacheable(text):
+            self.query_cache.record_bypass()
+            return self.tokenize(text)
+
+        tokens = self.query_cache.get(text)
+        if tokens is None:
+            tokens = tuple(self.tokenize(text))
+            self.query_cache.put(text, tokens)
+        return list(tokens)
+
+    def tokenize_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """문서 일괄 토큰화 (색인용, 캐시 미사용)"""
+        return [self.tokenize(text) for text in texts]
+
     def tokenize(self, text: str) -> List[str]:
-        """텍스트를 토큰으로 분할 (캐시됨)"""
+        """텍스트를 토큰으로 분할 (캐시 미사용)"""
         self.tokenize_count += 1
-        if text in self.tokenize.__wrapped__.__dict__.get('cache', {}):
-            self.cache_hits += 1
 
         if not text or not text.strip():
             return []
@@ -83,6 +189,41 @@ class KoreanTokenizer:
             text = self._compiled_token_pattern.sub(' ', text)
             return [t.lower() for t in text.split() if len(t) > self.MIN_TOKEN_LENGTH]
 
+def _term_freq(tokens: List[str]) -> Dict[str, int]:
+    """문서 용어 빈도 (토큰 등장 순서 유지)"""
+    term_freq: Dict[str, int] = {}
+    for token in tokens:
+        term_freq[token] = term_freq.get(token, 0) + 1
+    return term_freq
+
+
+# 병렬 색인 워커 프로세스별 토크나이저 (initializer에서 생성)
+_WORKER_TOKENIZER: Optional[KoreanTokenizer] = None
+
+
+def _init_index_worker():
+    global _WORKER_TOKENIZER
+    _WORKER_TOKENIZER = KoreanTokenizer()
+
+
+def _index_shard(texts: List[str]) -> Tuple[List[Dict[str, int]], List[int], Dict[str, int]]:
+    """샤드 토큰화 + 부분 통계 계산 (워커 프로세스에서 실행)
+
+    Returns:
+        (문서별 용어 빈도, 문서 길이, 샤드 DF)
+    """
+    term_freqs = []
+    doc_lens = []
+    doc_freqs: Dict[str, int] = {}
+    for tokens in _WORKER_TOKENIZER.tokenize_many(texts):
+        term_freq = _term_freq(tokens)
+        term_freqs.append(term_freq)
+        doc_lens.append(len(tokens))
+        for token in term_freq:
+            doc_freqs[token] = doc_freqs.get(token, 0) + 1
+    return term_freqs, doc_lens, doc_freqs
+
+
 class BM25Store:
     """BM25 키워드 검색 구현"""
     
@@ -90,15 +231,40 @@ class BM25Store:
     DEFAULT_K1 = 1.2  # 용어 빈도 포화 매개변수
     DEFAULT_B = 0.75  # 문서 길이 정규화 매개변수
     DEFAULT_INDEX_PATH = "rag_system/db/bm25_index.pkl"
+    SCORERS = ('python', 'sparse')  # python: 역색인 순회 | sparse: NumPy/SciPy CSC 행렬
+    COMPACT_MIN_DELETED = 64  # 병합(compaction) 최소 삭제 문서 수
+    COMPACT_DELETED_RATIO = 0.2  # 삭제 문서 비율이 이 값을 넘으면 병합
+    PARALLEL_MIN_DOCS = 200  # 병렬 색인 최소 문서 수 (이하면 프로세스 기동 비용이 더 큼)
     
-    def __init__(self, index_path: str = None, k1: float = None, b: float = None):
+    def __init__(self, index_path: str = None, k1: float = None, b: float = None, scorer: str = None,
+                 passage_chars: int = None, passage_overlap: int = None, passage_agg: str = None):
         self.index_path = Path(index_path) if index_path else Path(self.DEFAULT_INDEX_PATH)
         self.k1 = k1 if k1 is not None else self.DEFAULT_K1
         self.b = b if b is not None else self.DEFAULT_B
+
+        # 패시지(청크) 단위 색인 (0이면 문서 단위, 기존 인덱스를 로드하면 인덱스에 저장된 값 사용)
+        self._passage_config = (
+            passage_chars if passage_chars is not None else int(os.getenv("BM25_PASSAGE_CHARS", "0")),
+            passage_overlap if passage_overlap is not None else int(os.getenv("BM25_PASSAGE_OVERLAP", "200")),
+        )
+        self.passage_chars, self.passage_overlap = self._passage_config
+        self.passage_agg = (passage_agg or os.getenv("BM25_PASSAGE_AGG", "max")).strip().lower()
+        if self.passage_agg not in AGGREGATIONS:
+            self.passage_agg = 'max'
         
         self.logger = get_logger(__name__)
         self.tokenizer = KoreanTokenizer()
 
+        # 스코어러 선택 (BM25_SCORER 환경변수)
+        self.scorer = (scorer or os.getenv("BM25_SCORER", "python")).strip().lower()
+        if self.scorer not in self.SCORERS:
+            self.logger.warning(f"알 수 없는 BM25_SCORER={self.scorer}, python 스코어러 사용")
+            self.scorer = 'python'
+        elif self.scorer == 'sparse' and not SPARSE_AVAILABLE:
+            self.logger.warning("numpy/scipy 미설치, python 스코어러로 폴백")
+            self.scorer = 'python'
+        self._sparse_scorer: Optional[SparseBM25Scorer] = None  # 지연 생성 (인덱스 변경 시 무효화)
+
         # BM25 인덱스
         self.documents = []  # 원본 문서들
         self.metadata = []   # 문서 메타데이터
@@ -108,6 +274,19 @@ class BM25Store:
         self.avg_doc_len = 0.0  # 평균 문서 길이
         self.vocab = set()   # 전체 어휘
 
+        # 역색인 (검색 시 질의 용어를 포함한 문서만 스코어링)
+        self.postings: Dict[str, Tuple[array, array]] = {}  # 용어 → (문서 idx 배열, tf 배열)
+        self.idf: Dict[str, float] = {}  # 용어별 IDF (문서 수 변경 시 재계산)
+        self.len_norms: List[float] = []  # 문서별 길이 정규화 항 k1 * (1 - b + b * dl / avgdl)
+
+        # 증분 갱신 (삭제 문서는 tombstone 처리 후 병합 시 제거)
+        self.deleted: Set[int] = set()  # 삭제된 문서 idx
+        self._doc_index: Optional[Dict[str, List[int]]] = None  # doc_id → 문서 idx 목록 (지연 생성)
+        self._parent_keys: Optional[List[Optional[str]]] = None  # 문서 idx → doc_id (패시지 집계용, 지연 생성)
+
+        # 세그먼트 포맷(.seg)으로 로드한 경우 mmap 뷰 (읽기 전용, 문서 추가 시 메모리로 전환)
+        self._segment: Optional[BM25Segment] = None
+
         # 성능 통계
         self.search_count = 0
         self.total_search_time = 0.0
@@ -136,12 +315,28 @@ class BM25Store:
         self.doc_lens = []
         self.avg_doc_len = 0.0
         self.vocab = set()
+        self.postings = {}
+        self.idf = {}
+        self.len_norms = []
+        self.deleted = set()
+        self._doc_index = self._parent_keys = None
+        self._segment = None
+        self.passage_chars, self.passage_overlap = self._passage_config
         self.logger.info("새 BM25 인덱스 생성")
     
     def save_index(self):
-        """인덱스 저장"""
+        """인덱스 저장 (.seg 경로면 mmap 세그먼트 포맷, 그 외 pickle)"""
         try:
             self.index_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # tombstone은 저장하지 않음 (저장 전 병합)
+            if self.deleted:
+                self.compact()
+
+            if is_segment_path(self.index_path):
+                write_segment(self, self.index_path)
+                self.logger.info(f"BM25 세그먼트 저장 완료: {self.index_path}")
+                return
             
             index_data = {
                 'documents': self.documents,
@@ -152,11 +347,22 @@ class BM25Store:
                 'avg_doc_len': self.avg_doc_len,
                 'vocab': list(self.vocab),
                 'k1': self.k1,
-                'b': self.b
+                'b': self.b,
+                'passage_chars': self.passage_chars,
+                'passage_overlap': self.passage_overlap,
             }
             
-            with open(self.index_path, 'wb') as f:
-                pickle.dump(index_data, f)
+            # 임시 파일 작성 후 원자적 교체 (재로드 중인 검색기가 쓰다 만 피클을 읽지 않도록)
+            tmp_path = self.index_path.with_name(self.index_path.name + f".tmp{os.getpid()}")
+            try:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(index_data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.index_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
             
             self.logger.info(f"BM25 인덱스 저장 완료: {self.index_path}")
             
@@ -167,6 +373,10 @@ class BM25Store:
     def load_index(self):
         """저장된 인덱스 로드"""
         try:
+            if is_segment_path(self.index_path):
+                self._load_segment()
+                return
+
             with open(self.index_path, 'rb') as f:
                 index_data = pickle.load(f)
 
@@ -179,6 +389,8 @@ class BM25Store:
             self.vocab = set(index_data['vocab'])
             self.k1 = index_data.get('k1', 1.2)
             self.b = index_data.get('b', 0.75)
+            self.passage_chars = index_data.get('passage_chars', 0)
+            self.passage_overlap = index_data.get('passage_overlap', 0)
 
             # 메타데이터 길이 보정 (IndexError 방지)
             N = len(self.documents)
@@ -189,53 +401,125 @@ class BM25Store:
                 self.metadata = self.metadata[:N]
                 self.logger.warning(f"메타데이터 초과분 절단: {len(self.metadata) - N}개")
 
+            # 역색인 구축 (pickle 포맷은 그대로 유지, 포스팅은 term_freqs에서 재생성)
+            self.deleted = set()
+            self._doc_index = self._parent_keys = None
+            self._build_postings()
+            self._refresh_scoring_stats()
+
         except Exception as e:
             self.logger.error(f"BM25 인덱스 로드 실패: {e}")
             raise
-    
-    def add_documents(self, texts: List[str], metadatas: List[Dict[str, Any]], batch_size: int = 100) -> None:
-        """문서들을 인덱스에 추가 (배치 처리 최적화)"""
-        if len(texts) != len(metadatas):
-            raise ValueError("텍스트와 메타데이터 개수가 일치하지 않습니다")
 
-        start_time = time.time()
-        total_docs = len(texts)
+    def _load_segment(self):
+        """세그먼트 파일을 mmap으로 열고 인덱스 속성을 읽기 전용 뷰로 연결"""
+        segment = BM25Segment(self.index_path)
 
-        try:
-            # 배치 처리 (메모리 효율성)
-            for batch_start in range(0, total_docs, batch_size):
-                batch_end = min(batch_start + batch_size, total_docs)
-                batch_texts = texts[batch_start:batch_end]
-                batch_metadatas = metadatas[batch_start:batch_end]
+        self._segment = segment
+        self.documents = segment.documents_view()
+        self.metadata = segment.metadata_view()
+        self.term_freqs = []  # 세그먼트는 포스팅만 보관 (문서별 tf는 포스팅에서 복원)
+        self.doc_freqs = segment.doc_freqs_view()
+        self.doc_lens = segment.doc_lens
+        self.avg_doc_len = segment.avg_doc_len
+        self.vocab = self.doc_freqs.keys()
+        self.k1 = segment.k1
+        self.b = segment.b
+        self.passage_chars = segment.header.get("passage_chars", 0)
+        self.passage_overlap = segment.header.get("passage_overlap", 0)
 
-                for text, metadata in zip(batch_texts, batch_metadatas):
-                    # 토큰화
-                    tokens = self.tokenizer.tokenize(text)
+        # 저장 시점에 계산된 IDF/길이 정규화를 그대로 사용 (재계산 없음)
+        self.postings = segment.postings_view()
+        self.idf = segment.idf_view()
+        self.len_norms = segment.len_norms
+        self.deleted = set()
+        self._doc_index = self._parent_keys = None
+        self._sparse_scorer = None
 
-                    # 문서 추가
-                    self.documents.append(text)
-                    self.metadata.append(metadata)
+    def _materialize_segment(self):
+        """세그먼트 뷰를 메모리 인덱스로 전환 (문서 추가 등 변경 전 호출)"""
+        if self._segment is None:
+            return
 
-                    # 용어 빈도 계산
-                    term_freq = defaultdict(int)
-                    for token in tokens:
-                        term_freq[token] += 1
-                        self.vocab.add(token)
+        documents = list(self.documents)
+        metadata = list(self.metadata)
+        term_freqs = [{} for _ in range(len(documents))]
+        postings = {}
+        for token, (doc_ids, tfs) in self.postings.items():
+            postings[token] = (array('i', doc_ids), array('i', tfs))
+            for doc_idx, tf in zip(doc_ids, tfs):
+                term_freqs[doc_idx][token] = tf
 
-                    self.term_freqs.append(dict(term_freq))
-                    self.doc_lens.append(len(tokens))
+        self.documents = documents
+        self.metadata = metadata
+        self.term_freqs = term_freqs
+        self.doc_freqs = defaultdict(int, self.doc_freqs.items())
+        self.doc_lens = list(self.doc_lens)
+        self.vocab = set(postings)
+        self.postings = postings
+        self._segment = None
+        self._refresh_scoring_stats()
+        self.logger.info(f"BM25 세그먼트 → 메모리 인덱스 전환 ({len(documents)}개 문서)")
 
-                    # 문서 빈도 업데이트
-                    for token in set(tokens):
-                        self.doc_freqs[token] += 1
+    def _build_postings(self):
+        """term_freqs로부터 포스팅 리스트 전체 재구축"""
+        self.postings = {}
+        for doc_idx, term_freq in enumerate(self.term_freqs):
+            self._append_postings(doc_idx, term_freq)
 
-                # 배치 로깅
-                if (batch_end - batch_start) >= 10:
-                    self.logger.debug(f"BM25 인덱싱 진행: {batch_end}/{total_docs}")
+    def _append_postings(self, doc_idx: int, term_freq: Dict[str, int]):
+        """문서 하나의 용어 빈도를 포스팅 리스트에 추가 (doc idx 오름차순 유지)"""
+        for token, tf in term_freq.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = (array('i'), array('i'))
+                self.postings[token] = posting
+            posting[0].append(doc_idx)
+            posting[1].append(tf)
+
+    def _refresh_scoring_stats(self):
+        """IDF/길이 정규화 사전 계산 (문서 추가·삭제·로드 후 호출)"""
+        N = self._live_count()
+        self.idf = {
+            token: math.log((N - df + 0.5) / (df + 0.5))
+            for token, df in self.doc_freqs.items()
+            if df > 0
+        }
+        avg_doc_len = self.avg_doc_len or 1.0
+        self.len_norms = [
+            self.k1 * (1 - self.b + self.b * (doc_len / avg_doc_len))
+            for doc_len in self.doc_lens
+        ]
+        self._sparse_scorer = None
+    
+    def add_documents(self, texts: List[str], metadatas: List[Dict[str, Any]], batch_size: int = 100,
+                      workers: int = 1) -> None:
+        """문서들을 인덱스에 추가 (배치 처리 최적화)
+
+        Args:
+            workers: 2 이상이면 프로세스 풀로 토큰화·TF/DF 계산을 샤딩 (결과는 직렬 경로와 동일)
+        """
+        if len(texts) != len(metadatas):
+            raise ValueError("텍스트와 메타데이터 개수가 일치하지 않습니다")
+
+        start_time = time.time()
+        self._materialize_segment()
+        if self.passage_chars > 0:
+            texts, metadatas = self._split_passages(texts, metadatas)
+        total_docs = len(texts)
+
+        try:
+            if workers > 1 and total_docs >= self.PARALLEL_MIN_DOCS:
+                self._add_documents_parallel(texts, metadatas, batch_size, workers)
+            else:
+                self._add_documents_serial(texts, metadatas, batch_size)
 
             # 평균 문서 길이 재계산
-            if self.doc_lens:
-                self.avg_doc_len = sum(self.doc_lens) / len(self.doc_lens)
+            self._update_avg_doc_len()
+            self._doc_index = self._parent_keys = None
+
+            # N/avgdl이 바뀌었으므로 IDF·길이 정규화 재계산
+            self._refresh_scoring_stats()
 
             # 인덱싱 시간 기록
             self.index_time += time.time() - start_time
@@ -246,6 +530,192 @@ class BM25Store:
             self.logger.error(f"BM25 문서 추가 실패: {e}")
             raise
 
+    def _split_passages(self, texts: List[str], metadatas: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """문서를 겹치는 패시지로 분할 (패시지 메타데이터에 상위 doc_id·위치 기록)"""
+        passage_texts = []
+        passage_metadatas = []
+        for text, metadata in zip(texts, metadatas):
+            metadata = metadata or {}
+            # 식별자가 없는 문서는 내용 해시로 패시지를 묶음
+            doc_id = self._doc_key(metadata) or hashlib.sha1((text or "").encode("utf-8")).hexdigest()[:16]
+            for passage_idx, (start, passage) in enumerate(split_passages(text or "", self.passage_chars, self.passage_overlap)):
+                passage_texts.append(passage)
+                passage_metadatas.append({
+                    **metadata,
+                    'doc_id': doc_id,
+                    'passage_idx': passage_idx,
+                    'passage_start': start,
+                })
+        return passage_texts, passage_metadatas
+
+    def _append_document(self, text: str, metadata: Dict[str, Any], term_freq: Dict[str, int], doc_len: int):
+        """토큰화된 문서 1건을 인덱스 끝에 추가 (DF는 호출 측에서 갱신)"""
+        self.documents.append(text)
+        self.metadata.append(metadata)
+        self.term_freqs.append(term_freq)
+        self.doc_lens.append(doc_len)
+        self._append_postings(len(self.documents) - 1, term_freq)
+
+    def _add_documents_serial(self, texts: List[str], metadatas: List[Dict[str, Any]], batch_size: int):
+        """단일 프로세스 색인"""
+        total_docs = len(texts)
+
+        # 배치 처리 (메모리 효율성)
+        for batch_start in range(0, total_docs, batch_size):
+            batch_end = min(batch_start + batch_size, total_docs)
+            batch_texts = texts[batch_start:batch_end]
+            batch_metadatas = metadatas[batch_start:batch_end]
+
+            # 토큰화 (색인 경로는 질의 캐시를 거치지 않음)
+            batch_tokens = self.tokenizer.tokenize_many(batch_texts)
+
+            for text, metadata, tokens in zip(batch_texts, batch_metadatas, batch_tokens):
+                term_freq = _term_freq(tokens)
+                self._append_document(text, metadata, term_freq, len(tokens))
+
+                # 어휘·문서 빈도 업데이트
+                for token in term_freq:
+                    self.vocab.add(token)
+                    self.doc_freqs[token] += 1
+
+            # 배치 로깅
+            if (batch_end - batch_start) >= 10:
+                self.logger.debug(f"BM25 인덱싱 진행: {batch_end}/{total_docs}")
+
+    def _add_documents_parallel(self, texts: List[str], metadatas: List[Dict[str, Any]], batch_size: int,
+                                workers: int):
+        """프로세스 풀 색인 (샤드별 토큰화·TF/DF 계산 후 순서대로 병합)
+
+        샤드 결과를 입력 순서대로 이어붙이므로 문서 idx·포스팅·DF가 직렬 경로와 동일합니다.
+        """
+        total_docs = len(texts)
+        shard_size = max(batch_size, math.ceil(total_docs / (workers * 4)))
+        shards = [(start, min(start + shard_size, total_docs)) for start in range(0, total_docs, shard_size)]
+
+        # spawn: 부모 프로세스의 torch/llama 스레드 상태를 fork로 복제하지 않음
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_index_worker) as executor:
+            results = executor.map(_index_shard, [texts[start:end] for start, end in shards])
+
+            for (start, end), (term_freqs, doc_lens, shard_doc_freqs) in zip(shards, results):
+                for doc_idx, term_freq, doc_len in zip(range(start, end), term_freqs, doc_lens):
+                    self._append_document(texts[doc_idx], metadatas[doc_idx], term_freq, doc_len)
+
+                for token, df in shard_doc_freqs.items():
+                    self.doc_freqs[token] += df
+                self.vocab.update(shard_doc_freqs)
+                self.tokenizer.tokenize_count += end - start
+
+                self.logger.debug(f"BM25 병렬 인덱싱 진행: {end}/{total_docs} (workers={workers})")
+
+    def _live_count(self) -> int:
+        """삭제(tombstone)되지 않은 문서 수"""
+        return len(self.documents) - len(self.deleted)
+
+    def _update_avg_doc_len(self):
+        """살아있는 문서 기준 평균 길이 (삭제 문서의 doc_len은 0으로 유지됨)"""
+        live = self._live_count()
+        self.avg_doc_len = sum(self.doc_lens) / live if live else 0.0
+
+    @staticmethod
+    def _doc_key(metadata: Dict[str, Any]) -> Optional[str]:
+        """문서 식별자 (doc_id 우선, 없으면 filename)"""
+        return metadata.get('doc_id') or metadata.get('filename')
+
+    def _get_doc_index(self) -> Dict[str, List[int]]:
+        """doc_id → 문서 idx 목록 (청크 단위 색인 시 여러 개)"""
+        if self._doc_index is None:
+            doc_index: Dict[str, List[int]] = defaultdict(list)
+            for doc_idx, metadata in enumerate(self.metadata):
+                if doc_idx in self.deleted:
+                    continue
+                key = self._doc_key(metadata or {})
+                if key:
+                    doc_index[key].append(doc_idx)
+            self._doc_index = dict(doc_index)
+        return self._doc_index
+
+    def _get_parent_keys(self) -> List[Optional[str]]:
+        """문서 idx → 상위 doc_id (패시지 단위 색인에서 문서별 집계에 사용)"""
+        if self._parent_keys is None:
+            self._parent_keys = [self._doc_key(metadata or {}) for metadata in self.metadata]
+        return self._parent_keys
+
+    def _tombstone(self, doc_idx: int):
+        """문서를 삭제 표시하고 DF/어휘에서 제외 (포스팅은 병합 시 제거)"""
+        for token in self.term_freqs[doc_idx]:
+            df = self.doc_freqs.get(token, 0) - 1
+            if df > 0:
+                self.doc_freqs[token] = df
+            else:
+                self.doc_freqs.pop(token, None)
+                self.vocab.discard(token)
+
+        self.deleted.add(doc_idx)
+        self.documents[doc_idx] = ""
+        self.metadata[doc_idx] = {}
+        self.term_freqs[doc_idx] = {}
+        self.doc_lens[doc_idx] = 0
+
+    def delete_document(self, doc_id: str) -> int:
+        """doc_id(또는 filename)에 해당하는 문서 삭제
+
+        Returns:
+            삭제된 항목 수 (청크 단위 색인이면 여러 개)
+        """
+        self._materialize_segment()
+        doc_idxs = self._get_doc_index().pop(doc_id, [])
+        if not doc_idxs:
+            return 0
+
+        for doc_idx in doc_idxs:
+            self._tombstone(doc_idx)
+
+        self._update_avg_doc_len()
+        self._refresh_scoring_stats()
+        self._maybe_compact()
+        self.logger.info(f"BM25 문서 삭제: {doc_id} ({len(doc_idxs)}개 항목, tombstone {len(self.deleted)}개)")
+        return len(doc_idxs)
+
+    def upsert_document(self, doc_id: str, text: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """문서 추가 또는 교체 (기존 항목은 tombstone 처리 후 새 항목 추가)"""
+        metadata = dict(meta or {})
+        metadata['doc_id'] = doc_id
+
+        self._materialize_segment()
+        doc_index = self._get_doc_index()
+        for doc_idx in doc_index.pop(doc_id, []):
+            self._tombstone(doc_idx)
+
+        self.add_documents([text], [metadata])
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """삭제 문서가 임계값을 넘으면 병합"""
+        threshold = max(self.COMPACT_MIN_DELETED, int(len(self.documents) * self.COMPACT_DELETED_RATIO))
+        if len(self.deleted) >= threshold:
+            self.compact()
+
+    def compact(self):
+        """tombstone 문서를 제거하고 문서 idx/포스팅을 재구성 (세그먼트 병합)"""
+        if not self.deleted:
+            return
+
+        start_time = time.time()
+        removed = len(self.deleted)
+        keep = [doc_idx for doc_idx in range(len(self.documents)) if doc_idx not in self.deleted]
+
+        self.documents = [self.documents[i] for i in keep]
+        self.metadata = [self.metadata[i] for i in keep]
+        self.term_freqs = [self.term_freqs[i] for i in keep]
+        self.doc_lens = [self.doc_lens[i] for i in keep]
+        self.deleted = set()
+        self._doc_index = self._parent_keys = None
+
+        self._build_postings()
+        self._update_avg_doc_len()
+        self._refresh_scoring_stats()
+        self.logger.info(f"BM25 병합 완료: tombstone {removed}개 제거 ({time.time() - start_time:.2f}초)")
     
     def search(self, query: str, top_k: int = 5, snippet_max: int = 5000, **kwargs) -> List[Dict[str, Any]]:
         """BM25 스코어로 문서 검색 (성능 추적 포함)
@@ -256,103 +726,228 @@ class BM25Store:
             snippet_max: 스니펫 최대 길이 (기본: 5000자)
             **kwargs: 추가 옵션
         """
-        if not self.documents:
+        return self.search_batch([query], top_k=top_k, snippet_max=snippet_max)[0]
+
+    def search_batch(self, queries: List[str], top_k: int = 5, snippet_max: int = 5000) -> List[List[Dict[str, Any]]]:
+        """여러 질의를 한 번에 검색 (질의별 결과는 search()와 동일)
+
+        역색인: 질의들에 등장한 용어의 포스팅 리스트를 용어당 한 번만 순회해 가중치를 공유
+        sparse: (용어 × 질의) 행렬 곱 한 번으로 모든 질의 스코어 계산
+
+        Returns:
+            질의 순서대로의 결과 목록
+        """
+        if not queries:
             return []
+        if not self.documents:
+            return [[] for _ in queries]
 
         start_time = time.time()
-        self.search_count += 1
+        self.search_count += len(queries)
 
         try:
             # 쿼리 토큰화 (빈 쿼리 방어)
-            query_tokens = self.tokenizer.tokenize(query)
-            if not query_tokens:
-                return []
-            
-            # 각 문서별 BM25 스코어 계산
-            scores = []
-            N = len(self.documents)  # 총 문서 수
-            
-            for doc_idx in range(N):
-                score = 0.0
-                doc_len = self.doc_lens[doc_idx]
-                
-                for token in query_tokens:
-                    if token in self.term_freqs[doc_idx]:
-                        # 용어 빈도 (TF)
-                        tf = self.term_freqs[doc_idx][token]
-                        
-                        # 문서 빈도 (DF)
-                        df = self.doc_freqs.get(token, 0)
-                        if df == 0:
-                            continue
-                        
-                        # IDF 계산
-                        idf = math.log((N - df + 0.5) / (df + 0.5))
-                        
-                        # BM25 스코어 계산
-                        numerator = tf * (self.k1 + 1)
-                        denominator = tf + self.k1 * (1 - self.b + self.b * (doc_len / self.avg_doc_len))
-                        
-                        score += idf * (numerator / denominator)
-                
-                scores.append((score, doc_idx))
-            
-            # 스코어 기준 정렬
-            scores.sort(key=lambda x: x[0], reverse=True)
-            
-            # 결과 구성
-            results = []
-            for i, (score, doc_idx) in enumerate(scores[:top_k]):
-                if score > 0:  # 양의 스코어만
-                    # 메타데이터 안전 접근 (IndexError 방지)
-                    metadata = self.metadata[doc_idx] if doc_idx < len(self.metadata) else {}
-                    # 스니펫 길이 제한 적용
-                    content = self.documents[doc_idx]
-                    snippet = content[:snippet_max] if snippet_max > 0 else content
-
-                    result = {
-                        'rank': i + 1,
-                        'score': float(score),
-                        'content': snippet,
-                        'query_tokens': query_tokens,
-                        **metadata
-                    }
-                    results.append(result)
-            
-            # 검색 시간 기록
-            search_time = time.time() - start_time
-            self.total_search_time += search_time
+            token_lists = [self.tokenizer.tokenize_query(query) for query in queries]
+
+            score_matrix = None
+            term_weights = None
+            if self.scorer == 'sparse':
+                # CSC 가중치 행렬 × 질의 용어 행렬
+                score_matrix = self._get_sparse_scorer().score_batch(token_lists)
+            else:
+                term_weights = self._term_weights(token for tokens in token_lists for token in tokens)
+
+            batch_results = []
+            for q, query_tokens in enumerate(token_lists):
+                if not query_tokens:
+                    batch_results.append([])
+                    continue
+
+                if score_matrix is not None:
+                    column = score_matrix[:, q]
+                else:
+                    # 역색인 기반 BM25 스코어 (질의 용어를 포함한 문서만)
+                    scores = self._score_postings(query_tokens, term_weights)
+                    for doc_idx in self.deleted:
+                        scores.pop(doc_idx, None)
+
+                passage_info: Dict[int, Dict[str, Any]] = {}
+                if self.passage_chars > 0:
+                    # 패시지 스코어를 문서별로 집계 (max/sum), 최고 스코어 패시지를 결과로 반환
+                    if score_matrix is not None:
+                        scores = SparseBM25Scorer.nonzero(column)
+                    top_docs, passage_info = self._search_passages(scores, top_k)
+                elif score_matrix is not None:
+                    # argpartition top-k
+                    top_docs = SparseBM25Scorer.rank(column, top_k)
+                else:
+                    # 상위 K개 선택 (동점은 문서 순서 유지)
+                    top_docs = heapq.nlargest(
+                        top_k,
+                        ((score, doc_idx) for doc_idx, score in scores.items() if score > 0),
+                        key=lambda x: (x[0], -x[1]),
+                    )
+
+                batch_results.append(self._build_results(top_docs, passage_info, query_tokens, snippet_max))
 
-            if self.search_count % 100 == 0:
+            if self.search_count % 100 < len(queries):
                 self.logger.info(f"BM25 검색 통계: {self.search_count}회, 평균 {self.total_search_time/self.search_count:.3f}초")
 
-            return results
+            return batch_results
 
         except Exception as e:
             self.logger.error(f"BM25 검색 실패: {e}")
-            return []
+            return [[] for _ in queries]
         finally:
             self.total_search_time += time.time() - start_time
+
+    def _build_results(self, top_docs: List[Tuple[float, int]], passage_info: Dict[int, Dict[str, Any]],
+                       query_tokens: List[str], snippet_max: int) -> List[Dict[str, Any]]:
+        """(스코어, 문서 idx) 목록 → 검색 결과"""
+        results = []
+        for i, (score, doc_idx) in enumerate(top_docs):
+            # 메타데이터 안전 접근 (IndexError 방지)
+            metadata = self.metadata[doc_idx] if doc_idx < len(self.metadata) else {}
+            # 스니펫 길이 제한 적용
+            snippet = self._get_snippet(doc_idx, snippet_max)
+
+            result = {
+                'rank': i + 1,
+                'score': float(score),
+                'content': snippet,
+                'query_tokens': query_tokens,
+                **metadata,
+                **passage_info.get(doc_idx, {})
+            }
+            results.append(result)
+        return results
     
+    def _search_passages(self, scores: Dict[int, float], top_k: int) -> Tuple[List[Tuple[float, int]], Dict[int, Dict[str, Any]]]:
+        """패시지 스코어를 상위 문서 단위로 집계
+
+        Args:
+            scores: 패시지별 스코어 (삭제 패시지 제외)
+
+        Returns:
+            ([(문서 스코어, 대표 패시지 idx)], {대표 패시지 idx: 패시지 정보})
+        """
+        parent_keys = self._get_parent_keys()
+        groups: Dict[Any, List] = {}  # doc_id → [집계 스코어, 대표 패시지 idx, 대표 패시지 스코어, 매칭 패시지 수]
+        for doc_idx, score in sorted(scores.items()):
+            if score <= 0:
+                continue
+            key = parent_keys[doc_idx] or doc_idx
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [score, doc_idx, score, 1]
+                continue
+            group[3] += 1
+            if self.passage_agg == 'sum':
+                group[0] += score
+            if score > group[2]:
+                group[1], group[2] = doc_idx, score
+                if self.passage_agg == 'max':
+                    group[0] = score
+
+        # 상위 K개 선택 (동점은 대표 패시지 순서 유지)
+        top = heapq.nlargest(top_k, groups.values(), key=lambda g: (g[0], -g[1]))
+        top_docs = [(g[0], g[1]) for g in top]
+        passage_info = {g[1]: {'passage_score': float(g[2]), 'matched_passages': g[3]} for g in top}
+        return top_docs, passage_info
+
+    def _get_snippet(self, doc_idx: int, snippet_max: int) -> str:
+        """문서 스니펫 (세그먼트 모드는 필요한 앞부분만 디코딩)"""
+        if self._segment is not None:
+            return self._segment.get_text(doc_idx, max_chars=max(snippet_max, 0))
+        content = self.documents[doc_idx]
+        return content[:snippet_max] if snippet_max > 0 else content
+
+    def _term_weights(self, tokens: Iterable[str]) -> Dict[str, Tuple[Any, List[float]]]:
+        """질의 용어별 (포스팅 문서 idx, BM25 가중치) - 포스팅 리스트는 용어당 한 번만 순회"""
+        weights: Dict[str, Tuple[Any, List[float]]] = {}
+        k1_plus_1 = self.k1 + 1
+        len_norms = self.len_norms
+
+        for token in tokens:
+            if token in weights:
+                continue
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+
+            doc_ids, tfs = posting
+            weights[token] = (
+                doc_ids,
+                [idf * ((tf * k1_plus_1) / (tf + len_norms[doc_idx])) for doc_idx, tf in zip(doc_ids, tfs)],
+            )
+
+        return weights
+
+    def _score_postings(self, query_tokens: List[str],
+                        term_weights: Optional[Dict[str, Tuple[Any, List[float]]]] = None) -> Dict[int, float]:
+        """질의 토큰의 포스팅 가중치를 문서별로 누적
+
+        문서별 합산 순서가 질의 토큰 순서와 같으므로 전체 스캔 방식과 동일한 값을 반환합니다.
+        term_weights를 주면 (배치 검색) 이미 계산된 용어 가중치를 재사용합니다.
+        """
+        if term_weights is None:
+            term_weights = self._term_weights(query_tokens)
+
+        scores: Dict[int, float] = {}
+        for token in query_tokens:
+            entry = term_weights.get(token)
+            if entry is None:
+                continue
+            for doc_idx, weight in zip(*entry):
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + weight
+
+        return scores
+
+    def _get_sparse_scorer(self) -> SparseBM25Scorer:
+        """sparse 스코어러 반환 (첫 검색 시 k1/b를 반영한 가중치 행렬 구축)"""
+        if self._sparse_scorer is None:
+            start_time = time.time()
+            self._sparse_scorer = SparseBM25Scorer(self)
+            self.logger.info(f"BM25 sparse 행렬 구축 완료 ({time.time() - start_time:.2f}초)")
+        return self._sparse_scorer
+
     def get_stats(self) -> Dict[str, Any]:
         """BM25 인덱스 통계 (확장된 메트릭)"""
+        cache_stats = self.tokenizer.query_cache.get_stats()
         tokenizer_stats = {
             'type': 'kiwipiepy' if self.tokenizer.use_kiwi else 'basic',
             'tokenize_count': self.tokenizer.tokenize_count,
-            'cache_hits': self.tokenizer.cache_hits,
-            'cache_hit_rate': self.tokenizer.cache_hits / self.tokenizer.tokenize_count * 100 if self.tokenizer.tokenize_count > 0 else 0
+            'cache_hits': cache_stats['hits'],
+            'cache_misses': cache_stats['misses'],
+            'cache_hit_rate': cache_stats['hit_rate'],
+            'query_cache': cache_stats,
         }
 
         return {
-            'total_documents': len(self.documents),
+            'total_documents': self._live_count(),
+            'deleted_documents': len(self.deleted),
+            'passage_chars': self.passage_chars,
+            'passage_agg': self.passage_agg,
             'vocab_size': len(self.vocab),
             'avg_doc_length': self.avg_doc_len,
             'avgdl': self.avg_doc_len,  # 호환성 alias
             'index_path': str(self.index_path),
             'bm25_index_path': str(self.index_path),  # 호환성 alias
             'bm25_index_docs': len(self.documents),  # 호환성 alias
-            'has_tf': bool(self.term_freqs),
+            'has_tf': bool(self.term_freqs) or bool(self.postings),
+            'index_format': 'segment' if self._segment is not None else 'pickle',
+            'mapped_bytes': self._segment.memory_footprint() if self._segment is not None else 0,
             'has_df': bool(self.doc_freqs),
+            'posting_terms': len(self.postings),
+            'total_postings': (
+                len(self._segment.posting_docs) if self._segment is not None
+                else sum(len(doc_ids) for doc_ids, _ in self.postings.values())
+            ),
+            'scorer': self.scorer,
+            'sparse_matrix': self._sparse_scorer.get_stats() if self._sparse_scorer else None,
             'parameters': {
                 'k1': self.k1,
                 'b': self.b
@@ -0,0 +1,203 @@
+"""
+토큰 예산 기반 컨텍스트 패킹
+
+고정 문자↔토큰 계수(TOKENS_PER_CHAR)는 한국어 문서에서 편차가 커서 n_ctx를 넘기거나 컨텍스트 창을
+절반만 쓰게 됩니다. 모델 토크나이저(Llama.tokenize)로 청크 토큰 수를 정확히 세고,
+n_ctx - max_tokens - 프롬프트 오버헤드 예산을 관련도 순으로 채웁니다.
+
+- TokenCounter: sha1(텍스트) → 토큰 수 LRU 캐시 (같은 청크는 한 번만 토큰화)
+- 모델 미로드(테스트/폴백) 시 TOKENS_PER_CHAR 추정으로 동작 (method="estimate")
+- pack(): 입력 순서(관련도 순)대로 그리디 채우기, 넘치는 텍스트는 shrink로 남은 예산에 맞춤
+
+토큰화는 모델 어휘만 읽으므로 생성 스케줄러를 거치지 않고 호출 스레드에서 실행합니다.
+"""
+
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 채팅 템플릿 역할 토큰 등 메시지 래핑 여유분
+PROMPT_TEMPLATE_TOKENS = 32
+
+# 남은 예산이 이보다 작으면 텍스트를 줄여 넣지 않음
+MIN_SHRINK_TOKENS = 32
+
+
+def mode_max_tokens(mode: str, default: int) -> int:
+    """모드별 생성 토큰 예산 (chat/rag/summarize/summary, 그 외는 default)"""
+    mode_token_budgets = {
+        "chat": int(os.getenv("CHAT_MAX_TOKENS", "64")),
+        "rag": int(os.getenv("RAG_MAX_TOKENS", "160")),
+        "summarize": int(os.getenv("SUMMARIZE_MAX_TOKENS", "1200")),
+        "summary": int(os.getenv("SUMMARY_MAX_TOKENS", "1200")),
+    }
+    return mode_token_budgets.get(mode.lower(), default)
+
+
+def context_budget(n_ctx: int, max_tokens: int, prompt_overhead: int) -> int:
+    """컨텍스트에 쓸 수 있는 토큰 수 (n_ctx - 생성 예산 - 프롬프트 오버헤드)"""
+    return max(0, n_ctx - max_tokens - prompt_overhead)
+
+
+def _env_n_ctx() -> int:
+    for key in ("N_CTX", "LLM_N_CTX"):
+        val = os.getenv(key)
+        if val and val.strip().isdigit():
+            return int(val)
+    return 4096
+
+
+class TokenCounter:
+    """모델 토크나이저 기반 토큰 수 계산 (텍스트 해시별 캐시)"""
+
+    def __init__(self, llm: Any = None, n_ctx: Optional[int] = None, max_entries: int = 20000):
+        """
+        Args:
+            llm: llama_cpp.Llama 또는 ScheduledLlama (None이면 TOKENS_PER_CHAR 추정)
+            n_ctx: 컨텍스트 창 크기 (None이면 llm.n_ctx(), 없으면 N_CTX 환경변수)
+            max_entries: 토큰 수 캐시 항목 수
+        """
+        tokenize = getattr(llm, "tokenize", None)
+        detokenize = getattr(llm, "detokenize", None)
+        self._tokenize = tokenize if callable(tokenize) else None
+        self._detokenize = detokenize if callable(detokenize) else None
+        self.method = "tokenizer" if self._tokenize else "estimate"
+        self.tokens_per_char = float(os.getenv("TOKENS_PER_CHAR", "0.33"))
+
+        if n_ctx is None:
+            try:
+                n_ctx = int(llm.n_ctx()) if callable(getattr(llm, "n_ctx", None)) else None
+            except Exception:
+                n_ctx = None
+        self.n_ctx = n_ctx or _env_n_ctx()
+
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    # ---------------------------------------------------------------- 토큰 수
+
+    def _tokens(self, text: str) -> Optional[List[int]]:
+        if not self._tokenize:
+            return None
+        try:
+            return self._tokenize(text.encode("utf-8"), add_bos=False)
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            logger.debug(f"토큰화 실패 (추정값 사용): {e}")
+            return None
+
+    def _estimate(self, text: str) -> int:
+        return math.ceil(len(text) * self.tokens_per_char)
+
+    def count(self, text: str) -> int:
+        """텍스트 토큰 수 (BOS 제외)"""
+        if not text:
+            return 0
+        key = hashlib.sha1(text.encode("utf-8")).digest()
+        with self._lock:
+            n = self._cache.get(key)
+            if n is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return n
+            self.stats["misses"] += 1
+
+        tokens = self._tokens(text)
+        n = len(tokens) if tokens is not None else self._estimate(text)
+        with self._lock:
+            self._cache[key] = n
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return n
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """max_tokens 이하가 되도록 텍스트 앞부분만 유지"""
+        if max_tokens <= 0:
+            return ""
+        n = self.count(text)
+        if n <= max_tokens:
+            return text
+
+        tokens = self._tokens(text) if self._detokenize else None
+        if tokens is not None:
+            cut = self._detokenize(tokens[:max_tokens]).decode("utf-8", errors="ignore")
+        else:
+            cut = text[:int(len(text) * max_tokens / n)]
+        # 경계 재토큰화로 늘어나는 경우 문자 단위로 줄임
+        while cut and self.count(cut) > max_tokens:
+            cut = cut[:int(len(cut) * 0.95)]
+        return cut
+
+    # ---------------------------------------------------------------- 패킹
+
+    def pack(self, texts: List[str], budget: int, separator: str = "\n\n",
+             shrink: Optional[Callable[[str, int], str]] = None) -> Tuple[List[str], int]:
+        """관련도 순 텍스트를 예산 안에서 그리디로 채움
+
+        Args:
+            texts: 관련도 순 텍스트 목록
+            budget: 토큰 예산
+            separator: 텍스트 사이 구분자 (토큰 수 포함)
+            shrink: shrink(text, 남은 토큰) → 줄인 텍스트 (None이면 넘치는 텍스트는 건너뜀)
+
+        Returns:
+            (채운 텍스트 목록, 사용 토큰 수)
+        """
+        sep_tokens = self.count(separator)
+        packed: List[str] = []
+        used = 0
+        for text in texts:
+            if not text:
+                continue
+            cost = self.count(text) + (sep_tokens if packed else 0)
+            if used + cost <= budget:
+                packed.append(text)
+                used += cost
+                continue
+
+            remaining = budget - used - (sep_tokens if packed else 0)
+            if shrink is None or remaining < MIN_SHRINK_TOKENS:
+                continue
+            shrunk = self.truncate(shrink(text, remaining), remaining)
+            if shrunk:
+                packed.append(shrunk)
+                used += self.count(shrunk) + (sep_tokens if len(packed) > 1 else 0)
+        return packed, used
+
+    def get_stats(self) -> Dict[str, Any]:
+        """토큰 수 캐시 통계"""
+        with self._lock:
+            return {**self.stats, "entries": len(self._cache), "method": self.method, "n_ctx": self.n_ctx}
+
+
+_default_counter: Optional[TokenCounter] = None
+_estimate_counter: Optional[TokenCounter] = None
+
+
+def create_token_counter(llm: Any) -> TokenCounter:
+    """모델 토큰 카운터 생성 후 프로세스 기본 카운터로 등록 (컨텍스트 하이드레이터 공용)"""
+    global _default_counter
+    counter = TokenCounter(llm, max_entries=int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "20000")))
+    if counter.method == "tokenizer":
+        _default_counter = counter
+    return counter
+
+
+def get_token_counter() -> TokenCounter:
+    """기본 토큰 카운터 (모델 미로드 시 TOKENS_PER_CHAR 추정 카운터)"""
+    global _estimate_counter
+    if _default_counter is not None:
+        return _default_counter
+    if _estimate_counter is None:
+        _estimate_counter = TokenCounter()
+    return _estimate_counter
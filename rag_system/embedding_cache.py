@@ -0,0 +1,266 @@
+"""
+임베딩 디스크 캐시
+
+(모델명, 정규화 여부, sha1(텍스트)) → 임베딩 벡터를 보관합니다.
+- 벡터: float32 행을 이어 붙인 파일 (읽기는 np.memmap)
+- 키 인덱스: 같은 행 순서의 sha1 목록 (한 줄에 하나)
+
+두 파일 모두 추가 전용이라 재구축 중 중단되어도 이미 기록된 행은 유지되고,
+시작 시 두 파일 중 짧은 쪽에 맞춰 행 수를 정합니다.
+재색인 시 내용이 바뀌지 않은 청크는 다시 인코딩하지 않습니다.
+
+API·Streamlit·재임베딩 워커가 같은 디렉터리를 공유하므로 추가는 파일 잠금(flock) 안에서
+벡터 파일 크기 기준 행 번호로 기록하고, 다른 프로세스가 추가한 키는 키 파일 끝부분만 읽어 반영합니다.
+max_bytes를 넘으면 오래된 행부터 제거합니다 (임시 파일 작성 후 교체).
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """텍스트 내용 해시"""
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """임베딩 디스크 캐시 (모델·정규화 설정별 디렉터리)"""
+
+    VECTORS_FILE = "vectors.f32"
+    KEYS_FILE = "keys.txt"
+    LOCK_FILE = "lock"
+    COMPACTING_FILE = "compacting"
+
+    def __init__(self, cache_dir: str, model_name: str, dim: int, normalize: bool = True,
+                 max_bytes: int = 0):
+        """
+        Args:
+            cache_dir: 캐시 루트 디렉터리
+            model_name: 임베딩 모델 식별자
+            dim: 임베딩 차원
+            normalize: L2 정규화 여부 (키에 포함)
+            max_bytes: 벡터 파일 크기 상한 (넘으면 오래된 행부터 제거, 0이면 무제한)
+        """
+        namespace = hashlib.sha1(f"{model_name}|{int(normalize)}|{dim}".encode("utf-8")).hexdigest()[:16]
+        self.path = Path(cache_dir) / namespace
+        self.model_name = model_name
+        self.dim = dim
+        self.normalize = normalize
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._n_rows = 0          # 키 파일에서 읽은 행 수
+        self._keys_offset = 0     # 키 파일에서 읽은 바이트 수
+        self._keys_ino: Optional[int] = None
+        self._mmap: Optional[np.memmap] = None
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / "model.txt").write_text(f"{model_name}\nnormalize={normalize}\ndim={dim}\n", encoding="utf-8")
+        with self._lock, self._file_lock():
+            self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / self.VECTORS_FILE
+
+    @property
+    def keys_path(self) -> Path:
+        return self.path / self.KEYS_FILE
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * 4
+
+    @contextmanager
+    def _file_lock(self):
+        """캐시 디렉터리를 공유하는 프로세스 간 배타 잠금"""
+        with open(self.path / self.LOCK_FILE, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield  # 파일을 닫으면 잠금 해제
+
+    def _vector_file_size(self) -> int:
+        return self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+
+    def _load(self):
+        """키 인덱스 로드 (파일 잠금 보유 상태, 벡터/키 파일 행 수 불일치 시 짧은 쪽 기준으로 정리)"""
+        marker = self.path / self.COMPACTING_FILE
+        if marker.exists():
+            logger.warning("임베딩 캐시 압축이 중단됨 → 캐시 초기화")
+            self.vectors_path.unlink(missing_ok=True)
+            self.keys_path.unlink(missing_ok=True)
+            marker.unlink()
+
+        self.keys_path.touch()
+        data = self.keys_path.read_bytes()
+        complete = data.rfind(b"\n") + 1  # 기록 중단된 마지막 줄 제외
+        keys = data[:complete].decode("utf-8").split()
+        row_bytes = self._row_bytes
+        vector_rows = self._vector_file_size() // row_bytes
+
+        rows = min(len(keys), vector_rows)
+        if rows != len(keys) or complete != len(data) or self._vector_file_size() != rows * row_bytes:
+            logger.warning(f"임베딩 캐시 정리: 키 {len(keys)}개, 벡터 {vector_rows}개 → {rows}개 유지")
+            with open(self.vectors_path, "r+b" if self.vectors_path.exists() else "wb") as f:
+                f.truncate(rows * row_bytes)
+            self.keys_path.write_text("".join(f"{key}\n" for key in keys[:rows]), encoding="utf-8")
+
+        self._rows = {key: row for row, key in enumerate(keys[:rows])}
+        self._n_rows = rows
+        self._keys_offset = len("".join(f"{key}\n" for key in keys[:rows]).encode("utf-8"))
+        self._keys_ino = self.keys_path.stat().st_ino
+        self._mmap = None
+
+    def _refresh(self, locked: bool = False):
+        """다른 프로세스가 추가한 키 반영 (압축·초기화로 파일이 바뀌었으면 다시 로드)
+
+        Args:
+            locked: 호출 측이 파일 잠금을 보유 중인지
+        """
+        try:
+            st = os.stat(self.keys_path)
+        except FileNotFoundError:
+            st = None
+        if st is None or st.st_ino != self._keys_ino or st.st_size < self._keys_offset:
+            if locked:
+                self._load()
+            else:
+                with self._file_lock():
+                    self._load()
+            return
+        if st.st_size == self._keys_offset:
+            return
+
+        # 벡터를 먼저 기록하므로 완성된 키 줄의 벡터 행은 이미 존재
+        with open(self.keys_path, "rb") as f:
+            if os.fstat(f.fileno()).st_ino != self._keys_ino:  # stat 이후 압축으로 교체됨
+                return self._refresh(locked)
+            f.seek(self._keys_offset)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        for key in data[:complete].decode("utf-8").split():
+            self._rows.setdefault(key, self._n_rows)
+            self._n_rows += 1
+        self._keys_offset += complete
+
+    def _vectors(self) -> Optional[np.memmap]:
+        """벡터 파일 mmap (행이 추가되면 다시 매핑, 호출 측에서 lock 보유)"""
+        rows = self._n_rows
+        if rows == 0:
+            return None
+        if self._mmap is None or self._mmap.shape[0] != rows:
+            self._mmap = np.memmap(self.vectors_path, dtype="float32", mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def get_many(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """캐시 조회
+
+        Returns:
+            (벡터 행렬 (len(keys)×dim, 미스 행은 0), 히트 여부 bool 배열)
+        """
+        vectors = np.zeros((len(keys), self.dim), dtype="float32")
+        with self._lock:
+            self._refresh()
+            rows = [self._rows.get(key, -1) for key in keys]
+            found = np.array([row >= 0 for row in rows], dtype=bool)
+            if found.any():
+                vectors[found] = self._vectors()[np.array(rows)[found]]
+            hits = int(found.sum())
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(keys) - hits
+        return vectors, found
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """새 벡터 기록 (이미 있는 키는 건너뜀, 다른 프로세스와 파일 잠금으로 직렬화)"""
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        with self._lock, self._file_lock():
+            self._refresh(locked=True)
+            new_rows = []
+            seen = set()
+            for i, key in enumerate(keys):
+                if key not in self._rows and key not in seen:
+                    seen.add(key)
+                    new_rows.append(i)
+            if not new_rows:
+                return
+
+            # 키 없이 남은 벡터 행·끊긴 키 줄(기록 중 종료된 프로세스) 정리
+            if (self.keys_path.stat().st_size != self._keys_offset
+                    or self._vector_file_size() != self._n_rows * self._row_bytes):
+                self._load()
+
+            max_rows = self.max_bytes // self._row_bytes
+            if max_rows and self._n_rows + len(new_rows) > max_rows:
+                self._compact(keep=max(0, max_rows // 2 - len(new_rows)))
+
+            # 벡터를 먼저 기록해야 중단 시 키만 남는 일이 없음
+            base = self._vector_file_size() // self._row_bytes
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[new_rows].tobytes())
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{keys[i]}\n" for i in new_rows))
+
+            for offset, i in enumerate(new_rows):
+                self._rows[keys[i]] = base + offset
+            self._n_rows = base + len(new_rows)
+            self._keys_offset = self.keys_path.stat().st_size
+            self.stats["writes"] += len(new_rows)
+
+    def _compact(self, keep: int):
+        """최근 keep개 행만 남기고 제거 (두 lock 보유 상태, 임시 파일 작성 후 교체)
+
+        교체 도중 중단되면 키와 벡터 행이 어긋날 수 있으므로 표시 파일을 남겨
+        다음 로드 때 캐시를 비웁니다.
+        """
+        start = self._n_rows - keep
+        keys = self.keys_path.read_text(encoding="utf-8").split()[start:self._n_rows]
+        vectors = np.fromfile(self.vectors_path, dtype="float32", count=self._n_rows * self.dim)[start * self.dim:]
+
+        tmp_vectors = self.vectors_path.with_name(self.VECTORS_FILE + ".tmp")
+        tmp_keys = self.keys_path.with_name(self.KEYS_FILE + ".tmp")
+        vectors.tofile(tmp_vectors)
+        tmp_keys.write_text("".join(f"{key}\n" for key in keys), encoding="utf-8")
+
+        marker = self.path / self.COMPACTING_FILE
+        marker.touch()
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_keys, self.keys_path)
+        marker.unlink()
+
+        self.stats["evictions"] += start
+        logger.info(f"임베딩 캐시 상한 초과: 오래된 {start}개 제거, {keep}개 유지")
+        self._load()
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            self.vectors_path.unlink(missing_ok=True)
+            self.keys_path.unlink(missing_ok=True)
+            self._load()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._rows),
+                "bytes": self._n_rows * self._row_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.stats["hits"] / lookups * 100 if lookups else 0.0,
+                "path": str(self.path),
+            }
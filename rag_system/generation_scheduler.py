@@ -0,0 +1,385 @@
+"""
+LLM 생성 스케줄러
+
+단일 llama.cpp 컨텍스트는 동시 호출에 안전하지 않으므로, 모델을 소유한 전용 워커 스레드
+하나가 우선순위 큐에서 작업을 꺼내 순서대로 실행합니다.
+- 우선순위: 대화형 답변 > 문서 요약 > 쿼리 확장 > 예열
+- 작업별 마감 시간: 실행 시작까지의 대기열 대기 한도 (만료되면 실행하지 않음, 시작된 생성은 끝까지 진행)
+- 취소: 호출자가 대기를 포기하거나 스트림을 닫으면 큐에서 건너뛰거나 생성 중단
+- 메트릭: 큐 깊이(우선순위별), 대기 시간 p50/p95, 완료/만료/취소 수
+
+호출 코드는 ScheduledLlama(Llama 프록시)를 통해 기존처럼 create_chat_completion을 호출하고,
+우선순위는 generation_priority() 컨텍스트로 지정합니다 (미지정 시 대화형).
+"""
+
+import heapq
+import itertools
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class Priority(IntEnum):
+    """생성 작업 우선순위 (값이 작을수록 먼저 실행)"""
+    INTERACTIVE = 0
+    SUMMARY = 1
+    EXPANSION = 2
+    WARMUP = 3
+
+
+# 우선순위별 기본 마감 시간 (초, 제출 시점부터 실행 시작까지)
+DEFAULT_DEADLINES = {
+    Priority.INTERACTIVE: float(os.getenv("LLM_DEADLINE_INTERACTIVE", "120")),
+    Priority.SUMMARY: float(os.getenv("LLM_DEADLINE_SUMMARY", "300")),
+    Priority.EXPANSION: float(os.getenv("LLM_DEADLINE_EXPANSION", "10")),
+    Priority.WARMUP: float(os.getenv("LLM_DEADLINE_WARMUP", "600")),
+}
+
+
+class GenerationCancelledError(RuntimeError):
+    """호출자가 포기한 생성 작업"""
+
+
+class GenerationDeadlineExceededError(TimeoutError):
+    """마감 시간 안에 실행을 시작하지 못한 생성 작업 (또는 호출자 timeout 초과)"""
+
+
+_current_priority: ContextVar[Optional[Priority]] = ContextVar("generation_priority", default=None)
+
+
+@contextmanager
+def generation_priority(priority: Priority):
+    """블록 안의 LLM 호출 우선순위 지정
+
+    중첩 시 더 낮은 우선순위가 유지된다 (예열 중 호출된 쿼리 확장은 예열 우선순위).
+    """
+    current = _current_priority.get()
+    token = _current_priority.set(priority if current is None else max(current, priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """현재 컨텍스트의 생성 우선순위 (미지정: 대화형)"""
+    priority = _current_priority.get()
+    return Priority.INTERACTIVE if priority is None else priority
+
+
+_END = object()
+
+
+class GenerationJob:
+    """스케줄러 작업 (결과 대기/스트림 소비/취소)"""
+
+    def __init__(self, fn: Callable[[Any], Any], priority: Priority,
+                 deadline_sec: Optional[float] = None, stream: bool = False):
+        self.fn = fn
+        self.priority = Priority(priority)
+        self.stream = stream
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + deadline_sec if deadline_sec else None
+        self.wait_time: Optional[float] = None
+        self._cancelled = False
+        self._dequeued = threading.Event()  # 워커가 큐에서 꺼냄 (실행 시작 또는 건너뜀)
+        self._done = threading.Event()
+        self._result: Any = None
+        self._error: Optional[BaseException] = None
+        self._pieces: Optional[queue.Queue] = queue.Queue() if stream else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        """취소 (대기 중이면 건너뜀, 스트리밍 중이면 다음 조각에서 중단)"""
+        self._cancelled = True
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def _queue_remaining(self) -> Optional[float]:
+        """실행 시작까지 남은 대기 한도 (마감 없으면 None)"""
+        return max(0.0, self.deadline - time.monotonic()) if self.deadline else None
+
+    def _deadline_error(self) -> "GenerationDeadlineExceededError":
+        return GenerationDeadlineExceededError(f"생성 작업 마감 초과 (priority={self.priority.name})")
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """결과 대기
+
+        마감 시간은 실행 시작 전까지만 적용하고, 시작된 작업은 timeout(지정 시)까지 기다린다.
+        어느 쪽이든 초과하면 작업을 취소하고 GenerationDeadlineExceededError.
+        """
+        start = time.monotonic()
+        limits = [t for t in (timeout, self._queue_remaining()) if t is not None]
+        if not self._dequeued.wait(min(limits) if limits else None):
+            self.cancel()
+            raise self._deadline_error()
+        rest = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+        if not self._done.wait(rest):
+            self.cancel()
+            raise self._deadline_error()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def iter_pieces(self) -> Iterator[Any]:
+        """스트리밍 조각 소비 (소비자가 중간에 닫으면 작업 취소)
+
+        마감 시간은 실행 시작 전 대기에만 적용하므로, 시작된 스트림은 끝까지 전달된다.
+        """
+        try:
+            while True:
+                try:
+                    wait = None if self._dequeued.is_set() else self._queue_remaining()
+                    piece = self._pieces.get(timeout=wait)
+                except queue.Empty:
+                    if self._dequeued.is_set():
+                        continue  # 기다리는 사이 실행 시작
+                    raise self._deadline_error() from None
+                if piece is _END:
+                    break
+                yield piece
+            if self._error is not None:
+                raise self._error
+        finally:
+            if not self.done:
+                self.cancel()
+
+    def _finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self._result = result
+        self._error = error
+        if self._pieces is not None:
+            self._pieces.put(_END)
+        self._done.set()
+
+
+def _percentile(sorted_vals: list, p: float) -> float:
+    """최근접 순위 백분위"""
+    if not sorted_vals:
+        return 0.0
+    rank = max(1, min(len(sorted_vals), math.ceil(p * len(sorted_vals))))
+    return float(sorted_vals[rank - 1])
+
+
+class GenerationScheduler:
+    """모델을 소유하고 생성 작업을 우선순위 순으로 하나씩 실행"""
+
+    def __init__(self, model: Any, deadlines: Optional[Dict[Priority, float]] = None,
+                 wait_window_size: int = 2000):
+        """
+        Args:
+            model: llama_cpp.Llama (워커 스레드만 직접 호출)
+            deadlines: 우선순위별 기본 마감 시간 (초, None/0이면 무제한)
+            wait_window_size: 대기 시간 샘플 윈도 크기
+        """
+        self.model = model
+        self.deadlines = {**DEFAULT_DEADLINES, **(deadlines or {})}
+        self._cond = threading.Condition()
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._worker: Optional[threading.Thread] = None
+        self._running: Optional[GenerationJob] = None
+        self._wait_samples = deque(maxlen=wait_window_size)
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "expired": 0,
+            "cancelled": 0,
+        }
+
+    # ---------------------------------------------------------------- 제출
+
+    def submit(self, fn: Callable[[Any], Any], priority: Optional[Priority] = None,
+               deadline_sec: Optional[float] = None, stream: bool = False) -> GenerationJob:
+        """작업 제출 (fn(model)을 워커 스레드에서 실행)
+
+        Args:
+            fn: 모델을 받아 결과(스트림이면 조각 이터레이터)를 반환하는 함수
+            priority: 우선순위 (None이면 현재 컨텍스트)
+            deadline_sec: 제출 시점부터 실행 시작까지의 마감 시간 (None이면 우선순위 기본값)
+            stream: True면 fn의 반환 이터레이터를 조각 단위로 전달
+        """
+        priority = current_priority() if priority is None else Priority(priority)
+        if deadline_sec is None:
+            deadline_sec = self.deadlines.get(priority)
+        job = GenerationJob(fn, priority, deadline_sec, stream=stream)
+
+        with self._cond:
+            heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+            self.stats["submitted"] += 1
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="llm-generation-scheduler", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return job
+
+    def run(self, fn: Callable[[Any], Any], priority: Optional[Priority] = None,
+            deadline_sec: Optional[float] = None) -> Any:
+        """작업 제출 후 결과 대기 (워커 스레드 안에서 호출되면 바로 실행)"""
+        if threading.current_thread() is self._worker:
+            return fn(self.model)
+        return self.submit(fn, priority, deadline_sec).result()
+
+    def run_stream(self, fn: Callable[[Any], Iterator[Any]], priority: Optional[Priority] = None,
+                   deadline_sec: Optional[float] = None) -> Iterator[Any]:
+        """스트리밍 작업 제출 후 조각 이터레이터 반환"""
+        if threading.current_thread() is self._worker:
+            return iter(fn(self.model))
+        return self.submit(fn, priority, deadline_sec, stream=True).iter_pieces()
+
+    # ---------------------------------------------------------------- 워커
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+                job._dequeued.set()
+                if job.cancelled:
+                    self.stats["cancelled"] += 1
+                    job._finish(error=GenerationCancelledError("대기 중 취소됨"))
+                    continue
+                if job.expired():
+                    self.stats["expired"] += 1
+                    logger.warning(f"⏱️ 생성 작업 마감 초과로 건너뜀 (priority={job.priority.name})")
+                    job._finish(error=GenerationDeadlineExceededError("대기 중 마감 초과"))
+                    continue
+                job.wait_time = time.monotonic() - job.submitted_at
+                self._wait_samples.append((job.priority, job.wait_time * 1000))
+                self._running = job
+
+            try:
+                self._execute(job)
+            finally:
+                with self._cond:
+                    self._running = None
+
+    def _execute(self, job: GenerationJob) -> None:
+        try:
+            if not job.stream:
+                result = job.fn(self.model)
+                self._count("completed")
+                job._finish(result=result)
+                return
+
+            pieces = job.fn(self.model)
+            stopped = False
+            try:
+                for piece in pieces:
+                    if job.cancelled:
+                        stopped = True
+                        break
+                    job._pieces.put(piece)
+            finally:
+                close = getattr(pieces, "close", None)
+                if stopped and callable(close):
+                    close()  # llama.cpp 생성 루프 중단
+
+            if stopped:
+                self._count("cancelled")
+                logger.info(f"🛑 스트리밍 생성 중단 (cancelled, priority={job.priority.name})")
+                job._finish(error=GenerationCancelledError("생성 중 취소됨"))
+            else:
+                self._count("completed")
+                job._finish()
+        except Exception as e:
+            self._count("failed")
+            job._finish(error=e)
+
+    def _count(self, key: str) -> None:
+        with self._cond:
+            self.stats[key] += 1
+
+    # ---------------------------------------------------------------- 메트릭
+
+    def get_stats(self) -> Dict[str, Any]:
+        """큐 깊이, 대기 시간, 처리 결과 통계"""
+        with self._cond:
+            queued = [job for _, _, job in self._heap if not job.cancelled]
+            samples = list(self._wait_samples)
+            stats = dict(self.stats)
+            running = self._running.priority.name if self._running else None
+
+        depth = {p.name.lower(): 0 for p in Priority}
+        for job in queued:
+            depth[job.priority.name.lower()] += 1
+
+        all_waits = sorted(ms for _, ms in samples)
+        wait_by_priority = {}
+        for p in Priority:
+            waits = sorted(ms for prio, ms in samples if prio == p)
+            if waits:
+                wait_by_priority[p.name.lower()] = {
+                    "p50": int(_percentile(waits, 0.50)),
+                    "p95": int(_percentile(waits, 0.95)),
+                }
+
+        return {
+            **stats,
+            "queue_depth": len(queued),
+            "queue_depth_by_priority": depth,
+            "running": running,
+            "wait_ms_p50": int(_percentile(all_waits, 0.50)),
+            "wait_ms_p95": int(_percentile(all_waits, 0.95)),
+            "wait_ms_by_priority": wait_by_priority,
+        }
+
+
+class ScheduledLlama:
+    """Llama 프록시: 생성 호출은 스케줄러 경유, 그 외 속성은 원본 모델로 위임"""
+
+    def __init__(self, model: Any, scheduler: Optional[GenerationScheduler] = None):
+        self._model = model
+        self.scheduler = scheduler or GenerationScheduler(model)
+
+    def create_chat_completion(self, *args, **kwargs):
+        if kwargs.get("stream"):
+            return self.scheduler.run_stream(lambda llm: llm.create_chat_completion(*args, **kwargs))
+        return self.scheduler.run(lambda llm: llm.create_chat_completion(*args, **kwargs))
+
+    def create_completion(self, *args, **kwargs):
+        if kwargs.get("stream"):
+            return self.scheduler.run_stream(lambda llm: llm.create_completion(*args, **kwargs))
+        return self.scheduler.run(lambda llm: llm.create_completion(*args, **kwargs))
+
+    def __call__(self, *args, **kwargs):
+        return self.create_completion(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+
+_default_scheduler: Optional[GenerationScheduler] = None
+
+
+def attach_scheduler(model: Any) -> ScheduledLlama:
+    """모델을 스케줄러 프록시로 감싸고 프로세스 기본 스케줄러로 등록 (/metrics 조회용)"""
+    global _default_scheduler
+    proxy = ScheduledLlama(model)
+    _default_scheduler = proxy.scheduler
+    return proxy
+
+
+def get_scheduler_stats() -> Optional[Dict[str, Any]]:
+    """기본 스케줄러 통계 (모델 미로드 시 None)"""
+    return _default_scheduler.get_stats() if _default_scheduler else None
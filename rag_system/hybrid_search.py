@@ -12,6 +12,7 @@ from functools import lru_cache
 import hashlib
 
 from app.core.logging import get_logger
+from app.rag.parallel_executor import ParallelSearchExecutor
 
 try:
     import pdfplumber
@@ -46,6 +47,15 @@ DEFAULT_BM25_INDEX_PATH = "rag_system/db/bm25_index.pkl"
 # 결과 제한 상수
 MAX_SEARCH_RESULTS = 100
 
+# 동시 검색 설정 (벡터/BM25/쿼리 확장을 스레드로 동시 실행, 백엔드별 타임아웃 초)
+PARALLEL_SEARCH = _env_bool('HYBRID_PARALLEL_SEARCH', True)
+VECTOR_TIMEOUT = float(os.getenv('HYBRID_VECTOR_TIMEOUT', '3.0'))
+BM25_TIMEOUT = float(os.getenv('HYBRID_BM25_TIMEOUT', '3.0'))
+EXPANSION_TIMEOUT = float(os.getenv('HYBRID_EXPANSION_TIMEOUT', '1.0'))
+# 전용 스레드 풀 크기 (백엔드 3개 + 타임아웃 후에도 끝까지 실행되는 스레드 여유분)
+SEARCH_WORKERS = int(os.getenv('HYBRID_SEARCH_WORKERS', '9'))
+MAX_EXPANSIONS = 2  # 검색에 사용할 확장 쿼리 수
+
 class HybridSearch:
     """벡터 + BM25 하이브리드 검색"""
     
@@ -73,6 +83,15 @@ class HybridSearch:
         self.use_multilevel_filter = _env_bool("USE_MULTILEVEL_FILTER", False)
         self.single_document_mode = single_document_mode
         self.fusion_method = fusion_method
+        self.parallel_search = PARALLEL_SEARCH
+        self.backend_timeouts = {
+            'vector': VECTOR_TIMEOUT,
+            'bm25': BM25_TIMEOUT,
+            'expansion': EXPANSION_TIMEOUT,
+        }
+        # 전용 풀: 공용 싱글턴은 첫 호출자(HybridRetriever: 3개)가 크기를 정하고,
+        # 타임아웃된 스레드가 풀을 점유하면 다음 검색이 대기열에서 마감을 넘김
+        self.search_executor = ParallelSearchExecutor(max_workers=SEARCH_WORKERS) if self.parallel_search else None
 
         self.logger = get_logger(__name__)
         self.query_optimizer = QueryOptimizer()
@@ -100,6 +119,10 @@ class HybridSearch:
             
             self.vector_store = KoreanVectorStore(index_path=vector_path)
             self.bm25_store = BM25Store(index_path=bm25_path)
+
+            # 재랭킹 시 벡터 스토어의 문서 임베딩 재사용
+            if self.reranker is not None:
+                self.reranker.attach_vector_store(self.vector_store)
             
             self.logger.info("하이브리드 검색 시스템 초기화 완료")
             
@@ -472,6 +495,138 @@ class HybridSearch:
         
         return results
     
+    def _expand_query(self, query: str) -> Tuple[List[str], Optional[Dict[str, Any]], float]:
+        """쿼리 확장 (선택적)
+
+        Returns:
+            (검색에 쓸 확장 쿼리 목록, 확장 정보, 소요 시간)
+        """
+        if not (self.use_query_expansion and self.query_expander):
+            return [], None, 0.0
+
+        expansion_start = time.time()
+        expansion_result = self.query_expander.expand_query(query)
+        expansion_time = time.time() - expansion_start
+
+        # 확장된 쿼리 추가 (상위 몇 개만)
+        expansions = expansion_result['expanded_queries'][:MAX_EXPANSIONS]
+        expansion_info = {
+            'total_expansions': len(expansion_result['expanded_queries']),
+            'used_expansions': len(expansions),
+            'expansion_time': expansion_time
+        }
+        self.logger.info(f"Query expansion: {len(expansions) + 1}개 쿼리 생성 (시간: {expansion_time:.3f}초)")
+        return expansions, expansion_info, expansion_time
+
+    @staticmethod
+    def _timed_batch(search_batch, queries: List[str], top_k: int) -> Tuple[List[Dict[str, Any]], float]:
+        """배치 검색 후 (쿼리 순서대로 이어 붙인 결과, 소요 시간)"""
+        start = time.time()
+        results = []
+        for query_results in search_batch(queries, top_k=top_k):
+            results.extend(query_results)
+        return results, time.time() - start
+
+    def _retrieve_sequential(self, query: str, search_k: int) -> Dict[str, Any]:
+        """쿼리 확장 → 벡터 검색 → BM25 검색 순차 실행"""
+        expansions, expansion_info, expansion_time = self._expand_query(query)
+        expanded_queries = [query] + expansions  # 원본 쿼리는 항상 포함
+
+        # 쿼리 전처리: 한국어 조사 제거 (모든 쿼리에 적용)
+        cleaned_queries = [self.query_optimizer.clean_query_for_search(q) for q in expanded_queries]
+        self.logger.info(f"Query cleaning: {len(cleaned_queries)}개 쿼리 전처리 완료")
+
+        # 백엔드별 배치 호출 1회 (벡터: encode/index.search 1회, BM25: 포스팅 순회 공유)
+        vector_results, vector_time = self._timed_batch(self.vector_store.search_batch, cleaned_queries, search_k)
+        bm25_results, bm25_time = self._timed_batch(self.bm25_store.search_batch, cleaned_queries, search_k)
+
+        return {
+            'expanded_queries': expanded_queries,
+            'expansion_info': expansion_info,
+            'expansion_time': expansion_time,
+            'vector_results': vector_results,
+            'bm25_results': bm25_results,
+            'vector_time': vector_time,
+            'bm25_time': bm25_time,
+            'backend_timings': {},
+            'degraded': [],
+        }
+
+    def _retrieve_parallel(self, query: str, search_k: int) -> Dict[str, Any]:
+        """벡터/BM25/쿼리 확장 동시 실행 (FAISS·NumPy는 GIL 해제)
+
+        1단계: 원본 쿼리로 벡터·BM25 검색과 쿼리 확장을 동시에 실행
+        2단계: 확장 쿼리가 있으면 벡터·BM25 배치 검색을 다시 동시에 실행
+        백엔드별 타임아웃을 넘기거나 실패한 백엔드는 빈 결과로 두고 나머지 결과만 융합합니다.
+        """
+        executor = self.search_executor
+        cleaned_query = self.query_optimizer.clean_query_for_search(query)
+
+        def backend_tasks(queries: List[str]) -> List[Dict[str, Any]]:
+            return [
+                {
+                    'name': 'vector',
+                    'func': self._timed_batch,
+                    'args': (self.vector_store.search_batch, queries, search_k),
+                    'timeout': self.backend_timeouts['vector'],
+                },
+                {
+                    'name': 'bm25',
+                    'func': self._timed_batch,
+                    'args': (self.bm25_store.search_batch, queries, search_k),
+                    'timeout': self.backend_timeouts['bm25'],
+                },
+            ]
+
+        tasks = backend_tasks([cleaned_query])
+        if self.use_query_expansion and self.query_expander:
+            tasks.append({
+                'name': 'expansion',
+                'func': self._expand_query,
+                'args': (query,),
+                'timeout': self.backend_timeouts['expansion'],
+            })
+        phases = [executor.execute_searches(tasks)]
+
+        expansions, expansion_info, expansion_time = [], None, 0.0
+        if phases[0].get('expansion'):
+            expansions, expansion_info, expansion_time = phases[0]['expansion']
+
+        cleaned_expansions = [self.query_optimizer.clean_query_for_search(q) for q in expansions]
+        if cleaned_expansions:
+            phases.append(executor.execute_searches(backend_tasks(cleaned_expansions)))
+
+        merged = {'vector': ([], 0.0), 'bm25': ([], 0.0)}
+        degraded = []
+        backend_timings: Dict[str, Dict[str, float]] = {}
+        for phase in phases:
+            for name, timing in phase.get('_timings', {}).items():
+                total = backend_timings.setdefault(name, {'queue_ms': 0.0, 'run_ms': 0.0})
+                total['queue_ms'] += timing['queue_ms']
+                total['run_ms'] += timing['run_ms']
+            for name in ('vector', 'bm25'):
+                value = phase.get(name)
+                if not value:  # 타임아웃/실패 → []
+                    if name not in degraded:
+                        degraded.append(name)
+                    continue
+                results, elapsed = value
+                merged[name] = (merged[name][0] + results, merged[name][1] + elapsed)
+        if 'expansion' in phases[0].get('_errors', {}):
+            degraded.append('expansion')
+
+        return {
+            'expanded_queries': [query] + expansions,
+            'expansion_info': expansion_info,
+            'expansion_time': expansion_time,
+            'vector_results': merged['vector'][0],
+            'bm25_results': merged['bm25'][0],
+            'vector_time': merged['vector'][1],
+            'bm25_time': merged['bm25'][1],
+            'backend_timings': backend_timings,
+            'degraded': degraded,
+        }
+
     def search(self, query: str, top_k: int = 5, include_debug: bool = False) -> Dict[str, Any]:
         """하이브리드 검색 수행 (문서별 검색 보장 포함)"""
         start_time = time.time()
@@ -486,48 +641,22 @@ class HybridSearch:
             # 1. 쿼리에서 년도 및 키워드 추출
             target_year = self._extract_year_from_query(query)
             keywords = self._extract_keywords_from_query(query)
-            # 1. Query Expansion (선택적)
-            expansion_time = 0.0
-            expanded_queries = [query]  # 원본 쿼리는 항상 포함
-            expansion_info = None
-            
-            if self.use_query_expansion and self.query_expander:
-                expansion_start = time.time()
-                expansion_result = self.query_expander.expand_query(query)
-                expansion_time = time.time() - expansion_start
-                
-                # 확장된 쿼리 추가 (상위 몇 개만)
-                expanded_queries.extend(expansion_result['expanded_queries'][:2])  # 최대 2개 추가
-                expansion_info = {
-                    'total_expansions': len(expansion_result['expanded_queries']),
-                    'used_expansions': min(2, len(expansion_result['expanded_queries'])),
-                    'expansion_time': expansion_time
-                }
-                self.logger.info(f"Query expansion: {len(expanded_queries)}개 쿼리 생성 (시간: {expansion_time:.3f}초)")
-            
-            # 2. 쿼리 전처리: 한국어 조사 제거 (모든 쿼리에 적용)
-            cleaned_queries = []
-            for q in expanded_queries:
-                cleaned = self.query_optimizer.clean_query_for_search(q)
-                cleaned_queries.append(cleaned)
-            
-            self.logger.info(f"Query cleaning: {len(cleaned_queries)}개 쿼리 전처리 완료")
-            
-            # 3. 개별 검색 수행 (확장된 쿼리들로)
-            all_vector_results = []
-            all_bm25_results = []
-            
-            vector_start = time.time()
-            for cleaned_query in cleaned_queries:
-                vector_results = self.vector_store.search(cleaned_query, top_k=top_k * 2)
-                all_vector_results.extend(vector_results)
-            vector_time = time.time() - vector_start
-            
-            bm25_start = time.time()
-            for cleaned_query in cleaned_queries:
-                bm25_results = self.bm25_store.search(cleaned_query, top_k=top_k * 2)
-                all_bm25_results.extend(bm25_results)
-            bm25_time = time.time() - bm25_start
+            # 1~3. 쿼리 확장 + 전처리(조사 제거) + 벡터/BM25 검색
+            if self.parallel_search:
+                retrieval = self._retrieve_parallel(query, top_k * 2)
+            else:
+                retrieval = self._retrieve_sequential(query, top_k * 2)
+            expanded_queries = retrieval['expanded_queries']
+            expansion_info = retrieval['expansion_info']
+            expansion_time = retrieval['expansion_time']
+            all_vector_results = retrieval['vector_results']
+            all_bm25_results = retrieval['bm25_results']
+            vector_time = retrieval['vector_time']
+            bm25_time = retrieval['bm25_time']
+            degraded_backends = retrieval['degraded']
+            backend_timings = retrieval['backend_timings']
+            if degraded_backends:
+                self.logger.warning(f"부분 결과로 융합 (지연/실패 백엔드: {', '.join(degraded_backends)})")
             
             # 중복 제거 (chunk_id 기준)
             seen_vector = set()
@@ -785,8 +914,10 @@ class HybridSearch:
                     'fusion_time': fusion_time,
                     'rerank_time': rerank_time,
                     'compression_time': compression_time,
-                    'total_time': total_time
-                }
+                    'total_time': total_time,
+                    'backends': backend_timings,  # 동시 실행 시 백엔드별 풀 대기/실행 시간 (ms)
+                },
+                'degraded_backends': degraded_backends
             }
             
             # 디버그 정보 추가
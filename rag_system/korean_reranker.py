@@ -4,29 +4,33 @@ Dongjin-kr/ko-reranker 모델을 사용한 문서 재정렬
 """
 
 from app.core.logging import get_logger
+import os
 import torch
 import time
 import re
-import hashlib
 from collections import Counter
 from typing import List, Dict, Any, Tuple, Optional
-from functools import lru_cache
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import numpy as np
 
+from rag_system.rerank_score_cache import RerankScoreCache
+
 try:
-    from sentence_transformers import SentenceTransformer, util
+    from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 # Reranker 설정 상수
 DEFAULT_MODEL_NAME = "Dongjin-kr/ko-reranker"
+FALLBACK_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"  # sentence-transformer 대안 모델
 MAX_TOKEN_LENGTH = 512  # 토큰 최대 길이
 JACCARD_WEIGHT = 0.7  # Jaccard 유사도 가중치
 TF_WEIGHT = 0.3  # Term Frequency 가중치
-CACHE_SIZE = 1024  # 캐시 크기
-BATCH_SIZE = 32  # 배치 처리 크기
+CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))  # 점수 캐시 최대 항목 수 (메모리)
+CACHE_DB_PATH = os.getenv("RERANK_CACHE_DB", "")  # 점수 캐시 SQLite 경로 (빈 값: 영속화 안 함)
+BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))  # cross-encoder 마이크로 배치 크기
+NUM_THREADS = int(os.getenv("RERANK_NUM_THREADS", "0"))  # CPU 추론 스레드 수 (0: torch 기본값)
 
 class KoreanReranker:
     """한국어 문서 재정렬 모델"""
@@ -34,24 +38,35 @@ class KoreanReranker:
     def __init__(self, model_name: str = DEFAULT_MODEL_NAME,
                  fallback_mode: bool = True,
                  device: Optional[str] = None,
-                 batch_size: int = BATCH_SIZE):
+                 batch_size: int = BATCH_SIZE,
+                 num_threads: int = NUM_THREADS,
+                 vector_store=None):
         self.model_name = model_name
         self.model = None
         self.tokenizer = None
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.batch_size = batch_size
+        self.batch_size = max(1, batch_size)
+        self.num_threads = num_threads
         self.logger = get_logger(__name__)
         self.fallback_mode = fallback_mode
+
+        # 임베딩 재사용용 벡터 스토어 (폴백 모델과 같은 모델일 때만 저장 벡터 재사용)
+        self.vector_store = vector_store
         
         # 오프라인 환경이므로 바로 키워드 기반 스코어링 사용
         self.use_keyword_scoring = True
         self.logger.info("오프라인 모드: 키워드 기반 스코어링 사용")
 
+        # 점수 캐시 (모델, 정규화 질의 키, 문서 해시) → 점수
+        self.score_cache = RerankScoreCache(max_entries=CACHE_SIZE, db_path=CACHE_DB_PATH)
+
         # 성능 통계
         self.rerank_count = 0
         self.total_rerank_time = 0.0
-        self.cache_hits = 0
-        self.cache_misses = 0
+        self.forward_passes = 0  # cross-encoder forward 호출 수
+        self.scored_pairs = 0  # cross-encoder로 점수 계산한 (질의, 문서) 쌍 수
+        self.reused_embeddings = 0  # 벡터 스토어에서 재사용한 문서 임베딩 수
+        self.encoded_documents = 0  # 새로 인코딩한 문서 수
     
     def load_model(self):
         """Reranker 모델 로드"""
@@ -70,6 +85,8 @@ class KoreanReranker:
             
             if self.device == "cpu":
                 self.model = self.model.to(self.device)
+                if self.num_threads > 0:
+                    torch.set_num_threads(self.num_threads)
             
             self.model.eval()
             self.logger.info(f"Reranker 모델 로드 완료 (device: {self.device})")
@@ -78,6 +95,21 @@ class KoreanReranker:
             self.logger.error(f"Reranker 모델 로드 실패: {e}")
             raise
     
+    def attach_vector_store(self, vector_store):
+        """KoreanVectorStore 연결 (저장된 문서 벡터를 chunk_id로 재사용)"""
+        self.vector_store = vector_store
+
+    def _shares_embedding_space(self) -> bool:
+        """벡터 스토어 임베딩 모델이 폴백 모델과 같은지
+
+        다른 모델(검색용 임베딩)의 벡터로 점수를 내면 재랭킹 점수가 벡터 검색 유사도와
+        같아지므로, 모델명이 일치할 때만 저장 벡터와 스토어 인코더를 재사용합니다.
+        """
+        if self.vector_store is None:
+            return False
+        store_model = str(getattr(self.vector_store, "model_name", "") or "")
+        return store_model.rsplit("/", 1)[-1] == FALLBACK_MODEL_NAME
+
     def load_fallback_model(self):
         """대안 모델 로드 (로컬 sentence-transformer 기반)"""
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
@@ -90,7 +122,7 @@ class KoreanReranker:
             self.logger.info("대안 Reranker 모델 로딩 중: sentence-transformers 기반")
             
             # 다국어 모델 사용 (한국어 지원)
-            self.sentence_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+            self.sentence_model = SentenceTransformer(FALLBACK_MODEL_NAME)
             self.use_sentence_transformer = True
             
             self.logger.info("대안 Reranker 모델 로드 완료")
@@ -101,27 +133,17 @@ class KoreanReranker:
             self.use_keyword_scoring = True
             self.logger.info("키워드 기반 스코어링으로 폴백")
     
-    def _get_cache_key(self, query: str, document: str) -> str:
-        """캐시 키 생성"""
-        combined = f"{query}::{document[:200]}"  # 문서는 처음 200자만
-        return hashlib.md5(combined.encode()).hexdigest()
-
-    @lru_cache(maxsize=CACHE_SIZE)
-    def _cached_score(self, cache_key: str, query: str, document: str) -> float:
-        """캐시된 점수 계산"""
-        return self._compute_score_internal(query, document)
+    def _scorer_id(self) -> str:
+        """점수 캐시 키에 쓰는 스코어러 식별자 (스코어러가 바뀌면 캐시 분리)"""
+        if self.model is not None:
+            return self.model_name
+        if hasattr(self, 'use_sentence_transformer') and SENTENCE_TRANSFORMERS_AVAILABLE:
+            return f"st:{FALLBACK_MODEL_NAME}"
+        return "keyword"
 
     def compute_score(self, query: str, document: str) -> float:
         """쿼리와 문서 간 관련도 점수 계산 (캐시 적용)"""
-        cache_key = self._get_cache_key(query, document)
-
-        # 캐시 통계 업데이트
-        if cache_key in self._cached_score.__wrapped__.__dict__.get('cache', {}):
-            self.cache_hits += 1
-        else:
-            self.cache_misses += 1
-
-        return self._cached_score(cache_key, query, document)
+        return self.compute_batch_scores(query, [document])[0]
 
     def _compute_score_internal(self, query: str, document: str) -> float:
         """실제 점수 계산 로직"""
@@ -147,40 +169,98 @@ class KoreanReranker:
     
     def _compute_cross_encoder_score(self, query: str, document: str) -> float:
         """Cross-encoder 모델로 점수 계산"""
-        # 입력 텍스트 준비
-        pair = [query, document]
-        
-        # 토크나이징
-        inputs = self.tokenizer(
-            pair,
-            padding=True,
+        return self._compute_cross_encoder_scores(query, [document])[0]
+
+    def _compute_cross_encoder_scores(self, query: str, documents: List[str]) -> List[float]:
+        """Cross-encoder 배치 점수 계산
+
+        (질의, 문서) 쌍을 한 번에 토크나이징한 뒤 토큰 길이 순으로 정렬해
+        마이크로 배치로 나누므로 배치 내 패딩이 최소화됩니다.
+        """
+        if not documents:
+            return []
+
+        # 토크나이징 (패딩 없이 한 번에, 길이 계산용)
+        encoded = self.tokenizer(
+            [query] * len(documents),
+            documents,
             truncation=True,
             max_length=MAX_TOKEN_LENGTH,
-            return_tensors="pt"
-        ).to(self.device)
-        
-        # 점수 계산
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            score = torch.sigmoid(outputs.logits).cpu().numpy()[0][0]
-        
-        return float(score)
+        )
+        keys = list(encoded.keys())
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        order = sorted(range(len(documents)), key=lambda i: lengths[i])
+
+        scores = [0.0] * len(documents)
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch_idx = order[start:start + self.batch_size]
+                features = [{key: encoded[key][i] for key in keys} for i in batch_idx]
+                inputs = self.tokenizer.pad(features, padding=True, return_tensors="pt").to(self.device)
+
+                logits = self.model(**inputs).logits
+                batch_scores = torch.sigmoid(logits[:, 0]).float().cpu().tolist()
+                for i, score in zip(batch_idx, batch_scores):
+                    scores[i] = float(score)
+                self.forward_passes += 1
+
+        self.scored_pairs += len(documents)
+        return scores
     
     def _compute_sentence_transformer_score(self, query: str, document: str) -> float:
         """Sentence Transformer로 점수 계산 (cosine similarity)"""
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             return self._compute_keyword_score(query, document)
-        
-        # 임베딩 생성
-        query_embedding = self.sentence_model.encode([query])
-        doc_embedding = self.sentence_model.encode([document])
-        
-        # 코사인 유사도 계산
-        similarity = util.pytorch_cos_sim(query_embedding, doc_embedding)
-        score = float(similarity[0][0])
-        
+        return self._compute_sentence_transformer_scores(query, [document])[0]
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """폴백 모델 임베딩 생성 (벡터 스토어가 같은 모델이면 스토어 인코더 사용)"""
+        if self._shares_embedding_space():
+            return self.vector_store.encode_texts(texts)
+        return self.sentence_model.encode(
+            texts,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            batch_size=self.batch_size
+        ).astype('float32')
+
+    def _compute_sentence_transformer_scores(self, query: str, documents: List[str],
+                                             doc_ids: Optional[List[Optional[str]]] = None) -> List[float]:
+        """Sentence Transformer 배치 점수 계산
+
+        질의는 한 번만 인코딩하고, 벡터 스토어가 폴백 모델과 같으면 저장된 문서 벡터를 chunk_id로 재사용,
+        나머지 문서만 배치 인코딩한 뒤 행렬곱 한 번으로 코사인 유사도를 계산합니다.
+        """
+        if not documents:
+            return []
+
+        query_vec = self._encode([query])[0]
+
+        stored = {}
+        if doc_ids and self._shares_embedding_space():
+            stored = self.vector_store.get_vectors([doc_id for doc_id in doc_ids if doc_id])
+
+        doc_matrix = np.zeros((len(documents), query_vec.shape[0]), dtype='float32')
+        missing = []
+        for i in range(len(documents)):
+            doc_id = doc_ids[i] if doc_ids else None
+            if doc_id in stored:
+                doc_matrix[i] = stored[doc_id]
+            else:
+                missing.append(i)
+        if missing:
+            doc_matrix[missing] = self._encode([documents[i] for i in missing])
+        self.reused_embeddings += len(documents) - len(missing)
+        self.encoded_documents += len(missing)
+
+        # 코사인 유사도 (행 정규화 후 행렬곱)
+        doc_norms = np.linalg.norm(doc_matrix, axis=1)
+        doc_norms[doc_norms == 0] = 1.0
+        query_norm = np.linalg.norm(query_vec) or 1.0
+        similarities = (doc_matrix @ query_vec) / (doc_norms * query_norm)
+
         # 0-1 범위로 정규화
-        return (score + 1.0) / 2.0
+        return ((similarities + 1.0) / 2.0).tolist()
     
     def _compute_keyword_score(self, query: str, document: str) -> float:
         """키워드 기반 점수 계산 (최후의 수단)"""
@@ -213,20 +293,49 @@ class KoreanReranker:
         
         return min(max(final_score, 0.0), 1.0)
     
-    def compute_batch_scores(self, query: str, documents: List[str]) -> List[float]:
-        """배치로 여러 문서의 점수를 계산"""
+    def compute_batch_scores(self, query: str, documents: List[str],
+                             doc_ids: Optional[List[Optional[str]]] = None) -> List[float]:
+        """배치로 여러 문서의 점수를 계산
+
+        Args:
+            doc_ids: 문서별 chunk_id (sentence-transformer 폴백에서 저장된 벡터 재사용)
+        """
         try:
-            # 각 문서에 대해 개별 점수 계산
-            all_scores = []
-            for doc in documents:
-                score = self.compute_score(query, doc)
-                all_scores.append(score)
-            
-            return all_scores
+            # 캐시 조회 (미스만 계산)
+            scorer_id = self._scorer_id()
+            keys = [RerankScoreCache.make_key(scorer_id, query, doc) for doc in documents]
+            scores = self.score_cache.get_many(keys)
+            missing = [i for i, score in enumerate(scores) if score is None]
+
+            if missing:
+                computed = self._compute_scores(
+                    query,
+                    [documents[i] for i in missing],
+                    [doc_ids[i] for i in missing] if doc_ids else None,
+                )
+                self.score_cache.put_many([keys[i] for i in missing], computed)
+                for i, score in zip(missing, computed):
+                    scores[i] = score
+
+            return scores
             
         except Exception as e:
             self.logger.error(f"배치 점수 계산 실패: {e}")
             return [0.0] * len(documents)
+
+    def _compute_scores(self, query: str, documents: List[str],
+                        doc_ids: Optional[List[Optional[str]]] = None) -> List[float]:
+        """캐시 미스 문서 점수 계산"""
+        # cross-encoder: 길이 버킷 마이크로 배치 추론
+        if self.model is not None:
+            return self._compute_cross_encoder_scores(query, documents)
+
+        # sentence-transformer: 질의 1회 인코딩 + 행렬곱
+        if hasattr(self, 'use_sentence_transformer') and SENTENCE_TRANSFORMERS_AVAILABLE:
+            return self._compute_sentence_transformer_scores(query, documents, doc_ids)
+
+        # 그 외 스코어러: 각 문서에 대해 개별 점수 계산
+        return [self._compute_score_internal(query, doc) for doc in documents]
     
     def rerank(
         self,
@@ -252,9 +361,10 @@ class KoreanReranker:
         try:
             # 문서 텍스트 추출
             documents = [result.get('content', '') for result in search_results]
+            doc_ids = [result.get('chunk_id') for result in search_results]
             
             # 배치 점수 계산
-            rerank_scores = self.compute_batch_scores(query, documents)
+            rerank_scores = self.compute_batch_scores(query, documents, doc_ids)
             
             # 원본 결과에 rerank 점수 추가
             for i, result in enumerate(search_results):
@@ -284,7 +394,7 @@ class KoreanReranker:
 
             self.logger.info(
                 f"문서 재정렬 완료: {len(search_results)}개 → {len(reranked_results)}개 "
-                f"(시간: {rerank_time:.3f}초, 캐시 히트율: {self.cache_hits/(self.cache_hits+self.cache_misses)*100:.1f}%)"
+                f"(시간: {rerank_time:.3f}초, 캐시 히트율: {self.score_cache.get_stats()['hit_rate']:.1f}%)"
             )
             
             return reranked_results
@@ -295,14 +405,20 @@ class KoreanReranker:
 
     def get_stats(self) -> Dict[str, Any]:
         """성능 통계 반환"""
+        cache_stats = self.score_cache.get_stats()
         stats = {
             'rerank_count': self.rerank_count,
             'total_rerank_time': self.total_rerank_time,
             'avg_rerank_time': self.total_rerank_time / self.rerank_count if self.rerank_count > 0 else 0.0,
-            'cache_hits': self.cache_hits,
-            'cache_misses': self.cache_misses,
-            'cache_hit_rate': self.cache_hits / (self.cache_hits + self.cache_misses) * 100 if (self.cache_hits + self.cache_misses) > 0 else 0.0,
-            'cached_score_info': self._cached_score.cache_info() if hasattr(self._cached_score, 'cache_info') else None
+            'cache_hits': cache_stats['hits'],
+            'cache_misses': cache_stats['misses'],
+            'cache_hit_rate': cache_stats['hit_rate'],
+            'score_cache': cache_stats,
+            'batch_size': self.batch_size,
+            'forward_passes': self.forward_passes,
+            'scored_pairs': self.scored_pairs,
+            'reused_embeddings': self.reused_embeddings,
+            'encoded_documents': self.encoded_documents,
         }
         return stats
 
@@ -17,6 +17,20 @@ import torch
 import faiss
 from sentence_transformers import SentenceTransformer
 
+from rag_system.embedding_cache import EmbeddingCache, text_hash
+from rag_system.vector_index_factory import (
+    build_index,
+    code_size,
+    describe_index,
+    effective_encoding,
+    estimate_index_bytes,
+    index_settings_from_env,
+    min_train_vectors,
+    needs_training,
+    set_search_params,
+    stores_full_vectors,
+)
+
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
 except ImportError:
@@ -28,6 +42,8 @@ DEFAULT_EMBEDDING_DIM = 768  # ko-sroberta-multitask 기본 차원
 DEFAULT_INDEX_PATH = "rag_system/db/korean_vector_index.faiss"
 DEFAULT_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"  # 자동 GPU 감지
 MAX_BATCH_SIZE = 1024 if torch.cuda.is_available() else 512  # GPU시 더 큰 배치
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "var/cache/embeddings")  # 빈 값: 캐시 끔
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048"))  # 0: 무제한
 
 # 환경변수 설정 (한 번만)
 if "TRANSFORMERS_OFFLINE" not in os.environ:
@@ -40,12 +56,14 @@ class KoreanVectorStore:
     def __init__(self, model_name: str = DEFAULT_MODEL_NAME,
                  index_path: str = None,
                  device: str = DEFAULT_DEVICE,
-                 batch_size: int = MAX_BATCH_SIZE):
+                 batch_size: int = MAX_BATCH_SIZE,
+                 index_type: str = None):
         self.model_name = model_name
         self.index_path = Path(index_path) if index_path else Path(DEFAULT_INDEX_PATH)
         self.device = device
         self.batch_size = batch_size
         self.metadata_path = self.index_path.with_suffix('.metadata.pkl')
+        self.sidecar_path = self.index_path.with_suffix('.vectors.f32')
         
         self.logger = get_logger(__name__)
         
@@ -53,10 +71,23 @@ class KoreanVectorStore:
         self.embedding_model = None
         self.embedding_dim = DEFAULT_EMBEDDING_DIM
         self._cache_folder = None  # 캐시 폴더 저장
+        self.embedding_cache: Optional[EmbeddingCache] = None  # 색인용 임베딩 디스크 캐시
         
-        # FAISS 인덱스
+        # FAISS 인덱스 (VECTOR_INDEX_TYPE: flat | ivf_flat | ivf_pq | hnsw)
+        self.index_settings = index_settings_from_env()
+        if index_type:
+            self.index_settings["index_type"] = index_type
+        self._pending_training = False  # IVF/SQ8/PQ: 학습 벡터가 충분히 모일 때까지 Flat 인덱스에 보관
         self.index = None
+
+        # 양자화 인덱스 재스코어링: 후보 top_k×factor개를 원본 float32 사이드카(mmap)로 정확 재계산
+        self.rescore_factor = int(os.getenv("VECTOR_RESCORE_FACTOR", "4"))  # 0: 재스코어링 끔
+        self._sidecar: Optional[np.memmap] = None
+        self._sidecar_rows = 0  # 사이드카 파일에 기록된 행 수
+        self._pending_vectors: List[np.ndarray] = []  # 아직 사이드카에 기록되지 않은 벡터
+        self._pending_matrix: Optional[np.ndarray] = None
         self.metadata = []  # 각 벡터에 대응하는 메타데이터
+        self._chunk_rows: Optional[Dict[str, int]] = None  # chunk_id → 벡터 행 (지연 생성)
         
         self._initialize()
     
@@ -81,24 +112,18 @@ class KoreanVectorStore:
             self._cache_folder = self._get_cache_folder()
             
             try:
-                # 로컬 경로에서 직접 로드 시도
-                local_model_path = f"{self._cache_folder}/{self.model_name.replace('/', '--')}"
-                
-                if Path(local_model_path).exists():
-                    self.logger.info(f"로컬 모델 경로 사용: {local_model_path}")
-                    self.embedding_model = SentenceTransformer(
-                        local_model_path,
-                        device=self.device
-                    )
+                model_source, cache_folder = self.model_source()
+                if cache_folder is None:
+                    # 로컬 경로에서 직접 로드
+                    self.logger.info(f"로컬 모델 경로 사용: {model_source}")
                 else:
                     # 로컬 캐시 폴더에서 로드 시도
-                    self.logger.info(f"캐시 폴더에서 로드 시도: {self._cache_folder}")
-                    
-                    self.embedding_model = SentenceTransformer(
-                        self.model_name,
-                        device=self.device,
-                        cache_folder=self._cache_folder
-                    )
+                    self.logger.info(f"캐시 폴더에서 로드 시도: {cache_folder}")
+                self.embedding_model = SentenceTransformer(
+                    model_source,
+                    device=self.device,
+                    cache_folder=cache_folder
+                )
                 
                 # 실제 임베딩 차원 확인
                 self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
@@ -112,6 +137,8 @@ class KoreanVectorStore:
                 # 폴백: 더미 모델 생성
                 self._create_fallback_embedder()
                 self.logger.warning("더미 임베딩 모델로 동작 - 검색 품질 제한됨")
+
+            self._init_embedding_cache()
             
             # FAISS 인덱스 초기화 또는 로드
             if self.index_path.exists() and self.metadata_path.exists():
@@ -123,6 +150,30 @@ class KoreanVectorStore:
             self.logger.error(f"한국어 벡터 스토어 초기화 실패: {e}")
             raise
     
+    def model_source(self) -> Tuple[str, Optional[str]]:
+        """SentenceTransformer 로드 인자 (모델 경로/이름, cache_folder)
+
+        로컬 모델 디렉터리가 있으면 그 경로를, 없으면 모델명과 캐시 폴더를 반환합니다.
+        (재임베딩 워커 프로세스도 같은 방식으로 모델을 로드)
+        """
+        cache_folder = self._cache_folder or self._get_cache_folder()
+        local_model_path = f"{cache_folder}/{self.model_name.replace('/', '--')}"
+        if Path(local_model_path).exists():
+            return local_model_path, None
+        return self.model_name, cache_folder
+
+    def _init_embedding_cache(self):
+        """임베딩 디스크 캐시 초기화 (더미 임베딩 모델은 캐시하지 않음)"""
+        if not EMBEDDING_CACHE_DIR or not isinstance(self.embedding_model, SentenceTransformer):
+            return
+        try:
+            self.embedding_cache = EmbeddingCache(
+                EMBEDDING_CACHE_DIR, self.model_name, self.embedding_dim, normalize=True,
+                max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+            )
+        except OSError as e:
+            self.logger.warning(f"임베딩 캐시 초기화 실패, 캐시 없이 동작: {e}")
+
     def _create_fallback_embedder(self):
         """폴백 임베딩 함수 생성 (TF-IDF 기반)"""
         
@@ -161,9 +212,125 @@ class KoreanVectorStore:
     def create_new_index(self):
         """새 FAISS 인덱스 생성"""
         # 코사인 유사도 기반 인덱스 (한국어 텍스트에 더 적합)
-        self.index = faiss.IndexFlatIP(self.embedding_dim)  # Inner Product (코사인 유사도)
+        index_type = self.index_settings["index_type"]
+        if needs_training(index_type, self.index_settings["encoding"]):
+            # 학습 벡터가 충분히 모일 때까지 Flat 인덱스에 보관 (그동안도 정확 검색 가능)
+            self.index = faiss.IndexFlatIP(self.embedding_dim)
+            self._pending_training = True
+        else:
+            self.index = build_index(self.embedding_dim, **self.index_settings)
+            self._pending_training = False
+            self._apply_search_params()
         self.metadata = []
-        self.logger.info("새 한국어 FAISS 인덱스 생성 완료")
+        self._chunk_rows = None
+        # 기존 사이드카 파일은 다음 save_index에서 덮어씀
+        self._sidecar = None
+        self._sidecar_rows = 0
+        self._pending_vectors = []
+        self._pending_matrix = None
+        self.logger.info(
+            f"새 한국어 FAISS 인덱스 생성 완료 (종류: {index_type}, "
+            f"인코딩: {effective_encoding(index_type, self.index_settings['encoding'])})"
+        )
+
+    def _maybe_train(self, train_vectors: Optional[np.ndarray] = None):
+        """학습 벡터가 최소 개수에 도달하면 학습 (외부 학습 표본 우선, 없으면 모아 둔 벡터)"""
+        min_train = min_train_vectors(**self.index_settings)
+        if train_vectors is not None and len(train_vectors) >= min_train:
+            self._train_index(train_vectors)
+        elif self.index.ntotal >= min_train:
+            self._train_index(self.index.reconstruct_n(0, self.index.ntotal))
+
+    def _train_index(self, train_vectors: np.ndarray):
+        """IVF 계열 인덱스 학습 후 Flat에 모아 둔 벡터를 옮김 (학습 불가 시 Flat 유지)"""
+        self._pending_training = False
+        try:
+            index = build_index(self.embedding_dim, train_vectors=train_vectors, **self.index_settings)
+        except ValueError as e:
+            self.logger.warning(f"FAISS 인덱스 학습 불가, Flat 인덱스 사용: {e}")
+            return
+
+        buffered = self.index.reconstruct_n(0, self.index.ntotal) if self.index.ntotal else None
+        self.index = index
+        self._apply_search_params()
+        self._sidecar = None
+        self._sidecar_rows = 0
+        self._pending_vectors = []
+        self._pending_matrix = None
+        if buffered is not None:
+            self.index.add(buffered)
+            if self._needs_sidecar():
+                self._pending_vectors.append(buffered)
+        self.logger.info(
+            f"FAISS 인덱스 학습 완료: {describe_index(self.index)} "
+            f"(학습 벡터 {len(train_vectors)}개, 이전 벡터 {len(buffered) if buffered is not None else 0}개)"
+        )
+
+    # ---- 원본 벡터 사이드카 (mmap) ---------------------------------------------
+
+    def _needs_sidecar(self) -> bool:
+        """양자화 인덱스 + 재스코어링 사용 여부"""
+        return self.rescore_factor > 0 and self.index is not None and not stores_full_vectors(self.index)
+
+    def _rescore_available(self) -> bool:
+        """모든 벡터의 원본이 사이드카/미저장분에 있는지"""
+        pending = sum(len(v) for v in self._pending_vectors)
+        return self._needs_sidecar() and self._sidecar_rows + pending >= self.index.ntotal
+
+    def _open_sidecar(self):
+        """저장된 사이드카를 읽기 전용 mmap으로 열기"""
+        self._sidecar = None
+        self._sidecar_rows = 0
+        self._pending_vectors = []
+        self._pending_matrix = None
+        if not self.sidecar_path.exists():
+            return
+        rows = self.sidecar_path.stat().st_size // (self.embedding_dim * 4)
+        if rows:
+            self._sidecar = np.memmap(self.sidecar_path, dtype='float32', mode='r',
+                                      shape=(rows, self.embedding_dim))
+            self._sidecar_rows = rows
+
+    def _save_sidecar(self):
+        """미저장 벡터를 사이드카 파일 끝에 추가 (인덱스와 행 순서 동일)"""
+        if not self._needs_sidecar():
+            return
+        self._sidecar = None  # mmap 해제 후 파일 갱신
+        mode = 'r+b' if self.sidecar_path.exists() else 'wb'
+        with open(self.sidecar_path, mode) as f:
+            f.truncate(self._sidecar_rows * self.embedding_dim * 4)
+            f.seek(0, os.SEEK_END)
+            for vectors in self._pending_vectors:
+                f.write(np.ascontiguousarray(vectors, dtype='float32').tobytes())
+        self._open_sidecar()
+
+    def _exact_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """행 번호의 원본 float32 벡터 (사이드카 mmap + 미저장분)"""
+        rows = np.asarray(rows, dtype='int64')
+        out = np.empty((len(rows), self.embedding_dim), dtype='float32')
+        on_disk = rows < self._sidecar_rows
+        if on_disk.any():
+            out[on_disk] = self._sidecar[rows[on_disk]]
+        if not on_disk.all():
+            if self._pending_matrix is None:
+                self._pending_matrix = np.vstack(self._pending_vectors)
+            out[~on_disk] = self._pending_matrix[rows[~on_disk] - self._sidecar_rows]
+        return out
+
+    def _rescore(self, query_vector: np.ndarray, indices: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """후보를 원본 벡터 내적으로 재정렬"""
+        candidates = indices[indices >= 0]
+        exact = self._exact_vectors(candidates) @ query_vector
+        order = np.argsort(-exact, kind='stable')[:top_k]
+        return exact[order], candidates[order]
+
+    def _apply_search_params(self):
+        """nprobe / efSearch 적용 (해당 인덱스에만)"""
+        set_search_params(
+            self.index,
+            nprobe=self.index_settings["nprobe"],
+            ef_search=self.index_settings["ef_search"],
+        )
     
     def save_index(self):
         """인덱스 및 메타데이터 저장"""
@@ -173,6 +340,7 @@ class KoreanVectorStore:
             
             # FAISS 인덱스 저장
             faiss.write_index(self.index, str(self.index_path))
+            self._save_sidecar()
             
             # 메타데이터 저장
             with open(self.metadata_path, 'wb') as f:
@@ -189,10 +357,22 @@ class KoreanVectorStore:
         try:
             # FAISS 인덱스 로드
             self.index = faiss.read_index(str(self.index_path))
+            # 학습 전 Flat 상태로 저장된 인덱스는 계속 벡터를 모음
+            self._pending_training = (
+                needs_training(self.index_settings["index_type"], self.index_settings["encoding"])
+                and describe_index(self.index) in ("IndexFlat", "IndexFlatIP")
+            )
+            self._apply_search_params()
+            self._open_sidecar()
+            if self._needs_sidecar() and not self._rescore_available():
+                self.logger.warning(
+                    f"원본 벡터 사이드카 불일치({self._sidecar_rows}/{self.index.ntotal}), 재스코어링 비활성"
+                )
             
             # 메타데이터 로드
             with open(self.metadata_path, 'rb') as f:
                 self.metadata = pickle.load(f)
+            self._chunk_rows = None
             
             self.logger.info(f"한국어 인덱스 로드 완료: {len(self.metadata)}개 문서")
             
@@ -201,8 +381,25 @@ class KoreanVectorStore:
             # 실패시 새 인덱스 생성
             self.create_new_index()
     
-    def encode_texts(self, texts: List[str]) -> np.ndarray:
-        """텍스트들을 벡터로 변환 (L2 정규화 포함, 배치 처리)"""
+    def encode_texts(self, texts: List[str], use_cache: bool = False) -> np.ndarray:
+        """텍스트들을 벡터로 변환 (L2 정규화 포함, 배치 처리)
+
+        use_cache=True면 내용이 같은 텍스트는 임베딩 디스크 캐시에서 재사용합니다 (색인용).
+        """
+        if not use_cache or self.embedding_cache is None or not texts:
+            return self._encode(texts)
+
+        keys = [text_hash(text) for text in texts]
+        embeddings, found = self.embedding_cache.get_many(keys)
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            embeddings[missing] = self._encode([texts[i] for i in missing])
+            self.embedding_cache.put_many([keys[i] for i in missing], embeddings[missing])
+        self.logger.info(f"임베딩 캐시: {len(texts) - len(missing)}/{len(texts)}개 재사용")
+        return embeddings
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """임베딩 모델 인코딩"""
         try:
             # 대용량 텍스트를 배치로 처리
             if len(texts) > self.batch_size:
@@ -238,49 +435,127 @@ class KoreanVectorStore:
         
         try:
             # 텍스트들을 임베딩으로 변환
-            embeddings = self.encode_texts(texts)
-            
-            # FAISS 인덱스에 추가
-            self.index.add(embeddings)
-            
-            # 메타데이터 추가
-            self.metadata.extend(metadatas)
-            
-            self.logger.info(f"{len(texts)}개 한국어 문서 추가 완료 (총 {len(self.metadata)}개)")
+            embeddings = self.encode_texts(texts, use_cache=True)
+            self.add_embeddings(embeddings, metadatas)
             
         except Exception as e:
             self.logger.error(f"한국어 문서 추가 실패: {e}")
             raise
+
+    def add_embeddings(self, embeddings: np.ndarray, metadatas: List[Dict[str, Any]],
+                       train_vectors: Optional[np.ndarray] = None):
+        """인코딩된 벡터를 인덱스에 추가 (재임베딩 작업 등 외부 인코딩용)
+
+        Args:
+            embeddings: 정규화된 float32 벡터 (메타데이터와 같은 순서)
+            metadatas: 벡터별 메타데이터
+            train_vectors: 학습이 필요한 인덱스의 학습 표본 (None이거나 최소 개수 미만이면 추가된 벡터로 학습)
+        """
+        if len(embeddings) != len(metadatas):
+            raise ValueError("벡터와 메타데이터 개수가 일치하지 않습니다")
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+
+        # FAISS 인덱스에 추가 (IVF/SQ8/PQ는 학습 벡터가 충분히 모이면 학습)
+        self.index.add(embeddings)
+        if self._pending_training:
+            self._maybe_train(train_vectors)
+        elif self._needs_sidecar():
+            self._pending_vectors.append(embeddings)
+            self._pending_matrix = None
+
+        # 메타데이터 추가
+        self.metadata.extend(metadatas)
+        self._chunk_rows = None
+
+        self.logger.info(f"{len(embeddings)}개 한국어 문서 추가 완료 (총 {len(self.metadata)}개)")
     
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """쿼리와 유사한 문서 검색 (코사인 유사도)"""
-        if self.index.ntotal == 0:
+        return self.search_batch([query], top_k=top_k)[0]
+
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리를 한 번에 검색 (encode 1회 + (질의 수 × 차원) 행렬로 index.search 1회)
+
+        Returns:
+            쿼리 순서대로의 결과 목록 (질의별 결과는 search()와 동일)
+        """
+        if not queries:
             return []
+        if self.index.ntotal == 0:
+            return [[] for _ in queries]
         
         try:
             # 쿼리 임베딩 (정규화 포함)
-            query_embedding = self.encode_texts([query])
+            query_embeddings = self.encode_texts(queries)
             
             # FAISS 검색 (내적 기반 - 정규화된 벡터에서는 코사인 유사도와 동일)
-            scores, indices = self.index.search(query_embedding, top_k)
+            rescore = self._rescore_available()
+            k = min(top_k * self.rescore_factor, self.index.ntotal) if rescore else top_k
+            all_scores, all_indices = self.index.search(query_embeddings, k)
             
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.metadata) and idx != -1:  # 유효한 인덱스 확인
-                    result = {
-                        'rank': i + 1,
-                        'score': float(score),  # 코사인 유사도 점수 (높을수록 유사)
-                        'similarity': float(score),  # 정규화된 벡터에서 내적 = 코사인 유사도
-                        **self.metadata[idx]
-                    }
-                    results.append(result)
+            batch_results = []
+            for q, (scores, indices) in enumerate(zip(all_scores, all_indices)):
+                if rescore:
+                    # 양자화 근사 점수 → 원본 벡터 정확 점수로 재정렬
+                    scores, indices = self._rescore(query_embeddings[q], indices, top_k)
+                
+                results = []
+                for i, (score, idx) in enumerate(zip(scores, indices)):
+                    if idx < len(self.metadata) and idx != -1:  # 유효한 인덱스 확인
+                        result = {
+                            'rank': i + 1,
+                            'score': float(score),  # 코사인 유사도 점수 (높을수록 유사)
+                            'similarity': float(score),  # 정규화된 벡터에서 내적 = 코사인 유사도
+                            **self.metadata[idx]
+                        }
+                        results.append(result)
+                batch_results.append(results)
             
-            return results
+            return batch_results
             
         except Exception as e:
             self.logger.error(f"한국어 검색 실패: {e}")
-            return []
+            return [[] for _ in queries]
     
+    def get_vectors(self, chunk_ids: List[str]) -> Dict[str, np.ndarray]:
+        """chunk_id로 저장된 임베딩 조회 (재랭킹 시 재인코딩 없이 재사용)
+
+        Returns:
+            {chunk_id: 정규화된 벡터} (인덱스에 없는 chunk_id는 제외)
+        """
+        if self.index is None or not chunk_ids:
+            return {}
+
+        if self._chunk_rows is None:
+            self._chunk_rows = {
+                meta.get('chunk_id'): row for row, meta in enumerate(self.metadata) if meta.get('chunk_id')
+            }
+
+        found = [(chunk_id, self._chunk_rows.get(chunk_id)) for chunk_id in chunk_ids]
+        found = [(chunk_id, row) for chunk_id, row in found if row is not None and row < self.index.ntotal]
+        if not found:
+            return {}
+
+        # 양자화 인덱스는 사이드카의 원본 벡터 사용
+        if self._rescore_available():
+            exact = self._exact_vectors(np.array([row for _, row in found]))
+            return {chunk_id: vector for (chunk_id, _), vector in zip(found, exact)}
+
+        # IVF 인덱스는 direct map이 있어야 reconstruct 가능
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+            ivf.make_direct_map()
+
+        vectors = {}
+        for chunk_id, row in found:
+            try:
+                vectors[chunk_id] = self.index.reconstruct(row)
+            except RuntimeError as e:
+                # 벡터 재구성을 지원하지 않는 인덱스
+                self.logger.debug(f"벡터 재구성 불가: {e}")
+                break
+        return vectors
+
     def get_stats(self) -> Dict[str, Any]:
         """인덱스 통계 정보"""
         return {
@@ -290,7 +565,32 @@ class KoreanVectorStore:
             'index_path': str(self.index_path),
             'metadata_count': len(self.metadata),
             'model_type': 'Korean Specialized (jhgan/ko-sroberta-multitask)',
-            'similarity_metric': 'Cosine Similarity'
+            'similarity_metric': 'Cosine Similarity',
+            'index_type': self.index_settings['index_type'],
+            'index_class': describe_index(self.index) if self.index else None,
+            'pending_training': self._pending_training,
+            'nprobe': self.index_settings['nprobe'],
+            'ef_search': self.index_settings['ef_search'],
+            'encoding': effective_encoding(self.index_settings['index_type'], self.index_settings['encoding']),
+            'memory': self._memory_stats(),
+            'embedding_cache': self.embedding_cache.get_stats() if self.embedding_cache else None,
+        }
+
+    def _memory_stats(self) -> Dict[str, Any]:
+        """인코딩별 메모리 사용량 (바이트)"""
+        if self.index is None:
+            return {}
+        float32_bytes = self.index.ntotal * self.embedding_dim * 4
+        index_bytes = estimate_index_bytes(self.index)
+        return {
+            'index_bytes': index_bytes,
+            'code_bytes_per_vector': code_size(self.index),
+            'float32_bytes': float32_bytes,
+            'compression_ratio': float32_bytes / index_bytes if index_bytes else 1.0,
+            'sidecar_bytes': self._sidecar_rows * self.embedding_dim * 4,  # mmap: 페이지 캐시, 상주 메모리 아님
+            'pending_bytes': sum(v.nbytes for v in self._pending_vectors),
+            'rescoring': self._rescore_available(),
+            'rescore_factor': self.rescore_factor,
         }
     
     def rebuild_from_existing_data(self, old_vector_store_path: str = None):
@@ -10,12 +10,17 @@ import time
 import gc
 import yaml
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from functools import lru_cache
 import weakref
 
+from rag_system.generation_scheduler import GenerationCancelledError, GenerationDeadlineExceededError, attach_scheduler
+from rag_system.prompt_prefix_cache import PromptPrefixCache, create_prefix_cache
+from rag_system.context_packer import PROMPT_TEMPLATE_TOKENS, context_budget, create_token_counter
+from rag_system.context_packer import mode_max_tokens as env_mode_max_tokens
+
 
 # Generation 설정 상수 - L2 RAG 튜닝 (2025-10-25)
 # 일관성 향상: temperature 0.7 → 0.2
@@ -56,6 +61,7 @@ class RAGResponse:
     generation_time: float
     has_proper_citation: bool
     retry_count: int = 0
+    context_tokens: int = 0  # 프롬프트에 채운 컨텍스트 토큰 수 (모델 토크나이저 기준)
     
     # 적응형 길이 조정 관련 정보
     length_recommendation: Optional[Any] = None
@@ -122,6 +128,12 @@ class QwenLLM:
 
         self.llm = None
         self._load_model()
+
+        # 정적 프롬프트 접두부(시스템 프롬프트 + 고정 지시문) KV 상태 재사용
+        self.prefix_cache = create_prefix_cache(int(os.getenv("LLM_PREFIX_CACHE_SIZE", "4")))
+
+        # 모델 토크나이저 기반 컨텍스트 토큰 예산 (청크 해시별 토큰 수 캐시)
+        self.token_counter = create_token_counter(self.llm)
         
         
         # 인용 패턴 컴파일 (성능 향상)
@@ -286,6 +298,11 @@ class QwenLLM:
 
             self.logger.info(f"⚙️  최적화 모드: {'활성화' if self.use_optimized_prompts else '비활성화'}")
 
+            # 🔒 단일 llama.cpp 컨텍스트 직렬화: 모든 생성 호출은 우선순위 스케줄러 경유
+            if os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true":
+                self.llm = attach_scheduler(self.llm)
+                self.logger.info("🗂️  생성 스케줄러 활성화 (대화형 > 요약 > 쿼리 확장 > 예열)")
+
         except ImportError:
             self.logger.error("llama-cpp-python 패키지가 설치되지 않았습니다.")
             raise
@@ -320,9 +337,42 @@ class QwenLLM:
 
     def create_user_prompt(self, question: str, context_chunks: List[Dict[str, Any]]) -> str:
         """사용자 프롬프트 생성 (최적화 모드 지원)"""
+        return "".join(self.split_user_prompt(question, context_chunks))
+
+    def split_user_prompt(self, question: str, context_chunks: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """사용자 프롬프트를 (정적 지시문, 검색 컨텍스트 + 질문)으로 생성
+
+        정적 지시문은 요청 유형별로 고정이므로 시스템 프롬프트와 함께 KV 상태를 재사용할 수 있도록
+        앞에 두고, 매번 달라지는 검색 컨텍스트와 질문은 뒤에 둔다.
+        """
+        static_prompt, dynamic_prompt, _ = self._build_user_prompt(question, context_chunks)
+        return static_prompt, dynamic_prompt
+
+    def _context_token_budget(self, max_tokens: Optional[int], *prompt_parts: str) -> int:
+        """컨텍스트 토큰 예산 (n_ctx - 생성 예산 - 시스템/지시문/질문 토큰 - 템플릿 여유분)"""
+        overhead = sum(self.token_counter.count(part) for part in prompt_parts if part) + PROMPT_TEMPLATE_TOKENS
+        return context_budget(self.token_counter.n_ctx,
+                              self.config.max_tokens if max_tokens is None else max_tokens, overhead)
+
+    def _pack_context(self, blocks: List[str], budget: int) -> Tuple[str, int]:
+        """문서 블록을 관련도 순으로 예산 안에 채움 (넘치는 블록은 앞부분만)"""
+        packed, tokens = self.token_counter.pack(blocks, budget, separator="", shrink=lambda text, _: text)
+        if len(packed) < len(blocks):
+            self.logger.info(f"📦 컨텍스트 패킹: {len(packed)}/{len(blocks)}개 문서, {tokens}/{budget} 토큰")
+        return "".join(packed), tokens
+
+    def _build_user_prompt(self, question: str, context_chunks: List[Dict[str, Any]],
+                           max_tokens: Optional[int] = None,
+                           system_prompt: Optional[str] = None) -> Tuple[str, str, int]:
+        """(정적 지시문, 컨텍스트 + 질문, 컨텍스트 토큰 수) 생성
+
+        컨텍스트는 모델 토크나이저 기준 n_ctx - max_tokens - 프롬프트 오버헤드 예산에 맞춰 채운다.
+        """
+        if system_prompt is None:
+            system_prompt = self.create_system_prompt()
 
         if self.use_optimized_prompts:
-            return self._create_optimized_user_prompt(question, context_chunks)
+            return self._build_optimized_user_prompt(question, context_chunks, max_tokens, system_prompt)
 
         # 요약 요청 여부 확인
         is_summary_request = any(keyword in question.lower() for keyword in ['요약', '개요', '내용'])
@@ -333,36 +383,10 @@ class QwenLLM:
         # 특별 처리가 필요한 요청
         is_special_request = is_summary_request or is_list_request
 
-        context_text = ""
-        
-        for i, chunk in enumerate(context_chunks, 1):
-            filename = Path(self._get_chunk_source(chunk)).name
-            # 🔥 CRITICAL: Support both 'content' and 'snippet' fields
-            content = chunk.get('content') or chunk.get('snippet', '')
-            score = chunk.get('score', 0.0)
-            
-            context_text += f"\n--- 문서 {i}: {filename} (관련도: {score:.3f}) ---\n"
-            
-            # 특별 요청이 아닌 경우에만 메타데이터 추가 (메타데이터가 답변을 방해하므로)
-            if not is_special_request:
-                metadata = chunk.get('metadata', {})
-                author = metadata.get('기안자', metadata.get('author', ''))
-                doc_date = metadata.get('기안일자', metadata.get('date', ''))
-                doc_type = metadata.get('신청구분', metadata.get('doc_type', ''))
-                
-                if author or doc_date or doc_type:
-                    meta_info = []
-                    if author: meta_info.append(f"기안자: {author}")
-                    if doc_date: meta_info.append(f"날짜: {doc_date}")
-                    if doc_type: meta_info.append(f"문서유형: {doc_type}")
-                    context_text += f"[메타데이터: {', '.join(meta_info)}]\n"
-            
-            context_text += content + "\n"
-        
         # 요청 유형별 특별한 지시문
         if is_summary_request:
             instruction = """🎯 문서 요약 지침:
-위 문서를 철저히 읽고 다음 내용을 포함한 완전한 요약을 제공해주세요:
+아래 문서를 철저히 읽고 다음 내용을 포함한 완전한 요약을 제공해주세요:
 
 1. **문서 기본 정보**: 날짜, 기안자, 문서 종류
 2. **주요 목적**: 무엇을 위한 문서인지
@@ -373,7 +397,7 @@ class QwenLLM:
         
         elif is_list_request:
             instruction = """🎯 전체 목록 추출 지침:
-위 문서에서 언급된 모든 항목들을 완전하게 추출해주세요:
+아래 문서에서 언급된 모든 항목들을 완전하게 추출해주세요:
 
 1. **품목명/모델명**: 정확한 제품명과 모델번호
 2. **수량 및 가격**: 수치 정보를 빠짐없이 포함
@@ -384,43 +408,70 @@ class QwenLLM:
         
         else:
             instruction = """🎯 질문 답변 지침:
-위 문서의 내용을 바탕으로 질문에 대해 완전하고 정확하게 한국어로 답변해주세요.
+아래 문서의 내용을 바탕으로 질문에 대해 완전하고 정확하게 한국어로 답변해주세요.
 문서에서 관련 정보를 찾아 구체적이고 유용한 답변을 제공하고, 반드시 [파일명.pdf] 형식으로 출처를 인용해주세요.
 
 💡 문서에 있는 정보를 적극적으로 활용하여 사용자에게 도움이 되는 한국어 답변을 만들어주세요."""
         
-        return f"""한국어로 답변해주세요.
+        static_prompt = f"""한국어로 답변해주세요.
 
-질문: {question}
+{instruction}
 
-참고 문서:
-{context_text}
+반드시 한국어로만 답변하세요. 중국어나 영어로 답변하지 마세요.
 
-{instruction}
+"""
+        dynamic_template = """참고 문서:
+{context}
+
+질문: {question}"""
 
-반드시 한국어로만 답변하세요. 중국어나 영어로 답변하지 마세요."""
+        blocks = []
+        for i, chunk in enumerate(context_chunks, 1):
+            filename = Path(self._get_chunk_source(chunk)).name
+            # 🔥 CRITICAL: Support both 'content' and 'snippet' fields
+            content = chunk.get('content') or chunk.get('snippet', '')
+            score = chunk.get('score', 0.0)
+            
+            block = f"\n--- 문서 {i}: {filename} (관련도: {score:.3f}) ---\n"
+            
+            # 특별 요청이 아닌 경우에만 메타데이터 추가 (메타데이터가 답변을 방해하므로)
+            if not is_special_request:
+                metadata = chunk.get('metadata', {})
+                author = metadata.get('기안자', metadata.get('author', ''))
+                doc_date = metadata.get('기안일자', metadata.get('date', ''))
+                doc_type = metadata.get('신청구분', metadata.get('doc_type', ''))
+                
+                if author or doc_date or doc_type:
+                    meta_info = []
+                    if author: meta_info.append(f"기안자: {author}")
+                    if doc_date: meta_info.append(f"날짜: {doc_date}")
+                    if doc_type: meta_info.append(f"문서유형: {doc_type}")
+                    block += f"[메타데이터: {', '.join(meta_info)}]\n"
+            
+            blocks.append(block + content + "\n")
 
-    def _create_optimized_user_prompt(self, question: str, context_chunks: List[Dict[str, Any]]) -> str:
-        """최적화된 사용자 프롬프트 생성 - 금액/품목 정보 우선"""
-        context_text = ""
-        total_tokens = 0
+        budget = self._context_token_budget(
+            max_tokens, system_prompt, static_prompt, dynamic_template.format(context="", question=question))
+        context_text, context_tokens = self._pack_context(blocks, budget)
+        return static_prompt, dynamic_template.format(context=context_text, question=question), context_tokens
 
+    def _build_optimized_user_prompt(self, question: str, context_chunks: List[Dict[str, Any]],
+                                     max_tokens: Optional[int], system_prompt: str) -> Tuple[str, str, int]:
+        """최적화된 사용자 프롬프트 생성 - 금액/품목 정보 우선 (정적 지시문, 컨텍스트 + 질문, 컨텍스트 토큰 수)"""
         # 품목/금액 질문인 경우 전체 컨텍스트 사용
         is_items_query = any(kw in question for kw in ['품목', '구매', '소모품', '장비', '물품', '금액', '가격', '얼마'])
 
-        for i, chunk in enumerate(context_chunks, 1):
-            if total_tokens >= self.max_context_tokens:
-                break
-
+        blocks = []
+        for chunk in context_chunks:
             filename = Path(self._get_chunk_source(chunk)).name
             # 🔥 CRITICAL: Support both 'content' and 'snippet' fields
             content = chunk.get('content') or chunk.get('snippet', '')
 
-            context_text += f"\n[{filename}]\n"
+            block = f"\n[{filename}]\n"
 
             if is_items_query:
                 # 품목/금액 질문: 3000자까지 전부 사용 (필터링 X)
-                context_text += content[:3000]
+                block += content[:3000]
             else:
                 # 일반 질문: 중요 키워드 필터링
                 important_keywords = ['날짜', '금액', '구매', '목적', '제목', '수량', '모델', '기안']
@@ -430,33 +481,39 @@ class QwenLLM:
                         important_lines.append(line.strip())
 
                 if important_lines:
-                    context_text += '\n'.join(important_lines[:20])  # 최대 20라인으로 확장
+                    block += '\n'.join(important_lines[:20])  # 최대 20라인으로 확장
 
-            context_text += '\n'
-            total_tokens += len(context_text.split())
+            blocks.append(block + '\n')
 
         # 품목/금액 질문에 특화된 프롬프트
         if is_items_query:
-            return f"""문서:
-{context_text}
-
-질문: {question}
-
-**답변 시 필수 포함 사항:**
+            static_prompt = """**답변 시 필수 포함 사항:**
 1. 품목명 (정확한 이름)
 2. 수량
 3. 금액 (있는 경우 반드시 포함)
 4. 출처: [파일명.pdf]
 
+"""
+            dynamic_template = """문서:
+{context}
+
+질문: {question}
+
 답변:"""
         else:
             # 일반 질문용 프롬프트
-            return f"""문서:
-{context_text}
+            static_prompt = ""
+            dynamic_template = """문서:
+{context}
 
 Q: {question}
 A:"""
 
+        budget = min(self.max_context_tokens, self._context_token_budget(
+            max_tokens, system_prompt, static_prompt, dynamic_template.format(context="", question=question)))
+        context_text, context_tokens = self._pack_context(blocks, budget)
+        return static_prompt, dynamic_template.format(context=context_text, question=question), context_tokens
+
     def create_full_document_prompt(self, question: str, document_text: str, file_path: str) -> str:
         """전체 문서 전용 프롬프트 생성"""
         
@@ -485,20 +542,29 @@ A:"""
 
 답변 목표: 사용자가 문서 내용을 완전히 이해할 수 있는 유용한 요약 + [{filename}]"""
 
+    def _chat_completion(self, messages: List[Dict[str, str]], prefix_key: Optional[str], **kwargs):
+        """create_chat_completion (접두부 캐시 활성 시 정적 접두부 상태 복원 후 생성)"""
+        if self.prefix_cache is None or prefix_key is None:
+            return self.llm.create_chat_completion(messages=messages, **kwargs)
+        return self.prefix_cache.run(
+            self.llm,
+            prefix_key,
+            lambda model: model.create_chat_completion(messages=messages, **kwargs),
+            stream=kwargs.get("stream", False),
+        )
+
+    def _mode_max_tokens(self, mode: str) -> int:
+        """모드별 토큰 예산 (chat/rag/summarize/summary, 그 외는 기본 max_tokens)"""
+        return env_mode_max_tokens(mode, self.config.max_tokens)
+
     def generate_response(self, question: str, context_chunks: List[Dict[str, Any]],
                          max_retries: int = 2, enable_complex_processing: bool = True,
                          mode: str = "rag") -> RAGResponse:
         """RAG 응답 생성 (복합 질문 처리 및 적응형 길이 조정 통합)"""
 
         # 모드별 토큰 예산 적용 (지연 최적화)
-        mode_token_budgets = {
-            "chat": int(os.getenv("CHAT_MAX_TOKENS", "64")),
-            "rag": int(os.getenv("RAG_MAX_TOKENS", "160")),
-            "summarize": int(os.getenv("SUMMARIZE_MAX_TOKENS", "1200")),
-            "summary": int(os.getenv("SUMMARY_MAX_TOKENS", "1200")),  # summary 모드 추가
-        }
-        mode_max_tokens = mode_token_budgets.get(mode.lower(), self.config.max_tokens)
-        self.logger.info(f"🎯 Mode={mode}, max_tokens={mode_max_tokens} (budget: {mode_token_budgets.get(mode.lower(), 'N/A')})")
+        mode_max_tokens = self._mode_max_tokens(mode)
+        self.logger.info(f"🎯 Mode={mode}, max_tokens={mode_max_tokens}")
 
         # 0단계: 같은 문서의 모든 청크 우선 선택 (중간 단계 접근법)
         context_chunks = self._prioritize_same_document_chunks(context_chunks, max_chunks=10)
@@ -513,12 +579,17 @@ A:"""
         else:
             system_prompt = self.create_system_prompt()
             
-        user_prompt = self.create_user_prompt(question, context_chunks)
+        static_prompt, dynamic_prompt, context_tokens = self._build_user_prompt(
+            question, context_chunks, mode_max_tokens, system_prompt)
+        user_prompt = static_prompt + dynamic_prompt
+        prefix_key = PromptPrefixCache.make_key(system_prompt, static_prompt)
         
         retry_count = 0
         start_time = time.time()
-        best_answer = None  # 인용이 없어도 가장 좋은 답변 저장
-        
+        answer = None
+
+        # 단일 패스 생성: 인용이 없어도 전체를 다시 생성하지 않고 context_chunks 출처를 결정적으로 부착
+        # (max_retries는 생성 실패(예외) 재시도에만 사용)
         for attempt in range(max_retries + 1):
             try:
                 # 대화 메시지 구성
@@ -550,8 +621,9 @@ A:"""
                     )
 
                 # 생성
-                response = self.llm.create_chat_completion(
-                    messages=messages,
+                response = self._chat_completion(
+                    messages,
+                    prefix_key,
                     temperature=self.config.temperature,
                     max_tokens=final_max_tokens,
                     top_p=self.config.top_p,
@@ -563,93 +635,61 @@ A:"""
                 answer = response['choices'][0]['message']['content'].strip()
                 # 외국어 텍스트 필터링
                 answer = self._remove_foreign_text(answer)
-                generation_time = time.time() - start_time
-                
-                # 첫 번째 답변을 최선의 답변으로 저장 (인용 없어도)
-                if best_answer is None and len(answer) > 10:  # 너무 짧지 않은 답변만
-                    best_answer = {
-                        'answer': answer,
-                        'generation_time': generation_time,
-                        'retry_count': retry_count
-                    }
-                
-                # 인용 검증
-                citation_check = self._validate_citations(answer, context_chunks)
-                
-                if citation_check['has_citations']:
-                    # 적응형 길이 조정 적용
-                    original_length = len(answer)
-                    length_adjustments = []
-                    adjusted_answer = answer
-                    
-                    if self.config.enable_adaptive_length and length_recommendation:
-                        adjusted_answer, length_adjustments = self.length_analyzer.validate_and_adjust_answer(
-                            answer, length_recommendation)
-                    
-                    # 인용이 있는 답변 - 즉시 반환 (최우선)
-                    return RAGResponse(
-                        answer=adjusted_answer,
-                        sources_cited=citation_check['cited_files'],
-                        confidence=self._calculate_confidence(adjusted_answer, context_chunks),
-                        generation_time=generation_time,
-                        has_proper_citation=True,
-                        retry_count=retry_count,
-                        length_recommendation=length_recommendation,
-                        original_length=original_length,
-                        length_adjustments=length_adjustments,
-                        adaptive_length_used=self.config.enable_adaptive_length
-                    )
-                else:
-                    # 인용이 없지만 답변 품질 체크
-                    if self._is_meaningful_answer(answer):
-                        # 의미있는 답변이면 저장하고 재시도 계속
-                        best_answer = {
-                            'answer': answer,
-                            'generation_time': generation_time,
-                            'retry_count': retry_count
-                        }
-                        self.logger.info(f"인용 없지만 의미있는 답변 저장 (시도 {attempt + 1})")
-                    
-                    # 재시도 조건
-                    retry_count += 1
-                    if attempt < max_retries:
-                        self.logger.warning(f"인용 없는 응답, 재시도 {attempt + 1}/{max_retries}")
-                        # REMOVED: 실제 filename 있을 때만 인용하므로 placeholder 불필요
-                        continue
-                
+                break
+
+            except (GenerationCancelledError, GenerationDeadlineExceededError) as e:
+                # 생성 스케줄러 마감 초과/취소: 재시도는 같은 큐를 다시 기다리므로 바로 폴백
+                self.logger.warning(f"생성 작업 중단 (재시도 안 함): {e}")
+                break
             except Exception as e:
                 self.logger.error(f"응답 생성 실패 (시도 {attempt + 1}): {e}")
                 retry_count += 1
-                
-                if attempt < max_retries:
-                    continue
-        
-        # 모든 재시도 완료 - 최선의 답변 반환 + 출처 강제 추가
-        if best_answer and len(best_answer['answer']) > 10:
-            self.logger.info("인용 없는 답변 → 출처 강제 추가")
 
-            # 사용된 문서 출처 강제 추가
-            answer_with_sources = best_answer['answer']
+        if answer:
+            generation_time = time.time() - start_time
 
-            # 이미 인용이 있는지 다시 확인
-            has_any_citation = '[' in answer_with_sources and '.pdf]' in answer_with_sources
+            # 인용 검증
+            citation_check = self._validate_citations(answer, context_chunks)
 
-            if not has_any_citation:
-                # 상위 2개 문서 출처 강제 추가
-                top_sources = [chunk.get('source', '') for chunk in context_chunks[:2] if chunk.get('source')]
-                if top_sources:
-                    sources_text = ', '.join([f"[{src}]" for src in top_sources])
-                    answer_with_sources += f"\n\n출처: {sources_text}"
-                    self.logger.info(f"출처 강제 추가 완료: {len(top_sources)}개")
+            if citation_check['has_citations']:
+                # 적응형 길이 조정 적용
+                original_length = len(answer)
+                length_adjustments = []
+                adjusted_answer = answer
 
-            return RAGResponse(
-                answer=answer_with_sources,
-                sources_cited=[self._get_chunk_source(chunk) for chunk in context_chunks[:2]],  # 상위 2개 문서
-                confidence=self._calculate_confidence(answer_with_sources, context_chunks) * 0.8,  # 신뢰도 약간 감소
-                generation_time=best_answer['generation_time'],
-                has_proper_citation=True,  # 강제 추가했으므로 True
-                retry_count=best_answer['retry_count']
-            )
+                if self.config.enable_adaptive_length and length_recommendation:
+                    adjusted_answer, length_adjustments = self.length_analyzer.validate_and_adjust_answer(
+                        answer, length_recommendation)
+
+                return RAGResponse(
+                    answer=adjusted_answer,
+                    sources_cited=citation_check['cited_files'],
+                    confidence=self._calculate_confidence(adjusted_answer, context_chunks),
+                    generation_time=generation_time,
+                    has_proper_citation=True,
+                    retry_count=retry_count,
+                    length_recommendation=length_recommendation,
+                    original_length=original_length,
+                    length_adjustments=length_adjustments,
+                    adaptive_length_used=self.config.enable_adaptive_length,
+                    context_tokens=context_tokens
+                )
+
+            # 인용 없는 답변 → 출처 부착 (이전에는 여기서 max_retries회 전체 재생성 후 부착)
+            answer_with_sources, top_sources = self._attach_sources(answer, context_chunks)
+            usable = len(answer) > 10
+            self._record_citation_metrics(forced=usable and bool(top_sources), retry_avoided=max_retries > 0)
+
+            if usable:
+                return RAGResponse(
+                    answer=answer_with_sources,
+                    sources_cited=top_sources,
+                    confidence=self._calculate_confidence(answer_with_sources, context_chunks) * 0.8,  # 신뢰도 약간 감소
+                    generation_time=generation_time,
+                    has_proper_citation=bool(top_sources),
+                    retry_count=retry_count,
+                    context_tokens=context_tokens
+                )
         
         # 완전 실패 - 하지만 context_chunks가 있으면 기본 요약 제공
         generation_time = time.time() - start_time
@@ -693,6 +733,96 @@ A:"""
             retry_count=retry_count
         )
     
+    def _attach_sources(self, answer: str, context_chunks: List[Dict[str, Any]],
+                        max_sources: int = 2) -> Tuple[str, List[str]]:
+        """인용 없는 답변에 상위 문서 출처 부착 (검색 순위 기준, 같은 파일은 한 번만)"""
+        top_sources = []
+        for chunk in context_chunks:
+            source = self._get_chunk_source(chunk)
+            if source and source not in top_sources:
+                top_sources.append(source)
+                if len(top_sources) >= max_sources:
+                    break
+
+        if not top_sources:
+            return answer, []
+        self.logger.info(f"출처 부착: {len(top_sources)}개")
+        return answer + "\n\n출처: " + ', '.join(f"[{src}]" for src in top_sources), top_sources
+
+    def _record_citation_metrics(self, forced: bool, retry_avoided: bool) -> None:
+        """인용 누락 메트릭 기록 (/metrics: citation_forced_total, citation_retry_avoided_total)"""
+        try:
+            from app.rag.metrics_collector import get_metrics_collector
+            metrics = get_metrics_collector()
+            if forced:
+                metrics.record_citation_forced()
+            if retry_avoided:
+                metrics.record_citation_retry_avoided()
+        except Exception as e:
+            self.logger.debug(f"인용 메트릭 기록 실패 (무시): {e}")
+
+    # 스트리밍 조각 단위 외국어 문자 제거 (_remove_foreign_text는 완성된 라인 단위)
+    _FOREIGN_CHARS = re.compile(
+        r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff\u3040-\u309f\u30a0-\u30ff'
+        r'。，、；：？！…—·「」『』（）【】《》〈〉]'
+    )
+
+    def generate_stream(self, question: str, context_chunks: List[Dict[str, Any]],
+                        mode: str = "rag") -> Iterator[str]:
+        """RAG 응답 토큰 스트리밍 (create_chat_completion(stream=True))
+
+        생성되는 즉시 텍스트 조각을 yield한다. 답변에 인용이 없으면 상위 문서 출처를
+        마지막 조각으로 덧붙인다 (generate_response와 동일).
+        """
+        max_tokens = self._mode_max_tokens(mode)
+        context_chunks = self._prioritize_same_document_chunks(context_chunks, max_chunks=10)
+        system_prompt = self.create_system_prompt()
+        static_prompt, dynamic_prompt, context_tokens = self._build_user_prompt(
+            question, context_chunks, max_tokens, system_prompt)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": static_prompt + dynamic_prompt},
+        ]
+
+        start_time = time.time()
+        first_token_time = None
+        parts = []
+        stream = self._chat_completion(
+            messages,
+            PromptPrefixCache.make_key(system_prompt, static_prompt),
+            temperature=self.config.temperature,
+            max_tokens=max_tokens,
+            top_p=self.config.top_p,
+            top_k=self.config.top_k,
+            repeat_penalty=self.config.repeat_penalty,
+            stop=self.stop_tokens,
+            stream=True,
+        )
+        for chunk in stream:
+            delta = chunk['choices'][0].get('delta', {}).get('content')
+            if not delta:
+                continue
+            delta = self._FOREIGN_CHARS.sub('', delta)
+            if not delta:
+                continue
+            if first_token_time is None:
+                first_token_time = time.time() - start_time
+            parts.append(delta)
+            yield delta
+
+        answer = ''.join(parts)
+        if answer.strip() and not self._validate_citations(answer, context_chunks)['has_citations']:
+            answer_with_sources, top_sources = self._attach_sources(answer, context_chunks)
+            self._record_citation_metrics(forced=bool(top_sources), retry_avoided=False)
+            if top_sources:
+                yield answer_with_sources[len(answer):]
+
+        self.logger.info(
+            f"🎯 Stream mode={mode}, max_tokens={max_tokens}, context_tokens={context_tokens}, pieces={len(parts)}, "
+            f"ttft={first_token_time if first_token_time is not None else -1:.2f}s, "
+            f"total={time.time() - start_time:.2f}s"
+        )
+
     def _generate_structured_response(self, question_analysis: Dict[str, Any], 
                                     context_chunks: List[Dict[str, Any]], 
                                     max_retries: int = 2) -> RAGResponse:
@@ -0,0 +1,187 @@
+"""
+프롬프트 접두부 KV 상태 캐시
+
+RAG 답변 프롬프트는 시스템 프롬프트 + 요청 유형별 고정 지시문(정적 접두부) 뒤에 검색 컨텍스트와
+질문(동적 접미부)이 붙는 구조입니다. llama.cpp는 직전 평가 토큰(input_ids)과 새 프롬프트의
+공통 접두부를 재사용하므로, 접두부별로 저장해 둔 모델 상태(save_state)를 생성 직전에 복원하면
+쿼리 확장·요약 등 다른 프롬프트가 사이에 끼어도 접두부 토큰은 다시 평가하지 않습니다.
+
+- 접두부 키별 첫 생성 후 상태 저장 (LRU, 상태 1개 ≈ 해당 토큰 수만큼의 KV 캐시)
+- 모델이 이미 접두부를 보유하고 있으면 복원 생략 (resident)
+- 재사용 토큰 수는 같은 키의 두 요청이 공유한 최소 공통 접두부로 학습
+
+llama_cpp.LlamaCache(set_cache)는 모든 완료 요청마다 상태를 저장하므로, 고정 접두부만 명시적으로
+관리합니다. 상태 저장/복원은 모델 컨텍스트를 건드리므로 ScheduledLlama면 생성 스케줄러 워커에서
+생성과 함께 실행합니다.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from app.core.logging import get_logger
+from rag_system.generation_scheduler import ScheduledLlama
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _PrefixEntry:
+    state: Any                        # llama_cpp.LlamaState
+    prefix_len: Optional[int] = None  # 같은 키 요청 간 공통 접두부 토큰 수 (두 번째 요청부터)
+
+
+def _common_prefix_len(a: Sequence[int], b: Sequence[int]) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class PromptPrefixCache:
+    """정적 프롬프트 접두부 → 모델 상태 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 4):
+        """
+        Args:
+            max_entries: 보관할 접두부 상태 수 (상태마다 KV 캐시 사본을 메모리에 유지)
+        """
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, _PrefixEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "misses": 0,
+            "restored": 0,
+            "resident": 0,
+            "saved": 0,
+            "evictions": 0,
+            "reused_tokens": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def make_key(*static_parts: str) -> str:
+        """정적 프롬프트 조각들로 접두부 키 생성"""
+        h = hashlib.sha1()
+        for part in static_parts:
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    # ---------------------------------------------------------------- 실행
+
+    def run(self, llm: Any, key: str, fn: Callable[[Any], Any], stream: bool = False) -> Any:
+        """접두부 상태 복원 → fn(model) 생성 → 상태 저장/접두부 길이 갱신
+
+        Args:
+            llm: llama_cpp.Llama 또는 ScheduledLlama
+            key: make_key()로 만든 접두부 키
+            fn: 모델을 받아 생성 결과(stream이면 조각 이터레이터)를 반환하는 함수
+            stream: True면 조각 이터레이터 반환
+        """
+        if isinstance(llm, ScheduledLlama):
+            if stream:
+                return llm.scheduler.run_stream(lambda model: self._generate_stream(model, key, fn))
+            return llm.scheduler.run(lambda model: self._generate(model, key, fn))
+        if stream:
+            return self._generate_stream(llm, key, fn)
+        return self._generate(llm, key, fn)
+
+    def _generate(self, model: Any, key: str, fn: Callable[[Any], Any]) -> Any:
+        self._restore(model, key)
+        result = fn(model)
+        self._remember(model, key)
+        return result
+
+    def _generate_stream(self, model: Any, key: str, fn: Callable[[Any], Iterator[Any]]) -> Iterator[Any]:
+        self._restore(model, key)
+        yield from fn(model)
+        self._remember(model, key)  # 중단된 스트림은 저장하지 않음
+
+    def _restore(self, model: Any, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return
+            self._entries.move_to_end(key)
+
+        try:
+            if entry.prefix_len and self._holds_prefix(model, entry):
+                self._count("resident")
+            else:
+                model.load_state(entry.state)
+                self._count("restored")
+            if entry.prefix_len:
+                self._count("reused_tokens", entry.prefix_len)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"접두부 상태 복원 실패 (전체 프롬프트 평가): {e}")
+
+    def _remember(self, model: Any, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+        try:
+            if entry is None:
+                state = model.save_state()
+                with self._lock:
+                    self._entries[key] = _PrefixEntry(state)
+                    self.stats["saved"] += 1
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.stats["evictions"] += 1
+                return
+
+            common = _common_prefix_len(entry.state.input_ids, model.input_ids)
+            if entry.prefix_len is None or common < entry.prefix_len:
+                entry.prefix_len = common
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"접두부 상태 저장 실패: {e}")
+
+    @staticmethod
+    def _holds_prefix(model: Any, entry: _PrefixEntry) -> bool:
+        """모델의 현재 평가 토큰이 이미 접두부를 포함하는지"""
+        n = entry.prefix_len
+        current = model.input_ids
+        return len(current) >= n and _common_prefix_len(current[:n], entry.state.input_ids[:n]) == n
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    # ---------------------------------------------------------------- 메트릭
+
+    def get_stats(self) -> Dict[str, Any]:
+        """복원/보유/저장 횟수와 재사용 토큰 수"""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+        lookups = stats["misses"] + stats["restored"] + stats["resident"]
+        return {
+            **stats,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hit_rate": round((stats["restored"] + stats["resident"]) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_default_cache: Optional[PromptPrefixCache] = None
+
+
+def create_prefix_cache(max_entries: int) -> Optional[PromptPrefixCache]:
+    """접두부 캐시 생성 후 프로세스 기본 캐시로 등록 (/metrics 조회용, 0 이하면 끔)"""
+    global _default_cache
+    if max_entries <= 0:
+        return None
+    _default_cache = PromptPrefixCache(max_entries)
+    return _default_cache
+
+
+def get_prefix_cache_stats() -> Optional[Dict[str, Any]]:
+    """기본 접두부 캐시 통계 (비활성/모델 미로드 시 None)"""
+    return _default_cache.get_stats() if _default_cache else None
@@ -0,0 +1,198 @@
+"""
+전체 재임베딩 작업 (멀티 프로세스 샤딩 + 체크포인트)
+
+청크 목록을 길이순으로 정렬해 샤드로 나누고(샤드 내 길이가 비슷해 패딩 낭비 감소),
+N개 워커 프로세스가 각자 모델을 로드해 샤드를 인코딩합니다.
+- 워커마다 torch 스레드 수를 고정해 코어를 나눠 씀 (과구독 방지)
+- 샤드 결과는 체크포인트 디렉터리에 .npy로 원자적 기록 → 중단 후 재실행 시 완료된 샤드는 건너뜀
+- 완료된 샤드는 샤드 순서대로 FAISS 인덱스에 바로 추가 (인덱스 행 순서 = 길이 정렬 순서,
+  메타데이터도 같은 순서로 재배열되므로 chunk_id 조회에는 영향 없음)
+- 학습이 필요한 인덱스(IVF/SQ8/PQ)는 모든 샤드가 끝난 뒤 전체에서 고르게 뽑은 표본으로 학습
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.logging import get_logger
+from rag_system.embedding_cache import text_hash
+
+logger = get_logger(__name__)
+
+DEFAULT_SHARD_SIZE = 2048
+DEFAULT_TRAIN_MAX = 100_000
+MANIFEST_FILE = "manifest.json"
+
+_WORKER_MODEL = None  # 워커 프로세스별 임베딩 모델
+
+
+def _init_worker(model_source: str, cache_folder: Optional[str], device: str, threads: int):
+    """워커 프로세스 초기화 (스레드 수 고정 + 모델 로드)"""
+    global _WORKER_MODEL
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _WORKER_MODEL = SentenceTransformer(model_source, device=device, cache_folder=cache_folder)
+
+
+def _encode_shard(shard_path: str, texts: List[str], batch_size: int) -> int:
+    """샤드 인코딩 후 체크포인트 기록 (워커 프로세스)"""
+    embeddings = _WORKER_MODEL.encode(
+        texts,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+        normalize_embeddings=True,
+        batch_size=batch_size,
+    )
+    _save_shard(Path(shard_path), embeddings)
+    return len(texts)
+
+
+def _save_shard(path: Path, embeddings: np.ndarray):
+    """임시 파일에 쓴 뒤 교체 (중단 시 반쯤 쓴 샤드가 남지 않음)"""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(embeddings, dtype="float32"))
+    os.replace(tmp_path, path)
+
+
+def _fingerprint(model_name: str, texts: List[str], shard_size: int) -> str:
+    """작업 식별자 (모델, 샤드 크기, 텍스트 내용이 같을 때만 체크포인트 재사용)"""
+    digest = hashlib.sha1(f"{model_name}|{shard_size}|{len(texts)}".encode("utf-8"))
+    for text in texts:
+        digest.update(text_hash(text).encode("ascii"))
+    return digest.hexdigest()
+
+
+def _prepare_checkpoint(checkpoint_dir: Path, fingerprint: str) -> None:
+    """체크포인트 디렉터리 준비 (다른 작업의 체크포인트면 비움)"""
+    manifest_path = checkpoint_dir / MANIFEST_FILE
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("fingerprint") == fingerprint:
+            return
+        logger.info(f"다른 작업의 체크포인트 삭제: {checkpoint_dir}")
+        shutil.rmtree(checkpoint_dir)
+
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps({"fingerprint": fingerprint, "created_at": time.time()}), encoding="utf-8"
+    )
+
+
+def _training_sample(shard_paths: List[Path], total: int, train_max: int) -> np.ndarray:
+    """모든 샤드에서 고르게 뽑은 학습 표본"""
+    step = max(1, -(-total // train_max))
+    parts = [np.load(path, mmap_mode="r")[::step] for path in shard_paths]
+    return np.ascontiguousarray(np.vstack(parts), dtype="float32")
+
+
+def reembed(store, texts: List[str], metadatas: List[Dict[str, Any]], workers: int = 1,
+            shard_size: int = DEFAULT_SHARD_SIZE, threads: int = 0,
+            checkpoint_dir: Optional[str] = None, train_max: int = DEFAULT_TRAIN_MAX) -> Dict[str, Any]:
+    """전체 재임베딩 후 store 인덱스를 새로 구축·저장
+
+    Args:
+        store: KoreanVectorStore
+        texts: 청크 텍스트
+        metadatas: 청크 메타데이터 (texts와 같은 순서)
+        workers: 인코딩 프로세스 수 (1이면 현재 프로세스에서 인코딩)
+        shard_size: 샤드당 청크 수 (체크포인트 단위)
+        threads: 워커당 torch 스레드 수 (0: CPU 코어 수 / workers)
+        checkpoint_dir: 체크포인트 디렉터리 (None: <인덱스 경로>.reembed)
+        train_max: 학습 표본 최대 수
+
+    Returns:
+        작업 통계
+    """
+    if len(texts) != len(metadatas):
+        raise ValueError("텍스트와 메타데이터 개수가 일치하지 않습니다")
+
+    start = time.perf_counter()
+    checkpoint = Path(checkpoint_dir) if checkpoint_dir else store.index_path.with_suffix(".reembed")
+    _prepare_checkpoint(checkpoint, _fingerprint(store.model_name, texts, shard_size))
+
+    # 길이 내림차순 정렬 → 샤드 내 길이가 비슷해 패딩 감소
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    shards = [order[i:i + shard_size] for i in range(0, len(order), shard_size)]
+    shard_paths = [checkpoint / f"shard_{i:05d}.npy" for i in range(len(shards))]
+    done = {i for i, path in enumerate(shard_paths) if path.exists()}
+    resumed = len(done)
+    if resumed:
+        logger.info(f"체크포인트에서 재개: {resumed}/{len(shards)} 샤드 완료")
+
+    store.create_new_index()
+    defer = store._pending_training  # 학습 필요 인덱스는 전체 샤드 완료 후 추가
+    next_shard = 0
+
+    def add_shard(shard: int, train_vectors: Optional[np.ndarray] = None):
+        rows = shards[shard]
+        embeddings = np.load(shard_paths[shard])
+        store.add_embeddings(embeddings, [metadatas[i] for i in rows], train_vectors=train_vectors)
+        if store.embedding_cache is not None:
+            # 이후 증분 색인에서 같은 내용은 재인코딩하지 않도록 캐시에도 기록
+            store.embedding_cache.put_many([text_hash(texts[i]) for i in rows], embeddings)
+
+    def stream_completed():
+        nonlocal next_shard
+        while not defer and next_shard in done:
+            add_shard(next_shard)
+            next_shard += 1
+
+    stream_completed()
+    pending = [i for i in range(len(shards)) if i not in done]
+
+    if pending and workers > 1:
+        threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        model_source, cache_folder = store.model_source()
+        logger.info(f"재임베딩: {len(pending)}개 샤드, 워커 {workers}개 × 스레드 {threads}개")
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(model_source, cache_folder, store.device, threads)) as pool:
+            futures = {
+                pool.submit(_encode_shard, str(shard_paths[i]), [texts[j] for j in shards[i]], store.batch_size): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                future.result()
+                done.add(futures[future])
+                logger.info(f"재임베딩 진행: {len(done)}/{len(shards)} 샤드")
+                stream_completed()
+    else:
+        for i in pending:
+            _save_shard(shard_paths[i], store._encode([texts[j] for j in shards[i]]))
+            done.add(i)
+            logger.info(f"재임베딩 진행: {len(done)}/{len(shards)} 샤드")
+            stream_completed()
+
+    if defer and shards:
+        add_shard(0, train_vectors=_training_sample(shard_paths, len(texts), train_max))
+        next_shard = 1
+        defer = False
+        stream_completed()
+
+    store.save_index()
+    shutil.rmtree(checkpoint, ignore_errors=True)
+
+    stats = {
+        "chunks": len(texts),
+        "shards": len(shards),
+        "resumed_shards": resumed,
+        "encoded_shards": len(shards) - resumed,
+        "workers": workers,
+        "elapsed": time.perf_counter() - start,
+    }
+    logger.info(f"재임베딩 완료: {stats}")
+    return stats
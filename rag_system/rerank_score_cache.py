@@ -0,0 +1,215 @@
+"""
+재랭킹 점수 캐시
+
+(모델, 정규화된 질의 키, 문서 내용 해시) → 점수(float)만 보관합니다.
+- 메모리: LRU (항목 수 상한, 문서 원문은 보관하지 않음)
+- 디스크: 선택적 SQLite 영속화 (재시작 후에도 인기 질의 재랭킹 비용 0)
+
+질의 키는 QueryCache/PersistentCache와 같은 generate_smart_cache_key를 사용하므로
+표기만 다른 질의(공백, 구두점, 동의어)는 같은 점수를 공유합니다.
+"""
+
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.rag.smart_cache_key import generate_smart_cache_key
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+def content_hash(content: str) -> str:
+    """문서 내용 해시 (전체 내용 기준)"""
+    return hashlib.sha1((content or "").encode("utf-8")).hexdigest()
+
+
+class RerankScoreCache:
+    """재랭킹 점수 캐시 (메모리 LRU + 선택적 SQLite)"""
+
+    def __init__(self, max_entries: int = 4096, db_path: Optional[str] = None,
+                 max_db_rows: int = 200_000, cleanup_prob: float = 0.01):
+        """
+        Args:
+            max_entries: 메모리 캐시 최대 항목 수
+            db_path: SQLite 경로 (None/빈 문자열이면 영속화 안 함)
+            max_db_rows: SQLite 최대 행 수 (초과 시 오래된 접근부터 축출)
+            cleanup_prob: put 시 크기 정리 확률
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path or None
+        self.max_db_rows = max_db_rows
+        self.cleanup_prob = cleanup_prob
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[CacheKey, float]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+        }
+
+        if self.db_path:
+            try:
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._init_db()
+            except Exception as e:
+                logger.warning(f"재랭킹 점수 캐시 DB 초기화 실패, 메모리 캐시만 사용: {e}")
+                self.db_path = None
+
+    # ---- 키 ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(model: str, query: str, content: str) -> CacheKey:
+        return (model, generate_smart_cache_key(query), content_hash(content))
+
+    @staticmethod
+    def _db_key(key: CacheKey) -> str:
+        return "|".join(key)
+
+    # ---- SQLite --------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=5000;")
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rerank_scores (
+                    cache_key   TEXT PRIMARY KEY,
+                    score       REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rerank_accessed_at ON rerank_scores(accessed_at)"
+            )
+
+    def _db_get_many(self, keys: List[CacheKey]) -> Dict[CacheKey, float]:
+        db_keys = {self._db_key(key): key for key in keys}
+        found: Dict[CacheKey, float] = {}
+        try:
+            with self._connect() as conn:
+                placeholders = ",".join("?" * len(db_keys))
+                rows = conn.execute(
+                    f"SELECT cache_key, score FROM rerank_scores WHERE cache_key IN ({placeholders})",
+                    list(db_keys),
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE rerank_scores SET accessed_at=? WHERE cache_key=?",
+                        [(time.time(), db_key) for db_key, _ in rows],
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"재랭킹 점수 캐시 조회 실패: {e}")
+            return {}
+
+        for db_key, score in rows:
+            found[db_keys[db_key]] = float(score)
+        return found
+
+    def _db_put_many(self, items: List[Tuple[CacheKey, float]]):
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO rerank_scores (cache_key, score, accessed_at) VALUES (?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE SET score=excluded.score, accessed_at=excluded.accessed_at
+                    """,
+                    [(self._db_key(key), score, now) for key, score in items],
+                )
+                if random.random() < self.cleanup_prob:
+                    self._enforce_db_limit(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"재랭킹 점수 캐시 저장 실패: {e}")
+
+    def _enforce_db_limit(self, conn: sqlite3.Connection):
+        """행 수 상한 초과 시 오래된 접근부터 축출"""
+        (rows,) = conn.execute("SELECT COUNT(*) FROM rerank_scores").fetchone()
+        excess = rows - self.max_db_rows
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM rerank_scores WHERE cache_key IN "
+                "(SELECT cache_key FROM rerank_scores ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+            logger.info(f"재랭킹 점수 캐시 DB 정리: {excess}개 축출")
+
+    # ---- 핵심 API --------------------------------------------------------------
+
+    def _remember(self, key: CacheKey, score: float):
+        """메모리 LRU에 저장 (호출 측에서 lock 보유)"""
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_many(self, keys: List[CacheKey]) -> List[Optional[float]]:
+        """키 목록의 캐시된 점수 (없으면 None)"""
+        scores: List[Optional[float]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                score = self._cache.get(key)
+                if score is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    scores[i] = score
+
+        if missing and self.db_path:
+            found = self._db_get_many([keys[i] for i in missing])
+            if found:
+                with self._lock:
+                    for key, score in found.items():
+                        self._remember(key, score)
+                self.stats["disk_hits"] += len(found)
+                for i in missing:
+                    scores[i] = found.get(keys[i])
+
+        with self._lock:
+            misses = sum(1 for score in scores if score is None)
+            self.stats["misses"] += misses
+            self.stats["hits"] += len(keys) - misses
+        return scores
+
+    def put_many(self, keys: List[CacheKey], scores: List[float]):
+        """점수 저장 (float만 보관)"""
+        items = [(key, float(score)) for key, score in zip(keys, scores)]
+        with self._lock:
+            for key, score in items:
+                self._remember(key, score)
+        if self.db_path and items:
+            self._db_put_many(items)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM rerank_scores")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "hit_rate": self.stats["hits"] / lookups * 100 if lookups else 0.0,
+                "persistent": self.db_path is not None,
+                "db_path": self.db_path,
+            }
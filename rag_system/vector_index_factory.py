@@ -0,0 +1,184 @@
+"""
+FAISS 벡터 인덱스 팩토리
+
+KoreanVectorStore와 벤치마크 스크립트가 같은 방식으로 인덱스를 만들도록
+인덱스 종류별 생성·학습·검색 파라미터 설정을 모아둡니다.
+
+- flat: 전체 탐색 (정확, 소규모)
+- ivf_flat: IVF 역파일 + 원본 벡터 (nprobe로 재현율/지연 조절)
+- ivf_pq: IVF + Product Quantization (메모리 절감, 근사 점수)
+- hnsw: HNSW 그래프 (학습 불필요, efSearch로 재현율/지연 조절)
+
+벡터 저장 인코딩 (VECTOR_ENCODING, ivf_pq는 항상 pq):
+- float32: 원본 그대로 (dim×4 바이트)
+- fp16: 반정밀도 (dim×2 바이트)
+- sq8: 8bit 스칼라 양자화 (dim 바이트, 학습 필요)
+- pq: Product Quantization (pq_m 바이트, 학습 필요)
+
+모든 인덱스는 내적(METRIC_INNER_PRODUCT)을 사용합니다 (정규화 벡터 → 코사인 유사도).
+"""
+
+import math
+import os
+from typing import Any, Dict, Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+ENCODINGS = ("float32", "fp16", "sq8", "pq")
+_ENCODING_CODES = {"float32": "Flat", "fp16": "SQfp16", "sq8": "SQ8"}
+_FULL_PRECISION_CLASSES = ("IndexFlat", "IndexFlatIP", "IndexFlatL2", "IndexIVFFlat", "IndexHNSWFlat")
+MIN_POINTS_PER_CENTROID = 39  # faiss k-means 권장 centroid당 최소 학습 벡터 수
+PQ_MIN_TRAIN = 256  # PQ 코드북(8bit) 학습 최소 벡터 수
+
+
+def index_settings_from_env() -> Dict[str, Any]:
+    """환경변수 인덱스 설정"""
+    return {
+        "index_type": os.getenv("VECTOR_INDEX_TYPE", "flat").strip().lower(),
+        "encoding": os.getenv("VECTOR_ENCODING", "float32").strip().lower(),
+        "nlist": int(os.getenv("VECTOR_IVF_NLIST", "0")),  # 0: 학습 벡터 수로 자동 결정
+        "pq_m": int(os.getenv("VECTOR_PQ_M", "64")),
+        "hnsw_m": int(os.getenv("VECTOR_HNSW_M", "32")),
+        "ef_construction": int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "80")),
+        "nprobe": int(os.getenv("VECTOR_NPROBE", "16")),
+        "ef_search": int(os.getenv("VECTOR_HNSW_EF_SEARCH", "64")),
+        "train_min": int(os.getenv("VECTOR_TRAIN_MIN", "0")),  # 0: 인덱스 종류로 자동 결정
+    }
+
+
+def needs_training(index_type: str, encoding: str = "float32") -> bool:
+    """학습(k-means/양자화 범위/PQ 코드북)이 필요한 인덱스 여부"""
+    return index_type.startswith("ivf") or encoding in ("sq8", "pq")
+
+
+def min_train_vectors(index_type: str, encoding: str = "float32", nlist: int = 0,
+                      train_min: int = 0, **_) -> int:
+    """학습에 필요한 최소 벡터 수 (그 전까지는 Flat 인덱스에 모아 둠)
+
+    자동 nlist(4·√N)는 N ≥ (4·39)² ≈ 24k부터 centroid당 최소 학습 벡터를 만족합니다.
+    """
+    encoding = effective_encoding(index_type, encoding)
+    if not needs_training(index_type, encoding):
+        return 0
+    if train_min > 0:
+        return train_min
+    n = PQ_MIN_TRAIN if encoding in ("sq8", "pq") else 1
+    if index_type.startswith("ivf"):
+        n = max(n, nlist * MIN_POINTS_PER_CENTROID if nlist else (4 * MIN_POINTS_PER_CENTROID) ** 2)
+    return n
+
+
+def auto_nlist(n_vectors: int) -> int:
+    """IVF 리스트 수 (≈4·√N, centroid당 학습 벡터가 충분하도록 제한)"""
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def factory_string(index_type: str, nlist: int = 0, pq_m: int = 64, hnsw_m: int = 32,
+                   encoding: str = "float32") -> str:
+    """faiss.index_factory 문자열"""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"알 수 없는 인코딩: {encoding} (지원: {', '.join(ENCODINGS)})")
+    code = _ENCODING_CODES.get(encoding, f"PQ{pq_m}")
+    if index_type == "flat":
+        return code
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},{code}"
+    if index_type == "ivf_pq":
+        return f"IVF{nlist},PQ{pq_m}"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m},{code}"
+    raise ValueError(f"알 수 없는 인덱스 종류: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+
+
+def effective_encoding(index_type: str, encoding: str = "float32") -> str:
+    """실제 저장 인코딩 (ivf_pq는 항상 pq)"""
+    return "pq" if index_type == "ivf_pq" else encoding
+
+
+def build_index(dim: int, index_type: str = "flat", train_vectors: Optional[np.ndarray] = None,
+                nlist: int = 0, pq_m: int = 64, hnsw_m: int = 32, ef_construction: int = 80,
+                encoding: str = "float32", **_) -> "faiss.Index":
+    """인덱스 생성 (학습이 필요한 조합은 train_vectors로 학습까지 수행)
+
+    Raises:
+        ValueError: 알 수 없는 종류, 학습 벡터 부족, PQ 분할 불가
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"알 수 없는 인덱스 종류: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+
+    encoding = effective_encoding(index_type, encoding)
+    training = needs_training(index_type, encoding)
+    if training:
+        if train_vectors is None or len(train_vectors) == 0:
+            raise ValueError(f"{index_type}/{encoding} 인덱스는 학습 벡터가 필요합니다")
+        nlist = min(nlist or auto_nlist(len(train_vectors)), len(train_vectors))
+        if encoding == "pq":
+            if dim % pq_m:
+                raise ValueError(f"PQ 서브벡터 수({pq_m})가 차원({dim})의 약수가 아닙니다")
+            if len(train_vectors) < PQ_MIN_TRAIN:
+                raise ValueError(f"PQ 학습 벡터 부족: {len(train_vectors)} < {PQ_MIN_TRAIN}")
+
+    description = factory_string(index_type, nlist, pq_m, hnsw_m, encoding)
+    index = faiss.index_factory(dim, description, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == "hnsw":
+        faiss.downcast_index(index).hnsw.efConstruction = ef_construction
+    if training:
+        index.train(np.ascontiguousarray(train_vectors, dtype="float32"))
+    return index
+
+
+def set_search_params(index: "faiss.Index", nprobe: int = 0, ef_search: int = 0) -> Dict[str, int]:
+    """검색 파라미터 적용 (해당 인덱스에 없는 파라미터는 무시)
+
+    Returns:
+        실제 적용된 파라미터
+    """
+    applied = {}
+    params = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if not value:
+            continue
+        try:
+            params.set_index_parameter(index, name, value)
+            applied[name] = value
+        except RuntimeError:
+            pass
+    return applied
+
+
+def describe_index(index: "faiss.Index") -> str:
+    """인덱스 구현 클래스명 (예: IndexIVFFlat, IndexHNSWFlat)"""
+    return type(faiss.downcast_index(index)).__name__
+
+
+def stores_full_vectors(index: "faiss.Index") -> bool:
+    """원본 float32 벡터를 그대로 보관하는 인덱스 여부 (재스코어링 불필요)"""
+    return describe_index(index) in _FULL_PRECISION_CLASSES
+
+
+def code_size(index: "faiss.Index") -> int:
+    """벡터 1개당 코드 바이트 수 (HNSW는 저장부 기준, 그래프 링크 제외)"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return int(ivf.code_size)
+    index = faiss.downcast_index(index)
+    storage = getattr(index, "storage", None)
+    if storage is not None:
+        index = faiss.downcast_index(storage)
+    return int(getattr(index, "code_size", 0))
+
+
+def estimate_index_bytes(index: "faiss.Index") -> int:
+    """인덱스 메모리 사용량 추정 (코드 + IVF id + HNSW 레벨0 링크)"""
+    index_impl = faiss.downcast_index(index)
+    per_vector = code_size(index)
+    if faiss.try_extract_index_ivf(index) is not None:
+        per_vector += 8  # 역리스트의 int64 id
+    hnsw = getattr(index_impl, "hnsw", None)
+    if hnsw is not None:
+        per_vector += hnsw.nb_neighbors(0) * 4  # 레벨0 이웃(2M) int32
+    return per_vector * index.ntotal
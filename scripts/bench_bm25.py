@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+BM25 검색 성능 벤치마크
+
+측정 항목:
+- build_time: 인덱스 구축 시간
+- search latency: p50, p95 (역색인 또는 sparse 행렬 스코어링)
+- legacy latency: p50, p95 (기존 전체 문서 스캔, --legacy-max 이하 규모에서만)
+- max_score_diff: 역색인 vs 전체 스캔 스코어 최대 오차 (0이어야 함)
+
+합성 코퍼스(Zipf 분포 어휘)로 청크 수를 바꿔가며 측정합니다.
+
+Usage:
+    python scripts/bench_bm25.py
+    python scripts/bench_bm25.py --sizes 500,50000,500000 --queries 200
+    python scripts/bench_bm25.py --scorer sparse
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rag_system.bm25_store import BM25Store
+
+
+def make_corpus(n_docs: int, vocab_size: int, doc_len: int, seed: int) -> Tuple[List[str], List[str], List[float]]:
+    """Zipf 분포 어휘로 합성 청크 생성
+
+    Returns:
+        (texts, vocab, cum_weights)
+    """
+    rng = random.Random(seed)
+    vocab = [f"용어{i}" for i in range(vocab_size)]
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, vocab_size + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+
+    texts = []
+    for _ in range(n_docs):
+        length = max(5, int(rng.gauss(doc_len, doc_len * 0.3)))
+        texts.append(" ".join(rng.choices(vocab, cum_weights=cum_weights, k=length)))
+    return texts, vocab, cum_weights
+
+
+def make_queries(vocab: List[str], cum_weights: List[float], n_queries: int, seed: int) -> List[str]:
+    """빈출/희귀 용어가 섞인 2~4 토큰 질의 생성"""
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(n_queries):
+        terms = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(1, 2))
+        terms += rng.sample(vocab, k=rng.randint(1, 2))
+        queries.append(" ".join(terms))
+    return queries
+
+
+def legacy_search(store: BM25Store, query: str, top_k: int) -> List[Tuple[float, int]]:
+    """기존 전체 문서 스캔 BM25 (비교 기준)"""
+    query_tokens = store.tokenizer.tokenize(query)
+    n_docs = len(store.documents)
+    scores = []
+    for doc_idx in range(n_docs):
+        score = 0.0
+        doc_len = store.doc_lens[doc_idx]
+        for token in query_tokens:
+            if token in store.term_freqs[doc_idx]:
+                tf = store.term_freqs[doc_idx][token]
+                df = store.doc_freqs.get(token, 0)
+                if df == 0:
+                    continue
+                idf = math.log((n_docs - df + 0.5) / (df + 0.5))
+                numerator = tf * (store.k1 + 1)
+                denominator = tf + store.k1 * (1 - store.b + store.b * (doc_len / store.avg_doc_len))
+                score += idf * (numerator / denominator)
+        scores.append((score, doc_idx))
+    scores.sort(key=lambda x: x[0], reverse=True)
+    return [(score, doc_idx) for score, doc_idx in scores[:top_k] if score > 0]
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """p50/p95 계산 (표본이 적으면 최대값)"""
+    if len(values) >= 20:
+        return statistics.quantiles(values, n=100)[pct - 1]
+    return max(values) if pct > 50 else statistics.median(values)
+
+
+def benchmark_size(n_docs: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """규모별 벤치마크"""
+    texts, vocab, cum_weights = make_corpus(n_docs, args.vocab, args.doc_len, args.seed)
+    queries = make_queries(vocab, cum_weights, args.queries, args.seed)
+    metadatas = [{"filename": f"chunk_{i}.pdf"} for i in range(n_docs)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BM25Store(index_path=str(Path(tmp) / "bm25_bench.pkl"), scorer=args.scorer)
+
+        start = time.perf_counter()
+        store.add_documents(texts, metadatas)
+        if store.scorer == "sparse":
+            store._get_sparse_scorer()  # 행렬 구축 시간도 빌드에 포함
+        build_time = time.perf_counter() - start
+
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            store.search(query, top_k=args.top_k)
+            times.append(time.perf_counter() - start)
+
+        result = {
+            "scorer": store.scorer,
+            "chunks": n_docs,
+            "vocab": len(store.vocab),
+            "build_time": build_time,
+            "queries": len(queries),
+            "search_p50_ms": percentile(times, 50) * 1000,
+            "search_p95_ms": percentile(times, 95) * 1000,
+        }
+
+        if n_docs <= args.legacy_max:
+            legacy_times = []
+            max_diff = 0.0
+            for query in queries:
+                start = time.perf_counter()
+                expected = legacy_search(store, query, args.top_k)
+                legacy_times.append(time.perf_counter() - start)
+
+                actual = store.search(query, top_k=args.top_k)
+                if len(actual) != len(expected):
+                    max_diff = math.inf
+                    continue
+                for (score, _), r in zip(expected, actual):
+                    max_diff = max(max_diff, abs(score - r["score"]))
+
+            result.update({
+                "legacy_p50_ms": percentile(legacy_times, 50) * 1000,
+                "legacy_p95_ms": percentile(legacy_times, 95) * 1000,
+                "max_score_diff": max_diff,
+            })
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 검색 성능 벤치마크")
+    parser.add_argument("--sizes", default="500,50000,500000", help="청크 수 목록 (콤마 구분)")
+    parser.add_argument("--queries", type=int, default=200, help="규모별 질의 수")
+    parser.add_argument("--top-k", type=int, default=50, help="검색 top_k")
+    parser.add_argument("--vocab", type=int, default=50000, help="어휘 크기")
+    parser.add_argument("--doc-len", type=int, default=150, help="평균 청크 토큰 수")
+    parser.add_argument("--legacy-max", type=int, default=50000, help="전체 스캔 비교 최대 규모")
+    parser.add_argument("--scorer", default="python", choices=["python", "sparse"], help="BM25 스코어러")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="JSON 결과 경로 (기본: reports/benchmark_bm25_<ts>.json)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("BM25 검색 성능 벤치마크 (역색인 vs 전체 스캔)")
+    print("=" * 80)
+
+    results = []
+    for n_docs in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"\n🔍 규모: {n_docs:,} 청크")
+        result = benchmark_size(n_docs, args)
+        results.append(result)
+
+        print(f"  🏗️  Build: {result['build_time']:.2f}s (vocab={result['vocab']:,})")
+        print(f"  ⏱️  Search: p50={result['search_p50_ms']:.2f}ms, p95={result['search_p95_ms']:.2f}ms")
+        if "legacy_p50_ms" in result:
+            print(f"  🐢 Legacy: p50={result['legacy_p50_ms']:.2f}ms, p95={result['legacy_p95_ms']:.2f}ms")
+            print(f"  🎯 Max score diff: {result['max_score_diff']:.3g}")
+
+    output_file = Path(args.output) if args.output else Path("reports") / f"benchmark_bm25_{int(time.time())}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print(f"\n💾 결과 저장: {output_file}")
+    print("\n✅ 벤치마크 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+벡터 인덱스 재현율/지연 벤치마크
+
+측정 항목 (Flat 전체 탐색 결과를 정답으로 사용):
+- build_time: 학습 + 추가 시간
+- recall@k: Flat top-k 대비 겹치는 비율
+- search latency: p50, p95 (질의 1건씩)
+- index_bytes: 인덱스 메모리 추정 (인코딩별 비교)
+- rescored recall: 양자화 인코딩의 후보 top_k×factor를 원본 벡터로 재정렬한 재현율
+
+인덱스 종류(flat, ivf_flat, ivf_pq, hnsw)별로 nprobe / efSearch를 바꿔가며 측정해
+배포 규모에 맞는 설정을 고를 수 있게 합니다. 합성 코퍼스는 군집 가우시안 분포의
+정규화 벡터입니다 (임베딩 모델 불필요).
+
+Usage:
+    python scripts/bench_vector_index.py
+    python scripts/bench_vector_index.py --sizes 10000,200000 --types ivf_flat,hnsw
+    python scripts/bench_vector_index.py --nprobe 1,8,32 --ef-search 32,128
+    python scripts/bench_vector_index.py --types flat,hnsw --encodings float32,fp16,sq8,pq
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rag_system.vector_index_factory import (
+    INDEX_TYPES,
+    build_index,
+    describe_index,
+    effective_encoding,
+    estimate_index_bytes,
+    needs_training,
+    set_search_params,
+    stores_full_vectors,
+)
+
+
+def make_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """군집 가우시안 분포 정규화 벡터 (실제 임베딩처럼 주제별로 뭉친 분포)"""
+    centers = rng.standard_normal((clusters, dim)).astype("float32")
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """p50/p95 계산 (표본이 적으면 최대값)"""
+    if len(values) >= 20:
+        return statistics.quantiles(values, n=100)[pct - 1]
+    return max(values) if pct > 50 else statistics.median(values)
+
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, top_k: int,
+            exact: np.ndarray = None, rescore_factor: int = 0) -> Dict[str, float]:
+    """질의별 지연 + recall@k (exact가 주어지면 후보 재스코어링 포함)"""
+    times = []
+    hits = 0
+    k = top_k * rescore_factor if exact is not None else top_k
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = index.search(queries[i:i + 1], k)
+        ids = ids[0]
+        if exact is not None:
+            ids = ids[ids >= 0]
+            ids = ids[np.argsort(-(exact[ids] @ queries[i]), kind="stable")[:top_k]]
+        times.append(time.perf_counter() - start)
+        hits += len(set(ids.tolist()) & set(truth[i].tolist()))
+    return {
+        "recall": hits / (len(queries) * top_k),
+        "search_p50_ms": percentile(times, 50) * 1000,
+        "search_p95_ms": percentile(times, 95) * 1000,
+    }
+
+
+def benchmark_size(n: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """규모별 벤치마크 (인덱스 종류 × 검색 파라미터)"""
+    rng = np.random.default_rng(args.seed)
+    vectors = make_vectors(n + args.queries, args.dim, args.clusters, rng)
+    base, queries = vectors[:n], vectors[n:]
+
+    rows = []
+    truth = None
+    combos = []
+    for index_type in args.types:
+        for encoding in args.encodings:
+            combo = (index_type, effective_encoding(index_type, encoding))
+            if combo not in combos:
+                combos.append(combo)
+
+    for index_type, encoding in combos:
+        settings = {"nlist": args.nlist, "pq_m": args.pq_m, "hnsw_m": args.hnsw_m,
+                    "ef_construction": args.ef_construction, "encoding": encoding}
+        start = time.perf_counter()
+        train = base[:args.train_max] if needs_training(index_type, encoding) else None
+        try:
+            index = build_index(args.dim, index_type, train_vectors=train, **settings)
+        except ValueError as e:
+            print(f"  ⚠️  {index_type}/{encoding}: 건너뜀 ({e})")
+            continue
+        index.add(base)
+        build_time = time.perf_counter() - start
+
+        if truth is None:
+            # 첫 조합은 flat/float32 (main에서 보장)
+            _, truth = index.search(queries, args.top_k)
+
+        if index_type.startswith("ivf"):
+            sweep = [("nprobe", v) for v in args.nprobe]
+        elif index_type == "hnsw":
+            sweep = [("efSearch", v) for v in args.ef_search]
+        else:
+            sweep = [(None, None)]
+
+        modes = [0]
+        if args.rescore_factor > 0 and not stores_full_vectors(index):
+            modes.append(args.rescore_factor)
+
+        for param, value in sweep:
+            if param == "nprobe":
+                set_search_params(index, nprobe=value)
+            elif param == "efSearch":
+                set_search_params(index, ef_search=value)
+            for factor in modes:
+                row = {
+                    "vectors": n,
+                    "index_type": index_type,
+                    "encoding": encoding,
+                    "index_class": describe_index(index),
+                    "param": param,
+                    "value": value,
+                    "rescore_factor": factor,
+                    "build_time": build_time,
+                    "index_bytes": estimate_index_bytes(index),
+                    **measure(index, queries, truth, args.top_k,
+                              exact=base if factor else None, rescore_factor=factor),
+                }
+                rows.append(row)
+                label = f"{param}={value}" if param else "-"
+                if factor:
+                    label += f" x{factor}"
+                print(f"  {index_type:9s} {encoding:8s} {label:18s} recall@{args.top_k}={row['recall']:.3f} "
+                      f"p50={row['search_p50_ms']:.2f}ms p95={row['search_p95_ms']:.2f}ms "
+                      f"mem={row['index_bytes'] / 2**20:.1f}MB (build {build_time:.1f}s)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 인덱스 재현율/지연 벤치마크")
+    parser.add_argument("--sizes", default="10000,100000", help="벡터 수 목록 (콤마 구분)")
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원")
+    parser.add_argument("--queries", type=int, default=200, help="규모별 질의 수")
+    parser.add_argument("--top-k", type=int, default=10, help="검색 top_k")
+    parser.add_argument("--types", default=",".join(INDEX_TYPES), help="인덱스 종류 (콤마 구분)")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF 리스트 수 (0: 자동)")
+    parser.add_argument("--nprobe", default="1,4,16,64", help="IVF nprobe 목록")
+    parser.add_argument("--pq-m", type=int, default=64, help="PQ 서브벡터 수")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW 이웃 수")
+    parser.add_argument("--ef-construction", type=int, default=80, help="HNSW efConstruction")
+    parser.add_argument("--ef-search", default="16,32,64,128", help="HNSW efSearch 목록")
+    parser.add_argument("--encodings", default="float32", help="저장 인코딩 목록 (float32,fp16,sq8,pq)")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="양자화 재스코어링 후보 배수 (0: 안 함)")
+    parser.add_argument("--train-max", type=int, default=100000, help="IVF 학습 벡터 최대 수")
+    parser.add_argument("--clusters", type=int, default=256, help="합성 데이터 군집 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None,
+                        help="JSON 결과 경로 (기본: reports/benchmark_vector_index_<ts>.json)")
+    args = parser.parse_args()
+
+    args.types = [t.strip() for t in args.types.split(",") if t.strip()]
+    if "flat" in args.types:
+        args.types.remove("flat")
+    args.types.insert(0, "flat")  # 정답 기준은 항상 먼저
+    args.encodings = [e.strip() for e in args.encodings.split(",") if e.strip()]
+    if "float32" in args.encodings:
+        args.encodings.remove("float32")
+    args.encodings.insert(0, "float32")
+    args.nprobe = [int(v) for v in args.nprobe.split(",") if v.strip()]
+    args.ef_search = [int(v) for v in args.ef_search.split(",") if v.strip()]
+
+    print("=" * 80)
+    print("벡터 인덱스 재현율/지연 벤치마크 (Flat 대비)")
+    print("=" * 80)
+
+    results = []
+    for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"\n🔍 규모: {n:,} 벡터 (dim={args.dim})")
+        results.extend(benchmark_size(n, args))
+
+    output_file = (Path(args.output) if args.output
+                   else Path("reports") / f"benchmark_vector_index_{int(time.time())}.json")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print(f"\n💾 결과 저장: {output_file}")
+    print("\n✅ 벤치마크 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -75,7 +75,7 @@ def benchmark_case(
     compression_count = 0
     pdf_success_count = 0
     pdf_fail_count = 0
-    truncate_counts = {"none": 0, "compact": 0, "hardcut": 0}
+    truncate_counts = {"none": 0, "compact": 0, "hardcut": 0, "dropped": 0}
 
     for _ in range(repeat):
         start = time.perf_counter()
@@ -181,7 +181,7 @@ def main():
         if result["compression_ratio"] > thresholds["compression_ratio_max"]:
             print(
                 f"  ⚠️  Compression Ratio 높음: {result['compression_ratio']:.1%} "
-                f"(CONTEXT_MAX_TOKENS 또는 TOKENS_PER_CHAR 튜닝 필요)"
+                f"(CONTEXT_MAX_TOKENS 또는 CONTEXT_PROMPT_OVERHEAD 튜닝 필요)"
             )
         else:
             print(f"  ✅ Compression Ratio OK: {result['compression_ratio']:.1%}")
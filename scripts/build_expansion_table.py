@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+오프라인 쿼리 확장 테이블 구축
+
+metadata.db 문서(제목, 본문 미리보기, 키워드)에서 공기 관련어와 표기 변형을 추출하고
+config/query_expansion.yaml 동의어와 합쳐 JSON 테이블로 저장합니다.
+QueryExpander(dict 모드)는 검색 시 이 테이블만 조회합니다 (LLM 호출 없음).
+테이블 파일이 바뀌면 실행 중인 프로세스도 다음 조회 때 다시 로드합니다.
+
+Usage:
+    python scripts/build_expansion_table.py
+    python scripts/build_expansion_table.py --db var/db/metadata.db --output var/index/query_expansion_table.json
+    python scripts/build_expansion_table.py --min-df 2 --min-npmi 0.4 --max-related 3
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.rag.expansion_table import DEFAULT_TABLE_PATH, build_expansion_table, load_synonym_config
+from app.rag.query_expander import CONFIG_PATH, _filter_tokens, _quick_tokens
+
+
+def load_stopwords() -> set:
+    """검색 불용어 (config/filters.yaml, QueryExpander와 동일)"""
+    cfg_path = Path(os.getenv("FILTERS_CONFIG", str(CONFIG_PATH)))
+    try:
+        with open(cfg_path, "r", encoding="utf-8") as f:
+            return set((yaml.safe_load(f) or {}).get("search_stopwords", []))
+    except OSError:
+        return set()
+
+
+def iter_documents(db_path: str):
+    """FTS 색인 대상과 같은 필드 (title, text_preview, keywords)"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for title, preview, keywords in conn.execute(
+            "SELECT title, text_preview, keywords FROM documents"
+        ):
+            yield " ".join(part for part in (title, preview, keywords) if part)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 쿼리 확장 테이블 구축")
+    parser.add_argument("--db", default=os.getenv("DB_METADATA_PATH", "metadata.db"), help="메타데이터 DB 경로")
+    parser.add_argument("--config", default=None, help="동의어 설정 (기본: config/query_expansion.yaml)")
+    parser.add_argument("--output", default=os.getenv("QUERY_EXPANSION_TABLE", DEFAULT_TABLE_PATH),
+                        help="테이블 출력 경로")
+    parser.add_argument("--min-df", type=int, default=3, help="관련어 후보 최소 문서 빈도")
+    parser.add_argument("--max-df-ratio", type=float, default=0.2, help="관련어 후보 최대 문서 비율")
+    parser.add_argument("--min-npmi", type=float, default=0.3, help="관련어 최소 NPMI")
+    parser.add_argument("--max-related", type=int, default=5, help="용어당 관련어 수")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ 메타데이터 DB 없음: {args.db}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stopwords = load_stopwords()
+    doc_terms = [_filter_tokens(_quick_tokens(text), stopwords) for text in iter_documents(args.db)]
+    groups, patterns = load_synonym_config(args.config)
+    print(f"📄 문서 {len(doc_terms):,}개, 동의어 그룹 {len(groups)}개, 패턴 {len(patterns)}개")
+
+    table = build_expansion_table(
+        doc_terms, groups, patterns,
+        min_df=args.min_df, max_df_ratio=args.max_df_ratio,
+        min_npmi=args.min_npmi, max_related=args.max_related,
+    )
+    table.save(args.output)
+
+    stats = table.get_stats()
+    print(f"✅ 저장: {args.output} (용어 {stats['terms']:,}개: 동의어 {stats['synonym_terms']:,}, "
+          f"관련어 {stats['related_terms']:,}, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
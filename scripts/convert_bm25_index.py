@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+BM25 인덱스 포맷 변환 (pickle ↔ mmap 세그먼트)
+
+출력 경로 확장자로 포맷이 결정됩니다 (.seg: 세그먼트, .pkl: pickle).
+재색인 없이 기존 pickle 인덱스를 세그먼트로 전환할 때 사용합니다.
+
+Usage:
+    python scripts/convert_bm25_index.py --src var/index/bm25_index.pkl --dst var/index/bm25_index.seg
+    # 이후 .env: BM25_INDEX_PATH=var/index/bm25_index.seg
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def convert(src: Path, dst: Path) -> bool:
+    """src 인덱스를 읽어 dst 포맷으로 저장 후 검색 결과 동일성 확인"""
+    from rag_system.bm25_store import BM25Store
+
+    if not src.exists():
+        logger.error(f"원본 인덱스 없음: {src}")
+        return False
+
+    start = time.perf_counter()
+    source = BM25Store(index_path=str(src))
+    logger.info(f"원본 로드: {len(source.documents)}개 문서 ({time.perf_counter() - start:.2f}초)")
+
+    source._materialize_segment()  # 세그먼트 → pickle 변환 시 뷰를 메모리 객체로 전환
+    source.index_path = dst
+    source.save_index()
+
+    start = time.perf_counter()
+    converted = BM25Store(index_path=str(dst))
+    logger.info(f"변환본 로드: {len(converted.documents)}개 문서 ({time.perf_counter() - start:.3f}초)")
+
+    if len(converted.documents) != len(source.documents):
+        logger.error("문서 수 불일치")
+        return False
+
+    # 샘플 질의로 스코어 동일성 확인 (빈출 용어 상위 몇 개)
+    sample_terms = sorted(source.doc_freqs.items(), key=lambda x: -x[1])[:5]
+    for term, _ in sample_terms:
+        expected = [(r["score"], r["rank"]) for r in source.search(term, top_k=10)]
+        actual = [(r["score"], r["rank"]) for r in converted.search(term, top_k=10)]
+        if expected != actual:
+            logger.error(f"검색 결과 불일치: '{term}'")
+            return False
+
+    logger.info(f"✅ 변환 완료: {src} → {dst} ({dst.stat().st_size / 1024 / 1024:.1f}MB)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 인덱스 포맷 변환")
+    parser.add_argument("--src", default="var/index/bm25_index.pkl", help="원본 인덱스 경로")
+    parser.add_argument("--dst", default="var/index/bm25_index.seg", help="출력 인덱스 경로 (.seg/.pkl)")
+    args = parser.parse_args()
+
+    return 0 if convert(Path(args.src), Path(args.dst)) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+벡터 인덱스 전체 재임베딩
+
+기존 인덱스 메타데이터(.metadata.pkl)의 content로 모든 청크를 다시 인코딩해
+인덱스를 새로 구축합니다. 중단된 경우 같은 명령을 다시 실행하면 완료된 샤드부터 재개합니다.
+
+사용법:
+    python scripts/reembed_vectors.py --workers 4
+    python scripts/reembed_vectors.py --index rag_system/db/korean_vector_index.faiss --shard-size 4096
+    VECTOR_INDEX_TYPE=hnsw python scripts/reembed_vectors.py --workers 4 --threads 2
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    from rag_system.korean_vector_store import DEFAULT_INDEX_PATH, KoreanVectorStore
+    from rag_system.reembed_job import DEFAULT_SHARD_SIZE, reembed
+
+    parser = argparse.ArgumentParser(description="벡터 인덱스 전체 재임베딩 (샤딩 + 체크포인트)")
+    parser.add_argument("--index", default=os.getenv("VECTOR_INDEX_PATH", DEFAULT_INDEX_PATH),
+                        help="대상 FAISS 인덱스 경로")
+    parser.add_argument("--source-metadata", default=None,
+                        help="청크 메타데이터 pickle (기본: <인덱스>.metadata.pkl)")
+    parser.add_argument("--workers", type=int, default=1, help="인코딩 프로세스 수")
+    parser.add_argument("--threads", type=int, default=0, help="워커당 torch 스레드 수 (0: 코어 수 / workers)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="샤드당 청크 수")
+    parser.add_argument("--checkpoint-dir", default=None, help="체크포인트 디렉터리 (기본: <인덱스>.reembed)")
+    args = parser.parse_args()
+
+    index_path = Path(args.index)
+    source = Path(args.source_metadata) if args.source_metadata else index_path.with_suffix(".metadata.pkl")
+    if not source.exists():
+        logger.error(f"메타데이터를 찾을 수 없습니다: {source}")
+        return 1
+
+    with open(source, "rb") as f:
+        metadata = pickle.load(f)
+    metadatas = [item for item in metadata if item.get("content")]
+    texts = [item["content"] for item in metadatas]
+    logger.info(f"재임베딩 대상: {len(texts)}개 청크 (content 없음 {len(metadata) - len(texts)}개 제외)")
+
+    store = KoreanVectorStore(index_path=str(index_path))
+    stats = reembed(
+        store, texts, metadatas,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        threads=args.threads,
+        checkpoint_dir=args.checkpoint_dir,
+    )
+    logger.info(
+        f"✅ 완료: {stats['chunks']}개 청크, {stats['shards']}개 샤드 "
+        f"(재개 {stats['resumed_shards']}개), {stats['elapsed']:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
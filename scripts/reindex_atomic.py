@@ -6,6 +6,7 @@
 
 사용법:
     python scripts/reindex_atomic.py --source ./docs --tmp-index ./var/index_tmp --swap-to ./var/index
+    python scripts/reindex_atomic.py --workers 8  # 토큰화·TF/DF 계산 병렬화
 """
 
 import argparse
@@ -76,8 +77,12 @@ def _load_text_from_metadata_db(filename: str, db_conn) -> str | None:
     return None
 
 
-def reindex_bm25(source_dir: Path, output_path: Path) -> bool:
-    """BM25 인덱스 재구축 (metadata.db 기반)"""
+def reindex_bm25(source_dir: Path, output_path: Path, workers: int = 1) -> bool:
+    """BM25 인덱스 재구축 (metadata.db 기반)
+
+    Args:
+        workers: BM25 색인 프로세스 수 (1이면 직렬)
+    """
     try:
         from rag_system.bm25_store import BM25Store
         from modules.metadata_db import MetadataDB
@@ -211,32 +216,8 @@ def reindex_bm25(source_dir: Path, output_path: Path) -> bool:
 
         # BM25 인덱스 생성
         bm25 = BM25Store(index_path=str(output_path))
-        bm25.documents = []
-        bm25.metadata = []
-        bm25.term_freqs = []
-        bm25.doc_freqs = {}
-        bm25.doc_lens = []
-        bm25.vocab = set()
-
-        for text, metadata in zip(texts, metadatas):
-            tokens = bm25.tokenizer.tokenize(text)
-
-            bm25.documents.append(text)
-            bm25.metadata.append(metadata)
-
-            term_freq = {}
-            for token in tokens:
-                term_freq[token] = term_freq.get(token, 0) + 1
-                bm25.vocab.add(token)
-
-            bm25.term_freqs.append(term_freq)
-            bm25.doc_lens.append(len(tokens))
-
-            for token in set(tokens):
-                bm25.doc_freqs[token] = bm25.doc_freqs.get(token, 0) + 1
-
-        if bm25.doc_lens:
-            bm25.avg_doc_len = sum(bm25.doc_lens) / len(bm25.doc_lens)
+        bm25._create_new_index()
+        bm25.add_documents(texts, metadatas, workers=workers)
 
         bm25.save_index()
         logger.info(f"✅ BM25 인덱스 완료: {len(bm25.documents)}개 문서")
@@ -284,6 +265,8 @@ def main():
     parser.add_argument("--tmp-index", default="./var/index_tmp", help="임시 인덱스 디렉토리")
     parser.add_argument("--swap-to", default="./var/index", help="스왑 타겟 디렉토리")
     parser.add_argument("--report", default="reports/index_consistency.md", help="보고서 출력 경로")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"BM25 색인 프로세스 수 (1: 직렬, 권장: CPU 코어 수={os.cpu_count()})")
 
     args = parser.parse_args()
 
@@ -298,9 +281,10 @@ def main():
     # 1. 임시 디렉토리 생성
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    # 2. 임시 인덱스 생성
-    tmp_bm25_path = tmp_dir / "bm25_index.pkl"
-    success = reindex_bm25(source_dir, tmp_bm25_path)
+    # 2. 임시 인덱스 생성 (BM25_INDEX_PATH 확장자로 포맷 결정: .pkl=pickle, .seg=mmap 세그먼트)
+    index_name = Path(os.getenv("BM25_INDEX_PATH", "var/index/bm25_index.pkl")).name
+    tmp_bm25_path = tmp_dir / index_name
+    success = reindex_bm25(source_dir, tmp_bm25_path, workers=args.workers)
 
     if not success:
         logger.error("❌ 재색인 실패")
@@ -108,11 +108,11 @@ class AutoIndexWatcher:
             # 문서 ID 생성
             doc_id = f"doc_{hashlib.md5(str(pdf_path).encode()).hexdigest()[:12]}"
 
-            # BM25 인덱스에 추가
-            self.bm25_store.add_document(
-                doc_id=doc_id,
-                content=text,
-                metadata={
+            # BM25 인덱스에 추가 (같은 doc_id는 교체)
+            self.bm25_store.upsert_document(
+                doc_id,
+                text,
+                {
                     'filename': pdf_path.name,
                     'path': str(pdf_path),
                     'indexed_at': datetime.now().isoformat()
@@ -46,6 +46,10 @@ class AutoIndexer:
         self.CATEGORY_FOLDERS = ['category_purchase', 'category_repair', 'category_review',
                                 'category_disposal', 'category_consumables']
         self.SPECIAL_FOLDERS = ['recent', 'archive', 'assets']
+
+        # BM25 증분 갱신 (인덱스 파일이 바뀌면 다시 로드)
+        self._bm25 = None
+        self._bm25_stamp = None
         
     def _load_index(self) -> Dict:
         """기존 인덱스 로드"""
@@ -244,8 +248,8 @@ class AutoIndexer:
             self._save_index()
             
             # 인덱싱 트리거
-            if new_files or modified_files:
-                self._trigger_indexing(new_files + modified_files)
+            if new_files or modified_files or deleted_files:
+                self._trigger_indexing(new_files + modified_files, deleted_files)
         
         return {
             'new': new_files,
@@ -254,16 +258,78 @@ class AutoIndexer:
             'total': len(current_files)
         }
     
-    def _trigger_indexing(self, files: list):
-        """인덱싱 트리거 - 단순화된 버전 (perfect_rag 제거)"""
-        print(f"\n🔄 인덱싱 시작: {len(files)}개 파일")
+    @staticmethod
+    def _index_stamp(path: Path):
+        """인덱스 파일 변경 감지용 (mtime, 크기), 파일이 없으면 None"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _get_bm25(self):
+        """BM25 인덱스 (BM25_INDEX_PATH)
+
+        재색인(scripts/reindex_atomic.py)이 파일을 교체했으면 다시 로드한다.
+        오래된 사본으로 저장하면 새 인덱스를 덮어쓰므로 배치마다 확인한다.
+        """
+        index_path = Path(os.getenv("BM25_INDEX_PATH", "var/index/bm25_index.pkl"))
+        stamp = self._index_stamp(index_path)
+        if self._bm25 is None or stamp != self._bm25_stamp:
+            from rag_system.bm25_store import BM25Store
+            if self._bm25 is not None:
+                print("🔁 BM25 인덱스 파일 변경 감지 → 다시 로드")
+            self._bm25 = BM25Store(index_path=str(index_path))
+            self._bm25_stamp = stamp
+        return self._bm25
+
+    def _extract_text(self, file_path: Path) -> str:
+        """문서 텍스트 추출 (data/extracted 우선, 없으면 pdfplumber)"""
+        if file_path.suffix.lower() == '.txt':
+            return file_path.read_text(encoding='utf-8', errors='ignore')
+
+        extracted = Path(os.getenv("EXTRACTED_DIR", "data/extracted")) / f"{file_path.stem}.txt"
+        if extracted.exists():
+            text = extracted.read_text(encoding='utf-8', errors='ignore')
+            if text.strip():
+                return text
+
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+    def _trigger_indexing(self, files: list, deleted_files: list = None):
+        """인덱싱 트리거 - BM25 인덱스 증분 갱신 (추가/수정: upsert, 삭제: delete)"""
+        deleted_files = deleted_files or []
+        print(f"\n🔄 인덱싱 시작: {len(files)}개 파일 (삭제 {len(deleted_files)}개)")
 
         try:
-            # 파일 목록만 업데이트 (perfect_rag 없이)
-            print("📝 파일 인덱스 업데이트...")
-            updated_count = len(files)
+            bm25 = self._get_bm25()
+            updated_count = 0
 
-            print(f"✅ 인덱싱 완료! ({updated_count}개 파일)")
+            for file_path in files:
+                path_obj = Path(file_path)
+                try:
+                    text = self._extract_text(path_obj)
+                except Exception as e:
+                    self._handle_file_error(file_path, e)
+                    text = ""
+                if not text.strip():
+                    text = f"[파일명: {path_obj.name}] (텍스트 추출 실패)"
+
+                # 재색인 스크립트와 같이 파일명을 문서 식별자로 사용
+                bm25.upsert_document(path_obj.name, text, {
+                    'filename': path_obj.name,
+                    'path': str(path_obj),
+                    'category': path_obj.suffix.lstrip('.').lower(),
+                })
+                updated_count += 1
+
+            deleted_count = sum(bm25.delete_document(Path(f).name) for f in deleted_files)
+
+            bm25.save_index()
+            self._bm25_stamp = self._index_stamp(bm25.index_path)
+            print(f"✅ 인덱싱 완료! ({updated_count}개 파일 갱신, {deleted_count}개 항목 삭제)")
 
             # 통계 출력
             stats = self.get_statistics()
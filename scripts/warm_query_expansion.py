@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+쿼리 확장 캐시 예열
+
+라우팅 로그(logs/routing/routing_<날짜>.jsonl)에서 자주 나온 질의를 골라
+QueryExpander로 미리 확장해 둡니다. llm 모드에서는 결과가 공유 SQLite 캐시
+(QUERY_EXPANSION_CACHE_DB)에 저장되므로 재시작 후에도, 다른 프로세스(Streamlit/FastAPI)에서도
+같은 질의는 LLM을 호출하지 않습니다.
+
+Usage:
+    QUERY_EXPANSION_MODE=llm python scripts/warm_query_expansion.py
+    python scripts/warm_query_expansion.py --days 14 --limit 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.rag.query_expander import QueryExpander
+from app.rag.routing_monitor import RoutingMonitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="쿼리 확장 캐시 예열 (라우팅 로그 기반)")
+    parser.add_argument("--log-dir", default="logs/routing", help="라우팅 로그 디렉터리")
+    parser.add_argument("--days", type=int, default=7, help="조회할 일수")
+    parser.add_argument("--limit", type=int, default=200, help="예열할 최대 질의 수 (빈도순)")
+    parser.add_argument("--mode", default=None, help="dict | llm (기본: QUERY_EXPANSION_MODE)")
+    args = parser.parse_args()
+
+    queries = RoutingMonitor(args.log_dir).frequent_queries(days=args.days, limit=args.limit)
+    if not queries:
+        print(f"⚠️  최근 {args.days}일 라우팅 로그에 질의가 없습니다: {args.log_dir}")
+        return
+
+    print(f"🔥 예열 대상: {len(queries)}개 질의 (최다 {queries[0][1]}회)")
+    start = time.perf_counter()
+    expander = QueryExpander(mode=args.mode)
+    stats = expander.prewarm(query for query, _ in queries)
+    print(f"✅ 완료 ({time.perf_counter() - start:.1f}s): 캐시됨 {stats['cached']}, "
+          f"신규 {stats['expanded']}, 실패 {stats['failed']}")
+
+
+if __name__ == "__main__":
+    main()
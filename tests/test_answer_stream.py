@@ -0,0 +1,158 @@
+"""
+토큰 스트리밍 테스트
+- QwenLLM.generate_stream: stream=True 조각 전달, 외국어 문자 제거, 인용 없으면 출처 추가
+- RAGPipeline.answer_stream: 검색 메타데이터 → 토큰 → 최종 응답, 캐시 히트는 한 조각 재생
+- 첫 토큰 지연(TTFT) 메트릭 기록
+- 동시 동일 질의는 한 번만 생성 (팔로워는 리더 결과 재생)
+- 생성 실패/부분 답변은 캐시하지 않음
+"""
+import threading
+import time
+
+from app.rag import pipeline as pipeline_module
+from app.rag.cache_manager import QueryCache
+from app.rag.metrics_collector import get_metrics_collector
+from app.rag.persistent_cache import PersistentCache
+from app.rag.pipeline import RAGPipeline, _NoOpCompressor
+from app.rag.query_router import QueryRouter
+from rag_system.generation_scheduler import GenerationDeadlineExceededError
+from rag_system.llm_wrapper import QwenLLM
+
+
+class FakeLlama:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.kwargs = None
+
+    def create_chat_completion(self, **kwargs):
+        self.kwargs = kwargs
+        yield {"choices": [{"delta": {"role": "assistant"}}]}
+        for delta in self.deltas:
+            yield {"choices": [{"delta": {"content": delta}}]}
+
+
+def _qwen(monkeypatch, deltas):
+    fake = FakeLlama(deltas)
+    monkeypatch.setattr(QwenLLM, "_load_model", lambda self: setattr(self, "llm", fake))
+    return QwenLLM("model.gguf"), fake
+
+
+def test_qwen_generate_stream(monkeypatch):
+    llm, fake = _qwen(monkeypatch, ["카메라 ", "中文", "수리 내역"])
+    chunks = [{"source": "2024-01-02_카메라_수리.pdf", "content": "카메라 수리 내역", "score": 1.0}]
+
+    pieces = list(llm.generate_stream("카메라 수리", chunks, mode="rag"))
+
+    assert fake.kwargs["stream"] is True
+    assert pieces[:2] == ["카메라 ", "수리 내역"]
+    assert pieces[2] == "\n\n출처: [2024-01-02_카메라_수리.pdf]"
+
+    # 답변에 인용이 있으면 덧붙이지 않음
+    llm, _ = _qwen(monkeypatch, ["수리 내역 [2024-01-02_카메라_수리.pdf]"])
+    assert list(llm.generate_stream("카메라 수리", chunks)) == ["수리 내역 [2024-01-02_카메라_수리.pdf]"]
+
+
+class FakeRetriever:
+    def search(self, query, top_k, mode="chat", selected_filename=None):
+        return [{"doc_id": "d1", "snippet": "카메라 수리 내역 " * 10, "score": 0.9, "filename": "d1.pdf"}]
+
+
+class FakeStreamGenerator:
+    def __init__(self, delay=0.0, fail_after=None):
+        self.calls = 0
+        self.delay = delay
+        self.fail_after = fail_after
+
+    def generate_stream(self, query, context, temperature, mode="rag"):
+        self.calls += 1
+        for i, piece in enumerate(["카메라", " 수리"]):
+            if i == self.fail_after:
+                raise GenerationDeadlineExceededError("마감 초과")
+            time.sleep(self.delay)
+            yield piece
+
+
+def _pipeline(monkeypatch, tmp_path, generator=None):
+    monkeypatch.setenv("MODE", "RAG")
+    memory = QueryCache()
+    persistent = {}
+    monkeypatch.setattr(pipeline_module, "get_cache", lambda: memory)
+    monkeypatch.setattr(pipeline_module, "get_persistent_cache",
+                        lambda: PersistentCache(db_path=str(tmp_path / "c.db")))
+    monkeypatch.setattr(pipeline_module, "get_cached_result", memory.get)
+    monkeypatch.setattr(pipeline_module, "cache_query_result",
+                        lambda q, r, m=None, ns=None: memory.set(q, r, m, ns))
+    monkeypatch.setattr(pipeline_module, "get_cached_result_persistent",
+                        lambda q, m=None, ns=None: persistent.get((q, m, ns)))
+    monkeypatch.setattr(pipeline_module, "cache_query_result_persistent",
+                        lambda q, r, m=None, ns=None: persistent.__setitem__((q, m, ns), r))
+
+    rag = RAGPipeline.__new__(RAGPipeline)
+    rag.retriever = FakeRetriever()
+    rag.compressor = _NoOpCompressor()
+    rag.generator = generator or FakeStreamGenerator()
+    rag.query_router = QueryRouter()
+    return rag, memory, persistent
+
+
+def test_answer_stream_meta_then_tokens(monkeypatch, tmp_path):
+    rag, _, _ = _pipeline(monkeypatch, tmp_path)
+    collector = get_metrics_collector()
+    before = collector.get_metrics()["streamed_answers_total"]
+
+    events = list(rag.answer_stream("카메라 수리 내역 알려줘"))
+
+    assert [e["type"] for e in events] == ["meta", "token", "token", "done"]
+    assert events[0]["evidence"][0]["doc_id"] == "d1"
+    assert events[0]["status"]["found"] is True
+    done = events[-1]
+    assert done["result"]["text"] == "카메라 수리"
+    assert done["result"]["evidence"] == events[0]["evidence"]
+    assert 0 <= done["metrics"]["ttft_ms"] <= done["metrics"]["total_ms"]
+    assert done["metrics"]["context_tokens"] > 0
+    assert collector.get_metrics()["streamed_answers_total"] == before + 1
+
+    # 두 번째 요청: 캐시 히트 → 생성 없이 완성 답변 한 조각
+    replay = list(rag.answer_stream("카메라 수리 내역 알려줘"))
+    assert [e["type"] for e in replay] == ["meta", "token", "done"]
+    assert replay[1]["text"] == "카메라 수리"
+    assert replay[-1]["result"]["status"]["from_cache"] == "memory"
+    assert rag.generator.calls == 1
+
+
+def test_concurrent_streams_generate_once(monkeypatch, tmp_path):
+    rag, memory, _ = _pipeline(monkeypatch, tmp_path, FakeStreamGenerator(delay=0.1))
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(list(rag.answer_stream("카메라 수리 내역 알려줘"))[-1]))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert rag.generator.calls == 1
+    assert [r["result"]["text"] for r in results] == ["카메라 수리"] * 4
+    assert sorted(r["result"]["status"].get("from_cache", "leader") for r in results) == ["coalesced"] * 3 + ["leader"]
+    assert memory.get_stats()["inflight_count"] == 0
+
+
+def test_failed_stream_is_not_cached(monkeypatch, tmp_path):
+    # 첫 조각 이후 실패: 부분 답변은 표시하되 캐시하지 않음
+    rag, memory, persistent = _pipeline(monkeypatch, tmp_path, FakeStreamGenerator(fail_after=1))
+    events = list(rag.answer_stream("카메라 수리 내역 알려줘"))
+
+    assert [e["type"] for e in events] == ["meta", "token", "done"]
+    done = events[-1]["result"]
+    assert done["text"].startswith("카메라\n\n")
+    assert done["status"]["partial"] is True
+    assert memory.get_stats()["size"] == 0 and persistent == {}
+
+    # 첫 조각 전 실패: 오류 응답, 캐시 없음 → 다음 요청은 다시 생성
+    rag.generator = FakeStreamGenerator(fail_after=0)
+    events = list(rag.answer_stream("카메라 수리 내역 알려줘"))
+    assert [e["type"] for e in events] == ["meta", "done"]
+    assert events[-1]["result"]["status"]["found"] is False
+    assert memory.get_stats()["size"] == 0 and persistent == {}
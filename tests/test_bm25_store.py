@@ -0,0 +1,500 @@
+"""
+BM25Store 테스트
+- 역색인(포스팅 리스트) 스코어가 전체 스캔 방식과 동일한지 검증
+- top-k 선택 및 동점 순서 검증
+- 저장/로드 후 역색인 재구축 검증
+- upsert/delete 증분 갱신 결과가 재구축과 동일한지 검증
+- 자동 인덱서가 교체된 인덱스 파일을 다시 로드하는지 검증
+- 질의 토큰 캐시 상한 및 히트/미스 통계 검증
+- 병렬 색인 결과가 직렬 색인과 동일한지 검증
+- 패시지 단위 색인 집계(max/sum) 및 매칭 패시지 반환 검증
+- 배치 검색 결과가 질의별 검색과 동일한지 검증
+"""
+import math
+import os
+import random
+
+import pytest
+
+from rag_system.bm25_store import BM25Store
+
+TEXTS = [
+    "핀마이크 모델 ECM-77BC를 구매 검토합니다. 가격은 336,000원입니다.",
+    "영상편집팀 워크스테이션 교체 비용은 179,300,000원입니다. HP Z8 모델입니다.",
+    "광화문 스튜디오 모니터 교체 총액은 9,760,000원입니다. LG 모니터 3대입니다.",
+    "카메라 장비 구매를 위한 예산 검토서입니다. 총 예산은 50,000,000원입니다.",
+    "스튜디오 조명 시설 교체에 대한 기안서입니다. 필립스 LED 조명 20대를 구매합니다.",
+]
+
+
+def _metadatas(texts):
+    return [{"filename": f"doc_{i}.pdf", "doc_id": f"doc_{i}"} for i in range(len(texts))]
+
+
+def _full_scan_scores(store: BM25Store, query: str):
+    """기존 전체 스캔 BM25 스코어 (참조 구현)"""
+    query_tokens = store.tokenizer.tokenize(query)
+    n_docs = len(store.documents)
+    scores = []
+    for doc_idx in range(n_docs):
+        score = 0.0
+        doc_len = store.doc_lens[doc_idx]
+        for token in query_tokens:
+            if token in store.term_freqs[doc_idx]:
+                tf = store.term_freqs[doc_idx][token]
+                df = store.doc_freqs.get(token, 0)
+                idf = math.log((n_docs - df + 0.5) / (df + 0.5))
+                numerator = tf * (store.k1 + 1)
+                denominator = tf + store.k1 * (1 - store.b + store.b * (doc_len / store.avg_doc_len))
+                score += idf * (numerator / denominator)
+        scores.append((score, doc_idx))
+    scores.sort(key=lambda x: x[0], reverse=True)
+    return [(score, doc_idx) for score, doc_idx in scores if score > 0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    bm25 = BM25Store(index_path=str(tmp_path / "bm25_index.pkl"))
+    bm25.add_documents(TEXTS, _metadatas(TEXTS))
+    return bm25
+
+
+@pytest.fixture
+def random_store(tmp_path):
+    """동점/음수 IDF가 섞이도록 작은 어휘로 만든 무작위 코퍼스"""
+    rng = random.Random(7)
+    vocab = [f"용어{i}" for i in range(40)]
+    texts = [" ".join(rng.choices(vocab, k=rng.randint(3, 30))) for _ in range(300)]
+    bm25 = BM25Store(index_path=str(tmp_path / "bm25_random.pkl"))
+    bm25.add_documents(texts, _metadatas(texts))
+    return bm25
+
+
+class TestInvertedIndexScoring:
+    """포스팅 리스트 기반 스코어링 테스트"""
+
+    @pytest.mark.parametrize("query", ["교체 모니터", "스튜디오 조명 교체", "구매 검토", "없는단어"])
+    def test_same_scores_as_full_scan(self, store, query):
+        """전체 스캔과 동일한 스코어/순서"""
+        expected = _full_scan_scores(store, query)[:5]
+        results = store.search(query, top_k=5)
+
+        assert [r["filename"] for r in results] == [f"doc_{i}.pdf" for _, i in expected]
+        assert [r["score"] for r in results] == [score for score, _ in expected]
+
+    def test_random_corpus_matches_full_scan(self, random_store):
+        """무작위 코퍼스에서 top-k 결과 동일 (동점 순서 포함)"""
+        rng = random.Random(11)
+        for _ in range(30):
+            query = " ".join(f"용어{rng.randrange(45)}" for _ in range(rng.randint(1, 4)))
+            expected = _full_scan_scores(random_store, query)[:10]
+            results = random_store.search(query, top_k=10)
+
+            assert [(r["score"], r["doc_id"]) for r in results] == [
+                (score, f"doc_{i}") for score, i in expected
+            ]
+
+    def test_rank_is_contiguous(self, store):
+        """rank는 1부터 연속"""
+        results = store.search("교체", top_k=3)
+        assert [r["rank"] for r in results] == list(range(1, len(results) + 1))
+
+    def test_incremental_add_refreshes_idf(self, store):
+        """문서 추가 후 IDF/길이 정규화가 재계산됨"""
+        store.add_documents(["모니터 모니터 모니터 교체"], [{"filename": "doc_5.pdf"}])
+        expected = _full_scan_scores(store, "모니터 교체")[:5]
+        results = store.search("모니터 교체", top_k=5)
+
+        assert [r["score"] for r in results] == [score for score, _ in expected]
+
+
+class TestPostingsPersistence:
+    """저장/로드 시 역색인 재구축 테스트"""
+
+    def test_postings_rebuilt_on_load(self, store):
+        store.save_index()
+        reloaded = BM25Store(index_path=str(store.index_path))
+
+        assert reloaded.postings.keys() == store.postings.keys()
+        for token, (doc_ids, tfs) in store.postings.items():
+            assert list(reloaded.postings[token][0]) == list(doc_ids)
+            assert list(reloaded.postings[token][1]) == list(tfs)
+
+        query = "스튜디오 모니터 교체"
+        assert reloaded.search(query, top_k=5) == store.search(query, top_k=5)
+
+    def test_failed_save_keeps_previous_index(self, store, monkeypatch):
+        store.save_index()
+        before = store.index_path.read_bytes()
+
+        def broken_dump(obj, f):
+            f.write(b"partial")
+            raise OSError("disk full")
+
+        monkeypatch.setattr("rag_system.bm25_store.pickle.dump", broken_dump)
+        with pytest.raises(OSError):
+            store.save_index()
+
+        assert store.index_path.read_bytes() == before  # 쓰다 만 파일로 교체되지 않음
+        assert [p.name for p in store.index_path.parent.iterdir() if ".tmp" in p.name] == []
+
+    def test_stats_report_postings(self, store):
+        stats = store.get_stats()
+        assert stats["posting_terms"] == len(store.vocab)
+        assert stats["total_postings"] == sum(len(tf) for tf in store.term_freqs)
+
+
+def test_unknown_scorer_falls_back(tmp_path):
+    """알 수 없는 스코어러는 python으로 폴백"""
+    bm25 = BM25Store(index_path=str(tmp_path / "x.pkl"), scorer="gpu")
+    assert bm25.scorer == "python"
+
+
+class TestSparseScorer:
+    """NumPy/SciPy sparse 스코어러 테스트 (numpy/scipy 설치 시)"""
+
+    @pytest.fixture(autouse=True)
+    def _require_sparse(self):
+        pytest.importorskip("numpy")
+        pytest.importorskip("scipy")
+
+    def test_matches_python_scorer(self, random_store):
+        """python 스코어러와 부동소수 오차 범위 내 동일 결과"""
+        sparse_store = BM25Store(index_path=str(random_store.index_path) + ".missing", scorer="sparse")
+        sparse_store.add_documents(random_store.documents, random_store.metadata)
+
+        rng = random.Random(13)
+        for _ in range(30):
+            query = " ".join(f"용어{rng.randrange(45)}" for _ in range(rng.randint(1, 4)))
+            expected = random_store.search(query, top_k=10)
+            actual = sparse_store.search(query, top_k=10)
+
+            assert [r["doc_id"] for r in actual] == [r["doc_id"] for r in expected]
+            for a, e in zip(actual, expected):
+                assert a["score"] == pytest.approx(e["score"], rel=1e-9, abs=1e-12)
+
+    def test_batch_matches_single(self, random_store):
+        """행렬 곱 배치 스코어링도 질의별 결과와 동일"""
+        sparse_store = BM25Store(index_path=str(random_store.index_path) + ".missing", scorer="sparse")
+        sparse_store.add_documents(random_store.documents, random_store.metadata)
+        sparse_store.delete_document("doc_3")
+
+        queries = ["용어1 용어2", "용어5 용어5 용어9", "없는단어", "용어30"]
+        batch = sparse_store.search_batch(queries, top_k=10)
+
+        for query, actual in zip(queries, batch):
+            expected = sparse_store.search(query, top_k=10)
+            assert [r["doc_id"] for r in actual] == [r["doc_id"] for r in expected]
+            for a, e in zip(actual, expected):
+                assert a["score"] == pytest.approx(e["score"], rel=1e-9, abs=1e-12)
+
+
+class TestSegmentFormat:
+    """mmap 세그먼트 포맷(.seg) 테스트"""
+
+    @pytest.fixture
+    def segment_store(self, random_store, tmp_path):
+        seg = BM25Store(index_path=str(tmp_path / "bm25_index.seg"))
+        seg.add_documents(list(random_store.documents), list(random_store.metadata))
+        seg.save_index()
+        return BM25Store(index_path=str(tmp_path / "bm25_index.seg"))
+
+    def test_loads_as_segment(self, segment_store):
+        stats = segment_store.get_stats()
+        assert stats["index_format"] == "segment"
+        assert stats["total_documents"] == 300
+        assert stats["mapped_bytes"] > 0
+
+    def test_same_results_as_pickle(self, random_store, segment_store):
+        """pickle 인덱스와 동일한 스코어/순서"""
+        rng = random.Random(17)
+        for _ in range(30):
+            query = " ".join(f"용어{rng.randrange(45)}" for _ in range(rng.randint(1, 4)))
+            assert segment_store.search(query, top_k=10) == random_store.search(query, top_k=10)
+
+    def test_snippet_prefix(self, tmp_path):
+        """스니펫은 원문 앞부분만 디코딩"""
+        text = "스튜디오 " * 100
+        seg = BM25Store(index_path=str(tmp_path / "snip.seg"))
+        seg.add_documents(
+            [text, "다른 문서", "세번째 문서"],
+            [{"filename": "a.pdf"}, {"filename": "b.pdf"}, {"filename": "c.pdf"}],
+        )
+        seg.save_index()
+
+        loaded = BM25Store(index_path=str(tmp_path / "snip.seg"))
+        result = loaded.search("스튜디오", top_k=1, snippet_max=12)[0]
+        assert result["content"] == text[:12]
+        assert result["filename"] == "a.pdf"
+        assert loaded.documents[0] == text
+
+    def test_add_after_load_materializes(self, segment_store, random_store):
+        """세그먼트 로드 후 문서 추가 시 메모리 인덱스로 전환"""
+        extra = ["용어1 용어2 용어3", "용어41 용어41"]
+        segment_store.add_documents(extra, [{"doc_id": "x1"}, {"doc_id": "x2"}])
+        random_store.add_documents(extra, [{"doc_id": "x1"}, {"doc_id": "x2"}])
+
+        assert segment_store.get_stats()["index_format"] == "pickle"
+        for query in ["용어1 용어2", "용어41", "용어3 용어7"]:
+            assert segment_store.search(query, top_k=10) == random_store.search(query, top_k=10)
+
+
+class TestIncrementalUpdates:
+    """upsert/delete 증분 갱신 테스트 (재구축 결과와 동일해야 함)"""
+
+    def _rebuilt(self, store, tmp_path):
+        """살아있는 문서만으로 새로 구축한 인덱스"""
+        live = [i for i in range(len(store.documents)) if i not in store.deleted]
+        fresh = BM25Store(index_path=str(tmp_path / "rebuilt.pkl"))
+        fresh.add_documents([store.documents[i] for i in live], [store.metadata[i] for i in live])
+        return fresh
+
+    def _assert_same(self, store, fresh, queries):
+        for query in queries:
+            actual = [(r["score"], r["doc_id"]) for r in store.search(query, top_k=10)]
+            expected = [(r["score"], r["doc_id"]) for r in fresh.search(query, top_k=10)]
+            assert actual == expected
+
+    def test_delete_matches_rebuild(self, random_store, tmp_path):
+        for i in (3, 50, 51, 299):
+            assert random_store.delete_document(f"doc_{i}") == 1
+        assert random_store.deleted  # 임계값 미만이면 tombstone 유지
+
+        fresh = self._rebuilt(random_store, tmp_path)
+        assert random_store.get_stats()["total_documents"] == 296
+        self._assert_same(random_store, fresh, ["용어1 용어2", "용어7", "용어30 용어3 용어12"])
+
+    def test_upsert_replaces_document(self, store, tmp_path):
+        store.upsert_document("doc_2", "드론 촬영 장비 교체", {"filename": "doc_2.pdf"})
+        store.upsert_document("doc_9", "드론 배터리 구매", {"filename": "doc_9.pdf"})
+
+        results = store.search("드론", top_k=5)
+        assert sorted(r["doc_id"] for r in results) == ["doc_2", "doc_9"]
+        assert not store.search("광화문", top_k=5)
+        self._assert_same(store, self._rebuilt(store, tmp_path), ["교체 모니터", "드론 교체", "구매"])
+
+    def test_delete_unknown_is_noop(self, store):
+        assert store.delete_document("nope") == 0
+        assert not store.deleted
+
+    def test_compaction(self, random_store, tmp_path):
+        """삭제가 임계값을 넘으면 병합 (tombstone 제거 후 문서 idx 재구성)"""
+        for i in range(0, 300, 4):
+            random_store.delete_document(f"doc_{i}")
+
+        assert len(random_store.documents) < 300  # 병합 발생
+        assert random_store.get_stats()["total_documents"] == 225
+        self._assert_same(random_store, self._rebuilt(random_store, tmp_path), ["용어1 용어2", "용어20"])
+
+    def test_save_compacts_tombstones(self, store):
+        store.delete_document("doc_0")
+        store.save_index()
+        reloaded = BM25Store(index_path=str(store.index_path))
+
+        assert len(reloaded.documents) == 4
+        assert not reloaded.deleted
+        assert reloaded.search("교체 모니터", top_k=5) == store.search("교체 모니터", top_k=5)
+
+    def test_delete_after_segment_load(self, tmp_path, random_store):
+        seg_path = tmp_path / "inc.seg"
+        seg = BM25Store(index_path=str(seg_path))
+        seg.add_documents(list(random_store.documents), list(random_store.metadata))
+        seg.save_index()
+
+        loaded = BM25Store(index_path=str(seg_path))
+        loaded.delete_document("doc_10")
+        random_store.delete_document("doc_10")
+        for query in ["용어1 용어2", "용어5"]:
+            assert loaded.search(query, top_k=10) == random_store.search(query, top_k=10)
+
+    def test_auto_indexer_reloads_replaced_index(self, store, monkeypatch):
+        """재색인이 인덱스 파일을 교체하면 자동 인덱서가 오래된 사본 대신 새 인덱스를 로드"""
+        from scripts.utils.auto_indexer import AutoIndexer
+
+        store.save_index()
+        monkeypatch.setenv("BM25_INDEX_PATH", str(store.index_path))
+        indexer = AutoIndexer.__new__(AutoIndexer)
+        indexer._bm25 = None
+        indexer._bm25_stamp = None
+
+        first = indexer._get_bm25()
+        assert indexer._get_bm25() is first  # 변경 없으면 재사용
+
+        rebuilt = BM25Store(index_path=str(store.index_path.with_name("rebuilt.pkl")))
+        rebuilt.add_documents(TEXTS + ["드론 촬영 장비 구매"], _metadatas(TEXTS + ["드론"]))
+        rebuilt.save_index()
+        os.replace(rebuilt.index_path, store.index_path)
+
+        reloaded = indexer._get_bm25()
+        assert reloaded is not first
+        assert [r["doc_id"] for r in reloaded.search("드론", top_k=5)] == ["doc_5"]
+
+
+class TestQueryTokenCache:
+    """질의 토큰 캐시 테스트"""
+
+    def test_hits_and_misses_reported(self, store):
+        store.search("교체 모니터", top_k=3)
+        store.search("교체 모니터", top_k=3)
+        store.search("스튜디오", top_k=3)
+
+        stats = store.get_stats()["tokenizer"]
+        assert stats["cache_hits"] == 1
+        assert stats["cache_misses"] == 2
+        assert stats["query_cache"]["entries"] == 2
+        assert stats["cache_hit_rate"] == pytest.approx(100 / 3)
+
+    def test_indexing_bypasses_cache(self, store):
+        """문서 색인은 질의 캐시를 채우지 않음"""
+        assert store.get_stats()["tokenizer"]["query_cache"]["entries"] == 0
+
+    def test_long_text_not_cached(self, store):
+        store.tokenizer.tokenize_query("스튜디오 " * 200)
+        stats = store.tokenizer.query_cache.get_stats()
+        assert stats["entries"] == 0
+        assert stats["bypass"] == 1
+
+    def test_bounds_evict_lru(self):
+        from rag_system.bm25_store import QueryTokenCache
+
+        cache = QueryTokenCache(max_entries=2, max_bytes=1024, max_text_chars=64)
+        cache.put("a", ("a",))
+        cache.put("b", ("b",))
+        cache.get("a")
+        cache.put("c", ("c",))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == ("a",)
+        assert cache.get_stats()["evictions"] == 1
+
+        small = QueryTokenCache(max_entries=100, max_bytes=10, max_text_chars=64)
+        small.put("abc", ("abc",))
+        small.put("def", ("def",))
+        assert small.get_stats()["bytes"] <= 10
+        assert small.get("abc") is None
+
+    def test_cached_tokens_are_copies(self, store):
+        tokens = store.tokenizer.tokenize_query("교체 모니터")
+        tokens.append("변조")
+        assert store.tokenizer.tokenize_query("교체 모니터") == ["교체", "모니터"]
+
+
+def test_parallel_build_identical_to_serial(tmp_path):
+    """프로세스 풀 색인 결과가 직렬 색인과 동일"""
+    rng = random.Random(23)
+    vocab = [f"용어{i}" for i in range(200)]
+    texts = [" ".join(rng.choices(vocab, k=rng.randint(3, 60))) for _ in range(BM25Store.PARALLEL_MIN_DOCS + 50)]
+    metadatas = _metadatas(texts)
+
+    serial = BM25Store(index_path=str(tmp_path / "serial.pkl"))
+    serial.add_documents(texts, metadatas)
+    parallel = BM25Store(index_path=str(tmp_path / "parallel.pkl"))
+    parallel.add_documents(texts, metadatas, batch_size=20, workers=2)
+
+    assert parallel.term_freqs == serial.term_freqs
+    assert parallel.doc_lens == serial.doc_lens
+    assert dict(parallel.doc_freqs) == dict(serial.doc_freqs)
+    assert parallel.vocab == serial.vocab
+    assert parallel.idf == serial.idf
+    assert parallel.len_norms == serial.len_norms
+    assert {t: (list(d), list(f)) for t, (d, f) in parallel.postings.items()} == \
+        {t: (list(d), list(f)) for t, (d, f) in serial.postings.items()}
+
+
+class TestPassageIndexing:
+    """패시지(청크) 단위 색인 테스트"""
+
+    LONG_DOC = ("서론 문단입니다. " * 40) + "광화문 스튜디오 조명 교체 견적 " + ("결론 문단입니다. " * 40) + "추가 견적"
+
+    @pytest.fixture
+    def passage_store(self, tmp_path):
+        bm25 = BM25Store(index_path=str(tmp_path / "passage.pkl"), passage_chars=120, passage_overlap=30)
+        bm25.add_documents(
+            [self.LONG_DOC, "스튜디오 조명 구매 기안 조명", "카메라 수리 보고"],
+            [{"filename": "long.pdf"}, {"filename": "short.pdf"}, {"filename": "cam.pdf"}],
+        )
+        return bm25
+
+    def test_split_passages_overlap(self):
+        from rag_system.bm25_passages import split_passages
+
+        text = "가나다 " * 100
+        passages = split_passages(text, 50, 10)
+        assert len(passages) > 1
+        assert all(len(p) <= 50 for _, p in passages)
+        for (start, passage), (next_start, _) in zip(passages, passages[1:]):
+            assert text[start:start + len(passage)] == passage
+            assert next_start < start + len(passage)  # 겹침
+        assert split_passages("짧은 문서", 50, 10) == [(0, "짧은 문서")]
+
+    def test_returns_matching_passage(self, passage_store):
+        results = passage_store.search("광화문 견적", top_k=3)
+
+        assert [r["filename"] for r in results] == ["long.pdf"]
+        assert "광화문" in results[0]["content"]
+        assert len(results[0]["content"]) <= 120
+        assert results[0]["doc_id"] == "long.pdf"
+        assert results[0]["passage_idx"] > 0
+
+    def test_one_result_per_document(self, passage_store):
+        results = passage_store.search("문단입니다 조명", top_k=10)
+        filenames = [r["filename"] for r in results]
+        assert len(filenames) == len(set(filenames))
+
+    def test_sum_aggregation(self, passage_store):
+        max_results = {r["filename"]: r for r in passage_store.search("견적", top_k=5)}
+        passage_store.passage_agg = "sum"
+        sum_results = {r["filename"]: r for r in passage_store.search("견적", top_k=5)}
+
+        long_max, long_sum = max_results["long.pdf"], sum_results["long.pdf"]
+        assert long_sum["matched_passages"] > 1
+        assert long_sum["score"] > long_max["score"] == long_max["passage_score"]
+
+    def test_passage_setting_persisted(self, passage_store, tmp_path):
+        passage_store.save_index()
+        reloaded = BM25Store(index_path=str(passage_store.index_path), passage_chars=0)
+        assert reloaded.passage_chars == 120
+        assert reloaded.search("광화문", top_k=3) == passage_store.search("광화문", top_k=3)
+
+    def test_upsert_replaces_all_passages(self, passage_store):
+        before = len(passage_store.documents) - len(passage_store.deleted)
+        passage_store.upsert_document("long.pdf", "드론 장비", {"filename": "long.pdf"})
+
+        assert not passage_store.search("광화문", top_k=3)
+        assert passage_store.search("드론", top_k=3)[0]["filename"] == "long.pdf"
+        assert passage_store.get_stats()["total_documents"] < before
+
+
+class TestSearchBatch:
+    """배치 검색 테스트"""
+
+    QUERIES = ["용어1 용어2", "용어2 용어1 용어2", "", "용어39 없는단어", "용어7"]
+
+    def test_matches_full_scan(self, random_store):
+        """용어 가중치를 공유해도 질의별 전체 스캔 스코어와 동일"""
+        batch = random_store.search_batch(self.QUERIES, top_k=8)
+
+        assert len(batch) == len(self.QUERIES)
+        assert batch[2] == []
+        for query, results in zip(self.QUERIES, batch):
+            expected = _full_scan_scores(random_store, query)[:8]
+            assert [(r["score"], r["doc_id"]) for r in results] == [(score, f"doc_{i}") for score, i in expected]
+
+    def test_excludes_deleted(self, random_store):
+        random_store.delete_document("doc_0")
+        for results in random_store.search_batch(self.QUERIES, top_k=300):
+            assert all(r["doc_id"] != "doc_0" for r in results)
+
+    def test_empty_inputs(self, tmp_path, store):
+        assert store.search_batch([]) == []
+        empty = BM25Store(index_path=str(tmp_path / "empty.pkl"))
+        assert empty.search_batch(["교체", "모니터"]) == [[], []]
+
+    def test_passage_mode(self, tmp_path):
+        bm25 = BM25Store(index_path=str(tmp_path / "passage.pkl"), passage_chars=120, passage_overlap=30)
+        bm25.add_documents(
+            [TestPassageIndexing.LONG_DOC, "스튜디오 조명 구매 기안 조명"],
+            [{"filename": "long.pdf"}, {"filename": "short.pdf"}],
+        )
+        queries = ["광화문 조명", "견적"]
+        assert bm25.search_batch(queries, top_k=3) == [bm25.search(q, top_k=3) for q in queries]
@@ -0,0 +1,64 @@
+"""
+답변 캐시 네임스페이스 테스트
+- 인덱스 파일/생성 구성 변경 시 네임스페이스 변경
+- PersistentCache 네임스페이스 분리, 이전 네임스페이스 지연 축출
+- namespace 컬럼 없는 기존 DB 마이그레이션
+"""
+import sqlite3
+import time
+
+from app.rag.cache_namespace import current_answer_namespace
+from app.rag.persistent_cache import PersistentCache
+
+
+def test_namespace_tracks_index_and_generation_config(tmp_path, monkeypatch):
+    index = tmp_path / "bm25_index.pkl"
+    index.write_bytes(b"v1")
+    monkeypatch.setenv("BM25_INDEX_PATH", str(index))
+
+    ns1 = current_answer_namespace()
+    assert ns1 == current_answer_namespace()
+
+    index.write_bytes(b"v2-reindexed")
+    ns2 = current_answer_namespace()
+    assert ns2 != ns1
+
+    monkeypatch.setenv("LLM_TEMPERATURE", "0.7")
+    assert current_answer_namespace() != ns2
+
+
+def test_persistent_cache_namespaces_and_lazy_eviction(tmp_path):
+    cache = PersistentCache(db_path=str(tmp_path / "c.db"), cleanup_prob=0.0, namespace_grace=60)
+    cache.set("카메라 수리 내역", {"text": "old"}, namespace="index:v1")
+    assert cache.get("카메라 수리 내역", namespace="index:v1") == {"text": "old"}
+
+    # 재색인 후: 새 네임스페이스에서는 미스, 이전 항목은 유지되다가 유예 시간 뒤 정리
+    assert cache.get("카메라 수리 내역", namespace="index:v2") is None
+    cache.set("카메라 수리 내역", {"text": "new"}, namespace="index:v2")
+    cache._cleanup_expired()
+    assert cache.get_stats()["total_entries"] == 2
+
+    with cache._connect() as conn:
+        conn.execute("UPDATE query_cache SET accessed_at=? WHERE namespace='index:v1'", (time.time() - 120,))
+    cache._cleanup_expired()
+    assert cache.get_stats()["total_entries"] == 1
+    assert cache.get("카메라 수리 내역", namespace="index:v2") == {"text": "new"}
+
+
+def test_migrates_db_without_namespace_column(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE query_cache (
+            cache_key TEXT PRIMARY KEY, query TEXT NOT NULL, result_data BLOB NOT NULL,
+            created_at REAL NOT NULL, accessed_at REAL NOT NULL,
+            access_count INTEGER NOT NULL DEFAULT 1, compressed INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+    cache = PersistentCache(db_path=db_path)
+    cache.set("질의", {"ok": True}, namespace="ns")
+    assert cache.get("질의", namespace="ns") == {"ok": True}
+    assert cache.get("질의") is None
@@ -0,0 +1,63 @@
+"""
+인용 단일 패스 테스트
+- 인용 누락 시 재생성 없이 상위 문서 출처 부착 (같은 파일은 한 번)
+- citation_retry_avoided_total / citation_forced_total 메트릭
+- 생성 예외만 재시도
+"""
+from app.rag.metrics_collector import get_metrics_collector
+from rag_system.llm_wrapper import QwenLLM
+
+
+class FakeLlama:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def create_chat_completion(self, **kwargs):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return {"choices": [{"message": {"content": answer}}]}
+
+
+def _qwen(monkeypatch, answers):
+    monkeypatch.setenv("LLM_PREFIX_CACHE_SIZE", "0")
+    fake = FakeLlama(answers)
+    monkeypatch.setattr(QwenLLM, "_load_model", lambda self: setattr(self, "llm", fake))
+    return QwenLLM("model.gguf"), fake
+
+
+CHUNKS = [
+    {"source": "2024-01-02_카메라_수리.pdf", "content": "카메라 수리 내역 1", "score": 0.9},
+    {"source": "2024-01-02_카메라_수리.pdf", "content": "카메라 수리 내역 2", "score": 0.8},
+    {"source": "2024-03-05_렌즈_구매.pdf", "content": "렌즈 구매", "score": 0.5},
+]
+
+
+def test_missing_citation_is_attached_without_regeneration(monkeypatch):
+    llm, fake = _qwen(monkeypatch, ["카메라 수리 내역은 두 건입니다."])
+    before = get_metrics_collector().get_metrics()
+
+    response = llm.generate_response("카메라 수리 내역", CHUNKS, max_retries=2)
+
+    assert fake.calls == 1
+    assert response.answer.endswith("출처: [2024-01-02_카메라_수리.pdf], [2024-03-05_렌즈_구매.pdf]")
+    assert response.sources_cited == ["2024-01-02_카메라_수리.pdf", "2024-03-05_렌즈_구매.pdf"]
+    assert response.has_proper_citation is True
+    after = get_metrics_collector().get_metrics()
+    assert after["citation_retry_avoided_total"] == before["citation_retry_avoided_total"] + 1
+    assert after["citation_forced_total"] == before["citation_forced_total"] + 1
+
+
+def test_cited_answer_and_generation_error_retry(monkeypatch):
+    answer = "카메라 수리 내역입니다 [2024-01-02_카메라_수리.pdf]"
+    llm, fake = _qwen(monkeypatch, [RuntimeError("decode failed"), answer])
+    before = get_metrics_collector().get_metrics()["citation_retry_avoided_total"]
+
+    response = llm.generate_response("카메라 수리 내역", CHUNKS, max_retries=2)
+
+    assert fake.calls == 2  # 예외만 재시도
+    assert response.answer == answer
+    assert response.retry_count == 1
+    assert get_metrics_collector().get_metrics()["citation_retry_avoided_total"] == before
@@ -0,0 +1,90 @@
+"""
+토큰 예산 컨텍스트 패킹 테스트
+- TokenCounter: 텍스트 해시별 토큰 수 캐시, 토큰 단위 자르기
+- pack: 관련도 순 그리디 (넘치는 텍스트는 건너뛰거나 shrink로 채움)
+- hydrate_context / QwenLLM 프롬프트: n_ctx - max_tokens - 오버헤드 예산 준수, 토큰 수 보고
+"""
+from app.rag.utils import context_hydrator
+from rag_system.context_packer import TokenCounter, context_budget
+from rag_system.llm_wrapper import QwenLLM
+
+
+class FakeTokenizerLlama:
+    """한 글자 = 한 토큰"""
+
+    def __init__(self, n_ctx=4096):
+        self._n_ctx = n_ctx
+        self.tokenize_calls = 0
+        self.prompts = []
+
+    def tokenize(self, text, add_bos=True):
+        self.tokenize_calls += 1
+        return [ord(c) for c in text.decode("utf-8")]
+
+    def detokenize(self, tokens):
+        return "".join(chr(t) for t in tokens).encode("utf-8")
+
+    def n_ctx(self):
+        return self._n_ctx
+
+    def create_chat_completion(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        return {"choices": [{"message": {"content": "카메라 수리 내역입니다 [a.pdf]"}}]}
+
+
+def test_counter_caches_and_truncates():
+    llm = FakeTokenizerLlama()
+    counter = TokenCounter(llm)
+
+    assert counter.count("카메라 수리") == 6
+    assert counter.count("카메라 수리") == 6
+    assert llm.tokenize_calls == 1
+    assert counter.get_stats()["hits"] == 1
+    assert counter.truncate("카메라 수리 내역", 3) == "카메라"
+
+
+def test_pack_greedy_by_relevance():
+    counter = TokenCounter(FakeTokenizerLlama())
+    texts = ["가" * 50, "나" * 80, "다" * 30]
+
+    packed, used = counter.pack(texts, budget=90, separator="\n\n")
+    assert packed == ["가" * 50, "다" * 30]  # 넘치는 두 번째는 건너뛰고 세 번째로 채움
+    assert used == 50 + 2 + 30
+
+    packed, used = counter.pack(texts, budget=90, separator="\n\n", shrink=lambda t, n: t)
+    assert packed == ["가" * 50, "나" * 38]  # 남은 예산만큼 앞부분
+    assert used == 90
+
+
+def test_hydrate_context_fills_token_budget(monkeypatch):
+    counter = TokenCounter(FakeTokenizerLlama(n_ctx=1000))
+    monkeypatch.setattr(context_hydrator, "get_token_counter", lambda: counter)
+    monkeypatch.setenv("SUMMARIZE_MAX_TOKENS", "160")
+    monkeypatch.setenv("CONTEXT_PROMPT_OVERHEAD", "200")
+    monkeypatch.setenv("CONTEXT_MAX_TOKENS", "5000")
+    chunks = [{"text": "카메라 수리 금액 1,000원. " * 40}, {"text": "렌즈 구매. " * 40}]
+
+    text, metrics = context_hydrator.hydrate_context(chunks, mode="summarize")
+
+    budget = context_budget(1000, 160, 200)  # n_ctx 잔여분이 상한보다 작음
+    assert metrics["context_max_tokens"] == budget
+    assert metrics["token_count_method"] == "tokenizer"
+    assert metrics["packed_tokens"] == counter.count(text) <= budget
+    assert metrics["packed_tokens"] > budget - 50  # 예산을 거의 다 채움
+    assert metrics["truncate_reason"] == "hardcut"
+
+
+def test_qwen_prompt_fits_context_window(monkeypatch):
+    monkeypatch.setenv("LLM_PREFIX_CACHE_SIZE", "0")
+    fake = FakeTokenizerLlama(n_ctx=1200)
+    monkeypatch.setattr(QwenLLM, "_load_model", lambda self: setattr(self, "llm", fake))
+    llm = QwenLLM("model.gguf")
+    llm.use_optimized_prompts = False
+    chunks = [{"source": f"{i}.pdf", "content": "카메라 수리 내역 " * 100, "score": 1.0} for i in range(5)]
+
+    response = llm.generate_response("카메라 수리 내역 알려줘", chunks, mode="rag")
+
+    prompt_tokens = len(llm.create_system_prompt()) + len(fake.prompts[0])
+    assert prompt_tokens <= 1200 - 160
+    assert 0 < response.context_tokens < len(fake.prompts[0])
+    assert fake.prompts[0].endswith("질문: 카메라 수리 내역 알려줘")
@@ -0,0 +1,138 @@
+"""
+임베딩 디스크 캐시 테스트
+- 내용 해시 기준 히트/미스
+- 재시작 후 mmap 재사용
+- 모델별 네임스페이스 분리, 중단된 기록 복구
+- 디렉터리를 공유하는 인스턴스(프로세스) 간 행 번호 일관성, 크기 상한
+"""
+import threading
+
+import numpy as np
+
+from rag_system.embedding_cache import EmbeddingCache, text_hash
+
+DIM = 8
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype("float32")
+
+
+def test_hits_and_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", DIM)
+    keys = [text_hash(t) for t in ["가", "나", "다"]]
+    vectors = _vectors(3)
+
+    _, found = cache.get_many(keys)
+    assert not found.any()
+
+    cache.put_many(keys[:2], vectors[:2])
+    got, found = cache.get_many(keys)
+    assert found.tolist() == [True, True, False]
+    np.testing.assert_array_equal(got[:2], vectors[:2])
+    assert not got[2].any()
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+
+
+def test_persists_across_restart_and_namespaces(tmp_path):
+    keys = [text_hash(f"청크 {i}") for i in range(5)]
+    vectors = _vectors(5)
+    EmbeddingCache(str(tmp_path), "m", DIM).put_many(keys, vectors)
+
+    restarted = EmbeddingCache(str(tmp_path), "m", DIM)
+    got, found = restarted.get_many(keys[::-1])
+    assert found.all()
+    np.testing.assert_array_equal(got, vectors[::-1])
+
+    # 다른 모델/정규화 설정은 별도 캐시
+    assert not EmbeddingCache(str(tmp_path), "other", DIM).get_many(keys)[1].any()
+    assert not EmbeddingCache(str(tmp_path), "m", DIM, normalize=False).get_many(keys)[1].any()
+
+
+def test_duplicate_keys_written_once(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", DIM)
+    key = text_hash("같은 내용")
+    vectors = _vectors(2)
+
+    cache.put_many([key, key], vectors)
+    cache.put_many([key], vectors[1:])
+
+    assert cache.get_stats()["entries"] == 1
+    np.testing.assert_array_equal(cache.get_many([key])[0][0], vectors[0])
+
+
+def test_recovers_from_partial_write(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", DIM)
+    keys = [text_hash(t) for t in ["a", "b"]]
+    cache.put_many(keys, _vectors(2))
+
+    # 벡터 기록 도중 중단된 상황 (마지막 행 일부만 기록)
+    with open(cache.vectors_path, "r+b") as f:
+        f.truncate(DIM * 4 + 5)
+
+    restarted = EmbeddingCache(str(tmp_path), "m", DIM)
+    assert restarted.get_many(keys)[1].tolist() == [True, False]
+    assert restarted.vectors_path.stat().st_size == DIM * 4
+
+
+def test_instances_sharing_directory(tmp_path):
+    # 각 인스턴스가 별도 파일 잠금을 쓰므로 프로세스 간 공유와 같은 경로
+    a = EmbeddingCache(str(tmp_path), "m", DIM)
+    b = EmbeddingCache(str(tmp_path), "m", DIM)
+    keys = [text_hash(f"청크 {i}") for i in range(4)]
+    vectors = _vectors(4)
+
+    a.put_many(keys[:2], vectors[:2])
+    b.put_many(keys[1:], vectors[1:])  # b는 a의 기록을 다시 읽어 중복 없이 이어 씀
+
+    for cache in (a, b, EmbeddingCache(str(tmp_path), "m", DIM)):
+        got, found = cache.get_many(keys)
+        assert found.all()
+        np.testing.assert_array_equal(got, vectors)
+    assert a.vectors_path.stat().st_size == 4 * DIM * 4
+    assert len(a.keys_path.read_text().split()) == 4
+
+
+def test_concurrent_writers(tmp_path):
+    caches = [EmbeddingCache(str(tmp_path), "m", DIM) for _ in range(4)]
+    keys = [text_hash(f"청크 {i}") for i in range(200)]
+    vectors = _vectors(200)
+
+    def write(cache, offset):
+        for start in range(offset, 200, 20):
+            cache.put_many(keys[start:start + 20], vectors[start:start + 20])
+
+    threads = [threading.Thread(target=write, args=(c, i * 5)) for i, c in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    restarted = EmbeddingCache(str(tmp_path), "m", DIM)
+    got, found = restarted.get_many(keys)
+    assert found.all()
+    np.testing.assert_array_equal(got, vectors)
+    assert restarted.get_stats()["entries"] == 200
+
+
+def test_size_bound_evicts_oldest(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", DIM, max_bytes=10 * DIM * 4)
+    other = EmbeddingCache(str(tmp_path), "m", DIM, max_bytes=10 * DIM * 4)
+    keys = [text_hash(f"청크 {i}") for i in range(12)]
+    vectors = _vectors(12)
+
+    cache.put_many(keys[:8], vectors[:8])
+    assert other.get_many(keys[:1])[1].all()
+    cache.put_many(keys[8:], vectors[8:])  # 상한 초과: 최근 행만 남기고 압축
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 10 * DIM * 4
+    assert stats["evictions"] == 7
+    for c in (cache, other):  # 다른 인스턴스는 교체된 파일을 다시 로드
+        got, found = c.get_many(keys)
+        assert found.tolist() == [False] * 7 + [True] * 5
+        np.testing.assert_array_equal(got[7:], vectors[7:])
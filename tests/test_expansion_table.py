@@ -0,0 +1,90 @@
+"""
+오프라인 쿼리 확장 테이블 테스트
+- 설정 동의어(양방향) + 코퍼스 표기 변형 + 공기 관련어 구축
+- 저장/로드, 조사 제거 조회
+- QueryExpander dict 모드 (LLM 미사용)
+"""
+from app.rag import expansion_table
+from app.rag.expansion_table import ExpansionTable, build_expansion_table, load_expansion_table, strip_josa
+from app.rag.query_expander import QueryExpander
+
+
+def _corpus():
+    docs = []
+    for i in range(6):
+        docs.append(["무선마이크", "수신기", "배터리", f"문서{i}"])
+    for i in range(6):
+        docs.append(["조명", "스탠드", f"기타{i}"])
+    docs.append(["lvm-180a", "모니터"])
+    docs.append(["lvm180a", "모니터"])
+    for i in range(10):
+        docs.append([f"잡음{i}", f"잡음{i + 1}"])
+    return docs
+
+
+def test_build_synonyms_variants_and_related():
+    table = build_expansion_table(
+        _corpus(),
+        synonym_groups=[["수리", "보수", "정비"]],
+        patterns={"구매했": ["구매", "구입"]},
+        min_df=2, max_df_ratio=0.5, min_npmi=0.3, max_related=3,
+    )
+
+    synonyms, _ = table.lookup("보수")
+    assert synonyms == ["수리", "정비"]
+    assert table.lookup("구매했")[0] == ["구매", "구입"]
+    assert "lvm180a" in table.lookup("lvm-180a")[0]
+    assert "lvm-180a" in table.lookup("lvm180a")[0]
+
+    _, related = table.lookup("무선마이크")
+    assert set(related) == {"수신기", "배터리"}
+    assert "스탠드" not in related
+    assert table.lookup("없는용어") == ([], [])
+
+
+def test_save_load_and_josa_lookup(tmp_path):
+    table = build_expansion_table([], synonym_groups=[["카메라", "캠코더"]])
+    path = tmp_path / "table.json"
+    table.save(str(path))
+
+    loaded = ExpansionTable.load(str(path))
+    assert loaded.lookup("카메라를")[0] == ["캠코더"]
+    assert strip_josa("카메라를") == "카메라"
+    assert strip_josa("가를") == "가를"  # 어간 2자 미만은 유지
+
+    expansion_table._table_cache.clear()
+    assert load_expansion_table(str(path)).lookup("캠코더")[0] == ["카메라"]
+    assert load_expansion_table(str(tmp_path / "missing.json")) is None
+
+
+def test_query_expander_dict_mode(tmp_path, monkeypatch):
+    table = build_expansion_table(_corpus(), synonym_groups=[["마이크", "mic", "무선마이크"]],
+                                  min_df=2, max_df_ratio=0.5)
+    path = tmp_path / "table.json"
+    table.save(str(path))
+    monkeypatch.setenv("QUERY_EXPANSION_TABLE", str(path))
+    monkeypatch.setenv("QUERY_EXPANSION_MAX_RELATED", "1")
+
+    expander = QueryExpander(mode="dict")
+    assert expander.llm is None
+
+    result = expander.expand_query("무선마이크를 구매한 문서")
+    assert result["original_keywords"][0] == "무선마이크를"
+    assert result["synonyms"]["무선마이크를"] == ["마이크", "mic"]
+    assert len(result["related"]["무선마이크를"]) == 1
+    # 원형 다음에 조사 제거 어간
+    assert result["search_query"].startswith('"무선마이크를" OR "무선마이크" OR ')
+    assert '"mic"' in result["search_query"]
+    assert expander.expand_query("무선마이크를 구매한 문서") is result  # 캐시
+
+
+def test_query_expander_dict_mode_keeps_surface_word(tmp_path, monkeypatch):
+    # "회로도"의 "도"는 조사가 아니므로 원형이 검색어에 남아야 함 (FTS5는 단어 단위 일치)
+    path = tmp_path / "table.json"
+    build_expansion_table([]).save(str(path))
+    monkeypatch.setenv("QUERY_EXPANSION_TABLE", str(path))
+
+    result = QueryExpander(mode="dict").expand_query("회로도 검토")
+    assert result["original_keywords"][0] == "회로도"
+    assert result["search_query"].startswith('"회로도" OR ')
+    assert '"회로"' in result["search_query"]
@@ -0,0 +1,130 @@
+"""
+LLM 생성 스케줄러 테스트
+- 우선순위 순 실행 (대화형 > 요약 > 쿼리 확장 > 예열)
+- 대기 중 마감 초과 작업은 실행하지 않음, 시작된 스트림은 마감 후에도 끝까지 전달
+- 스트림 소비 중단 시 생성 취소 후 다음 작업 진행
+- ScheduledLlama 프록시와 generation_priority 컨텍스트
+"""
+import threading
+import time
+
+import pytest
+
+from rag_system.generation_scheduler import (
+    GenerationDeadlineExceededError,
+    GenerationScheduler,
+    Priority,
+    ScheduledLlama,
+    current_priority,
+    generation_priority,
+)
+
+
+def _block(scheduler):
+    """워커를 점유하는 작업 제출 → (시작 이벤트, 해제 이벤트)"""
+    started, release = threading.Event(), threading.Event()
+
+    def blocker(model):
+        started.set()
+        release.wait(5)
+
+    scheduler.submit(blocker, Priority.INTERACTIVE)
+    assert started.wait(5)
+    return release
+
+
+def test_runs_jobs_in_priority_order():
+    scheduler = GenerationScheduler(model=None)
+    release = _block(scheduler)
+
+    order = []
+    jobs = [
+        scheduler.submit(lambda m, p=p: order.append(p), p)
+        for p in (Priority.WARMUP, Priority.EXPANSION, Priority.INTERACTIVE, Priority.SUMMARY)
+    ]
+    stats = scheduler.get_stats()
+    assert stats["queue_depth"] == 4
+    assert stats["queue_depth_by_priority"]["warmup"] == 1
+    assert stats["running"] == "INTERACTIVE"
+
+    release.set()
+    for job in jobs:
+        job.result(timeout=5)
+    assert order == [Priority.INTERACTIVE, Priority.SUMMARY, Priority.EXPANSION, Priority.WARMUP]
+
+    stats = scheduler.get_stats()
+    assert stats["completed"] == 5
+    assert stats["queue_depth"] == 0
+    assert stats["wait_ms_by_priority"]["warmup"]["p95"] >= stats["wait_ms_by_priority"]["interactive"]["p50"]
+
+
+def test_expired_job_is_skipped():
+    scheduler = GenerationScheduler(model=None)
+    release = _block(scheduler)
+
+    ran = []
+    job = scheduler.submit(lambda m: ran.append(1), Priority.EXPANSION, deadline_sec=0.05)
+    with pytest.raises(GenerationDeadlineExceededError):
+        job.result()
+
+    release.set()
+    scheduler.run(lambda m: None)  # 큐 비우기
+    assert ran == []
+    assert scheduler.get_stats()["cancelled"] + scheduler.get_stats()["expired"] == 1
+
+
+def test_started_stream_outlives_deadline():
+    scheduler = GenerationScheduler(model=None)
+
+    def slow_pieces(model):
+        for i in range(5):
+            time.sleep(0.03)
+            yield i
+
+    stream = scheduler.run_stream(slow_pieces, Priority.INTERACTIVE, deadline_sec=0.05)
+    assert list(stream) == [0, 1, 2, 3, 4]  # 마감은 실행 시작 전 대기에만 적용
+    assert scheduler.get_stats()["completed"] == 1
+    assert scheduler.get_stats()["expired"] == 0
+
+
+def test_abandoned_stream_is_cancelled():
+    produced = []
+
+    class FakeLlama:
+        def create_chat_completion(self, **kwargs):
+            for i in range(1000):
+                produced.append(i)
+                time.sleep(0.005)  # 토큰 디코딩
+                yield {"choices": [{"delta": {"content": str(i)}}]}
+
+    llm = ScheduledLlama(FakeLlama())
+    stream = llm.create_chat_completion(messages=[], stream=True)
+    assert next(stream)["choices"][0]["delta"]["content"] == "0"
+    stream.close()  # UI 세션 이탈
+
+    assert llm.scheduler.run(lambda m: "다음 작업") == "다음 작업"
+    assert len(produced) < 1000
+    assert llm.scheduler.get_stats()["cancelled"] == 1
+
+
+def test_scheduled_llama_and_priority_context():
+    seen = []
+
+    class FakeLlama:
+        metadata = {"general.name": "fake"}
+
+        def create_chat_completion(self, **kwargs):
+            seen.append(threading.current_thread().name)
+            return {"choices": [{"message": {"content": "ok"}}]}
+
+    llm = ScheduledLlama(FakeLlama())
+    assert llm.metadata == {"general.name": "fake"}  # 비생성 속성은 원본 위임
+    assert llm.create_chat_completion(messages=[])["choices"][0]["message"]["content"] == "ok"
+    assert seen == ["llm-generation-scheduler"]
+
+    assert current_priority() == Priority.INTERACTIVE
+    with generation_priority(Priority.WARMUP):
+        with generation_priority(Priority.EXPANSION):
+            assert current_priority() == Priority.WARMUP  # 중첩은 낮은 우선순위 유지
+    with generation_priority(Priority.SUMMARY):
+        assert current_priority() == Priority.SUMMARY
@@ -0,0 +1,63 @@
+"""
+HybridSearch 동시 검색 테스트
+- 전용 스레드 풀에서 벡터/BM25 동시 실행, 느린 백엔드는 제외하고 부분 결과 사용
+- 백엔드별 풀 대기/실행 시간 보고
+"""
+import time
+
+from app.rag.parallel_executor import ParallelSearchExecutor
+from rag_system.hybrid_search import HybridSearch
+from rag_system.query_optimizer import QueryOptimizer
+
+
+class FakeBackend:
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+
+    def search_batch(self, queries, top_k=5):
+        time.sleep(self.delay)
+        return [[{"chunk_id": f"{self.name}-{q}", "score": 1.0}] for q in queries]
+
+
+def _hybrid(vector_delay=0.0, bm25_delay=0.0, workers=4):
+    hybrid = HybridSearch.__new__(HybridSearch)
+    hybrid.query_optimizer = QueryOptimizer()
+    hybrid.use_query_expansion = False
+    hybrid.query_expander = None
+    hybrid.vector_store = FakeBackend("v", vector_delay)
+    hybrid.bm25_store = FakeBackend("b", bm25_delay)
+    hybrid.backend_timeouts = {"vector": 0.1, "bm25": 1.0, "expansion": 1.0}
+    hybrid.search_executor = ParallelSearchExecutor(max_workers=workers)
+    return hybrid
+
+
+def test_slow_backend_degrades_to_partial_results():
+    hybrid = _hybrid(vector_delay=0.3)
+    try:
+        start = time.perf_counter()
+        retrieval = hybrid._retrieve_parallel("카메라", 5)
+        elapsed = time.perf_counter() - start
+    finally:
+        hybrid.search_executor.shutdown()
+
+    assert retrieval["degraded"] == ["vector"]
+    assert [r["chunk_id"] for r in retrieval["bm25_results"]] == ["b-카메라"]
+    assert elapsed < 0.25
+    timings = retrieval["backend_timings"]
+    assert set(timings) == {"vector", "bm25"}
+    assert timings["bm25"]["queue_ms"] < 50
+
+
+def test_stuck_backend_does_not_starve_next_search():
+    # 타임아웃된 벡터 스레드가 실행 중이어도 여유 스레드로 다음 검색이 대기 없이 실행
+    hybrid = _hybrid(vector_delay=0.3, workers=4)
+    try:
+        hybrid._retrieve_parallel("카메라", 5)
+        hybrid.vector_store.delay = 0.0
+        retrieval = hybrid._retrieve_parallel("렌즈", 5)
+    finally:
+        hybrid.search_executor.shutdown()
+
+    assert retrieval["degraded"] == []
+    assert max(t["queue_ms"] for t in retrieval["backend_timings"].values()) < 50
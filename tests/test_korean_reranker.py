@@ -0,0 +1,140 @@
+"""
+한국어 재랭커 배치 점수 테스트
+- cross-encoder: 길이순 마이크로 배치 점수가 입력 순서로 복원됨
+- sentence-transformer 폴백: 질의 1회 인코딩 + 문서 배치 인코딩, 단건 점수와 동일
+- 벡터 스토어 저장 벡터는 폴백 모델과 같은 모델일 때만 재사용 (다르면 폴백 모델로 인코딩)
+"""
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+DIM = 4
+
+
+class FakeSentenceModel:
+    """텍스트 길이·글자 코드로 만든 결정적 임베딩"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[len(t), sum(map(ord, t)) % 7, t.count("카"), 1.0] for t in texts], dtype="float32")
+
+
+class FakeVectorStore:
+    def __init__(self, model_name, vectors):
+        self.model_name = model_name
+        self.vectors = vectors
+        self.encoded = []
+
+    def get_vectors(self, chunk_ids):
+        return {cid: self.vectors[cid] for cid in chunk_ids if cid in self.vectors}
+
+    def encode_texts(self, texts):
+        self.encoded.append(list(texts))
+        return FakeSentenceModel().encode(texts)
+
+
+class FakeBatch(dict):
+    def to(self, device):
+        return self
+
+
+class FakeTokenizer:
+    """문서 i → [CLS, 표식 i, 본문 길이만큼 토큰] (표식으로 문서를 식별)"""
+
+    def __call__(self, queries, documents, truncation=True, max_length=512):
+        ids = [[0, int(doc.split()[0])] + [1] * len(doc) for doc in documents]
+        return {"input_ids": ids, "attention_mask": [[1] * len(x) for x in ids]}
+
+    def pad(self, features, padding=True, return_tensors="pt"):
+        import torch
+
+        width = max(len(f["input_ids"]) for f in features)
+        return FakeBatch({
+            key: torch.tensor([f[key] + [0] * (width - len(f[key])) for f in features])
+            for key in ("input_ids", "attention_mask")
+        })
+
+
+class FakeCrossEncoder:
+    """표식 토큰을 logit으로 반환, 배치별 (크기, 패딩 길이) 기록"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batches.append(tuple(input_ids.shape))
+        return SimpleNamespace(logits=(input_ids[:, 1:2].float() - 3.0) / 2.0)
+
+
+@pytest.fixture
+def reranker(monkeypatch):
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from rag_system import korean_reranker
+
+    monkeypatch.setattr(korean_reranker, "SENTENCE_TRANSFORMERS_AVAILABLE", True)
+    r = korean_reranker.KoreanReranker()
+    r.sentence_model = FakeSentenceModel()
+    r.use_sentence_transformer = True
+    return r
+
+
+DOCS = ["카메라 수리 내역", "렌즈 구매", "카메라 카메라 점검 보고서"]
+
+
+def test_batch_scores_match_single(reranker):
+    batch = reranker.compute_batch_scores("카메라 수리", DOCS)
+
+    reranker.score_cache.clear()
+    single = [reranker.compute_score("카메라 수리", doc) for doc in DOCS]
+    np.testing.assert_allclose(batch, single, rtol=1e-6)
+    assert reranker.sentence_model.calls[0] == ["카메라 수리"]  # 질의 1회
+    assert reranker.sentence_model.calls[1] == DOCS  # 문서는 한 번에
+
+
+def test_stored_vectors_reused_only_for_same_model(reranker):
+    from rag_system.korean_reranker import FALLBACK_MODEL_NAME
+
+    stored = {"c0": np.array([9, 9, 9, 9], dtype="float32")}
+    ids = ["c0", "c1", None]
+
+    # 검색용 임베딩 모델: 저장 벡터를 쓰면 재랭킹 점수가 벡터 유사도와 같아지므로 폴백 모델로 인코딩
+    other = FakeVectorStore("jhgan/ko-sroberta-multitask", stored)
+    reranker.attach_vector_store(other)
+    expected = reranker._compute_sentence_transformer_scores("카메라 수리", DOCS)
+    assert reranker.compute_batch_scores("카메라 수리", DOCS, ids) == pytest.approx(expected)
+    assert other.encoded == []
+    assert reranker.reused_embeddings == 0
+
+    # 같은 모델: chunk_id로 저장 벡터 재사용, 나머지만 스토어 인코더로 인코딩
+    same = FakeVectorStore(f"sentence-transformers/{FALLBACK_MODEL_NAME}", stored)
+    reranker.attach_vector_store(same)
+    reranker.score_cache.clear()
+    scores = reranker.compute_batch_scores("카메라 수리", DOCS, ids)
+    assert same.encoded == [["카메라 수리"], DOCS[1:]]
+    assert reranker.reused_embeddings == 1
+
+    query = FakeSentenceModel().encode(["카메라 수리"])[0]
+    cosine = stored["c0"] @ query / (np.linalg.norm(stored["c0"]) * np.linalg.norm(query))
+    assert scores[0] == pytest.approx((cosine + 1) / 2)
+
+
+def test_cross_encoder_micro_batches_keep_input_order(reranker):
+    reranker.model = FakeCrossEncoder()
+    reranker.tokenizer = FakeTokenizer()
+    reranker.batch_size = 2
+    # 표식(0~4)과 길이 순서가 서로 다르도록 구성
+    documents = ["0 " + "가" * 30, "1 " + "가" * 2, "2 " + "가" * 18, "3 " + "가" * 9, "4 " + "가" * 40]
+
+    scores = reranker.compute_batch_scores("질의", documents)
+
+    expected = [1 / (1 + math.exp(-(i - 3.0) / 2.0)) for i in range(5)]
+    assert scores == pytest.approx(expected, rel=1e-6)
+    # 길이순 3개 버킷 (2, 2, 1), 버킷마다 가장 긴 문서 기준 패딩
+    assert reranker.model.batches == [(2, 13), (2, 34), (1, 44)]
+    assert reranker.forward_passes == 3
@@ -0,0 +1,137 @@
+"""
+한국어 벡터 스토어 인덱스 테스트
+- 학습 필요 인덱스(IVF/SQ8/PQ): 최소 학습 벡터 수까지 Flat 인덱스에 모은 뒤 학습, 행 순서 유지
+- 외부 학습 표본이 충분하면 바로 학습, 학습 전 저장한 인덱스는 로드 후에도 계속 모음
+- 양자화 인덱스 재스코어링: 원본 사이드카(.vectors.f32) 저장/로드, 정확 점수 순서, 증분 추가 행 수
+"""
+import numpy as np
+import pytest
+
+from rag_system.korean_vector_store import KoreanVectorStore
+
+DIM = 16
+
+
+def _vectors(n, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, DIM)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _metas(start, n):
+    return [{"chunk_id": f"c{i}", "content": f"문서 {i}"} for i in range(start, start + n)]
+
+
+@pytest.fixture
+def make_store(monkeypatch, tmp_path):
+    """임베딩 모델 없이 인덱스만 초기화한 스토어"""
+    monkeypatch.setenv("EMBEDDING_CACHE_DIR", "")
+
+    def init(self):
+        self.embedding_dim = DIM
+        if self.index_path.exists():
+            self.load_index()
+        else:
+            self.create_new_index()
+
+    monkeypatch.setattr(KoreanVectorStore, "_initialize", init)
+
+    def make(index_type="ivf_flat", **settings):
+        monkeypatch.setenv("VECTOR_IVF_NLIST", "4")  # 최소 학습 벡터 4×39 = 156
+        for key, value in settings.items():
+            monkeypatch.setenv(key, str(value))
+        return KoreanVectorStore(index_path=str(tmp_path / "index.faiss"), index_type=index_type)
+
+    return make
+
+
+def _nearest_chunk(store, vector):
+    _, rows = store.index.search(vector[None, :], 1)
+    return store.metadata[rows[0][0]]["chunk_id"]
+
+
+def test_buffers_until_min_training_size(make_store):
+    store = make_store()
+    vectors = _vectors(200)
+
+    store.add_embeddings(vectors[:100], _metas(0, 100))
+    assert store._pending_training
+    assert store.get_stats()["index_class"] == "IndexFlatIP"
+    assert _nearest_chunk(store, vectors[42]) == "c42"  # 학습 전에도 검색 가능
+
+    store.add_embeddings(vectors[100:], _metas(100, 100))
+    assert not store._pending_training
+    assert store.get_stats()["index_class"] == "IndexIVFFlat"
+    assert store.index.ntotal == 200
+    store.index.nprobe = 4
+    assert [_nearest_chunk(store, vectors[i]) for i in (0, 99, 100, 199)] == ["c0", "c99", "c100", "c199"]
+
+
+def test_train_sample_and_reload(make_store):
+    store = make_store()
+    vectors = _vectors(300)
+
+    # 외부 학습 표본이 충분하면 첫 배치부터 학습
+    store.add_embeddings(vectors[:10], _metas(0, 10), train_vectors=vectors)
+    assert store.get_stats()["index_class"] == "IndexIVFFlat"
+    assert store.index.ntotal == 10
+
+    # 표본이 부족하면 추가된 벡터를 계속 모음 (저장/로드 후에도)
+    small = make_store()
+    small.add_embeddings(vectors[:50], _metas(0, 50), train_vectors=vectors[:50])
+    small.save_index()
+    reloaded = make_store()
+    assert reloaded._pending_training
+    reloaded.add_embeddings(vectors[50:200], _metas(50, 150))
+    assert reloaded.get_stats()["index_class"] == "IndexIVFFlat"
+    assert reloaded.index.ntotal == 200
+
+
+def _exact_top(vectors, query, k):
+    return [f"c{i}" for i in np.argsort(-(vectors @ query), kind="stable")[:k]]
+
+
+def test_sq8_rescoring_matches_flat_after_reload(make_store, monkeypatch):
+    vectors = _vectors(400)
+    queries = _vectors(5, seed=1)
+    store = make_store("flat", VECTOR_ENCODING="sq8", VECTOR_RESCORE_FACTOR=4)
+    store.add_embeddings(vectors, _metas(0, 400))
+    assert store.get_stats()["index_class"] == "IndexScalarQuantizer"
+    store.save_index()
+    assert store.sidecar_path.stat().st_size == 400 * DIM * 4
+
+    reloaded = make_store("flat", VECTOR_ENCODING="sq8", VECTOR_RESCORE_FACTOR=4)
+    assert reloaded._sidecar_rows == 400
+    assert reloaded.get_stats()["memory"]["rescoring"]
+    monkeypatch.setattr(reloaded, "encode_texts", lambda texts, use_cache=False: queries[:len(texts)])
+
+    results = reloaded.search_batch(["q"] * len(queries), top_k=5)
+    for query, hits in zip(queries, results):
+        assert [h["chunk_id"] for h in hits] == _exact_top(vectors, query, 5)
+        np.testing.assert_allclose([h["score"] for h in hits], np.sort(vectors @ query)[::-1][:5], rtol=1e-5)
+
+    # 재랭킹용 벡터는 양자화 복원값이 아닌 원본
+    got = reloaded.get_vectors(["c3", "c7"])
+    np.testing.assert_array_equal(got["c3"], vectors[3])
+    np.testing.assert_array_equal(got["c7"], vectors[7])
+
+
+def test_sidecar_rows_follow_incremental_adds(make_store, monkeypatch):
+    vectors = _vectors(450)
+    store = make_store("flat", VECTOR_ENCODING="sq8", VECTOR_RESCORE_FACTOR=4)
+    store.add_embeddings(vectors[:300], _metas(0, 300))
+    store.save_index()
+
+    reloaded = make_store("flat", VECTOR_ENCODING="sq8", VECTOR_RESCORE_FACTOR=4)
+    reloaded.add_embeddings(vectors[300:400], _metas(300, 100))
+    reloaded.add_embeddings(vectors[400:], _metas(400, 50))
+    assert reloaded._sidecar_rows == 300
+    assert reloaded.get_stats()["memory"]["pending_bytes"] == 150 * DIM * 4
+
+    # 저장 전에도 미저장분 포함 재스코어링
+    monkeypatch.setattr(reloaded, "encode_texts", lambda texts, use_cache=False: vectors[420:421])
+    assert reloaded.search("q", top_k=3)[0]["chunk_id"] == "c420"
+
+    reloaded.save_index()
+    assert reloaded._sidecar_rows == 450
+    assert reloaded.sidecar_path.stat().st_size == 450 * DIM * 4
+    np.testing.assert_array_equal(reloaded.get_vectors(["c449"])["c449"], vectors[449])
@@ -0,0 +1,98 @@
+"""
+ParallelSearchExecutor 테스트
+- 태스크별 타임아웃: 느린 태스크만 Timeout 처리, 나머지 결과는 유지 (부분 결과)
+- 실패 태스크는 [] + 에러 기록
+- 풀 대기 시간과 실행 시간 분리 보고, 타임아웃 후 계속 실행 중인 스레드 집계
+"""
+import time
+
+import pytest
+
+from app.rag.parallel_executor import ParallelSearchExecutor
+
+
+@pytest.fixture
+def executor():
+    ex = ParallelSearchExecutor(max_workers=3)
+    yield ex
+    ex.shutdown()
+
+
+def _sleep_then(value, seconds):
+    time.sleep(seconds)
+    return value
+
+
+def _fail():
+    raise RuntimeError("backend down")
+
+
+def test_per_task_timeout_keeps_partial_results(executor):
+    start = time.perf_counter()
+    results = executor.execute_searches([
+        {"name": "fast", "func": _sleep_then, "args": (["a"], 0.01)},
+        {"name": "slow", "func": _sleep_then, "args": (["b"], 0.4), "timeout": 0.1},
+    ])
+    elapsed = time.perf_counter() - start
+
+    assert results["fast"] == ["a"]
+    assert results["slow"] == []
+    assert results["_errors"] == {"slow": "Timeout"}
+    assert elapsed < 0.3  # 느린 태스크를 기다리지 않음
+
+
+def test_default_per_task_timeout_and_failures(executor):
+    results = executor.execute_searches(
+        [
+            {"name": "ok", "func": _sleep_then, "args": (1, 0.0)},
+            {"name": "broken", "func": _fail},
+            {"name": "slow", "func": _sleep_then, "args": (2, 0.4)},
+        ],
+        per_task_timeout=0.1,
+    )
+
+    assert results["ok"] == 1
+    assert results["broken"] == [] and "backend down" in results["_errors"]["broken"]
+    assert results["slow"] == [] and results["_errors"]["slow"] == "Timeout"
+
+
+def test_total_timeout(executor):
+    results = executor.execute_searches(
+        [{"name": "slow", "func": _sleep_then, "args": (1, 0.4), "timeout": 5.0}],
+        total_timeout=0.1,
+    )
+    assert results["slow"] == []
+    assert results["_errors"] == {"slow": "Timeout"}
+
+
+def test_timings_split_queue_and_run():
+    ex = ParallelSearchExecutor(max_workers=1)
+    try:
+        results = ex.execute_searches([
+            {"name": "first", "func": _sleep_then, "args": (1, 0.1)},
+            {"name": "second", "func": _sleep_then, "args": (2, 0.1)},
+        ])
+    finally:
+        ex.shutdown()
+
+    timings = results["_timings"]
+    assert timings["first"]["queue_ms"] < 50
+    assert timings["second"]["queue_ms"] >= 80  # 첫 태스크가 끝날 때까지 풀에서 대기
+    assert 80 <= timings["second"]["run_ms"] < 200
+
+
+def test_timed_out_running_task_is_counted_as_stuck():
+    ex = ParallelSearchExecutor(max_workers=2)
+    try:
+        results = ex.execute_searches([
+            {"name": "slow", "func": _sleep_then, "args": (1, 0.3), "timeout": 0.05},
+            {"name": "queued", "func": _sleep_then, "args": (2, 0.0), "timeout": 0.05},
+        ])
+        assert results["_errors"].get("slow") == "Timeout"
+        assert ex.get_stats() == {"max_workers": 2, "stuck_tasks": 1}
+        assert results["_timings"]["slow"]["run_ms"] >= 40
+
+        time.sleep(0.4)
+        assert ex.get_stats()["stuck_tasks"] == 0  # 끝나면 풀로 복귀
+    finally:
+        ex.shutdown()
@@ -0,0 +1,101 @@
+"""
+프롬프트 접두부 KV 상태 캐시 테스트
+- 첫 생성 후 상태 저장, 다른 프롬프트가 끼면 복원, 접두부 보유 시 복원 생략
+- 재사용 토큰 수는 같은 키 요청 간 공통 접두부로 학습
+- 스케줄러 경유 스트리밍, 프롬프트 배치 (정적 지시문 → 컨텍스트 → 질문)
+"""
+from rag_system.generation_scheduler import ScheduledLlama
+from rag_system.llm_wrapper import QwenLLM
+from rag_system.prompt_prefix_cache import PromptPrefixCache
+
+
+class FakeState:
+    def __init__(self, input_ids):
+        self.input_ids = list(input_ids)
+
+
+class FakeLlama:
+    """문자 하나를 토큰 하나로 보고, 기존 input_ids와의 공통 접두부 이후만 평가"""
+
+    def __init__(self):
+        self.input_ids = []
+        self.evaluated = []
+        self.loads = 0
+
+    def _eval(self, prompt):
+        tokens = [ord(c) for c in prompt]
+        n = 0
+        while n < min(len(tokens), len(self.input_ids)) and tokens[n] == self.input_ids[n]:
+            n += 1
+        self.evaluated.append(len(tokens) - n)
+        self.input_ids = tokens + [0]  # 생성 토큰
+
+    def create_chat_completion(self, messages, stream=False, **kwargs):
+        self._eval("".join(m["content"] for m in messages))
+        if stream:
+            return iter([{"choices": [{"delta": {"content": "답"}}]}])
+        return {"choices": [{"message": {"content": "답"}}]}
+
+    def save_state(self):
+        return FakeState(self.input_ids)
+
+    def load_state(self, state):
+        self.loads += 1
+        self.input_ids = list(state.input_ids)
+
+
+def _ask(cache, llm, static, dynamic):
+    messages = [{"role": "system", "content": static}, {"role": "user", "content": dynamic}]
+    key = PromptPrefixCache.make_key(static)
+    return cache.run(llm, key, lambda m: m.create_chat_completion(messages=messages))
+
+
+def test_restores_prefix_state_between_prompts():
+    cache = PromptPrefixCache(max_entries=2)
+    llm = FakeLlama()
+    static = "고정 지시문" * 20
+
+    _ask(cache, llm, static, "문서 A 질문 1")
+    _ask(cache, llm, "쿼리 확장 프롬프트", "질문")  # 다른 접두부가 컨텍스트를 덮어씀
+    _ask(cache, llm, static, "문서 B 질문 2")
+    assert llm.loads == 1
+    assert llm.evaluated[2] == len("B 질문 2")  # 접두부는 재평가 안 함
+
+    # 접두부 길이 학습 후: 모델이 접두부를 보유 중이면 복원 생략
+    _ask(cache, llm, static, "문서 C 질문 3")
+    assert llm.loads == 1
+    stats = cache.get_stats()
+    assert stats["saved"] == 2
+    assert stats["restored"] == 1 and stats["resident"] == 1
+    assert stats["reused_tokens"] == len(static) + len("문서 ")
+
+
+def test_lru_eviction_and_failed_restore():
+    cache = PromptPrefixCache(max_entries=1)
+    llm = FakeLlama()
+    _ask(cache, llm, "접두부 1", "q")
+    _ask(cache, llm, "접두부 2", "q")
+    assert cache.get_stats()["evictions"] == 1
+
+    class NoStateLlama(FakeLlama):
+        def save_state(self):
+            raise RuntimeError("state unsupported")
+
+    assert _ask(cache, NoStateLlama(), "접두부 3", "q")["choices"][0]["message"]["content"] == "답"
+    assert cache.get_stats()["errors"] == 1
+
+
+def test_qwen_stream_uses_prefix_cache_through_scheduler(monkeypatch):
+    fake = FakeLlama()
+    monkeypatch.setattr(QwenLLM, "_load_model", lambda self: setattr(self, "llm", ScheduledLlama(fake)))
+    llm = QwenLLM("model.gguf")
+    chunks = [{"source": "a.pdf", "content": "카메라 수리 내역", "score": 1.0}]
+
+    static, dynamic = llm.split_user_prompt("카메라 수리 내역 알려줘", chunks)
+    assert "카메라 수리 내역 알려줘" not in static
+    assert dynamic.index("a.pdf") < dynamic.index("카메라 수리 내역 알려줘")  # 컨텍스트 → 질문
+
+    list(llm.generate_stream("카메라 수리 내역 알려줘", chunks))
+    list(llm.generate_stream("카메라 수리 내역 요청", chunks))
+    assert llm.prefix_cache.get_stats()["saved"] == 1
+    assert llm.prefix_cache.get_stats()["restored"] == 1
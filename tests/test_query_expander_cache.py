@@ -0,0 +1,88 @@
+"""
+쿼리 확장 캐시 테스트
+- 메모리 캐시 항목 수 상한 (LRU)
+- llm 모드 결과의 SQLite 공유 캐시 (프로세스/재시작 간 재사용, 설정 해시별 분리)
+- 라우팅 로그 기반 예열
+- PersistentCache 항목 수 상한
+"""
+import json
+from datetime import datetime
+
+from app.rag import query_expander
+from app.rag.persistent_cache import PersistentCache
+from app.rag.query_expander import QueryExpander, _MemCache
+from app.rag.routing_monitor import RoutingMonitor
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_response(self, question, **kwargs):
+        self.calls += 1
+        return json.dumps({"keywords": ["무선마이크"], "synonyms": {"무선마이크": ["mic"]}})
+
+
+def _expander(monkeypatch, tmp_path, llm):
+    monkeypatch.setenv("QUERY_EXPANSION_CACHE_DB", str(tmp_path / "qexp.db"))
+    monkeypatch.setattr(query_expander.LLMSingleton, "get_instance", classmethod(lambda cls: llm))
+    return QueryExpander(mode="llm")
+
+
+def test_mem_cache_is_bounded():
+    cache = _MemCache(ttl_sec=60, max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("A ") == {"v": 1}  # 정규화 키 + 최근 사용 갱신
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+
+
+def test_shared_cache_survives_new_instance(monkeypatch, tmp_path):
+    llm = FakeLLM()
+    first = _expander(monkeypatch, tmp_path, llm)
+    result = first.expand_query("무선마이크 구매 문서")
+    assert llm.calls == 1
+    assert '"mic"' in result["search_query"]
+
+    # 다른 프로세스/재시작: 메모리 캐시는 비어 있어도 SQLite에서 조회
+    second = _expander(monkeypatch, tmp_path, llm)
+    assert second.expand_query("무선마이크  구매 문서") == result
+    assert llm.calls == 1
+
+    # 설정(프롬프트/불용어 등)이 바뀌면 다른 키
+    third = _expander(monkeypatch, tmp_path, llm)
+    third.config_hash = "other"
+    third.expand_query("무선마이크 구매 문서")
+    assert llm.calls == 2
+
+
+def test_prewarm_from_routing_log(monkeypatch, tmp_path):
+    log_dir = tmp_path / "routing"
+    log_dir.mkdir()
+    today = datetime.now().date()
+    lines = [{"query": "무선마이크 구매"}] * 3 + [{"query": "조명 수리"}]
+    (log_dir / f"routing_{today}.jsonl").write_text(
+        "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines) + '{"query": "잘린',
+        encoding="utf-8",
+    )
+
+    queries = RoutingMonitor(str(log_dir)).frequent_queries(days=1)
+    assert queries == [("무선마이크 구매", 3), ("조명 수리", 1)]
+
+    llm = FakeLLM()
+    expander = _expander(monkeypatch, tmp_path, llm)
+    stats = expander.prewarm(q for q, _ in queries)
+    assert stats == {"queries": 2, "cached": 0, "expanded": 2, "failed": 0}
+    assert expander.prewarm(["무선마이크 구매"])["cached"] == 1
+    assert llm.calls == 2
+
+
+def test_persistent_cache_entry_limit(tmp_path):
+    cache = PersistentCache(db_path=str(tmp_path / "c.db"), cleanup_prob=1.0, max_entries=2,
+                            key_func=lambda q, m=None: q)
+    for query in ["a", "b", "c"]:
+        cache.set(query, {"q": query})
+    assert cache.get_stats()["total_entries"] == 2
+    assert cache.get("c") == {"q": "c"}
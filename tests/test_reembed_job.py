@@ -0,0 +1,89 @@
+"""
+재임베딩 작업 테스트
+- 길이순 샤딩 후 메타데이터와 벡터 순서 일치
+- 중단 후 재실행 시 완료된 샤드는 재인코딩하지 않음
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from rag_system.reembed_job import reembed
+
+DIM = 4
+
+
+class FakeStore:
+    """KoreanVectorStore의 재임베딩 관련 인터페이스만 구현한 테스트용 스토어"""
+
+    def __init__(self, index_path, fail_after=None):
+        self.index_path = Path(index_path)
+        self.model_name = "fake-model"
+        self.device = "cpu"
+        self.batch_size = 8
+        self.embedding_cache = None
+        self._pending_training = False
+        self.fail_after = fail_after
+        self.encoded = []
+        self.saved = False
+
+    def create_new_index(self):
+        self.vectors = []
+        self.metadata = []
+
+    def _encode(self, texts):
+        if self.fail_after is not None and len(self.encoded) >= self.fail_after:
+            raise RuntimeError("중단")
+        self.encoded.append(len(texts))
+        # 텍스트 길이를 첫 성분에 기록해 순서 검증
+        return np.array([[len(t), 0, 0, 0] for t in texts], dtype="float32")
+
+    def add_embeddings(self, embeddings, metadatas, train_vectors=None):
+        self.vectors.extend(embeddings)
+        self.metadata.extend(metadatas)
+
+    def save_index(self):
+        self.saved = True
+
+
+TEXTS = ["가" * n for n in (3, 10, 1, 7, 5, 2, 8)]
+METAS = [{"chunk_id": f"c{i}", "length": len(t)} for i, t in enumerate(TEXTS)]
+
+
+def test_length_sorted_shards_keep_metadata_aligned(tmp_path):
+    store = FakeStore(tmp_path / "index.faiss")
+    stats = reembed(store, TEXTS, METAS, shard_size=3)
+
+    assert stats["shards"] == 3
+    assert store.encoded == [3, 3, 1]
+    assert [m["length"] for m in store.metadata] == sorted(map(len, TEXTS), reverse=True)
+    assert [int(v[0]) for v in store.vectors] == [m["length"] for m in store.metadata]
+    assert store.saved
+    assert not (tmp_path / "index.reembed").exists()  # 완료 후 체크포인트 삭제
+
+
+def test_resume_skips_completed_shards(tmp_path):
+    crashed = FakeStore(tmp_path / "index.faiss", fail_after=2)
+    with pytest.raises(RuntimeError):
+        reembed(crashed, TEXTS, METAS, shard_size=3)
+    assert not crashed.saved
+
+    resumed = FakeStore(tmp_path / "index.faiss")
+    stats = reembed(resumed, TEXTS, METAS, shard_size=3)
+
+    assert stats["resumed_shards"] == 2
+    assert resumed.encoded == [1]  # 마지막 샤드만 인코딩
+    assert len(resumed.metadata) == len(TEXTS)
+    assert [int(v[0]) for v in resumed.vectors] == [m["length"] for m in resumed.metadata]
+
+
+def test_changed_texts_invalidate_checkpoint(tmp_path):
+    with pytest.raises(RuntimeError):
+        reembed(FakeStore(tmp_path / "index.faiss", fail_after=2), TEXTS, METAS, shard_size=3)
+
+    changed = TEXTS[:-1] + ["나" * 4]
+    store = FakeStore(tmp_path / "index.faiss")
+    stats = reembed(store, changed, METAS, shard_size=3)
+
+    assert stats["resumed_shards"] == 0
+    assert store.encoded == [3, 3, 1]
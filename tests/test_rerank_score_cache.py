@@ -0,0 +1,50 @@
+"""
+재랭킹 점수 캐시 테스트
+- (모델, 정규화 질의 키, 문서 해시) 키 구성
+- LRU 상한 및 히트/미스 통계
+- SQLite 영속화 (재시작 후 재사용)
+"""
+from rag_system.rerank_score_cache import RerankScoreCache
+
+
+def test_key_uses_model_normalized_query_and_content():
+    key = RerankScoreCache.make_key("m", "HP Z8 가격", "문서 본문")
+
+    assert key[0] == "m"
+    assert key == RerankScoreCache.make_key("m", "HP Z8 가격", "문서 본문")
+    assert key != RerankScoreCache.make_key("other", "HP Z8 가격", "문서 본문")
+    assert key != RerankScoreCache.make_key("m", "HP Z8 가격", "문서 본문 수정")
+    # 문서 원문은 키에 남지 않음 (해시만 보관)
+    assert "문서 본문" not in "".join(key)
+
+
+def test_hits_misses_and_lru_bound():
+    cache = RerankScoreCache(max_entries=2)
+    keys = [RerankScoreCache.make_key("m", "질의", f"문서{i}") for i in range(3)]
+
+    assert cache.get_many(keys[:2]) == [None, None]
+    cache.put_many(keys[:2], [0.1, 0.2])
+    assert cache.get_many(keys[:2]) == [0.1, 0.2]
+
+    cache.put_many(keys[2:], [0.3])
+    assert cache.get_many([keys[0]]) == [None]  # 가장 오래된 항목 축출
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+
+
+def test_sqlite_persistence(tmp_path):
+    db_path = str(tmp_path / "rerank_scores.db")
+    keys = [RerankScoreCache.make_key("m", "질의", f"문서{i}") for i in range(2)]
+
+    first = RerankScoreCache(db_path=db_path)
+    first.put_many(keys, [0.25, 0.75])
+
+    restarted = RerankScoreCache(db_path=db_path)
+    assert restarted.get_many(keys + [RerankScoreCache.make_key("m", "질의", "새 문서")]) == [0.25, 0.75, None]
+    assert restarted.get_stats()["disk_hits"] == 2
+    # 디스크 히트는 메모리로 승격
+    assert restarted.get_stats()["entries"] == 2
@@ -0,0 +1,123 @@
+"""
+답변 single-flight 테스트
+- QueryCache in-flight: 팔로워가 리더 결과 공유, 리더 실패 시 None
+- PersistentCache 계산 임대: 프로세스 간 리더 1명, 결과 대기
+- RAGPipeline: 동시 동일 질의는 한 번만 계산 (coalesced 메트릭), 리더 실패 응답은 공유하지 않음
+"""
+import threading
+import time
+
+from app.rag import pipeline as pipeline_module
+from app.rag.cache_manager import QueryCache
+from app.rag.persistent_cache import PersistentCache
+from app.rag.pipeline import RAGPipeline
+
+
+def test_query_cache_shares_leader_result():
+    cache = QueryCache()
+    assert cache.begin_inflight("질의", namespace="ns")
+    assert not cache.begin_inflight("질의", namespace="ns")
+
+    shared = []
+    follower = threading.Thread(target=lambda: shared.append(cache.wait_inflight("질의", namespace="ns", timeout=5)))
+    follower.start()
+    time.sleep(0.05)
+    cache.end_inflight("질의", namespace="ns", result={"text": "답"})
+    follower.join()
+
+    assert shared == [{"text": "답"}]
+    assert cache.get_stats()["coalesced"] == 1
+    assert cache.wait_inflight("질의", namespace="ns") is None  # 계산 중 아님
+
+    # 리더 실패: 결과 없이 종료 → 팔로워는 직접 계산
+    cache.begin_inflight("실패", namespace="ns")
+    cache.end_inflight("실패", namespace="ns")
+    assert cache.begin_inflight("실패", namespace="ns")
+
+
+def test_persistent_cache_lease(tmp_path):
+    db_path = str(tmp_path / "c.db")
+    leader = PersistentCache(db_path=db_path)
+    follower = PersistentCache(db_path=db_path)
+
+    assert leader.acquire_lease("질의", namespace="ns", ttl=5)
+    assert not follower.acquire_lease("질의", namespace="ns", ttl=5)
+
+    def finish():
+        time.sleep(0.1)
+        leader.set("질의", {"text": "답"}, namespace="ns")
+        leader.release_lease("질의", namespace="ns")
+
+    threading.Thread(target=finish).start()
+    assert follower.wait_for_result("질의", namespace="ns", timeout=5, poll_interval=0.02) == {"text": "답"}
+    assert follower.stats["coalesced"] == 1
+    assert follower.acquire_lease("질의", namespace="ns", ttl=5)
+
+    # 만료된 임대(리더 프로세스 종료)는 다음 요청이 가져감
+    assert leader.acquire_lease("만료", ttl=-1)
+    assert follower.acquire_lease("만료", ttl=5)
+
+
+def test_pipeline_coalesces_concurrent_answers(tmp_path, monkeypatch):
+    memory = QueryCache()
+    monkeypatch.setattr(pipeline_module, "get_cache", lambda: memory)
+    persistent = PersistentCache(db_path=str(tmp_path / "c.db"))
+    monkeypatch.setattr(pipeline_module, "get_persistent_cache", lambda: persistent)
+
+    calls = []
+
+    def compute(self, query, top_k, selected_filename, cache_mode, cache_ns, errors=None):
+        calls.append(query)
+        time.sleep(0.2)
+        return {"text": "답", "status": {"found": True}}
+
+    monkeypatch.setattr(RAGPipeline, "_compute_answer", compute)
+    rag = RAGPipeline.__new__(RAGPipeline)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(rag._answer_single_flight("질의", None, None, None, "ns")))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(r["status"].get("from_cache", "leader") for r in results) == ["coalesced"] * 3 + ["leader"]
+    assert memory.get_stats()["coalesced"] == 3
+    assert memory.get_stats()["inflight_count"] == 0
+
+
+def test_pipeline_follower_recomputes_after_leader_failure(tmp_path, monkeypatch):
+    memory = QueryCache()
+    monkeypatch.setattr(pipeline_module, "get_cache", lambda: memory)
+    persistent = PersistentCache(db_path=str(tmp_path / "c.db"))
+    monkeypatch.setattr(pipeline_module, "get_persistent_cache", lambda: persistent)
+
+    calls = []
+
+    def compute(self, query, top_k, selected_filename, cache_mode, cache_ns, errors=None):
+        calls.append(query)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            errors.append("[E_GENERATE] timeout")
+            return {"text": "답변 생성 중 오류가 발생했다.", "status": {"found": False}}
+        return {"text": "답", "status": {"found": True}}
+
+    monkeypatch.setattr(RAGPipeline, "_compute_answer", compute)
+    rag = RAGPipeline.__new__(RAGPipeline)
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault(
+        "leader", rag._answer_single_flight("질의", None, None, None, "ns")))
+    leader.start()
+    time.sleep(0.05)
+    results["follower"] = rag._answer_single_flight("질의", None, None, None, "ns")
+    leader.join()
+
+    assert len(calls) == 2
+    assert results["leader"]["status"]["found"] is False
+    assert results["follower"] == {"text": "답", "status": {"found": True}}
+    assert memory.get_stats()["coalesced"] == 0
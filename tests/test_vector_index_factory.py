@@ -0,0 +1,105 @@
+"""
+FAISS 벡터 인덱스 팩토리 테스트
+- 인덱스 종류·인코딩별 factory 문자열
+- 학습 필요 인덱스 생성 (자동 nlist, 학습 벡터 부족 시 ValueError), 최소 학습 벡터 수
+- 검색 파라미터 적용 (해당 인덱스에만), 메모리 사용량 추정
+"""
+import faiss
+import numpy as np
+import pytest
+
+from rag_system.vector_index_factory import (
+    MIN_POINTS_PER_CENTROID,
+    PQ_MIN_TRAIN,
+    auto_nlist,
+    build_index,
+    describe_index,
+    estimate_index_bytes,
+    factory_string,
+    min_train_vectors,
+    set_search_params,
+)
+
+DIM = 16
+
+
+def _vectors(n, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, DIM)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("args, expected", [
+    (("flat",), "Flat"),
+    (("flat", 0, 64, 32, "fp16"), "SQfp16"),
+    (("ivf_flat", 8), "IVF8,Flat"),
+    (("ivf_flat", 8, 64, 32, "sq8"), "IVF8,SQ8"),
+    (("ivf_pq", 8, 4), "IVF8,PQ4"),
+    (("hnsw", 0, 64, 16), "HNSW16,Flat"),
+    (("hnsw", 0, 4, 16, "pq"), "HNSW16,PQ4"),
+])
+def test_factory_string(args, expected):
+    assert factory_string(*args) == expected
+
+
+def test_factory_string_rejects_unknown():
+    with pytest.raises(ValueError):
+        factory_string("lsh")
+    with pytest.raises(ValueError):
+        factory_string("flat", encoding="int4")
+
+
+def test_build_index_trains_with_auto_nlist():
+    train = _vectors(2000)
+    index = build_index(DIM, "ivf_flat", train_vectors=train)
+
+    ivf = faiss.extract_index_ivf(index)
+    assert index.is_trained
+    assert ivf.nlist == auto_nlist(2000) == 2000 // MIN_POINTS_PER_CENTROID
+    assert describe_index(build_index(DIM, "hnsw")) == "IndexHNSWFlat"
+
+
+def test_build_index_validates_training():
+    with pytest.raises(ValueError):
+        build_index(DIM, "ivf_flat")  # 학습 벡터 없음
+    with pytest.raises(ValueError):
+        build_index(DIM, "ivf_pq", train_vectors=_vectors(100), pq_m=4)  # PQ 학습 벡터 부족
+    with pytest.raises(ValueError):
+        build_index(DIM, "ivf_pq", train_vectors=_vectors(500), pq_m=5)  # 차원의 약수 아님
+
+
+def test_min_train_vectors():
+    assert min_train_vectors("flat") == 0
+    assert min_train_vectors("hnsw", "fp16") == 0
+    assert min_train_vectors("flat", "sq8") == PQ_MIN_TRAIN
+    assert min_train_vectors("ivf_flat", nlist=8) == 8 * MIN_POINTS_PER_CENTROID
+    assert min_train_vectors("ivf_flat") == (4 * MIN_POINTS_PER_CENTROID) ** 2  # 자동 nlist
+    assert min_train_vectors("ivf_pq", nlist=2) == PQ_MIN_TRAIN
+    assert min_train_vectors("ivf_flat", nlist=8, train_min=50) == 50
+
+
+def test_set_search_params_applies_matching_params():
+    ivf = build_index(DIM, "ivf_flat", train_vectors=_vectors(500), nlist=8)
+    assert set_search_params(ivf, nprobe=4, ef_search=32) == {"nprobe": 4}
+    assert faiss.extract_index_ivf(ivf).nprobe == 4
+
+    hnsw = build_index(DIM, "hnsw")
+    assert set_search_params(hnsw, nprobe=4, ef_search=32) == {"efSearch": 32}
+    assert faiss.downcast_index(hnsw).hnsw.efSearch == 32
+
+    assert set_search_params(build_index(DIM, "flat"), nprobe=4, ef_search=32) == {}
+
+
+def test_estimate_index_bytes():
+    vectors = _vectors(300)
+
+    flat = build_index(DIM, "flat")
+    flat.add(vectors)
+    assert estimate_index_bytes(flat) == 300 * DIM * 4
+
+    ivf = build_index(DIM, "ivf_flat", train_vectors=vectors, nlist=4, encoding="sq8")
+    ivf.add(vectors)
+    assert estimate_index_bytes(ivf) == 300 * (DIM + 8)  # SQ8 코드 + int64 id
+
+    hnsw = build_index(DIM, "hnsw", hnsw_m=8)
+    hnsw.add(vectors)
+    assert estimate_index_bytes(hnsw) == 300 * (DIM * 4 + 2 * 8 * 4)  # 원본 + 레벨0 이웃 2M개